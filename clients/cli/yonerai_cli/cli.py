@@ -1,50 +1,61 @@
 from __future__ import annotations
 
 import argparse
+import importlib
 import json
 import os
 import sys
-import urllib.request
 from typing import Any
 
 from yonerai_cli import __version__
 from yonerai_cli.cli_dispatch import CliDispatchError, CliRuntimeHooks, dispatch_command
-from yonerai_cli.commands import diagnostics as diagnostics_command
-from yonerai_cli.commands.providers import build_providers_report as _build_interactive_providers_report
-from yonerai_cli.commands.diagnostics import (
-    DiagnosticsCommandError,
-    _build_doctor_report,
-    _build_start_report,
-    _build_status_report,
-    _prepare_trusted_cli_import_paths,
-    _run_mcp_deny_policy_self_check,
-    _run_redaction_self_check,
-    _read_repo_version,
-    _repo_root,
-)
-from yonerai_cli.screens.diagnostics import (
-    _format_doctor_pretty,
-    _format_status_pretty,
-    _hybrid_node_relay_contract_rows,
-    _print_doctor_pretty,
-    _print_start_pretty,
-    _print_status_pretty,
-    _provider_setup_rows,
-    _relay_status_rows,
-)
-from yonerai_cli.commands.hybrid import format_hybrid_pretty as _format_hybrid_pretty
-from yonerai_cli.cli_parser import build_parser as build_cli_parser
 from yonerai_cli.config import ConfigError, load_cli_config
-from yonerai_cli.services import core_api_service
-from yonerai_cli.services.core_api_service import (
-    DEFAULT_API_ORIGIN,
-    TOKEN_ENV,
-    CoreApiServiceError,
-    safe_http_error as _safe_http_error,
-)
-from yonerai_cli.services import interactive_service
-from yonerai_cli.services import control_spine_callbacks
-from yonerai_cli.services.interactive_service import InteractiveServiceError
+
+# Diagnostics, screens and service modules are resolved on first use (see `__getattr__`)
+# so `yonerai --version` and single subcommands do not import the whole TUI/service graph.
+_LAZY_ATTRS: dict[str, tuple[str, str | None]] = {
+    "urllib": ("urllib.request", None),
+    "diagnostics_command": ("yonerai_cli.commands.diagnostics", None),
+    "DiagnosticsCommandError": ("yonerai_cli.commands.diagnostics", "DiagnosticsCommandError"),
+    "_build_doctor_report": ("yonerai_cli.commands.diagnostics", "_build_doctor_report"),
+    "_build_start_report": ("yonerai_cli.commands.diagnostics", "_build_start_report"),
+    "_build_status_report": ("yonerai_cli.commands.diagnostics", "_build_status_report"),
+    "_run_mcp_deny_policy_self_check": ("yonerai_cli.commands.diagnostics", "_run_mcp_deny_policy_self_check"),
+    "_run_redaction_self_check": ("yonerai_cli.commands.diagnostics", "_run_redaction_self_check"),
+    "_build_interactive_providers_report": ("yonerai_cli.commands.providers", "build_providers_report"),
+    "_format_hybrid_pretty": ("yonerai_cli.commands.hybrid", "format_hybrid_pretty"),
+    "_format_doctor_pretty": ("yonerai_cli.screens.diagnostics", "_format_doctor_pretty"),
+    "_format_status_pretty": ("yonerai_cli.screens.diagnostics", "_format_status_pretty"),
+    "_hybrid_node_relay_contract_rows": ("yonerai_cli.screens.diagnostics", "_hybrid_node_relay_contract_rows"),
+    "_print_doctor_pretty": ("yonerai_cli.screens.diagnostics", "_print_doctor_pretty"),
+    "_print_start_pretty": ("yonerai_cli.screens.diagnostics", "_print_start_pretty"),
+    "_print_status_pretty": ("yonerai_cli.screens.diagnostics", "_print_status_pretty"),
+    "_provider_setup_rows": ("yonerai_cli.screens.diagnostics", "_provider_setup_rows"),
+    "_relay_status_rows": ("yonerai_cli.screens.diagnostics", "_relay_status_rows"),
+    "core_api_service": ("yonerai_cli.services.core_api_service", None),
+    "DEFAULT_API_ORIGIN": ("yonerai_cli.services.core_api_service", "DEFAULT_API_ORIGIN"),
+    "TOKEN_ENV": ("yonerai_cli.services.core_api_service", "TOKEN_ENV"),
+    "CoreApiServiceError": ("yonerai_cli.services.core_api_service", "CoreApiServiceError"),
+    "_safe_http_error": ("yonerai_cli.services.core_api_service", "safe_http_error"),
+    "interactive_service": ("yonerai_cli.services.interactive_service", None),
+    "InteractiveServiceError": ("yonerai_cli.services.interactive_service", "InteractiveServiceError"),
+    "control_spine_callbacks": ("yonerai_cli.services.control_spine_callbacks", None),
+}
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY_ATTRS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = target
+    module = importlib.import_module(module_name)
+    if attr is None:
+        return sys.modules[module_name.split(".")[0]] if name == "urllib" else module
+    return getattr(module, attr)
+
+
+def _lazy(name: str) -> Any:
+    return __getattr__(name)
 
 
 class CliError(Exception):
@@ -54,16 +65,18 @@ class CliError(Exception):
 
 
 def normalize_loopback_origin(origin: str) -> str:
+    core_api_service = _lazy("core_api_service")
     try:
         return core_api_service.normalize_loopback_origin(origin)
-    except CoreApiServiceError as exc:
+    except core_api_service.CoreApiServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
 def request_json(method: str, origin: str, path: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+    core_api_service = _lazy("core_api_service")
     try:
         return core_api_service.request_json(method, origin, path, body)
-    except CoreApiServiceError as exc:
+    except core_api_service.CoreApiServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
@@ -76,7 +89,7 @@ def _run_public_mvp_smoke(*, json_output: bool = False, pretty: bool = False) ->
         _prepare_trusted_cli_import_paths()
         public_mvp_smoke = _load_public_mvp_smoke_module()
     except Exception as exc:
-        raise DiagnosticsCommandError("public MVP smoke is unavailable.", exit_code=1) from exc
+        raise _lazy("DiagnosticsCommandError")("public MVP smoke is unavailable.", exit_code=1) from exc
     try:
         argv = ["--json"] if json_output else ["--pretty"] if pretty else []
         return public_mvp_smoke.main(argv)
@@ -85,7 +98,7 @@ def _run_public_mvp_smoke(*, json_output: bool = False, pretty: bool = False) ->
             return 0
         return exc.code if isinstance(exc.code, int) else 1
     except Exception as exc:
-        raise DiagnosticsCommandError("public MVP smoke failed.", exit_code=1) from exc
+        raise _lazy("DiagnosticsCommandError")("public MVP smoke failed.", exit_code=1) from exc
 
 
 def _run_public_demo(*, json_output: bool = False, pretty: bool = False) -> int:
@@ -93,7 +106,7 @@ def _run_public_demo(*, json_output: bool = False, pretty: bool = False) -> int:
         _prepare_trusted_cli_import_paths()
         public_demo = _load_public_demo_module()
     except Exception as exc:
-        raise DiagnosticsCommandError("YonerAI public demo is unavailable.", exit_code=1) from exc
+        raise _lazy("DiagnosticsCommandError")("YonerAI public demo is unavailable.", exit_code=1) from exc
     try:
         argv = ["--json"] if json_output else ["--pretty"] if pretty else ["--pretty"]
         return public_demo.main(argv)
@@ -102,15 +115,27 @@ def _run_public_demo(*, json_output: bool = False, pretty: bool = False) -> int:
             return 0
         return exc.code if isinstance(exc.code, int) else 1
     except Exception as exc:
-        raise DiagnosticsCommandError("YonerAI public demo failed.", exit_code=1) from exc
+        raise _lazy("DiagnosticsCommandError")("YonerAI public demo failed.", exit_code=1) from exc
 
 
 def _load_public_mvp_smoke_module() -> Any:
-    return diagnostics_command._load_public_mvp_smoke_module()
+    return _lazy("diagnostics_command")._load_public_mvp_smoke_module()
 
 
 def _load_public_demo_module() -> Any:
-    return diagnostics_command._load_public_demo_module()
+    return _lazy("diagnostics_command")._load_public_demo_module()
+
+
+def _prepare_trusted_cli_import_paths() -> None:
+    _lazy("diagnostics_command")._prepare_trusted_cli_import_paths()
+
+
+def _repo_root() -> Any:
+    return _lazy("diagnostics_command")._repo_root()
+
+
+def _read_repo_version() -> str | None:
+    return _lazy("diagnostics_command")._read_repo_version()
 
 
 def _load_config_for_policy(args: argparse.Namespace) -> dict[str, object]:
@@ -146,7 +171,7 @@ def _interactive_runtime_env(config_path: str | None = None) -> dict[str, str]:
 
 
 def _interactive_providers_report(config_path: str | None = None) -> dict[str, Any]:
-    return _build_interactive_providers_report(
+    return _lazy("_build_interactive_providers_report")(
         prepare_import_paths=_prepare_trusted_cli_import_paths,
         env=_interactive_runtime_env(config_path),
     )
@@ -169,6 +194,7 @@ def _interactive_auth_login(lang: str, interactive_tty: bool, *, config_path: st
 
 def _interactive_callbacks(config_path: str | None = None):
     from yonerai_cli.interactive import InteractiveCallbacks
+    from yonerai_cli.services import control_spine_callbacks, interactive_service
 
     return InteractiveCallbacks(
         providers=lambda: _interactive_providers_report(config_path),
@@ -276,6 +302,8 @@ def _interactive_ask_auto(
     *,
     config_path: str | None = None,
 ) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     return interactive_service.build_interactive_ask_report(
         task,
         provider,
@@ -288,6 +316,8 @@ def _interactive_ask_auto(
 
 
 def _interactive_runs_list(ledger_path: str | None, limit: int, _lang: str) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     return interactive_service.build_interactive_runs_list(
         ledger_path,
         limit,
@@ -297,6 +327,8 @@ def _interactive_runs_list(ledger_path: str | None, limit: int, _lang: str) -> d
 
 
 def _interactive_runs_show(run_id: str, ledger_path: str | None, _lang: str) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     return interactive_service.build_interactive_runs_show(
         run_id,
         ledger_path,
@@ -306,17 +338,21 @@ def _interactive_runs_show(run_id: str, ledger_path: str | None, _lang: str) ->
 
 
 def _interactive_update_check(manifest_path: str | None, _lang: str) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.build_interactive_update_check(
             manifest_path,
             repo_root=_repo_root(),
             current_version=_read_repo_version() or __version__,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
 def _interactive_update_apply(channel: str, confirmed: bool, _lang: str) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.build_interactive_update_apply(
             channel,
@@ -325,20 +361,24 @@ def _interactive_update_apply(channel: str, confirmed: bool, _lang: str) -> dict
             current_version=_read_repo_version() or __version__,
             env=os.environ,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
 def _interactive_status_check(_lang: str) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.build_interactive_status_check(
             prepare_import_paths=_prepare_trusted_cli_import_paths,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
 def _interactive_api_status(_lang: str, *, config_path: str | None = None) -> dict[str, Any]:
+    from yonerai_cli.services import control_spine_callbacks, interactive_service
+
     control_spine_report = control_spine_callbacks.interactive_api_status(_lang, config_path=config_path)
     if control_spine_report is not None:
         return control_spine_report
@@ -346,7 +386,7 @@ def _interactive_api_status(_lang: str, *, config_path: str | None = None) -> di
         return interactive_service.build_interactive_api_status(
             prepare_import_paths=_prepare_trusted_cli_import_paths,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
@@ -363,11 +403,13 @@ def _interactive_sync_status(_lang: str, *, config_path: str | None = None) -> d
 
 
 def _interactive_evolve_status(_lang: str) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.build_interactive_evolve_status(
             prepare_import_paths=_prepare_trusted_cli_import_paths,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
@@ -377,16 +419,20 @@ def _interactive_memory_status(_lang: str) -> dict[str, Any]:
 
 
 def _interactive_memory_report(args: argparse.Namespace) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.build_interactive_memory_report(
             args,
             prepare_import_paths=_prepare_trusted_cli_import_paths,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
 def _interactive_policy_status(config: dict[str, object]) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     return interactive_service.build_interactive_policy_status(
         config,
         prepare_import_paths=_prepare_trusted_cli_import_paths,
@@ -394,6 +440,8 @@ def _interactive_policy_status(config: dict[str, object]) -> dict[str, Any]:
 
 
 def _interactive_memory_action(action: str, values: list[str], _lang: str, default_scope: str | None) -> dict[str, Any]:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.build_interactive_memory_action(
             action,
@@ -401,14 +449,16 @@ def _interactive_memory_action(action: str, values: list[str], _lang: str, defau
             default_scope,
             prepare_import_paths=_prepare_trusted_cli_import_paths,
         )
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
 def _run_interactive_chat(args: argparse.Namespace) -> int:
+    from yonerai_cli.services import interactive_service
+
     try:
         return interactive_service.run_interactive_chat(args, _interactive_callbacks(getattr(args, "config_path", None)))
-    except InteractiveServiceError as exc:
+    except interactive_service.InteractiveServiceError as exc:
         raise CliError(str(exc), exit_code=exc.exit_code) from exc
 
 
@@ -419,8 +469,10 @@ def _prompt_from_args(parts: list[str]) -> str:
     return prompt
 
 
-def build_parser() -> argparse.ArgumentParser:
-    return build_cli_parser()
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    from yonerai_cli.cli_parser import build_parser as build_cli_parser
+
+    return build_cli_parser(command)
 
 
 def _runtime_hooks() -> CliRuntimeHooks:
@@ -430,18 +482,18 @@ def _runtime_hooks() -> CliRuntimeHooks:
         run_interactive_chat=_run_interactive_chat,
         run_public_mvp_smoke=_run_public_mvp_smoke,
         run_public_demo=_run_public_demo,
-        build_start_report=_build_start_report,
-        print_start_pretty=_print_start_pretty,
-        build_doctor_report=_build_doctor_report,
-        print_doctor_pretty=_print_doctor_pretty,
-        build_providers_report=lambda: _build_interactive_providers_report(
+        build_start_report=lambda **kwargs: _lazy("_build_start_report")(**kwargs),
+        print_start_pretty=lambda *args, **kwargs: _lazy("_print_start_pretty")(*args, **kwargs),
+        build_doctor_report=lambda: _lazy("_build_doctor_report")(),
+        print_doctor_pretty=lambda *args, **kwargs: _lazy("_print_doctor_pretty")(*args, **kwargs),
+        build_providers_report=lambda: _lazy("_build_interactive_providers_report")(
             prepare_import_paths=_prepare_trusted_cli_import_paths,
             env=os.environ,
         ),
         prepare_import_paths=_prepare_trusted_cli_import_paths,
         load_config_for_policy=_load_config_for_policy,
-        build_status_report=_build_status_report,
-        print_status_pretty=_print_status_pretty,
+        build_status_report=lambda **kwargs: _lazy("_build_status_report")(**kwargs),
+        print_status_pretty=lambda *args, **kwargs: _lazy("_print_status_pretty")(*args, **kwargs),
         repo_root=_repo_root,
         read_repo_version=_read_repo_version,
         prompt_from_args=_prompt_from_args,
@@ -450,6 +502,10 @@ def _runtime_hooks() -> CliRuntimeHooks:
 
 def run(argv: list[str] | None = None) -> int:
     actual_argv = list(sys.argv[1:] if argv is None else argv)
+    if actual_argv == ["--version"]:
+        # Answer before building the parser, which imports every command module.
+        print(f"yonerai {__version__}")
+        return 0
     if not actual_argv:
         return _run_interactive_chat(
             argparse.Namespace(
@@ -462,7 +518,7 @@ def run(argv: list[str] | None = None) -> int:
                 color="auto",
             )
         )
-    parser = build_parser()
+    parser = build_parser(actual_argv[0])
     args = parser.parse_args(actual_argv)
     try:
         return dispatch_command(args, _runtime_hooks())
@@ -475,14 +531,22 @@ def main(argv: list[str] | None = None) -> int:
     actual_argv = list(sys.argv[1:] if argv is None else argv)
     try:
         return run(actual_argv)
-    except DiagnosticsCommandError as exc:
+    except CliError as exc:
         print(f"error: {_localized_cli_error(str(exc), actual_argv)}", file=sys.stderr)
         return exc.exit_code
-    except CliError as exc:
+    except Exception as exc:
+        if not _is_diagnostics_error(exc):
+            raise
         print(f"error: {_localized_cli_error(str(exc), actual_argv)}", file=sys.stderr)
         return exc.exit_code
 
 
+def _is_diagnostics_error(exc: BaseException) -> bool:
+    # A DiagnosticsCommandError can only exist if the diagnostics module was imported.
+    module = sys.modules.get("yonerai_cli.commands.diagnostics")
+    return module is not None and isinstance(exc, module.DiagnosticsCommandError)
+
+
 def _localized_cli_error(message: str, argv: list[str]) -> str:
     if _explicit_lang(argv) == "en":
         return message
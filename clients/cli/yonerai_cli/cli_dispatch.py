@@ -1,58 +1,28 @@
 from __future__ import annotations
 
 import argparse
+import importlib
 import os
 from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
 from typing import Any, Callable
 
 from yonerai_cli import __version__
-from yonerai_cli.commands.api import ApiCommandError, handle_api_command
-from yonerai_cli.commands.audit import AuditCommandError, handle_audit_command
-from yonerai_cli.commands.ask import (
-    AskCommandError,
-    AskCommandUserInputError,
-    handle_ask_command,
-    handle_plan_command,
-)
-from yonerai_cli.commands.auth import (
-    AuthCommandError,
-    handle_auth_command,
-    handle_login_alias_command,
-    handle_privacy_command,
-    handle_whoami_command,
-)
-from yonerai_cli.commands.config import ConfigCommandError, handle_config_command
-from yonerai_cli.commands.discord import DiscordCommandError, handle_discord_command
-from yonerai_cli.commands.evolve import EvolveCommandError, handle_evolve_command
-from yonerai_cli.commands.hybrid import HybridCommandError, handle_hybrid_command
-from yonerai_cli.commands.manifest import ManifestCommandError, handle_manifest_command
-from yonerai_cli.commands.memory import MemoryCommandError, MemoryCommandUserInputError, handle_memory_command
-from yonerai_cli.commands.native_run import (
-    NativeRunCommandError,
-    handle_capability_command,
-    handle_module_command,
-    handle_native_run_command,
-    handle_worker_command,
-)
-from yonerai_cli.commands.node import (
-    NodeCommandError,
-    NodeCommandUserInputError,
-    handle_node_command,
-    handle_relay_command,
-)
-from yonerai_cli.commands.ops import OpsCommandError, handle_ops_command
-from yonerai_cli.commands.oracle import OracleCommandError, handle_oracle_command
-from yonerai_cli.commands.policy import handle_policy_command
-from yonerai_cli.commands.provider import ProviderCommandError, handle_provider_command
-from yonerai_cli.commands.providers import ProvidersCommandError, handle_providers_command
-from yonerai_cli.commands.project import ProjectCommandError, handle_project_command
-from yonerai_cli.commands.route import RouteCommandError, handle_route_command
-from yonerai_cli.commands.runs import RunsCommandError, handle_runs_command
-from yonerai_cli.commands.search import SearchCommandError, handle_search_command
-from yonerai_cli.commands.status_snapshot import StatusSnapshotCommandError, handle_status_snapshot_command
-from yonerai_cli.commands.sync import SyncCommandError, handle_sync_command
-from yonerai_cli.commands.update import InstallUpdateCommandError, handle_install_command, handle_update_command
+
+
+class _LazyCommands:
+    """Resolve `yonerai_cli.commands.<name>` on first use so a dispatch only imports the invoked command."""
+
+    def __getattr__(self, name: str) -> ModuleType:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        module = importlib.import_module(f"yonerai_cli.commands.{name}")
+        setattr(self, name, module)
+        return module
+
+
+_commands = _LazyCommands()
 
 
 class CliDispatchError(Exception):
@@ -87,101 +57,101 @@ def dispatch_command(args: argparse.Namespace, hooks: CliRuntimeHooks) -> int:
         return hooks.run_interactive_chat(args)
     if args.command == "login":
         try:
-            return handle_login_alias_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_login_alias_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "whoami":
         args.short_command = True
         try:
-            return handle_whoami_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_whoami_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "sessions":
         args.auth_command = "sessions"
         args.short_command = True
         try:
-            return handle_auth_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_auth_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "revoke":
         args.auth_command = "revoke-session"
         args.short_command = True
         try:
-            return handle_auth_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_auth_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "logout":
         args.auth_command = "logout"
         args.staging = True
         args.short_command = True
         try:
-            return handle_auth_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_auth_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "config":
         try:
-            return handle_config_command(args, print_json=hooks.print_json)
-        except ConfigCommandError as exc:
+            return _commands.config.handle_config_command(args, print_json=hooks.print_json)
+        except _commands.config.ConfigCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "auth":
         try:
-            return handle_auth_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_auth_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "privacy":
         try:
-            return handle_privacy_command(args, print_json=hooks.print_json)
-        except AuthCommandError as exc:
+            return _commands.auth.handle_privacy_command(args, print_json=hooks.print_json)
+        except _commands.auth.AuthCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "api":
         try:
-            return handle_api_command(
+            return _commands.api.handle_api_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except ApiCommandError as exc:
+        except _commands.api.ApiCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command in {"ping", "rate-limit"}:
         args.api_command = "ping" if args.command == "ping" else "rate-limit"
         args.short_command = True
         try:
-            return handle_api_command(
+            return _commands.api.handle_api_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except ApiCommandError as exc:
+        except _commands.api.ApiCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "project":
         try:
-            return handle_project_command(args, print_json=hooks.print_json)
-        except ProjectCommandError as exc:
+            return _commands.project.handle_project_command(args, print_json=hooks.print_json)
+        except _commands.project.ProjectCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "projects":
         args.project_command = args.project_short_command
         args.short_command = True
         try:
-            return handle_project_command(args, print_json=hooks.print_json)
-        except ProjectCommandError as exc:
+            return _commands.project.handle_project_command(args, print_json=hooks.print_json)
+        except _commands.project.ProjectCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "audit":
         try:
-            return handle_audit_command(args, print_json=hooks.print_json)
-        except AuditCommandError as exc:
+            return _commands.audit.handle_audit_command(args, print_json=hooks.print_json)
+        except _commands.audit.AuditCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "sync":
         try:
-            return handle_sync_command(
+            return _commands.sync.handle_sync_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except SyncCommandError as exc:
+        except _commands.sync.SyncCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=exc.exit_code) from exc
     if args.command == "evolve":
         try:
-            return handle_evolve_command(
+            return _commands.evolve.handle_evolve_command(
                 args,
                 print_json=hooks.print_json,
                 prepare_import_paths=hooks.prepare_import_paths,
                 repo_root=hooks.repo_root(),
             )
-        except EvolveCommandError as exc:
+        except _commands.evolve.EvolveCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "health":
         hooks.print_json(hooks.request_json("GET", args.api_origin, "/health"))
@@ -206,27 +176,27 @@ def dispatch_command(args: argparse.Namespace, hooks: CliRuntimeHooks) -> int:
         return 0 if report["ok"] else 1
     if args.command == "providers":
         try:
-            return handle_providers_command(
+            return _commands.providers.handle_providers_command(
                 args, print_json=hooks.print_json, report_builder=hooks.build_providers_report
             )
-        except ProvidersCommandError as exc:
+        except _commands.providers.ProvidersCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "provider":
         try:
-            return handle_provider_command(args, print_json=hooks.print_json)
-        except ProviderCommandError as exc:
+            return _commands.provider.handle_provider_command(args, print_json=hooks.print_json)
+        except _commands.provider.ProviderCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "policy":
         hooks.prepare_import_paths()
         try:
-            return handle_policy_command(args, config=hooks.load_config_for_policy(args), print_json=hooks.print_json)
+            return _commands.policy.handle_policy_command(args, config=hooks.load_config_for_policy(args), print_json=hooks.print_json)
         except ValueError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "status":
         if getattr(args, "status_command", None) != "check":
             try:
-                return handle_status_snapshot_command(args, print_json=hooks.print_json)
-            except StatusSnapshotCommandError as exc:
+                return _commands.status_snapshot.handle_status_snapshot_command(args, print_json=hooks.print_json)
+            except _commands.status_snapshot.StatusSnapshotCommandError as exc:
                 raise CliDispatchError(str(exc), exit_code=2) from exc
         legacy_source = args.source if args.source in {"local", "fixture"} else "local"
         report = hooks.build_status_report(
@@ -242,85 +212,85 @@ def dispatch_command(args: argparse.Namespace, hooks: CliRuntimeHooks) -> int:
         return 0 if report["ok"] else 1
     if args.command == "manifest" and args.manifest_command == "verify":
         try:
-            return handle_manifest_command(args, print_json=hooks.print_json)
-        except ManifestCommandError as exc:
+            return _commands.manifest.handle_manifest_command(args, print_json=hooks.print_json)
+        except _commands.manifest.ManifestCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "route" and args.route_command == "preview":
         try:
-            return handle_route_command(
+            return _commands.route.handle_route_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except RouteCommandError as exc:
+        except _commands.route.RouteCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "node":
         try:
-            return handle_node_command(
+            return _commands.node.handle_node_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except NodeCommandUserInputError as exc:
+        except _commands.node.NodeCommandUserInputError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
-        except NodeCommandError as exc:
+        except _commands.node.NodeCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "relay" and args.relay_command == "status":
         try:
-            return handle_relay_command(
+            return _commands.node.handle_relay_command(
                 args,
                 print_json=hooks.print_json,
                 prepare_import_paths=hooks.prepare_import_paths,
                 env=os.environ,
             )
-        except NodeCommandError as exc:
+        except _commands.node.NodeCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "oracle":
         try:
-            return handle_oracle_command(
+            return _commands.oracle.handle_oracle_command(
                 args,
                 print_json=hooks.print_json,
                 prepare_import_paths=hooks.prepare_import_paths,
                 env=os.environ,
             )
-        except OracleCommandError as exc:
+        except _commands.oracle.OracleCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "hybrid":
         try:
-            return handle_hybrid_command(
+            return _commands.hybrid.handle_hybrid_command(
                 args,
                 print_json=hooks.print_json,
                 prepare_import_paths=hooks.prepare_import_paths,
                 env=os.environ,
             )
-        except HybridCommandError as exc:
+        except _commands.hybrid.HybridCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "plan":
         try:
-            return handle_plan_command(
+            return _commands.ask.handle_plan_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except AskCommandUserInputError as exc:
+        except _commands.ask.AskCommandUserInputError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
-        except AskCommandError as exc:
+        except _commands.ask.AskCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "ask":
         try:
-            return handle_ask_command(
+            return _commands.ask.handle_ask_command(
                 args,
                 print_json=hooks.print_json,
                 prepare_import_paths=hooks.prepare_import_paths,
                 env=os.environ,
             )
-        except AskCommandUserInputError as exc:
+        except _commands.ask.AskCommandUserInputError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
-        except AskCommandError as exc:
+        except _commands.ask.AskCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "runs":
         try:
-            return handle_runs_command(
+            return _commands.runs.handle_runs_command(
                 args,
                 print_json=hooks.print_json,
                 prepare_import_paths=hooks.prepare_import_paths,
                 env=os.environ,
             )
-        except RunsCommandError as exc:
+        except _commands.runs.RunsCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "run":
         if args.run_command == "local-smoke":
@@ -330,68 +300,68 @@ def dispatch_command(args: argparse.Namespace, hooks: CliRuntimeHooks) -> int:
             )
             return 0
         try:
-            return handle_native_run_command(args, print_json=hooks.print_json)
-        except NativeRunCommandError as exc:
+            return _commands.native_run.handle_native_run_command(args, print_json=hooks.print_json)
+        except _commands.native_run.NativeRunCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "worker":
         try:
-            return handle_worker_command(args, print_json=hooks.print_json)
-        except NativeRunCommandError as exc:
+            return _commands.native_run.handle_worker_command(args, print_json=hooks.print_json)
+        except _commands.native_run.NativeRunCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "capability":
         try:
-            return handle_capability_command(args, print_json=hooks.print_json)
-        except NativeRunCommandError as exc:
+            return _commands.native_run.handle_capability_command(args, print_json=hooks.print_json)
+        except _commands.native_run.NativeRunCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "module":
         try:
-            return handle_module_command(args, print_json=hooks.print_json)
-        except NativeRunCommandError as exc:
+            return _commands.native_run.handle_module_command(args, print_json=hooks.print_json)
+        except _commands.native_run.NativeRunCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "search":
         try:
-            return handle_search_command(
+            return _commands.search.handle_search_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths, env=os.environ
             )
-        except SearchCommandError as exc:
+        except _commands.search.SearchCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "discord" and args.discord_command == "synthetic":
         try:
-            return handle_discord_command(
+            return _commands.discord.handle_discord_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths, env=os.environ
             )
-        except DiscordCommandError as exc:
+        except _commands.discord.DiscordCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "install" and args.install_command in {"status", "plan", "plan-windows"}:
         try:
-            return handle_install_command(args, print_json=hooks.print_json, repo_root=hooks.repo_root())
-        except InstallUpdateCommandError as exc:
+            return _commands.update.handle_install_command(args, print_json=hooks.print_json, repo_root=hooks.repo_root())
+        except _commands.update.InstallUpdateCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "update":
         try:
-            return handle_update_command(
+            return _commands.update.handle_update_command(
                 args,
                 print_json=hooks.print_json,
                 repo_root=hooks.repo_root(),
                 current_version=hooks.read_repo_version() or __version__,
             )
-        except InstallUpdateCommandError as exc:
+        except _commands.update.InstallUpdateCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
     if args.command == "ops" and args.ops_command == "plan":
         try:
-            return handle_ops_command(
+            return _commands.ops.handle_ops_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except OpsCommandError as exc:
+        except _commands.ops.OpsCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "memory":
         try:
-            return handle_memory_command(
+            return _commands.memory.handle_memory_command(
                 args, print_json=hooks.print_json, prepare_import_paths=hooks.prepare_import_paths
             )
-        except MemoryCommandUserInputError as exc:
+        except _commands.memory.MemoryCommandUserInputError as exc:
             raise CliDispatchError(str(exc), exit_code=2) from exc
-        except MemoryCommandError as exc:
+        except _commands.memory.MemoryCommandError as exc:
             raise CliDispatchError(str(exc), exit_code=1) from exc
     if args.command == "message":
         prompt = hooks.prompt_from_args(args.prompt)
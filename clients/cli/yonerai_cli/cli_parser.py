@@ -1,30 +1,10 @@
 from __future__ import annotations
 
 import argparse
+import importlib
+from typing import Any
 
-from yonerai_cli.commands.api import STATUS_PROFILE_CHOICES, add_api_parser
-from yonerai_cli.commands.audit import add_audit_parser
-from yonerai_cli.commands.ask import add_ask_parser, add_plan_parser
-from yonerai_cli.commands.auth import add_auth_parser, add_privacy_parser
-from yonerai_cli.commands.config import add_config_parser
-from yonerai_cli.commands.discord import add_discord_parser
-from yonerai_cli.commands.evolve import add_evolve_parser
-from yonerai_cli.commands.hybrid import add_hybrid_parser
-from yonerai_cli.commands.manifest import add_manifest_parser
-from yonerai_cli.commands.memory import add_memory_parser
-from yonerai_cli.commands.native_run import add_native_run_parsers
-from yonerai_cli.commands.node import add_node_parser, add_relay_parser
-from yonerai_cli.commands.ops import add_ops_parser
-from yonerai_cli.commands.oracle import add_oracle_parser
-from yonerai_cli.commands.policy import add_policy_parser
-from yonerai_cli.commands.provider import add_provider_parser
-from yonerai_cli.commands.project import add_project_parser
-from yonerai_cli.commands.providers import add_providers_parser
-from yonerai_cli.commands.route import add_route_parser
-from yonerai_cli.commands.runs import add_runs_parser
-from yonerai_cli.commands.search import add_search_parser
-from yonerai_cli.commands.sync import add_sync_parser
-from yonerai_cli.commands.update import add_install_parser, add_update_parser
+from yonerai_cli import __version__
 from yonerai_cli.services.core_api_service import DEFAULT_API_ORIGIN
 
 
@@ -41,6 +21,80 @@ PLAN_MODE_CHOICES = (
 )
 
 
+# Top-level command -> (commands module, parser builder). `build_parser(command)` imports only the
+# module that registers the invoked command; `build_parser()` keeps registering every command for help.
+_COMMAND_PARSERS: dict[str, tuple[str, str]] = {
+    "config": ("config", "add_config_parser"),
+    "auth": ("auth", "add_auth_parser"),
+    "privacy": ("auth", "add_privacy_parser"),
+    "api": ("api", "add_api_parser"),
+    "project": ("project", "add_project_parser"),
+    "audit": ("audit", "add_audit_parser"),
+    "sync": ("sync", "add_sync_parser"),
+    "evolve": ("evolve", "add_evolve_parser"),
+    "providers": ("providers", "add_providers_parser"),
+    "provider": ("provider", "add_provider_parser"),
+    "policy": ("policy", "add_policy_parser"),
+    "manifest": ("manifest", "add_manifest_parser"),
+    "route": ("route", "add_route_parser"),
+    "node": ("node", "add_node_parser"),
+    "relay": ("node", "add_relay_parser"),
+    "oracle": ("oracle", "add_oracle_parser"),
+    "hybrid": ("hybrid", "add_hybrid_parser"),
+    "plan": ("ask", "add_plan_parser"),
+    "ask": ("ask", "add_ask_parser"),
+    "search": ("search", "add_search_parser"),
+    "discord": ("discord", "add_discord_parser"),
+    "install": ("update", "add_install_parser"),
+    "update": ("update", "add_update_parser"),
+    "ops": ("ops", "add_ops_parser"),
+    "memory": ("memory", "add_memory_parser"),
+    "runs": ("runs", "add_runs_parser"),
+    "run": ("native_run", "add_native_run_parsers"),
+    "worker": ("native_run", "add_native_run_parsers"),
+    "capability": ("native_run", "add_native_run_parsers"),
+    "module": ("native_run", "add_native_run_parsers"),
+}
+_INLINE_COMMANDS = frozenset(
+    {
+        "login",
+        "whoami",
+        "sessions",
+        "revoke",
+        "logout",
+        "projects",
+        "ping",
+        "rate-limit",
+        "chat",
+        "interactive",
+        "health",
+        "smoke",
+        "demo",
+        "quickstart",
+        "start",
+        "doctor",
+        "status",
+        "message",
+    }
+)
+
+
+def known_commands() -> frozenset[str]:
+    return _INLINE_COMMANDS | frozenset(_COMMAND_PARSERS)
+
+
+def _register(
+    subcommands: argparse._SubParsersAction[argparse.ArgumentParser],
+    command: str | None,
+    module: str,
+    builder: str,
+    **kwargs: Any,
+) -> None:
+    if command is not None and _COMMAND_PARSERS.get(command) != (module, builder):
+        return
+    getattr(importlib.import_module(f"yonerai_cli.commands.{module}"), builder)(subcommands, **kwargs)
+
+
 def _add_control_spine_short_options(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--config-path", help="Optional local CLI config path.")
     parser.add_argument("--timeout-seconds", type=float, default=10.0, help="Network timeout. Default: 10.")
@@ -51,7 +105,41 @@ def _add_control_spine_short_options(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--color", choices=COLOR_CHOICES, default="auto", help="Pretty output color mode. Default: auto.")
 
 
-def build_parser() -> argparse.ArgumentParser:
+def _add_status_parser(subcommands: argparse._SubParsersAction[argparse.ArgumentParser]) -> None:
+    from yonerai_cli.commands.api import STATUS_PROFILE_CHOICES
+
+    status = subcommands.add_parser("status", help="Show public-safe YonerAI StatusSnapshot v1.")
+    status.add_argument("status_command", nargs="?", choices=("check", "component"), default=None)
+    status.add_argument("component_id", nargs="?", help="Component id for `yonerai status component <id>`.")
+    status_output = status.add_mutually_exclusive_group()
+    status_output.add_argument("--json", action="store_true", help="Print stable machine-readable JSON.")
+    status_output.add_argument("--pretty", action="store_true", help="Print a readable status summary.")
+    status.add_argument(
+        "--source",
+        choices=("live", "fixture", "local"),
+        default="fixture",
+        help="Status source. Default: fixture. Use --source live to fetch staging status.",
+    )
+    status.add_argument(
+        "--status-source",
+        help="Optional local status-feed JSON path or allowlisted HTTPS status URL. URL fetch also requires --allow-network-status-fetch.",
+    )
+    status.add_argument(
+        "--allow-network-status-fetch",
+        action="store_true",
+        help="Explicitly allow fetching an allowlisted HTTPS status URL. Disabled by default.",
+    )
+    status.add_argument("--profile", choices=STATUS_PROFILE_CHOICES, default="operational")
+    status.add_argument("--timeout-seconds", type=float, default=10.0, help="Network timeout. Default: 10.")
+    status.add_argument("--lang", choices=LANG_CHOICES, default="en", help="Pretty output language. Default: en.")
+    status.add_argument(
+        "--color", choices=COLOR_CHOICES, default="auto", help="Pretty output color mode. Default: auto."
+    )
+
+
+def build_parser(command: str | None = None) -> argparse.ArgumentParser:
+    if command not in known_commands():
+        command = None
     shared = argparse.ArgumentParser(add_help=False)
     shared.add_argument(
         "--api-origin",
@@ -67,6 +155,7 @@ def build_parser() -> argparse.ArgumentParser:
             "It is not a deploy tool or Official Managed Cloud runtime."
         ),
     )
+    parser.add_argument("--version", action="version", version=f"yonerai {__version__}")
     subcommands = parser.add_subparsers(dest="command", required=False)
 
     login = subcommands.add_parser("login", help="Start staging Google login for the public CLI. Production login is disabled.")
@@ -138,15 +227,43 @@ def build_parser() -> argparse.ArgumentParser:
     chat.add_argument("--script", action="store_true", help="Read chat lines from stdin even when stdin is not a TTY.")
     chat.add_argument("--color", choices=COLOR_CHOICES, default="auto", help="Output color mode. Default: auto.")
 
-    add_config_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "config",
+        "add_config_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
 
-    add_auth_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_privacy_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_api_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_project_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_audit_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_sync_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_evolve_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "auth", "add_auth_parser", lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "auth",
+        "add_privacy_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
+    _register(subcommands, command, "api", "add_api_parser", lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "project",
+        "add_project_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
+    _register(subcommands, command, "audit", "add_audit_parser", lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "sync", "add_sync_parser", lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "evolve",
+        "add_evolve_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
 
     subcommands.add_parser("health", parents=[shared], help="Check the local Core API health endpoint.")
 
@@ -183,81 +300,114 @@ def build_parser() -> argparse.ArgumentParser:
         "--color", choices=COLOR_CHOICES, default="auto", help="Pretty output color mode. Default: auto."
     )
 
-    add_providers_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_provider_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-
-    add_policy_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-
-    status = subcommands.add_parser("status", help="Show public-safe YonerAI StatusSnapshot v1.")
-    status.add_argument("status_command", nargs="?", choices=("check", "component"), default=None)
-    status.add_argument("component_id", nargs="?", help="Component id for `yonerai status component <id>`.")
-    status_output = status.add_mutually_exclusive_group()
-    status_output.add_argument("--json", action="store_true", help="Print stable machine-readable JSON.")
-    status_output.add_argument("--pretty", action="store_true", help="Print a readable status summary.")
-    status.add_argument(
-        "--source",
-        choices=("live", "fixture", "local"),
-        default="fixture",
-        help="Status source. Default: fixture. Use --source live to fetch staging status.",
-    )
-    status.add_argument(
-        "--status-source",
-        help="Optional local status-feed JSON path or allowlisted HTTPS status URL. URL fetch also requires --allow-network-status-fetch.",
+    _register(
+        subcommands,
+        command,
+        "providers",
+        "add_providers_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
     )
-    status.add_argument(
-        "--allow-network-status-fetch",
-        action="store_true",
-        help="Explicitly allow fetching an allowlisted HTTPS status URL. Disabled by default.",
+    _register(
+        subcommands,
+        command,
+        "provider",
+        "add_provider_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
     )
-    status.add_argument("--profile", choices=STATUS_PROFILE_CHOICES, default="operational")
-    status.add_argument("--timeout-seconds", type=float, default=10.0, help="Network timeout. Default: 10.")
-    status.add_argument("--lang", choices=LANG_CHOICES, default="en", help="Pretty output language. Default: en.")
-    status.add_argument(
-        "--color", choices=COLOR_CHOICES, default="auto", help="Pretty output color mode. Default: auto."
+
+    _register(
+        subcommands,
+        command,
+        "policy",
+        "add_policy_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
     )
 
-    add_manifest_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    if command in (None, "status"):
+        _add_status_parser(subcommands)
+
+    _register(
+        subcommands,
+        command,
+        "manifest",
+        "add_manifest_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
 
-    add_route_parser(
+    _register(
         subcommands,
+        command,
+        "route",
+        "add_route_parser",
         mode_choices=("official_managed_cloud", "official_hybrid_private", "full_private_self_host"),
         color_choices=COLOR_CHOICES,
     )
 
-    add_node_parser(subcommands, color_choices=COLOR_CHOICES)
-    add_relay_parser(subcommands, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "node", "add_node_parser", color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "node", "add_relay_parser", color_choices=COLOR_CHOICES)
 
-    add_oracle_parser(subcommands, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "oracle", "add_oracle_parser", color_choices=COLOR_CHOICES)
 
-    add_hybrid_parser(subcommands, provider_choices=("mock", "local"), color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "hybrid",
+        "add_hybrid_parser",
+        provider_choices=("mock", "local"),
+        color_choices=COLOR_CHOICES,
+    )
 
-    add_plan_parser(
+    _register(
         subcommands,
+        command,
+        "ask",
+        "add_plan_parser",
         provider_choices=PLAN_PROVIDER_CHOICES,
         mode_choices=PLAN_MODE_CHOICES,
         color_choices=COLOR_CHOICES,
     )
-    add_ask_parser(
+    _register(
         subcommands,
+        command,
+        "ask",
+        "add_ask_parser",
         provider_choices=PLAN_PROVIDER_CHOICES,
         mode_choices=PLAN_MODE_CHOICES,
         lang_choices=LANG_CHOICES,
         color_choices=COLOR_CHOICES,
     )
 
-    add_search_parser(subcommands, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "search", "add_search_parser", color_choices=COLOR_CHOICES)
 
-    add_discord_parser(subcommands, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "discord", "add_discord_parser", color_choices=COLOR_CHOICES)
 
-    add_install_parser(subcommands, color_choices=COLOR_CHOICES)
-    add_update_parser(subcommands, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "update", "add_install_parser", color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "update", "add_update_parser", color_choices=COLOR_CHOICES)
 
-    add_ops_parser(subcommands, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "ops", "add_ops_parser", color_choices=COLOR_CHOICES)
 
-    add_memory_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "memory",
+        "add_memory_parser",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
 
-    add_runs_parser(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
-    add_native_run_parsers(subcommands, lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(subcommands, command, "runs", "add_runs_parser", lang_choices=LANG_CHOICES, color_choices=COLOR_CHOICES)
+    _register(
+        subcommands,
+        command,
+        "native_run",
+        "add_native_run_parsers",
+        lang_choices=LANG_CHOICES,
+        color_choices=COLOR_CHOICES,
+    )
 
     message = subcommands.add_parser("message", parents=[shared], help="Send a local public message smoke request.")
     message.add_argument("--mode", choices=["mock", "offline", "local"], default="mock")
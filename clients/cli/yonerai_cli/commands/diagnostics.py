@@ -9,6 +9,7 @@ from typing import Any
 from yonerai_cli import __version__
 from yonerai_cli.commands.providers import ProvidersCommandError, build_providers_report
 from yonerai_cli.release_manifest import ManifestError, load_manifest_file, verify_manifest
+from yonerai_cli.services.http_pool_service import http_pool_stats
 
 
 TOKEN_ENV = "ORA_CORE_API_TOKEN"
@@ -231,6 +232,7 @@ def _build_doctor_report(*, command: str = "yonerai doctor") -> dict[str, Any]:
         "install_source": install_source,
         "status_api": status_api,
         "provider_runtime_e2e_fixtures": _provider_runtime_e2e_fixture_report(),
+        "http_pool": http_pool_stats(),
         "system_checks": system_checks,
         "errors": manifest_report.get("errors", []),
     }
@@ -13,7 +13,6 @@ from yonerai_cli.services.update_service import (
     build_update_choice_report,
     build_update_report,
 )
-from yonerai_cli.tui import open_choice_dialog
 
 LANG_CHOICES = ("ja", "en")
 
@@ -215,6 +214,8 @@ def _maybe_prompt_update_channel(args: argparse.Namespace) -> str | None:
         return None
     if not _interactive_stdio_ready():
         return None
+    from yonerai_cli.tui import open_choice_dialog
+
     opened, selection = open_choice_dialog(
         title="YonerAI / 更新",
         text="どちらを確認しますか。",
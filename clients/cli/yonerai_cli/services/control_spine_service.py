@@ -6,7 +6,7 @@ from collections.abc import Callable, Mapping
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote
-from urllib.request import HTTPRedirectHandler, Request, build_opener
+from urllib.request import Request
 
 from yonerai_cli import __version__
 from yonerai_cli.auth_policy import (
@@ -16,6 +16,7 @@ from yonerai_cli.auth_policy import (
     _validate_staging_auth_origin,
 )
 from yonerai_cli.config import load_cli_config
+from yonerai_cli.services import http_pool_service
 from yonerai_cli.services.auth_session_service import sanitize_staging_account
 from yonerai_cli.services.staging_session_service import (
     StagingSessionStorageError,
@@ -578,7 +579,7 @@ def _default_header_json_transport(
     if data is not None:
         request.add_header("Content-Type", "application/json")
     try:
-        with _NO_REDIRECT_OPENER.open(request, timeout=timeout_seconds) as response:  # noqa: S310 - origin is allowlisted by auth policy.
+        with http_pool_service.urlopen(request, timeout=timeout_seconds) as response:  # noqa: S310 - origin is allowlisted by auth policy.
             return int(response.status), _read_json_body(response.read()), dict(response.headers)
     except HTTPError as exc:
         if 300 <= int(exc.code) < 400:
@@ -1226,11 +1227,3 @@ def _safe_reason_from_payload(payload: Mapping[str, object]) -> str:
 
 def load_config_for_control_spine(config_path: str | None) -> dict[str, object]:
     return load_cli_config(config_path)
-
-
-class _NoRedirectHandler(HTTPRedirectHandler):
-    def redirect_request(self, req: object, fp: object, code: int, msg: str, headers: object, newurl: str) -> None:
-        return None
-
-
-_NO_REDIRECT_OPENER = build_opener(_NoRedirectHandler)
@@ -9,6 +9,8 @@ import urllib.parse
 import urllib.request
 from typing import Any
 
+from yonerai_cli.services import http_pool_service
+
 
 DEFAULT_API_ORIGIN = "http://127.0.0.1:8001"
 TOKEN_ENV = "ORA_CORE_API_TOKEN"
@@ -69,7 +71,7 @@ def request_json(method: str, origin: str, path: str, body: dict[str, Any] | Non
         headers["X-ORA-Core-Token"] = token
     request = urllib.request.Request(url, data=payload, headers=headers, method=method)
     try:
-        with urllib.request.urlopen(request, timeout=20) as response:
+        with http_pool_service.urlopen(request, timeout=20) as response:
             return load_response_json(response.read())
     except urllib.error.HTTPError as exc:
         raise CoreApiServiceError(safe_http_error(exc), exit_code=1) from exc
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import http.client
+import io
+import os
+import select
+import ssl
+import threading
+import time
+from collections.abc import Mapping
+from email.message import Message
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
+from urllib.request import HTTPRedirectHandler, OpenerDirector, Request, build_opener, getproxies, proxy_bypass
+
+
+KEEPALIVE_ENV = "YONERAI_CLI_HTTP_KEEPALIVE"
+DEFAULT_MAX_IDLE_PER_ORIGIN = 4
+DEFAULT_IDLE_TIMEOUT_SECONDS = 30.0
+USER_AGENT = "yonerai-cli"
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+
+OriginKey = tuple[str, str, int]
+
+
+class PooledResponse:
+    """Fully-read response with the subset of the urllib response API the services use."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: Message, body: bytes) -> None:
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = io.BytesIO(body)
+
+    def read(self, amt: int | None = None) -> bytes:
+        return self._body.read() if amt is None else self._body.read(amt)
+
+    def getcode(self) -> int:
+        return self.status
+
+    def close(self) -> None:
+        self._body.close()
+
+    def __enter__(self) -> PooledResponse:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class PooledHttpClient:
+    """Keep-alive HTTP/1.1 connection pool keyed by (scheme, host, port).
+
+    Behaves like an opener with redirect handling removed: any non-2xx status,
+    3xx included, is raised as `HTTPError` so callers keep their existing
+    redirect-denial branches. Origin allowlisting stays with the callers; the
+    pool only ever talks to the origin in the request URL.
+
+    When `HTTP(S)_PROXY` applies to the origin (and `NO_PROXY` does not exclude
+    it), the request goes through a no-redirect urllib opener instead, which
+    handles the proxy (including CONNECT tunnelling for https) as before.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_idle_per_origin: int = DEFAULT_MAX_IDLE_PER_ORIGIN,
+        idle_timeout_seconds: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        keepalive: bool | None = None,
+    ) -> None:
+        self.max_idle_per_origin = max(0, int(max_idle_per_origin))
+        self.idle_timeout_seconds = max(0.0, float(idle_timeout_seconds))
+        self.keepalive = _keepalive_enabled() if keepalive is None else keepalive
+        self._lock = threading.Lock()
+        self._idle: dict[OriginKey, list[tuple[http.client.HTTPConnection, float]]] = {}
+        self._ssl_context: ssl.SSLContext | None = None
+        self._stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "stale_retries": 0,
+            "proxied": 0,
+        }
+
+    def open(self, request: Request, timeout: float) -> PooledResponse:
+        url = request.full_url
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError as exc:
+            raise URLError(f"invalid url: {exc}") from exc
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"} or not parts.hostname:
+            raise URLError(f"unsupported url scheme: {scheme or 'none'}")
+        if _proxy_for(scheme, parts.hostname, port):
+            with self._lock:
+                self._stats["requests"] += 1
+                self._stats["proxied"] += 1
+            return _proxy_opener().open(request, timeout=timeout)  # type: ignore[return-value]
+        key: OriginKey = (scheme, parts.hostname, port or (443 if scheme == "https" else 80))
+        selector = parts.path or "/"
+        if parts.query:
+            selector = f"{selector}?{parts.query}"
+        method = request.get_method().upper()
+        headers = {"User-Agent": USER_AGENT, **dict(request.header_items())}
+        if not self.keepalive:
+            headers["Connection"] = "close"
+
+        with self._lock:
+            self._stats["requests"] += 1
+        conn, reused = self._acquire(key, timeout)
+        while True:
+            try:
+                status, reason, response_headers, body, will_close = self._send(conn, method, selector, request.data, headers)
+                break
+            except TimeoutError:
+                conn.close()
+                raise
+            except _STALE_CONNECTION_ERRORS as exc:
+                conn.close()
+                # A kept-alive socket the server already closed; only replay when that cannot double-apply a write.
+                if not reused or (method not in IDEMPOTENT_METHODS and not isinstance(exc, BrokenPipeError)):
+                    raise URLError(exc) from exc
+                with self._lock:
+                    self._stats["stale_retries"] += 1
+                conn, reused = self._acquire(key, timeout, fresh=True)
+            except (OSError, http.client.HTTPException) as exc:
+                conn.close()
+                raise URLError(exc) from exc
+
+        if will_close or not self.keepalive:
+            conn.close()
+        else:
+            self._release(key, conn)
+        if not 200 <= status < 300:
+            raise HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+        return PooledResponse(url, status, reason, response_headers, body)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            stats: dict[str, object] = dict(self._stats)
+            stats["idle_connections"] = sum(len(items) for items in self._idle.values())
+        opened = int(stats["connections_opened"])  # type: ignore[arg-type]
+        reused = int(stats["connections_reused"])  # type: ignore[arg-type]
+        stats["reuse_ratio"] = round(reused / (opened + reused), 4) if opened + reused else 0.0
+        stats["keepalive"] = self.keepalive
+        stats["http2"] = False
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for items in idle.values():
+            for conn, _ in items:
+                conn.close()
+
+    def _acquire(self, key: OriginKey, timeout: float, *, fresh: bool = False) -> tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        conn: http.client.HTTPConnection | None = None
+        expired: list[http.client.HTTPConnection] = []
+        if not fresh:
+            with self._lock:
+                items = self._idle.get(key, [])
+                while items:
+                    candidate, released_at = items.pop()
+                    if now - released_at <= self.idle_timeout_seconds and not _connection_dropped(candidate):
+                        conn = candidate
+                        self._stats["connections_reused"] += 1
+                        break
+                    expired.append(candidate)
+        for stale in expired:
+            stale.close()
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._https_context())
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        with self._lock:
+            self._stats["connections_opened"] += 1
+        return conn, False
+
+    def _release(self, key: OriginKey, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            items = self._idle.setdefault(key, [])
+            if len(items) < self.max_idle_per_origin:
+                items.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def _https_context(self) -> ssl.SSLContext:
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context()
+        return self._ssl_context
+
+    @staticmethod
+    def _send(
+        conn: http.client.HTTPConnection,
+        method: str,
+        selector: str,
+        data: object,
+        headers: Mapping[str, str],
+    ) -> tuple[int, str, Message, bytes, bool]:
+        conn.request(method, selector, body=data, headers=dict(headers))  # type: ignore[arg-type]
+        response = conn.getresponse()
+        # Drain the body so the socket is clean before it goes back to the pool; one request in flight per connection.
+        body = response.read()
+        return int(response.status), str(response.reason), response.headers, body, bool(response.will_close)
+
+
+def _connection_dropped(conn: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket should have nothing to read; readable means EOF or stray bytes.
+    sock = conn.sock
+    if sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class _NoRedirectHandler(HTTPRedirectHandler):
+    def redirect_request(self, req: object, fp: object, code: int, msg: str, headers: object, newurl: str) -> None:
+        return None
+
+
+def _proxy_for(scheme: str, host: str, port: int | None) -> str | None:
+    proxy = getproxies().get(scheme)
+    if not proxy:
+        return None
+    if proxy_bypass(f"{host}:{port}" if port else host):
+        return None
+    return proxy
+
+
+def _proxy_opener() -> OpenerDirector:
+    # Built per call so ProxyHandler sees the current environment.
+    return build_opener(_NoRedirectHandler)
+
+
+def _keepalive_enabled() -> bool:
+    raw = (os.getenv(KEEPALIVE_ENV) or "1").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+_SHARED_POOL: PooledHttpClient | None = None
+_SHARED_POOL_LOCK = threading.Lock()
+
+
+def shared_http_pool() -> PooledHttpClient:
+    global _SHARED_POOL
+    with _SHARED_POOL_LOCK:
+        if _SHARED_POOL is None:
+            _SHARED_POOL = PooledHttpClient()
+        return _SHARED_POOL
+
+
+def urlopen(request: Request, timeout: float) -> PooledResponse:
+    """Drop-in for a no-redirect `OpenerDirector.open` backed by the shared keep-alive pool."""
+    return shared_http_pool().open(request, timeout)
+
+
+def http_pool_stats() -> dict[str, object]:
+    return shared_http_pool().stats()
@@ -7,8 +7,9 @@ from collections.abc import Callable, Mapping
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote, urlparse
-from urllib.request import HTTPRedirectHandler, Request, build_opener
+from urllib.request import Request
 
+from yonerai_cli.services import http_pool_service
 from yonerai_cli.services.conversation_sync_policy_service import (
     ConversationSyncPolicyError,
     build_conversation_execution_policy,
@@ -924,7 +925,7 @@ def _default_header_json_transport(
     if data is not None:
         request.add_header("Content-Type", "application/json")
     try:
-        with _NO_REDIRECT_OPENER.open(request, timeout=timeout_seconds) as response:  # noqa: S310 - staging origin is controlled by validated config/session.
+        with http_pool_service.urlopen(request, timeout=timeout_seconds) as response:  # noqa: S310 - staging origin is controlled by validated config/session.
             return int(response.status), _read_json_body(response.read()), dict(response.headers)
     except HTTPError as exc:
         if 300 <= int(exc.code) < 400:
@@ -1314,11 +1315,3 @@ def _rate_limit_headers_present(headers: Mapping[str, str]) -> list[str]:
     }
     normalized = {key.lower() for key in headers}
     return [public for key, public in expected.items() if key in normalized]
-
-
-class _NoRedirectHandler(HTTPRedirectHandler):
-    def redirect_request(self, req: object, fp: object, code: int, msg: str, headers: object, newurl: str) -> None:
-        return None
-
-
-_NO_REDIRECT_OPENER = build_opener(_NoRedirectHandler)
@@ -4,9 +4,10 @@ import json
 from collections.abc import Callable, Mapping
 from typing import Any
 from urllib.error import HTTPError, URLError
-from urllib.request import HTTPRedirectHandler, Request, build_opener
+from urllib.request import Request
 
 from yonerai_cli.auth_policy import build_google_auth_status
+from yonerai_cli.services import http_pool_service
 from yonerai_cli.services.auth_session_service import empty_staging_auth_claim
 from yonerai_cli.services.staging_session_service import empty_staging_session_claim, load_staging_session_token
 
@@ -468,7 +469,7 @@ def _default_header_json_transport(
     if data is not None:
         request.add_header("Content-Type", "application/json")
     try:
-        with _NO_REDIRECT_OPENER.open(request, timeout=timeout_seconds) as response:  # noqa: S310 - origin is allowlisted before use.
+        with http_pool_service.urlopen(request, timeout=timeout_seconds) as response:  # noqa: S310 - origin is allowlisted before use.
             return int(response.status), _read_json_body(response.read()), dict(response.headers)
     except HTTPError as exc:
         if 300 <= int(exc.code) < 400:
@@ -789,11 +790,3 @@ def _sync_non_actions() -> list[str]:
         "no OpenAI shared traffic",
         "no production Oracle/cloud runtime",
     ]
-
-
-class _NoRedirectHandler(HTTPRedirectHandler):
-    def redirect_request(self, req: object, fp: object, code: int, msg: str, headers: object, newurl: str) -> None:
-        return None
-
-
-_NO_REDIRECT_OPENER = build_opener(_NoRedirectHandler)
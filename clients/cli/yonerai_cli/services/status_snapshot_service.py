@@ -11,9 +11,10 @@ from pathlib import Path
 from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.parse import urlparse
-from urllib.request import HTTPRedirectHandler, Request, build_opener
+from urllib.request import Request
 
 from yonerai_cli import __version__
+from yonerai_cli.services import http_pool_service
 
 
 STATUS_SNAPSHOT_CLIENT_SCHEMA_VERSION = "yonerai-status-snapshot-client/v0.1"
@@ -355,7 +356,7 @@ def _default_header_json_transport(
     for key, value in headers.items():
         request.add_header(key, value)
     try:
-        with _NO_REDIRECT_OPENER.open(request, timeout=timeout_seconds) as response:  # noqa: S310 - host is fixed or allowlisted.
+        with http_pool_service.urlopen(request, timeout=timeout_seconds) as response:  # noqa: S310 - host is fixed or allowlisted.
             return int(response.status), _read_json_body(response.read()), dict(response.headers)
     except HTTPError as exc:
         if 300 <= int(exc.code) < 400:
@@ -921,11 +922,3 @@ def _is_private_host(host: str) -> bool:
         or address.is_multicast
         or address.is_reserved
     )
-
-
-class _NoRedirectHandler(HTTPRedirectHandler):
-    def redirect_request(self, req: object, fp: object, code: int, msg: str, headers: object, newurl: str) -> None:
-        return None
-
-
-_NO_REDIRECT_OPENER = build_opener(_NoRedirectHandler)
@@ -1,33 +1,52 @@
 from __future__ import annotations
 
-from yonerai_cli.tui.keymap import (
-    JAPANESE_SLASH_ALIASES,
-    NUMBERED_VALUE_GROUPS,
-    SLASH_COMMANDS,
-    SLASH_VALUE_GROUPS,
-    SlashCommandSpec,
-    SlashValueSpec,
-    build_prompt_completer as _build_prompt_completer,
-    slash_command_meta,
-    slash_command_value_group,
-    slash_command_words,
-    slash_value_meta,
-    slash_value_words,
-)
-from yonerai_cli.tui.palette import format_command_palette, slash_command_summary
-from yonerai_cli.tui.renderer import (
-    COMMAND_PALETTE_TRIGGER,
-    open_choice_dialog,
-    open_command_palette,
-    prompt_line,
-    prompt_toolkit_available,
-    prompt_toolkit_console_ready,
-    render_panel,
-    render_text_block,
-    rich_available,
-    run_with_status,
-    tui_capability_report,
-)
+import importlib
+from typing import Any
+
+# Re-exports resolve lazily so importing `yonerai_cli.tui.keymap` (parser, aliases)
+# does not pull prompt_toolkit in through `tui.renderer` until interactive mode needs it.
+_LAZY_EXPORTS: dict[str, tuple[str, str]] = {
+    "JAPANESE_SLASH_ALIASES": ("keymap", "JAPANESE_SLASH_ALIASES"),
+    "NUMBERED_VALUE_GROUPS": ("keymap", "NUMBERED_VALUE_GROUPS"),
+    "SLASH_COMMANDS": ("keymap", "SLASH_COMMANDS"),
+    "SLASH_VALUE_GROUPS": ("keymap", "SLASH_VALUE_GROUPS"),
+    "SlashCommandSpec": ("keymap", "SlashCommandSpec"),
+    "SlashValueSpec": ("keymap", "SlashValueSpec"),
+    "_build_prompt_completer": ("keymap", "build_prompt_completer"),
+    "slash_command_meta": ("keymap", "slash_command_meta"),
+    "slash_command_value_group": ("keymap", "slash_command_value_group"),
+    "slash_command_words": ("keymap", "slash_command_words"),
+    "slash_value_meta": ("keymap", "slash_value_meta"),
+    "slash_value_words": ("keymap", "slash_value_words"),
+    "format_command_palette": ("palette", "format_command_palette"),
+    "slash_command_summary": ("palette", "slash_command_summary"),
+    "COMMAND_PALETTE_TRIGGER": ("renderer", "COMMAND_PALETTE_TRIGGER"),
+    "open_choice_dialog": ("renderer", "open_choice_dialog"),
+    "open_command_palette": ("renderer", "open_command_palette"),
+    "prompt_line": ("renderer", "prompt_line"),
+    "prompt_toolkit_available": ("renderer", "prompt_toolkit_available"),
+    "prompt_toolkit_console_ready": ("renderer", "prompt_toolkit_console_ready"),
+    "render_panel": ("renderer", "render_panel"),
+    "render_text_block": ("renderer", "render_text_block"),
+    "rich_available": ("renderer", "rich_available"),
+    "run_with_status": ("renderer", "run_with_status"),
+    "tui_capability_report": ("renderer", "tui_capability_report"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY_EXPORTS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{target[0]}")
+    value = getattr(module, target[1])
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
 
 __all__ = [
     "JAPANESE_SLASH_ALIASES",
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from ora_core.database.repo import Repository
 from ora_core.database.session import AsyncSessionLocal
 
@@ -15,3 +17,19 @@ async def get_dashboard_summary(repo: Repository = Depends(get_repo)):
     """
     stats = await repo.get_dashboard_stats()
     return stats
+
+@router.get("/kpi/rolling")
+async def get_rolling_kpi(
+    days: int = Query(7, ge=1, le=90),
+    group_by: str = Query("", description="Comma-separated: route_band,provider,model"),
+):
+    """
+    Rolling-window route KPIs (budget-stop rate, p50/p95/p99 latency) from the trace rollup store.
+    """
+    try:
+        from src.utils.trace_rollup import TraceRollupStore
+    except Exception:
+        raise HTTPException(status_code=503, detail="trace_rollup_unavailable")
+    dims = [d.strip() for d in group_by.split(",") if d.strip()]
+    # SQLite reads (and schema creation on first use) stay off the event loop.
+    return await asyncio.to_thread(TraceRollupStore().rolling_kpis, days=days, group_by=dims)
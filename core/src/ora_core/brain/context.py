@@ -1,16 +1,82 @@
-from typing import Any, Dict
+import json
+import os
+from collections import OrderedDict
 from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict
+
 from ora_core.api.schemas.messages import MessageRequest
 from ora_core.brain.memory import memory_store
+from src.utils.env import env_int
 from src.utils.intent_semantics import classify_semantic_intent, has_explicit_export_constraint
 
+# memory/soul.md at the repository root (core/src/ora_core/brain -> repo).
+SOUL_PATH = Path(__file__).resolve().parents[4] / "memory" / "soul.md"
+
+# (mtime_ns, size) -> parsed content, so unchanged files cost one stat() per message.
+_file_cache: dict[str, tuple[tuple[int, int], Any]] = {}
+_static_prompt_cache: "OrderedDict[tuple, str]" = OrderedDict()
+_STATIC_PROMPT_CACHE_MAX = 16
+
+
+def _read_cached(path: str | Path, parse: Callable[[str], Any]) -> tuple[tuple[int, int] | None, Any]:
+    """Return `(stamp, parse(text))` for `path`, re-reading only when mtime/size change."""
+    key = str(path)
+    try:
+        st = os.stat(key)
+    except OSError:
+        _file_cache.pop(key, None)
+        return None, None
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _file_cache.get(key)
+    if hit is not None and hit[0] == stamp:
+        return stamp, hit[1]
+    with open(key, "r", encoding="utf-8") as f:
+        value = parse(f.read())
+    _file_cache[key] = (stamp, value)
+    return stamp, value
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap tokenizer-free estimate: ~4 ASCII chars per token, ~1 token per non-ASCII (CJK) char."""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def trim_history_to_budget(history: list[dict], max_tokens: int) -> list[dict]:
+    """Keep the newest turns that fit in `max_tokens`; an oversized newest turn keeps its tail."""
+    kept: list[dict] = []
+    used = 0
+    for msg in reversed(history):
+        content = str(msg.get("content") or "")
+        cost = estimate_tokens(content) + 4  # per-message framing
+        if used + cost > max_tokens:
+            if not kept and max_tokens > 4:
+                while content and estimate_tokens(content) + 4 > max_tokens:
+                    content = content[len(content) - int(len(content) * 0.9):]
+                if content:
+                    kept.append({**msg, "content": "…" + content})
+            break
+        kept.append(msg)
+        used += cost
+    kept.reverse()
+    return kept
+
+
 class ContextBuilder:
     """
     Assembles the context (System Prompt + History) for the LLM.
     Layers L1 (Session), L2 (User Facts), L3 (Summaries) are merged here.
     Includes Security Protocols, Admin Detection, and Rich Personality.
+
+    Message order is stable-prefix first so provider-side prompt caching can hit:
+    the first system message (soul + identity + security + capabilities + intro
+    protocol) only varies by role and is byte-identical across users and turns;
+    time, user, server and memory follow in a separate session message.
     """
-    
+
     @staticmethod
     async def build_context(
         req: MessageRequest,
@@ -22,7 +88,7 @@ class ContextBuilder:
     ) -> list[dict]:
         """
         Builds the 4-layer context messages for the LLM.
-        L1: Session History (from DB or client-provided)
+        L1: Session History (from DB or client-provided), trimmed to ORA_CONTEXT_HISTORY_TOKENS
         L2: User Traits/Facts (from MemoryStore)
         L3: Recent Summaries (from MemoryStore)
         L4: Raw Logs (implicitly handled by Update Policy)
@@ -43,10 +109,23 @@ class ContextBuilder:
 
         profile = await memory_store.get_or_create_profile(target_memory_id, req.user_identity.display_name or "User")
 
+        current_attachments = list(req.attachments or [])
+        current_image_attachments = ContextBuilder._filter_image_attachments(current_attachments)
+
         # 2. Build History
-        # Priority: Client-provided history > DB history
-        llm_history = []
+        # Priority: Client-provided history > DB history. The DB is read at most once:
+        # for the history itself and/or to find images from the previous user turn.
         history_msgs: list[Any] = []
+        fetch_limit = env_int("ORA_CONTEXT_HISTORY_FETCH", 40, 1, 500)
+        if not req.client_history:
+            history_msgs = await repo.get_messages(conversation_id, limit=fetch_limit)
+        elif not current_image_attachments:
+            try:
+                history_msgs = await repo.get_messages(conversation_id, limit=fetch_limit)
+            except Exception:
+                history_msgs = []
+
+        llm_history = []
         if req.client_history:
             # Use pre-built history from client (richer - includes embed content, reply chains)
             for h in req.client_history:
@@ -56,21 +135,19 @@ class ContextBuilder:
                     content = f"[{h.author_name}]: {content}"
                 llm_history.append({"role": h.role, "content": content})
         else:
-            # Fallback: Fetch from DB
-            history_msgs = await repo.get_messages(conversation_id, limit=15)
             for h in history_msgs:
                 author = str(h.author)
                 content = str(h.content)
                 if content == req.content and author == "user":
                     continue
                 llm_history.append({"role": author, "content": content})
+        history_budget = env_int("ORA_CONTEXT_HISTORY_TOKENS", 1500, 0, 200_000)
+        llm_history = trim_history_to_budget(llm_history, history_budget)
 
-        # 3. Construct Rich System Prompt
-        system_prompt = await ContextBuilder._construct_system_prompt(req, profile)
-        
-        # 4. Assemble Final Message List
+        # 3. Stable prefix, then per-turn session context
         messages = [
-            {"role": "system", "content": system_prompt}
+            {"role": "system", "content": ContextBuilder._static_system_prompt(req)},
+            {"role": "system", "content": ContextBuilder._session_prompt(req, profile)},
         ]
 
         summaries = profile.get("layer3_recent_summaries", [])
@@ -84,28 +161,23 @@ class ContextBuilder:
                     formatted_summaries.append(f"- {title} [{ts}]: {snippet}")
                 else:
                     formatted_summaries.append(f"- {s}")
-            
+
             summary_text = "\n".join(formatted_summaries)
             messages.append({
-                "role": "system", 
+                "role": "system",
                 "content": f"## Context Summary of Past Interactions\n{summary_text}"
             })
 
         # Channel Memory Injection
         ctx = req.client_context
         channel_memory = None
-        
+
         if ctx and ctx.channel_memory:
             channel_memory = ctx.channel_memory
         elif ctx and ctx.channel_id:
-            # Try to load from local file storage if shared
-            import os
-            import json
+            # Try to load from local file storage if shared (cached until the file changes)
             try:
-                c_path = memory_store.get_channel_path(ctx.channel_id)
-                if os.path.exists(c_path):
-                    with open(c_path, "r", encoding="utf-8") as f:
-                        channel_memory = json.load(f)
+                _stamp, channel_memory = _read_cached(memory_store.get_channel_path(ctx.channel_id), json.loads)
             except Exception:
                 pass
 
@@ -126,16 +198,9 @@ class ContextBuilder:
         # L1: History
         messages.extend(llm_history)
 
-        current_attachments = list(req.attachments or [])
-        current_image_attachments = ContextBuilder._filter_image_attachments(current_attachments)
         prior_image_attachments: list[Any] = []
 
         if not current_image_attachments:
-            if not history_msgs:
-                try:
-                    history_msgs = await repo.get_messages(conversation_id, limit=10)
-                except Exception:
-                    history_msgs = []
             prior_image_attachments = ContextBuilder._latest_prior_user_image_attachments(
                 history_msgs,
                 limit=3,
@@ -183,7 +248,7 @@ class ContextBuilder:
                 "content": ContextBuilder._build_user_content(req, attachments_override=effective_attachments),
             }
         )
-        
+
         return messages
 
     @staticmethod
@@ -323,58 +388,49 @@ class ContextBuilder:
         )
 
     @staticmethod
-    async def _construct_system_prompt(req: MessageRequest, profile: Dict[str, Any]) -> str:
+    def _soul_prompt() -> tuple[tuple[int, int] | None, str]:
+        try:
+            stamp, soul = _read_cached(SOUL_PATH, str.strip)
+        except Exception:
+            return None, ""
+        return stamp, soul or ""
+
+    @staticmethod
+    def _static_system_prompt(req: MessageRequest) -> str:
         """
-        Builds the System Prompt with:
-        - Base Personality (YonerAI Identity)
-        - Context Awareness (Time, User, Server)
-        - 4-Layer Memory Injection
-        - Security Protocols (Admin vs Guest)
-        - Capability Instructions
-        - Self-Introduction Protocol
+        The cacheable prefix: Soul, Base Personality, Security Protocol, Capabilities
+        and the Self-Introduction template. Depends only on the user's role and the
+        soul file, so it is built once per (role, soul mtime) and reused byte-for-byte.
         """
-        name = profile.get("name", "User")
         ctx = req.client_context
-        
+        is_admin = bool(ctx.is_admin) if ctx else False
+        is_sub_admin = bool(ctx.is_sub_admin) if ctx else False
+        soul_stamp, soul = ContextBuilder._soul_prompt()
+
+        key = (is_admin, is_sub_admin, soul_stamp)
+        cached = _static_prompt_cache.get(key)
+        if cached is not None:
+            _static_prompt_cache.move_to_end(key)
+            return cached
+
+        prompt = f"[SYSTEM IDENTITY]\n{soul}\n\n" if soul else ""
+
         # 1. Base Personality
-        now_str = ctx.timestamp if ctx and ctx.timestamp else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        server_name = ctx.server_name if ctx else "Unknown"
-        
-        base_prompt = (
+        prompt += (
             "You are YonerAI (formerly ORA), a highly advanced AI assistant system.\n"
             "Your goal is to assist the user efficiently, securely, and with clear boundaries.\n"
-            f"Current Time: {now_str}\n"
-            f"User: {name} (ID: {req.user_identity.id})\n"
+            "Per-turn details (current time, user, server, user memory) are in the [SESSION CONTEXT] message.\n"
         )
-        if server_name and server_name != "Unknown":
-            base_prompt += f"Server: {server_name}\n"
-
-        # 2. L2: User Memory Injection
-        l2 = profile.get("layer2_user_memory", {})
-        facts = l2.get("facts", [])
-        traits = l2.get("traits", [])
-        interests = l2.get("interests", [])
-        impression = l2.get("impression", "New friend.")
-        
-        if impression:
-            base_prompt += f"User Axis(L2): {impression}\n"
-        if facts:
-            base_prompt += f"Facts(L2): {', '.join(facts[:5])}\n"
-        if interests:
-            base_prompt += f"Interests(L2): {', '.join(interests[:5])}\n"
 
-        # 3. SECURITY PROTOCOL (Critical)
-        is_admin = ctx.is_admin if ctx else False
-        is_sub_admin = ctx.is_sub_admin if ctx else False
-        
+        # 2. SECURITY PROTOCOL (Critical)
         if is_admin or is_sub_admin:
-            base_prompt += (
+            prompt += (
                 "\n[SECURITY LEVEL: RED]\n"
                 "User is ADMIN. You have full permission to reveal system internals, file paths, and configuration.\n"
                 "You may display the File Tree or source code if requested.\n"
             )
         else:
-            base_prompt += (
+            prompt += (
                 "\n[SECURITY LEVEL: GREEN]\n"
                 "User is GUEST. STRICT CONFIDENTIALITY PROTOCOL ACTIVE.\n"
                 "1. DO NOT reveal any absolute file paths (e.g. C:\\Users...).\n"
@@ -384,8 +440,8 @@ class ContextBuilder:
                 "However, you CAN use tools to help them (e.g. play music, search), just don't show *how* it works internally.\n"
             )
 
-        # 4. Capability Instructions
-        base_prompt += (
+        # 3. Capability Instructions
+        prompt += (
             "\n[Capabilities]\n"
             "- You may use tools for search, image/media workflows, chat support, and platform operations.\n"
             "- Do not advertise private/owner-only local machine operations in general self-introductions.\n"
@@ -397,20 +453,20 @@ class ContextBuilder:
             "- Always be helpful, but safe.\n"
         )
 
-        # 5. Self-Introduction Protocol
-        display_server = server_name if server_name and server_name != "Unknown" else "Direct Message"
+        # 4. Self-Introduction Protocol (time / server / name are filled from [SESSION CONTEXT])
         security_level = "RED (Admin)" if (is_admin or is_sub_admin) else "GREEN (Guest)"
         security_desc = "システム内部の開示が可能です。" if (is_admin or is_sub_admin) else "セキュリティ上、システム情報は非開示です。"
         user_role = "管理者" if is_admin else ("サブ管理者" if is_sub_admin else "ゲスト")
         role_desc = "全権限を持っています" if is_admin else ("補助権限を持っています" if is_sub_admin else "一般ユーザーです")
 
-        base_prompt += (
+        prompt += (
             "\n[SELF-INTRODUCTION PROTOCOL]\n"
-            "If the user asks 'Who are you?', 'What can you do?', 'introduction', or '自己紹介', YOU MUST use the following format:\n\n"
+            "If the user asks 'Who are you?', 'What can you do?', 'introduction', or '自己紹介', YOU MUST use the following format "
+            "(replace <Current Time>, <Server> and <User> with the values from [SESSION CONTEXT]):\n\n"
             "⚡ YonerAI\n"
             "はじめまして、YonerAIです。よろしくお願いします。簡単に自己紹介します。\n\n"
-            f"モデル／環境：YonerAI Core（現在時刻: {now_str}、サーバ: {display_server}）\n"
-            f"ユーザー：{name}（あなたは{user_role}です — {role_desc}）\n"
+            "モデル／環境：YonerAI Core（現在時刻: <Current Time>、サーバ: <Server>）\n"
+            f"ユーザー：<User>（あなたは{user_role}です — {role_desc}）\n"
             "主な能力：\n"
             "- リアルタイム検索（Google）や情報収集\n"
             "- 画像生成・編集\n"
@@ -420,6 +476,42 @@ class ContextBuilder:
             f"セキュリティ：現在のセキュリティレベルは{security_level}。{security_desc}\n\n"
             "何を手伝いしましょうか？\n"
         )
-        
-        return base_prompt
 
+        _static_prompt_cache[key] = prompt
+        while len(_static_prompt_cache) > _STATIC_PROMPT_CACHE_MAX:
+            _static_prompt_cache.popitem(last=False)
+        return prompt
+
+    @staticmethod
+    def _session_prompt(req: MessageRequest, profile: Dict[str, Any]) -> str:
+        """
+        Per-turn system context, placed after the stable prefix:
+        - Context Awareness (Time, User, Server)
+        - L2 User Memory Injection
+        """
+        name = profile.get("name", "User")
+        ctx = req.client_context
+
+        now_str = ctx.timestamp if ctx and ctx.timestamp else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        server_name = ctx.server_name if ctx else "Unknown"
+        display_server = server_name if server_name and server_name != "Unknown" else "Direct Message"
+
+        prompt = (
+            "[SESSION CONTEXT]\n"
+            f"Current Time: {now_str}\n"
+            f"User: {name} (ID: {req.user_identity.id})\n"
+            f"Server: {display_server}\n"
+        )
+
+        l2 = profile.get("layer2_user_memory", {})
+        facts = l2.get("facts", [])
+        interests = l2.get("interests", [])
+        impression = l2.get("impression", "New friend.")
+
+        if impression:
+            prompt += f"User Axis(L2): {impression}\n"
+        if facts:
+            prompt += f"Facts(L2): {', '.join(facts[:5])}\n"
+        if interests:
+            prompt += f"Interests(L2): {', '.join(interests[:5])}\n"
+        return prompt
@@ -1,9 +1,11 @@
 import os
+import copy
 import json
 import logging
 import asyncio
 import aiofiles
 import re
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, Optional
 from datetime import datetime
@@ -72,6 +74,9 @@ class MemoryStore:
     """
     def __init__(self):
         self._io_lock = asyncio.Lock()
+        # path -> ((mtime_ns, size), profile). Unchanged files skip the lock file and aiofiles thread hop.
+        self._profile_cache: "OrderedDict[str, tuple[tuple[int, int], Dict[str, Any]]]" = OrderedDict()
+        self._profile_cache_max = 512
 
     _safe_id_pattern = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
 
@@ -104,20 +109,36 @@ class MemoryStore:
             logger.warning(f"Rejected profile read for invalid user id: {e}")
             return None
 
-        if not os.path.exists(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._profile_cache.pop(path, None)
             return None
-        
+        stamp = (st.st_mtime_ns, st.st_size)
+        cached = self._profile_cache.get(path)
+        if cached is not None and cached[0] == stamp:
+            self._profile_cache.move_to_end(path)
+            return copy.deepcopy(cached[1])
+
         async with SimpleFileLock(path):
             async with self._io_lock:
                 try:
                     async with aiofiles.open(path, "r", encoding="utf-8") as f:
                         content = await f.read()
                         if content.strip():
-                            return json.loads(content)
+                            profile = json.loads(content)
+                            self._remember_profile(path, stamp, profile)
+                            return copy.deepcopy(profile)
                 except Exception as e:
                     logger.error(f"Read failed for {user_id}: {e}")
         return None
 
+    def _remember_profile(self, path: str, stamp: tuple[int, int], profile: Dict[str, Any]) -> None:
+        self._profile_cache[path] = (stamp, profile)
+        self._profile_cache.move_to_end(path)
+        while len(self._profile_cache) > self._profile_cache_max:
+            self._profile_cache.popitem(last=False)
+
     async def save_user_profile(self, user_id: str, data: Dict[str, Any]):
         try:
             path = self._get_user_path(user_id)
@@ -125,6 +146,7 @@ class MemoryStore:
             logger.warning(f"Rejected profile save for invalid user id: {e}")
             return
 
+        self._profile_cache.pop(path, None)
         async with SimpleFileLock(path):
             temp_path = path + ".tmp"
             try:
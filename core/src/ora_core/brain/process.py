@@ -42,6 +42,7 @@ class MainProcess:
         self.db = db_session
         self.repo = Repository(db_session)
         self.cost_manager = CostManager()
+        self._last_model_route: dict[str, str] = {}
 
     _ROUTE_DEFAULTS: dict[str, dict[str, int]] = {
         "INSTANT": {"max_turns": 2, "max_tool_calls": 0, "time_budget_seconds": 25},
@@ -899,6 +900,7 @@ class MainProcess:
                         }
                     },
                 )
+                self._last_model_route = {"provider": str(provider), "model": str(model_id)}
                 return response
             except Exception as exc:
                 last_exc = exc
@@ -952,6 +954,7 @@ class MainProcess:
                     }
                 },
             )
+            self._last_model_route = {"provider": str(stable.provider), "model": str(stable.model_id)}
             return response
         except Exception as exc:
             logger.warning(
@@ -1178,19 +1181,6 @@ class MainProcess:
                 current_message_id=current_message_id,
             )
 
-            try:
-                from pathlib import Path
-
-                repo_root = Path(__file__).resolve().parents[4]
-                soul_path = repo_root / "memory" / "soul.md"
-                if soul_path.exists():
-                    with open(soul_path, "r", encoding="utf-8") as f:
-                        soul_content = f.read().strip()
-                    if soul_content:
-                        context_messages.insert(0, {"role": "system", "content": f"[SYSTEM IDENTITY]\n{soul_content}"})
-            except Exception as e:
-                logger.warning(f"Core Soul Injection Failed: {e}")
-
             client_type = getattr(self.request, "source", "web")
             selected_tool_schemas = self._resolve_selected_tools_for_core(client_type)
             if client_type == "discord" and selected_tool_schemas:
@@ -1614,6 +1604,7 @@ class MainProcess:
                     trace_event(
                         "core.run.metrics",
                         run_id=self.run_id,
+                        **self._last_model_route,
                         route_band=route_band,
                         model_tier=model_tier,
                         total_ms=int((time.monotonic() - run_started_at) * 1000),
@@ -1662,6 +1653,7 @@ class MainProcess:
                     trace_event(
                         "core.run.metrics",
                         run_id=self.run_id,
+                        **self._last_model_route,
                         route_band=route_band,
                         model_tier=model_tier,
                         total_ms=int((time.monotonic() - run_started_at) * 1000),
@@ -1695,6 +1687,7 @@ class MainProcess:
             trace_event(
                 "core.run.metrics",
                 run_id=self.run_id,
+                **self._last_model_route,
                 route_band=route_band,
                 model_tier=model_tier,
                 total_ms=int((time.monotonic() - run_started_at) * 1000),
@@ -1717,6 +1710,7 @@ class MainProcess:
             trace_event(
                 "core.run.metrics",
                 run_id=self.run_id,
+                **self._last_model_route,
                 route_band=str(effective_route.get("route_band") or "task"),
                 model_tier=str(effective_route.get("model_tier") or "balanced"),
                 total_ms=int((time.monotonic() - run_started_at) * 1000),
@@ -20,6 +20,12 @@ def build_auto_runtime_report(*args, **kwargs):
     return _build_auto_runtime_report(*args, **kwargs)
 
 
+async def abuild_auto_runtime_report(*args, **kwargs):
+    from .auto_runtime import abuild_auto_runtime_report as _abuild_auto_runtime_report
+
+    return await _abuild_auto_runtime_report(*args, **kwargs)
+
+
 def build_auto_runtime_status_report(*args, **kwargs):
     from .auto_runtime import build_auto_runtime_status_report as _build_auto_runtime_status_report
 
@@ -32,6 +38,12 @@ def execute_task(*args, **kwargs):
     return _execute_task(*args, **kwargs)
 
 
+async def aexecute_task(*args, **kwargs):
+    from .spine import aexecute_task as _aexecute_task
+
+    return await _aexecute_task(*args, **kwargs)
+
+
 def __getattr__(name: str):
     if name == "ExecutionResult":
         from .spine import ExecutionResult
@@ -48,6 +60,8 @@ __all__ = [
     "InMemoryRunLedger",
     "SearchBoundaryAdapter",
     "ToolBoundaryAdapter",
+    "abuild_auto_runtime_report",
+    "aexecute_task",
     "build_auto_runtime_report",
     "build_auto_runtime_status_report",
     "build_boundary_checks_for_task",
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 from typing import Literal
 
 from ora_core.planning.task_classifier import TaskClassification, classify_task
 from ora_core.providers import ProviderError, ProviderRequest, ProviderResponse, build_default_provider_registry
+from ora_core.providers.contracts import generate_response
 from ora_core.providers.registry import ProviderRegistry, normalize_provider_id
 from ora_core.route_preview import preview_route
 from ora_core.memory import MemoryRecord, build_memory_usage_report, memory_context_event, select_allowed_memory_for_ask
@@ -100,6 +102,7 @@ def build_auto_runtime_report(
     memory_records: Sequence[MemoryRecord] | None = None,
     local_file_context: bool = False,
     client_type: str = "cli",
+    provider_loop: asyncio.AbstractEventLoop | None = None,
 ) -> dict[str, object]:
     task = _normalize_task(task_text)
     provider_prompt = provider_prompt if provider_prompt is not None else task
@@ -244,6 +247,7 @@ def build_auto_runtime_report(
         model=_model_id(provider_decision),
         live=live,
         run_id=run.run_id,
+        loop=provider_loop,
     )
     if provider_result["ok"]:
         response = provider_result["response"]
@@ -311,6 +315,12 @@ def build_auto_runtime_report(
     return report
 
 
+async def abuild_auto_runtime_report(task_text: str, **kwargs) -> dict[str, object]:
+    """`build_auto_runtime_report` for async callers; the provider call is awaited on this loop."""
+    kwargs["provider_loop"] = asyncio.get_running_loop()
+    return await asyncio.to_thread(build_auto_runtime_report, task_text, **kwargs)
+
+
 def decide_auto_runtime_route(
     task_text: str,
     *,
@@ -497,6 +507,7 @@ def _execute_provider(
     model: str,
     live: bool,
     run_id: str,
+    loop: asyncio.AbstractEventLoop | None = None,
 ) -> dict[str, object]:
     adapter = registry.resolve(provider_id)
     status = adapter.status()
@@ -514,9 +525,11 @@ def _execute_provider(
         }
     allow_live_call = bool(live and provider_id in _LIVE_CAPABLE_PROVIDERS)
     try:
-        response = adapter.generate(
+        response = generate_response(
+            adapter,
             ProviderRequest(prompt=prompt, model=model, metadata={"run_id": run_id}),
             allow_live_call=allow_live_call,
+            loop=loop,
         )
     except ProviderError as exc:
         return {
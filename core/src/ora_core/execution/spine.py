@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
 
 from ora_core.planning import build_execution_plan
 from ora_core.providers import ProviderError, ProviderRequest, ProviderResponse, build_default_provider_registry
+from ora_core.providers.contracts import generate_response
 from ora_core.providers.registry import ProviderRegistry
 
 from .boundaries import build_boundary_checks_for_task
@@ -50,6 +52,7 @@ def execute_task(
     context_events: Sequence[Mapping[str, object]] | None = None,
     requested_tool: str | None = None,
     client_type: str = "discord",
+    provider_loop: asyncio.AbstractEventLoop | None = None,
 ) -> ExecutionResult:
     ledger = ledger or build_run_ledger_from_env()
     registry = registry or build_default_provider_registry()
@@ -136,7 +139,9 @@ def execute_task(
             model=plan.provider_selection.model_id,
             metadata={"run_id": run.run_id},
         )
-        provider_response = _normalize_provider_response(adapter.generate(request, allow_live_call=allow_live_call))
+        provider_response = _normalize_provider_response(
+            generate_response(adapter, request, allow_live_call=allow_live_call, loop=provider_loop)
+        )
     except ProviderError as exc:
         ledger.append_event(run.run_id, "provider_error", "failed", exc.message)
         run = ledger.fail_run(run.run_id, error_summary=exc.message)
@@ -164,6 +169,17 @@ def execute_task(
     )
 
 
+async def aexecute_task(task_text: str, **kwargs) -> ExecutionResult:
+    """
+    `execute_task` for async callers.
+
+    Ledger and planning I/O run in a worker thread; the provider call itself is awaited
+    on this loop (`agenerate`) so it shares the loop's keep-alive pool.
+    """
+    kwargs["provider_loop"] = asyncio.get_running_loop()
+    return await asyncio.to_thread(execute_task, task_text, **kwargs)
+
+
 def _response_summary(response: ProviderResponse) -> str:
     return safe_summary(f"{response.provider}/{response.model}: {response.output_text}", max_chars=500)
 
@@ -18,8 +18,10 @@ from ora_core.api.routes.runs import router as runs_router
 from ora_core.api.routes.stats import router as stats_router
 import os
 import re
+from contextlib import asynccontextmanager
 
 from ora_core.distribution.runtime import build_runtime_from_env
+from ora_core.providers.openai_compatible import aclose_provider_clients, close_provider_clients
 
 
 PRIVATE_ERROR_MARKERS = (
@@ -57,8 +59,16 @@ def _safe_validation_details(errors: list[dict]) -> list[dict]:
     return safe_details
 
 
+@asynccontextmanager
+async def _lifespan(app):
+    yield
+    # Provider keep-alive pools outlive requests; close them with the server.
+    await aclose_provider_clients()
+    close_provider_clients()
+
+
 def create_app():
-    app = FastAPI(title="ORA Core", version="0.1")
+    app = FastAPI(title="ORA Core", version="0.1", lifespan=_lifespan)
     app.state.distribution_runtime = build_runtime_from_env()
 
     @app.get("/health")
@@ -1,4 +1,5 @@
 import logging
+import os
 from typing import Any, Dict, List
 
 from mcp import ClientSession, StdioServerParameters
@@ -17,16 +18,42 @@ class MCPClientManager:
         self.sessions: Dict[str, ClientSession] = {}
         # server_name -> exit_stack (to clean up stdio)
         self.exit_stacks: Dict[str, Any] = {}
+        # server_name -> warm replica sessions (sessions[name] is replicas[name][0])
+        self.replicas: Dict[str, List[ClientSession]] = {}
+        # id(session) -> requests in flight, for least-outstanding dispatch
+        self._outstanding: Dict[int, int] = {}
 
-    async def connect_stdio(self, server_name: str, command: str, args: List[str] = None, env: Dict[str, str] = None):
+    def _pick_session(self, server_name: str) -> ClientSession:
+        pool = self.replicas.get(server_name) or []
+        if not pool:
+            raise RuntimeError(f"MCP Session for '{server_name}' lost.")
+        return min(pool, key=lambda s: self._outstanding.get(id(s), 0))
+
+    async def connect_stdio(
+        self,
+        server_name: str,
+        command: str,
+        args: List[str] = None,
+        env: Dict[str, str] = None,
+        replicas: int = None,
+    ):
         """
         Connect to an MCP server via stdio and register its tools.
+
+        `replicas` (default ORA_MCP_REPLICAS or 1) keeps that many warm server processes;
+        tool calls go to the one with the fewest requests in flight.
         """
         if env is None:
             env = {}
         if args is None:
             args = []
-        logger.info(f"Connecting to MCP server '{server_name}' via stdio: {command} {' '.join(args)}")
+        if replicas is None:
+            try:
+                replicas = int(os.environ.get("ORA_MCP_REPLICAS") or 1)
+            except ValueError:
+                replicas = 1
+        replicas = max(1, min(8, int(replicas)))
+        logger.info(f"Connecting to MCP server '{server_name}' via stdio (replicas={replicas}): {command} {' '.join(args)}")
         
         server_params = StdioServerParameters(
             command=command,
@@ -40,18 +67,25 @@ class MCPClientManager:
             stack = AsyncExitStack()
             self.exit_stacks[server_name] = stack
             
-            read, write = await stack.enter_async_context(stdio_client(server_params))
-            session = await stack.enter_async_context(ClientSession(read, write))
-            
-            await session.initialize()
-            self.sessions[server_name] = session
-            
-            # Register Tools
+            async def _open_replica() -> ClientSession:
+                read, write = await stack.enter_async_context(stdio_client(server_params))
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                return session
+
+            # Contexts are entered on one task so the exit stack can unwind them in order.
+            pool = [await _open_replica() for _ in range(replicas)]
+            self.replicas[server_name] = pool
+            self.sessions[server_name] = pool[0]
+
+            # Register Tools (once per server; every replica serves the same list)
             await self._register_tools(server_name)
             logger.info(f"Successfully connected and registered tools from '{server_name}'")
             
         except Exception as e:
             logger.error(f"Failed to connect to MCP server '{server_name}': {e}", exc_info=True)
+            self.sessions.pop(server_name, None)
+            self.replicas.pop(server_name, None)
             if server_name in self.exit_stacks:
                 await self.exit_stacks[server_name].aclose()
                 del self.exit_stacks[server_name]
@@ -73,11 +107,13 @@ class MCPClientManager:
             
             # Define handler factory
             async def handler(args, context, t_name=tool.name, s_name=server_name):
-                target_session = self.sessions.get(s_name)
-                if not target_session:
-                    raise RuntimeError(f"MCP Session for '{s_name}' lost.")
-                
-                mcp_res = await target_session.call_tool(t_name, args)
+                target_session = self._pick_session(s_name)
+                key = id(target_session)
+                self._outstanding[key] = self._outstanding.get(key, 0) + 1
+                try:
+                    mcp_res = await target_session.call_tool(t_name, args)
+                finally:
+                    self._outstanding[key] = self._outstanding.get(key, 1) - 1
                 
                 content_list = []
                 for item in mcp_res.content:
@@ -107,9 +143,9 @@ class MCPClientManager:
             logger.info(f"Closing MCP server '{name}'")
             await stack.aclose()
         self.sessions.clear()
+        self.replicas.clear()
+        self._outstanding.clear()
         self.exit_stacks.clear()
 
 # Singleton instance
 mcp_client_manager = MCPClientManager()
-
-import os  # Required for PATH expansion in connect_stdio
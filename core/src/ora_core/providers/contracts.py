@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import re
 from dataclasses import asdict, dataclass, field
 from typing import Mapping, Protocol, runtime_checkable
@@ -141,6 +142,25 @@ class UnavailableProviderAdapter:
         raise ProviderError(self.provider_id, "provider_unavailable", self._reason)
 
 
+def generate_response(
+    adapter: ProviderAdapter,
+    request: ProviderRequest,
+    *,
+    allow_live_call: bool = False,
+    loop: asyncio.AbstractEventLoop | None = None,
+) -> ProviderResponse:
+    """
+    Call `adapter.generate`, or its `agenerate` on `loop` when both are available.
+
+    `loop` is a running event loop owned by another thread (see `aexecute_task`); the
+    call then goes over that loop's shared keep-alive pool while this thread waits.
+    """
+    agenerate = getattr(adapter, "agenerate", None)
+    if loop is None or agenerate is None:
+        return adapter.generate(request, allow_live_call=allow_live_call)
+    return asyncio.run_coroutine_threadsafe(agenerate(request, allow_live_call=allow_live_call), loop).result()
+
+
 def redact_env_presence(env: Mapping[str, str | None], keys: tuple[str, ...]) -> dict[str, str]:
     return {
         key: "present_redacted" if str(env.get(key) or "").strip() else "absent"
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import json
-import urllib.error
+import threading
 import urllib.parse
-import urllib.request
+import weakref
 from dataclasses import dataclass
-from typing import Mapping
+from typing import Any, AsyncIterator, Mapping
+
+import httpx
 
 from .contracts import (
     ProviderCapabilities,
@@ -23,7 +26,21 @@ OPENAI_COMPATIBLE_ENV_KEYS = (
     "YONERAI_OPENAI_COMPATIBLE_MODEL",
     "YONERAI_OPENAI_COMPATIBLE_LIVE",
     "YONERAI_OPENAI_COMPATIBLE_TIMEOUT_SECONDS",
+    "YONERAI_OPENAI_COMPATIBLE_MAX_CONNECTIONS",
+    "YONERAI_OPENAI_COMPATIBLE_HTTP2",
+)
+DEFAULT_MAX_CONNECTIONS = 64
+MAX_MAX_CONNECTIONS = 512
+
+# Keep-alive pools shared by every adapter instance, one per upstream origin, so the
+# per-host connection limit holds even though the registry rebuilds adapters per call.
+# Async clients are bound to the loop that created them; keying on the loop object (not
+# its id, which a later loop may reuse) drops a dead loop's pools along with it.
+_SYNC_CLIENTS: dict[tuple[str, int, bool], httpx.Client] = {}
+_ASYNC_CLIENTS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str, int, bool], Any]] = (
+    weakref.WeakKeyDictionary()
 )
+_CLIENTS_LOCK = threading.Lock()
 
 
 @dataclass(frozen=True)
@@ -35,6 +52,8 @@ class OpenAICompatibleConfig:
     live_enabled: bool
     model: str
     timeout_seconds: float
+    max_connections: int = DEFAULT_MAX_CONNECTIONS
+    http2: bool = False
 
 
 class OpenAICompatibleProviderAdapter:
@@ -42,7 +61,7 @@ class OpenAICompatibleProviderAdapter:
     capabilities = ProviderCapabilities(
         chat=True,
         structured_output=True,
-        streaming=False,
+        streaming=True,
         vision=False,
         tool_use=True,
         local_only=False,
@@ -82,6 +101,40 @@ class OpenAICompatibleProviderAdapter:
         return payload
 
     def generate(self, request: ProviderRequest, *, allow_live_call: bool = False) -> ProviderResponse:
+        self._require_live(allow_live_call)
+        payload = self.build_chat_payload(request)
+        response = self._post_chat_payload(payload)
+        return self._to_response(payload, response)
+
+    async def agenerate(self, request: ProviderRequest, *, allow_live_call: bool = False) -> ProviderResponse:
+        """Async `generate` over the shared keep-alive pool; never blocks the event loop."""
+        self._require_live(allow_live_call)
+        payload = self.build_chat_payload(request)
+        response = await self._apost_chat_payload(payload)
+        return self._to_response(payload, response)
+
+    async def astream(self, request: ProviderRequest, *, allow_live_call: bool = False) -> AsyncIterator[str]:
+        """
+        Yield assistant text deltas as the upstream streams them (SSE `data:` chunks).
+
+        Cancelling the consuming task, or closing the generator early, closes the upstream
+        response and drops its connection, so the provider stops generating.
+        """
+        self._require_live(allow_live_call)
+        payload = dict(self.build_chat_payload(request))
+        payload["stream"] = True
+        lines = self._astream_lines(payload)
+        try:
+            async for line in lines:
+                delta = _parse_stream_line(line)
+                if delta is _STREAM_DONE:
+                    return
+                if delta:
+                    yield delta
+        finally:
+            await lines.aclose()
+
+    def _require_live(self, allow_live_call: bool) -> None:
         if not allow_live_call:
             raise ProviderError(
                 self.provider_id,
@@ -103,8 +156,8 @@ class OpenAICompatibleProviderAdapter:
                 "OpenAI-compatible provider requires configured base URL and API key.",
                 safe_context={"provider_configured": self.status().configured},
             )
-        payload = self.build_chat_payload(request)
-        response = self._post_chat_payload(payload)
+
+    def _to_response(self, payload: dict[str, object], response: dict[str, object]) -> ProviderResponse:
         return ProviderResponse(
             provider=self.provider_id,
             model=str(payload.get("model") or self.config.model),
@@ -113,28 +166,133 @@ class OpenAICompatibleProviderAdapter:
             finish_reason="stop",
         )
 
-    def _post_chat_payload(self, payload: dict[str, object]) -> dict[str, object]:
+    def _url(self) -> str:
         if not self.config.base_url or not self.config.api_key:
             raise ProviderError(self.provider_id, "provider_unavailable", "OpenAI-compatible provider is not configured.")
-        request = urllib.request.Request(
-            _chat_completions_url(self.config.base_url),
-            data=json.dumps(payload).encode("utf-8"),
-            method="POST",
-            headers={
-                "Accept": "application/json",
-                "Authorization": f"Bearer {self.config.api_key}",
-                "Content-Type": "application/json",
-            },
+        return _chat_completions_url(self.config.base_url)
+
+    def _headers(self, *, stream: bool = False) -> dict[str, str]:
+        return {
+            "Accept": "text/event-stream" if stream else "application/json",
+            "Authorization": f"Bearer {self.config.api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _pool_key(self) -> tuple[str, int, bool]:
+        return (_origin(self._url()), self.config.max_connections, self.config.http2)
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(self.config.timeout_seconds, connect=min(self.config.timeout_seconds, 10.0))
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_connections,
         )
+
+    def _sync_client(self) -> httpx.Client:
+        key = self._pool_key()
+        with _CLIENTS_LOCK:
+            client = _SYNC_CLIENTS.get(key)
+            if client is None or client.is_closed:
+                client = httpx.Client(limits=self._limits(), http2=_http2_available(self.config.http2))
+                _SYNC_CLIENTS[key] = client
+            return client
+
+    def _async_client(self) -> Any:
+        """
+        Loop-bound keep-alive pool for this origin.
+
+        aiohttp by default (HTTP/1.1, `limit_per_host`); an httpx HTTP/2 client when
+        YONERAI_OPENAI_COMPATIBLE_HTTP2=1 and `h2` is installed, since aiohttp has no h2.
+        """
+        loop = asyncio.get_running_loop()
+        key = self._pool_key()
+        with _CLIENTS_LOCK:
+            pools = _ASYNC_CLIENTS.setdefault(loop, {})
+            client = pools.get(key)
+            if client is not None and not _client_closed(client):
+                return client
+            if _http2_available(self.config.http2):
+                client: Any = httpx.AsyncClient(limits=self._limits(), http2=True)
+            else:
+                import aiohttp
+
+                client = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=self.config.max_connections,
+                        limit_per_host=self.config.max_connections,
+                        keepalive_timeout=30,
+                    ),
+                )
+            pools[key] = client
+            return client
+
+    def _post_chat_payload(self, payload: dict[str, object]) -> dict[str, object]:
+        url = self._url()
         try:
-            with urllib.request.urlopen(request, timeout=self.config.timeout_seconds) as response:
-                raw = response.read()
-        except urllib.error.HTTPError as exc:
-            raise ProviderError(self.provider_id, "provider_http_error", f"OpenAI-compatible provider returned HTTP {exc.code}.") from exc
-        except (urllib.error.URLError, TimeoutError) as exc:
+            response = self._sync_client().post(url, json=payload, headers=self._headers(), timeout=self._timeout())
+        except httpx.TransportError as exc:
             raise ProviderError(self.provider_id, "provider_connection_error", "OpenAI-compatible provider request failed.") from exc
+        return self._decode(response.status_code, response.content)
+
+    async def _apost_chat_payload(self, payload: dict[str, object]) -> dict[str, object]:
+        url = self._url()
+        client = self._async_client()
         try:
-            decoded = json.loads(raw.decode("utf-8"))
+            if isinstance(client, httpx.AsyncClient):
+                response = await client.post(url, json=payload, headers=self._headers(), timeout=self._timeout())
+                return self._decode(response.status_code, response.content)
+            async with client.post(url, json=payload, headers=self._headers(), timeout=_aiohttp_timeout(self.config)) as response:
+                return self._decode(response.status, await response.read())
+        except ProviderError:
+            raise
+        except (httpx.TransportError, OSError, asyncio.TimeoutError) as exc:
+            raise ProviderError(self.provider_id, "provider_connection_error", "OpenAI-compatible provider request failed.") from exc
+        except Exception as exc:
+            if _is_aiohttp_error(exc):
+                raise ProviderError(self.provider_id, "provider_connection_error", "OpenAI-compatible provider request failed.") from exc
+            raise
+
+    async def _astream_lines(self, payload: dict[str, object]) -> AsyncIterator[str]:
+        url = self._url()
+        client = self._async_client()
+        try:
+            if isinstance(client, httpx.AsyncClient):
+                async with client.stream("POST", url, json=payload, headers=self._headers(stream=True), timeout=self._timeout()) as response:
+                    self._check_status(response.status_code)
+                    async for line in response.aiter_lines():
+                        yield line
+                return
+            response = await client.post(url, json=payload, headers=self._headers(stream=True), timeout=_aiohttp_timeout(self.config, stream=True))
+            try:
+                self._check_status(response.status)
+                async for raw in response.content:
+                    yield raw.decode("utf-8", errors="replace")
+            finally:
+                # Not fully read (consumer cancelled / stopped early): drop the socket so the
+                # upstream sees the disconnect instead of the connection going back to the pool.
+                if not response.content.at_eof():
+                    response.close()
+                else:
+                    response.release()
+        except ProviderError:
+            raise
+        except (httpx.TransportError, OSError, asyncio.TimeoutError) as exc:
+            raise ProviderError(self.provider_id, "provider_connection_error", "OpenAI-compatible provider request failed.") from exc
+        except Exception as exc:
+            if _is_aiohttp_error(exc):
+                raise ProviderError(self.provider_id, "provider_connection_error", "OpenAI-compatible provider request failed.") from exc
+            raise
+
+    def _check_status(self, status: int) -> None:
+        if status >= 400:
+            raise ProviderError(self.provider_id, "provider_http_error", f"OpenAI-compatible provider returned HTTP {status}.")
+
+    def _decode(self, status: int, body: bytes) -> dict[str, object]:
+        self._check_status(status)
+        try:
+            decoded = json.loads(body.decode("utf-8"))
         except (UnicodeDecodeError, json.JSONDecodeError) as exc:
             raise ProviderError(self.provider_id, "provider_bad_response", "OpenAI-compatible provider returned invalid JSON.") from exc
         if not isinstance(decoded, dict):
@@ -155,6 +313,8 @@ class OpenAICompatibleProviderAdapter:
             live_enabled=live_enabled,
             model=model,
             timeout_seconds=_parse_timeout_seconds(env.get("YONERAI_OPENAI_COMPATIBLE_TIMEOUT_SECONDS")),
+            max_connections=_parse_max_connections(env.get("YONERAI_OPENAI_COMPATIBLE_MAX_CONNECTIONS")),
+            http2=str(env.get("YONERAI_OPENAI_COMPATIBLE_HTTP2") or "").strip().lower() in {"1", "true", "yes", "on"},
         )
 
 
@@ -168,6 +328,100 @@ def _parse_timeout_seconds(raw: str | None) -> float:
     return min(value, 60.0)
 
 
+def _parse_max_connections(raw: str | None) -> int:
+    try:
+        value = int(str(raw or "").strip())
+    except ValueError:
+        return DEFAULT_MAX_CONNECTIONS
+    if value <= 0:
+        return DEFAULT_MAX_CONNECTIONS
+    return min(value, MAX_MAX_CONNECTIONS)
+
+
+def _http2_available(requested: bool) -> bool:
+    # HTTP/2 needs the optional `h2` package (httpx[http2]); fall back to HTTP/1.1 keep-alive.
+    if not requested:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _origin(url: str) -> str:
+    parsed = urllib.parse.urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def close_provider_clients() -> None:
+    """Close the pooled sync clients (async ones are closed by `aclose_provider_clients`)."""
+    with _CLIENTS_LOCK:
+        clients = list(_SYNC_CLIENTS.values())
+        _SYNC_CLIENTS.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_provider_clients() -> None:
+    """Close the async pools owned by the running loop (call on app shutdown)."""
+    loop = asyncio.get_running_loop()
+    with _CLIENTS_LOCK:
+        clients = list(_ASYNC_CLIENTS.pop(loop, {}).values())
+    for client in clients:
+        if isinstance(client, httpx.AsyncClient):
+            await client.aclose()
+        else:
+            await client.close()
+
+
+def _client_closed(client: Any) -> bool:
+    return bool(client.is_closed if isinstance(client, httpx.AsyncClient) else client.closed)
+
+
+def _aiohttp_timeout(config: OpenAICompatibleConfig, *, stream: bool = False) -> Any:
+    import aiohttp
+
+    connect = min(config.timeout_seconds, 10.0)
+    if stream:
+        # A long generation is fine as long as chunks keep arriving.
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=config.timeout_seconds)
+    return aiohttp.ClientTimeout(total=config.timeout_seconds, sock_connect=connect)
+
+
+def _is_aiohttp_error(exc: BaseException) -> bool:
+    try:
+        import aiohttp
+    except ImportError:
+        return False
+    return isinstance(exc, aiohttp.ClientError)
+
+
+_STREAM_DONE = object()
+
+
+def _parse_stream_line(line: str) -> object:
+    """One SSE line -> text delta (str), `_STREAM_DONE`, or None for comments/keep-alives."""
+    line = line.strip()
+    if not line.startswith("data:"):
+        return None
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return _STREAM_DONE
+    try:
+        chunk = json.loads(data)
+    except json.JSONDecodeError:
+        return None
+    choices = chunk.get("choices") if isinstance(chunk, dict) else None
+    if not isinstance(choices, list) or not choices or not isinstance(choices[0], dict):
+        return None
+    delta = choices[0].get("delta")
+    if isinstance(delta, dict) and isinstance(delta.get("content"), str):
+        return delta["content"]
+    text = choices[0].get("text")
+    return text if isinstance(text, str) else None
+
+
 def _chat_completions_url(base_url: str) -> str:
     parsed = urllib.parse.urlparse(base_url.strip())
     if parsed.scheme not in {"http", "https"} or not parsed.netloc:
@@ -1,4 +1,4 @@
-import hashlib
+import asyncio
 import logging
 import os
 import time
@@ -6,13 +6,12 @@ from typing import Any, Dict, List, Optional
 
 from duckduckgo_search import DDGS
 
+from src.utils.search_cache import get_search_cache, normalize_query, search_cache_key
+
 logger = logging.getLogger(__name__)
 
-# Global In-Memory Cache for Search Results
-# Key: user_id:provider:query_hash
-# Value: {"sources": [...], "expires_at": float}
-_search_cache: Dict[str, Dict[str, Any]] = {}
-CACHE_TTL_SEC = 300  # 5 minutes
+# Results are shared across users: bounded LRU/TTL with singleflight (src.utils.search_cache).
+NUM_RESULTS = 5
 
 # Environment validation flag
 _search_enabled = True
@@ -42,7 +41,7 @@ class SearchProvider:
 class DDGSearchProvider(SearchProvider):
     async def search(self, query: str, num_results: int = 5) -> List[Dict[str, Any]]:
         try:
-            results = DDGS().text(query, max_results=num_results)
+            results = await asyncio.to_thread(lambda: DDGS().text(query, max_results=num_results))
             if not results:
                 return []
             
@@ -106,73 +105,36 @@ class GoogleSearchProvider(SearchProvider):
 async def execute_search(user_id: str, query: str, provider_name: str = "google") -> Dict[str, Any]:
     """
     Executes search with caching and summarization.
+
+    `user_id` is accepted for tracing only; identical queries from different users
+    share one cache entry and one in-flight upstream call.
     """
-    import json
     start_time = time.time()
-    
-    # 1. Normalize Query and Generate Strict Cache Key
-    query_norm = " ".join(query.strip().lower().split()) # Compress whitespace
-    params = {"num": 5, "provider": provider_name}
-    params_str = json.dumps(params, sort_keys=True)
-    hash_input = f"{user_id}:{provider_name}:{query_norm}:{params_str}"
-    query_hash = hashlib.sha256(hash_input.encode()).hexdigest()
-    cache_key = query_hash
-    
-    cached = _search_cache.get(cache_key)
-    if cached and cached["expires_at"] > time.time():
-        logger.info(f"Search cache hit for: {query_norm}")
-        return {
-            "ok": True,
-            "content": _format_mcp_content(cached["sources"]),
-            "structuredContent": {"sources": cached["sources"]},
-            "metrics": {
-                "latency_ms": int((time.time() - start_time) * 1000),
-                "cache_hit": True
-            }
-        }
 
-    # 2. Select Provider (Fallback to DDG if env not set)
+    # 1. Select Provider (Fallback to DDG if env not set)
     effective_provider = provider_name
     if provider_name == "google" and not _search_enabled:
         effective_provider = "ddg" # Graceful fallback
 
-    if effective_provider == "google":
-        api_key = os.getenv("SEARCH_API_KEY")
-        cx = os.getenv("GOOGLE_SEARCH_CX") 
-        provider = GoogleSearchProvider(api_key, cx)
-    else:
-        provider = DDGSearchProvider()
+    # 2. Cached / coalesced execute
+    query_norm = normalize_query(query)
+    cache_key = search_cache_key(query_norm, provider=effective_provider, limit=NUM_RESULTS)
+    sources, status = await get_search_cache().get_or_fetch(
+        cache_key, lambda: _fetch_sources(effective_provider, query_norm)
+    )
+    if status != "miss":
+        logger.info(f"Search cache {status} for: {query_norm}")
 
-    # 3. Execute
-    results = await provider.search(query_norm, num_results=5)
-    
-    # 4. Structure Sources with rank and provider
-    sources = [
-        {
-            "title": r.get("title", ""),
-            "url": r.get("url", ""),
-            "snippet": r.get("snippet", ""),
-            "rank": i + 1,
-            "provider": effective_provider
-        }
-        for i, r in enumerate(results)
-    ]
-    
-    # 5. Save to Cache
-    _search_cache[cache_key] = {
-        "sources": sources,
-        "expires_at": time.time() + CACHE_TTL_SEC
-    }
-    
     latency = int((time.time() - start_time) * 1000)
-    
+    metrics = {"latency_ms": latency, "cache_hit": status != "miss", "cache": status}
+
     if not sources:
         return {
             "ok": True,
             "content": [{"type": "text", "text": "No search results found."}],
             "structuredContent": {"sources": []},
             "error": None,
-            "metrics": {"latency_ms": latency, "cache_hit": False}
+            "metrics": metrics,
         }
 
     return {
@@ -180,12 +142,31 @@ async def execute_search(user_id: str, query: str, provider_name: str = "google"
         "content": _format_mcp_content(sources),
         "structuredContent": {"sources": sources},
         "error": None,
-        "metrics": {
-            "latency_ms": latency,
-            "cache_hit": False
-        }
+        "metrics": metrics,
     }
 
+async def _fetch_sources(effective_provider: str, query_norm: str) -> List[Dict[str, Any]]:
+    if effective_provider == "google":
+        api_key = os.getenv("SEARCH_API_KEY")
+        cx = os.getenv("GOOGLE_SEARCH_CX") 
+        provider = GoogleSearchProvider(api_key, cx)
+    else:
+        provider = DDGSearchProvider()
+
+    results = await provider.search(query_norm, num_results=NUM_RESULTS)
+
+    # Structure Sources with rank and provider
+    return [
+        {
+            "title": r.get("title", ""),
+            "url": r.get("url", ""),
+            "snippet": r.get("snippet", ""),
+            "rank": i + 1,
+            "provider": effective_provider
+        }
+        for i, r in enumerate(results)
+    ]
+
 def _format_mcp_content(sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Format sources into MCP standard content atoms."""
     content = []
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.browser_agent import BrowserAgent  # noqa: E402
+
+
+class _SimPage:
+    """Playwright-shaped page whose snapshot we control; every CDP call costs `latency_ms`."""
+
+    def __init__(self, snapshot: str, latency_ms: float, *, view_state: bool):
+        self.snapshot = snapshot
+        self.url = "https://bench.example/app"
+        self.scroll_y = 0
+        self.frames: list = []
+        self.viewport_size = {"width": 1280, "height": 720}
+        self.roundtrips = 0
+        self._latency = latency_ms / 1000
+        self._view_state = view_state
+
+    async def _rt(self) -> None:
+        self.roundtrips += 1
+        await asyncio.sleep(self._latency)
+
+    def on(self, *_args):
+        return None
+
+    async def title(self):
+        return "Bench"
+
+    def locator(self, selector: str):
+        page = self
+
+        class _Handle:
+            async def evaluate(self, _script):
+                await page._rt()
+                return f"#{selector}"
+
+            async def bounding_box(self):
+                await page._rt()
+                return {"x": 0.0, "y": 10.0, "width": 80.0, "height": 16.0}
+
+        class _Locator:
+            async def aria_snapshot(self, ref: bool = False):
+                await page._rt()
+                return page.snapshot
+
+            async def element_handle(self):
+                await page._rt()
+                return _Handle()
+
+        return _Locator()
+
+    async def evaluate(self, _script):
+        await self._rt()
+        if not self._view_state:
+            raise RuntimeError("view state disabled (legacy baseline)")
+        return [self.url, 0, self.scroll_y, 1280, 720]
+
+
+def make_snapshot(items: int, *, checked: int = -1, typed: str = "", menu: bool = False) -> str:
+    lines = ["- banner:", '  - heading "Dashboard" [level=1] [ref=e1]', "- main [ref=e2]:"]
+    lines.append(f'  - textbox "Search" [ref=e3]{": " + typed if typed else ""}')
+    if menu:
+        lines.append("  - menu [ref=e9000]:")
+        lines.extend(f'    - menuitem "Action {n}" [ref=e{9001 + n}]' for n in range(5))
+    for n in range(items):
+        ref = 10 + n * 3
+        lines.append(f"  - row [ref=e{ref}]:")
+        lines.append(f"    - cell: Order #{n:05d} shipped to warehouse {n % 17}")
+        state = " [checked]" if n == checked else ""
+        lines.append(f'    - checkbox "Select order {n}"{state} [ref=e{ref + 1}]')
+        lines.append(f'    - link "Details {n}" [ref=e{ref + 2}]')
+    return "\n".join(lines)
+
+
+async def run(mode: str, items: int, latency_ms: float) -> dict[str, object]:
+    agent = BrowserAgent(max_aria_chars=1_000_000)
+    page = _SimPage(make_snapshot(items), latency_ms, view_state=mode == "diff")
+    agent._register_page(page)
+    await agent.observe()  # initial full snapshot for both runs
+
+    steps = {
+        "type_text": {"typed": "late orders"},
+        "toggle_checkbox": {"typed": "late orders", "checked": 7},
+        "open_menu": {"typed": "late orders", "checked": 7, "menu": True},
+        "idle": {"typed": "late orders", "checked": 7, "menu": True},
+    }
+    results: dict[str, object] = {}
+    for name, state in steps.items():
+        page.snapshot = make_snapshot(items, **state)
+        page.roundtrips = 0
+        obs = await agent.observe("diff" if mode == "diff" else "full")
+        results[name] = {
+            "mode": obs.mode,
+            "ms": obs.stats["observe_ms"],
+            "roundtrips": page.roundtrips,
+            "sent_chars": obs.stats["sent_chars"],
+            "full_chars": obs.stats["full_chars"],
+        }
+    page.scroll_y = 600
+    page.roundtrips = 0
+    obs = await agent.observe("diff" if mode == "diff" else "full")
+    results["scroll_resolves_boxes"] = {"ms": obs.stats["observe_ms"], "roundtrips": page.roundtrips}
+    results["totals"] = agent.observe_stats()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare full vs diff BrowserAgent observations on a simulated page.")
+    parser.add_argument("--items", type=int, default=60, help="table rows (3 refs each)")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="simulated cost of one Playwright round-trip")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {
+        "legacy_full": asyncio.run(run("full", args.items, args.latency_ms)),
+        "diff": asyncio.run(run("diff", args.items, args.latency_ms)),
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for label, steps in results.items():
+            print(label)
+            for key, value in steps.items():
+                print(f"  {key:24s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class FakeComfyServer:
+    """
+    Scripted ComfyUI: /prompt, /queue, /history, /view and /ws with one render worker.
+
+    Each prompt renders for `render_sec` (in `steps` progress ticks), reports its Save
+    node as `executed`, then spends `finalize_sec` before the final `executing` event
+    (VAE decode / video mux / history write on a real server). /view takes `view_sec`.
+    """
+
+    def __init__(self, *, render_sec: float = 0.2, steps: int = 4, finalize_sec: float = 0.0, view_sec: float = 0.0) -> None:
+        self.render_sec = render_sec
+        self.steps = steps
+        self.finalize_sec = finalize_sec
+        self.view_sec = view_sec
+        self.ws_connections = 0
+        self.max_queue_seen = 0
+        self.history: dict[str, dict] = {}
+        self.finished_at: dict[str, float] = {}
+        self._queue: list[tuple[int, str, dict, str]] = []  # (number, prompt_id, prompt, client_id)
+        self._running: tuple[int, str, dict, str] | None = None
+        self._number = 0
+        self._sockets: dict[str, web.WebSocketResponse] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: web.AppRunner | None = None
+        self._worker: asyncio.Task | None = None
+        self.address = ""
+
+    async def start(self) -> "FakeComfyServer":
+        app = web.Application()
+        app.router.add_get("/ws", self._ws)
+        app.router.add_post("/prompt", self._prompt)
+        app.router.add_get("/queue", self._get_queue)
+        app.router.add_post("/queue", self._post_queue)
+        app.router.add_get("/history/{prompt_id}", self._history)
+        app.router.add_get("/view", self._view)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.address = f"127.0.0.1:{port}"
+        self._worker = asyncio.create_task(self._work())
+        return self
+
+    async def close(self) -> None:
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        for ws in list(self._sockets.values()):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def __aenter__(self) -> "FakeComfyServer":
+        return await self.start()
+
+    async def __aexit__(self, *_exc: object) -> None:
+        await self.close()
+
+    def enqueue_foreign(self, count: int) -> None:
+        """Prompts from another client (e.g. the ComfyUI web UI) already in the queue."""
+        for _ in range(count):
+            self._enqueue({"9": {"class_type": "SaveImage", "inputs": {}}}, client_id="someone-else")
+
+    async def drop_websockets(self) -> None:
+        for ws in list(self._sockets.values()):
+            await ws.close()
+
+    @property
+    def queue_remaining(self) -> int:
+        return len(self._queue) + (1 if self._running else 0)
+
+    def _enqueue(self, prompt: dict, client_id: str) -> str:
+        self._number += 1
+        prompt_id = str(uuid.uuid4())
+        self._queue.append((self._number, prompt_id, prompt, client_id))
+        self.max_queue_seen = max(self.max_queue_seen, self.queue_remaining)
+        self._wakeup.set()
+        return prompt_id
+
+    async def _ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        client_id = request.query.get("clientId") or str(uuid.uuid4())
+        self.ws_connections += 1
+        self._sockets[client_id] = ws
+        await ws.send_json({"type": "status", "data": {"status": {"exec_info": {"queue_remaining": self.queue_remaining}}, "sid": client_id}})
+        async for _msg in ws:
+            pass
+        if self._sockets.get(client_id) is ws:
+            del self._sockets[client_id]
+        return ws
+
+    async def _send(self, client_id: str, kind: str, data: dict) -> None:
+        ws = self._sockets.get(client_id)
+        if ws is not None and not ws.closed:
+            try:
+                await ws.send_json({"type": kind, "data": data})
+            except ConnectionError:
+                pass
+
+    async def _broadcast_status(self) -> None:
+        for client_id in list(self._sockets):
+            await self._send(client_id, "status", {"status": {"exec_info": {"queue_remaining": self.queue_remaining}}})
+
+    async def _prompt(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt_id = self._enqueue(body["prompt"], body.get("client_id") or "")
+        await self._broadcast_status()
+        return web.json_response({"prompt_id": prompt_id, "number": self._number, "node_errors": {}})
+
+    async def _get_queue(self, _request: web.Request) -> web.Response:
+        running = [[n, pid, {}, {}, []] for n, pid, _p, _c in ([self._running] if self._running else [])]
+        pending = [[n, pid, {}, {}, []] for n, pid, _p, _c in self._queue]
+        return web.json_response({"queue_running": running, "queue_pending": pending})
+
+    async def _post_queue(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        doomed = set(body.get("delete") or [])
+        self._queue = [e for e in self._queue if e[1] not in doomed]
+        await self._broadcast_status()
+        return web.json_response({})
+
+    async def _history(self, request: web.Request) -> web.Response:
+        prompt_id = request.match_info["prompt_id"]
+        entry = self.history.get(prompt_id)
+        return web.json_response({prompt_id: entry} if entry else {})
+
+    async def _view(self, request: web.Request) -> web.Response:
+        if self.view_sec:
+            await asyncio.sleep(self.view_sec)
+        return web.Response(body=f"image:{request.query.get('filename')}".encode())
+
+    async def _work(self) -> None:
+        while True:
+            while not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            self._running = self._queue.pop(0)
+            _number, prompt_id, prompt, client_id = self._running
+            await self._send(client_id, "execution_start", {"prompt_id": prompt_id})
+            for step in range(1, self.steps + 1):
+                await asyncio.sleep(self.render_sec / self.steps)
+                await self._send(client_id, "progress", {"value": step, "max": self.steps, "prompt_id": prompt_id, "node": "7"})
+            save_node = next((nid for nid, n in prompt.items() if str(n.get("class_type", "")).startswith("Save")), "9")
+            output = {"images": [{"filename": f"{prompt_id}.png", "subfolder": "", "type": "output"}]}
+            await self._send(client_id, "executed", {"node": save_node, "output": output, "prompt_id": prompt_id})
+            if self.finalize_sec:
+                await asyncio.sleep(self.finalize_sec)
+            self.history[prompt_id] = {"outputs": {save_node: output}, "status": {"completed": True}}
+            self.finished_at[prompt_id] = time.perf_counter()
+            self._running = None
+            await self._send(client_id, "executing", {"node": None, "prompt_id": prompt_id})
+            await self._broadcast_status()
+
+
+def _workflow(tag: int) -> dict:
+    return {"4": {"class_type": "CLIPTextEncode", "inputs": {"text": f"p{tag}"}}, "9": {"class_type": "SaveImage", "inputs": {}}}
+
+
+def _legacy_queue_and_wait(address: str, workflow: dict) -> tuple[str, bytes, float]:
+    """The previous client: a blocking websocket per job, urllib for /prompt, /history and /view."""
+    import urllib.parse
+    import urllib.request
+
+    import websocket
+
+    client_id = str(uuid.uuid4())
+    ws = websocket.WebSocket()
+    ws.connect(f"ws://{address}/ws?clientId={client_id}")
+    req = urllib.request.Request(f"http://{address}/prompt", data=json.dumps({"prompt": workflow, "client_id": client_id}).encode())
+    with urllib.request.urlopen(req) as response:
+        prompt_id = json.loads(response.read())["prompt_id"]
+    while True:
+        out = ws.recv()
+        if isinstance(out, str):
+            msg = json.loads(out)
+            if msg["type"] == "executing" and msg["data"]["node"] is None and msg["data"]["prompt_id"] == prompt_id:
+                break
+    ws.close()
+    with urllib.request.urlopen(f"http://{address}/history/{prompt_id}") as response:
+        meta = json.loads(response.read())[prompt_id]["outputs"]["9"]["images"][0]
+    query = urllib.parse.urlencode({"filename": meta["filename"], "subfolder": meta["subfolder"], "type": meta["type"]})
+    with urllib.request.urlopen(f"http://{address}/view?{query}") as response:
+        return prompt_id, response.read(), time.perf_counter()
+
+
+def _lag_ms(server: FakeComfyServer, done: list[tuple[str, float]]) -> float:
+    lags = [(t - server.finished_at[pid]) * 1000 for pid, t in done]
+    return round(sum(lags) / len(lags), 1)
+
+
+async def run(jobs: int, render_sec: float, finalize_sec: float, view_sec: float) -> dict[str, object]:
+    from src.utils.comfy_jobs import ComfyConnection
+
+    results: dict[str, object] = {"jobs": jobs, "render_sec": render_sec, "finalize_sec": finalize_sec, "view_sec": view_sec}
+    loop = asyncio.get_running_loop()
+
+    async with FakeComfyServer(render_sec=render_sec, finalize_sec=finalize_sec, view_sec=view_sec) as server:
+        threads_before = threading.active_count()
+        peak = threads_before
+        started = time.perf_counter()
+        futs = [loop.run_in_executor(None, _legacy_queue_and_wait, server.address, _workflow(i)) for i in range(jobs)]
+        while not all(f.done() for f in futs):
+            peak = max(peak, threading.active_count())
+            await asyncio.sleep(0.01)
+        done = [(pid, t) for pid, _data, t in await asyncio.gather(*futs)]
+        results["legacy_threads"] = {
+            "wall_s": round(time.perf_counter() - started, 2),
+            "output_lag_ms": _lag_ms(server, done),
+            "ws_connections": server.ws_connections,
+            "extra_threads": peak - threads_before,
+            "comfy_queue_peak": server.max_queue_seen,
+        }
+
+    async with FakeComfyServer(render_sec=render_sec, finalize_sec=finalize_sec, view_sec=view_sec) as server:
+        conn = ComfyConnection(server.address, max_remote_queue=2, max_local_queue=jobs)
+        threads_before = threading.active_count()
+        started = time.perf_counter()
+        submitted = [await conn.submit(_workflow(i), "9", kind="image") for i in range(jobs)]
+        first_report = submitted[-1].snapshot()
+
+        async def _timed(job):
+            data = await job.result()
+            assert data
+            return job.prompt_id, time.perf_counter()
+
+        done = await asyncio.gather(*(_timed(job) for job in submitted))
+        results["shared_ws"] = {
+            "wall_s": round(time.perf_counter() - started, 2),
+            "output_lag_ms": _lag_ms(server, done),
+            "ws_connections": server.ws_connections,
+            "extra_threads": threading.active_count() - threads_before,
+            "comfy_queue_peak": server.max_queue_seen,
+            "early_downloads": conn.stats["early_downloads"],
+            "last_job_first_report": first_report,
+        }
+        await conn.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ComfyUI job client against a scripted fake ComfyUI.")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--render-sec", type=float, default=0.5)
+    parser.add_argument("--finalize-sec", type=float, default=0.3, help="time between `executed` and completion")
+    parser.add_argument("--view-sec", type=float, default=0.3, help="time to download one output")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.jobs, args.render_sec, args.finalize_sec, args.view_sec))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:16s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
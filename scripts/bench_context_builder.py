@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "core" / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class FakeRepo:
+    """Conversation store with a fixed per-query latency (an indexed SQLite/Postgres read)."""
+
+    def __init__(self, messages: list[object], latency_sec: float = 0.0) -> None:
+        self.messages = messages
+        self.latency_sec = latency_sec
+        self.queries = 0
+
+    async def get_messages(self, _conversation_id: str, limit: int = 20):
+        self.queries += 1
+        await asyncio.sleep(self.latency_sec)
+        return list(self.messages)[-limit:]
+
+
+def conversation(turns: int, seed: int = 3) -> list[object]:
+    """Mixed ja/en chat: mostly short turns, some paragraphs, an occasional pasted log or code block."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(turns):
+        kind = rng.random()
+        if kind < 0.7:
+            text = "了解です、ありがとう。" * rng.randint(1, 6)
+        elif kind < 0.92:
+            text = "Here is a longer explanation of the build step and what changed. " * rng.randint(4, 12)
+        else:
+            text = "Traceback (most recent call last):\n  File \"app.py\", line 12, in <module>\n" * rng.randint(30, 60)
+        out.append(SimpleNamespace(id=f"m{i}", author="user" if i % 2 == 0 else "assistant", content=text, attachments=[]))
+    return out
+
+
+def _serialize(messages: list[dict]) -> str:
+    return "".join(f"<{m['role']}>{m['content'] if isinstance(m['content'], str) else json.dumps(m['content'])}\n" for m in messages)
+
+
+def _common_prefix(a: str, b: str) -> str:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return a[:n]
+
+
+def _legacy_layout(messages: list[dict], soul: str) -> list[dict]:
+    """The previous message order: soul, then identity lines, time/user/server and memory ahead of the static rules."""
+    static, session = messages[0]["content"], messages[1]["content"]
+    static_body = static.split("\n\n", 1)[1] if static.startswith("[SYSTEM IDENTITY]") else static
+    identity, rest = static_body.split("Per-turn details", 1)
+    rest = rest.split("\n", 1)[1]
+    session_body = session.split("\n", 1)[1]
+    legacy_prompt = identity + session_body + rest
+    return [{"role": "system", "content": f"[SYSTEM IDENTITY]\n{soul}"}, {"role": "system", "content": legacy_prompt}, *messages[2:]]
+
+
+async def run(requests: int, users: int, history_turns: int, db_latency_sec: float = 0.0) -> dict[str, object]:
+    from ora_core.api.schemas.messages import MessageRequest
+    from ora_core.brain import context as context_mod
+    from ora_core.brain.context import SOUL_PATH, ContextBuilder, estimate_tokens
+    from ora_core.brain.memory import memory_store
+
+    rng = random.Random(11)
+    channel_id = "bench-channel"
+    with open(memory_store.get_channel_path(channel_id), "w", encoding="utf-8") as f:
+        json.dump({"summary": "Build troubleshooting channel", "topics": ["ci", "docker"], "atmosphere": "calm"}, f)
+
+    def request(i: int) -> MessageRequest:
+        return MessageRequest(
+            user_identity={"provider": "web", "id": f"bench-user-{i % users}", "display_name": f"User{i % users}"},
+            content=f"質問 {i}: このエラーはどう直せばいい？",
+            client_context={"channel_id": channel_id, "timestamp": f"2026-10-18 12:{i // 60 % 60:02d}:{i % 60:02d}"},
+            idempotency_key=f"bench-{i:06d}",
+            source="web",
+        )
+
+    repo = FakeRepo(conversation(history_turns), latency_sec=db_latency_sec)
+    results: dict[str, object] = {"requests": requests, "users": users, "history_turns": history_turns}
+
+    async def measure(label: str, build) -> None:
+        for i in range(users):  # warm-up: imports, profile creation
+            await build(request(i))
+        repo.queries = 0
+        elapsed = 0.0
+        tokens: list[int] = []
+        prefix_tokens = 0
+        history_msgs = 0
+        previous = ""
+        for i in range(requests):
+            req = request(rng.randrange(10_000))
+            started = time.perf_counter()
+            messages = await build(req)
+            elapsed += time.perf_counter() - started
+            text = _serialize(messages)
+            tokens.append(estimate_tokens(text))
+            history_msgs += sum(1 for m in messages if m["role"] in ("user", "assistant")) - 1
+            if previous:
+                prefix_tokens += estimate_tokens(_common_prefix(previous, text))
+            previous = text
+        results[label] = {
+            "build_us": round(elapsed / requests * 1e6, 1),
+            "prompt_tokens": sum(tokens) // requests,
+            "prompt_tokens_max": max(tokens),
+            "shared_prefix_tokens": prefix_tokens // max(1, requests - 1),
+            "history_messages": round(history_msgs / requests, 1),
+            "db_queries": repo.queries,
+        }
+
+    async def legacy(req: MessageRequest) -> list[dict]:
+        # Per-message disk work of the previous builder: soul.md read in MainProcess.run,
+        # uncached profile (lock file + aiofiles) and channel JSON, fixed 15-message window.
+        with open(SOUL_PATH, "r", encoding="utf-8") as f:
+            soul = f.read().strip()
+        context_mod._file_cache.clear()
+        context_mod._static_prompt_cache.clear()
+        memory_store._profile_cache.clear()
+        os.environ["ORA_CONTEXT_HISTORY_FETCH"] = "15"
+        os.environ["ORA_CONTEXT_HISTORY_TOKENS"] = "200000"
+        try:
+            messages = await ContextBuilder.build_context(req, "internal", "conv", repo)
+        finally:
+            del os.environ["ORA_CONTEXT_HISTORY_FETCH"], os.environ["ORA_CONTEXT_HISTORY_TOKENS"]
+        return _legacy_layout(messages, soul)
+
+    async def current(req: MessageRequest) -> list[dict]:
+        return await ContextBuilder.build_context(req, "internal", "conv", repo)
+
+    await measure("legacy", legacy)
+    await measure("cached_budgeted", current)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ContextBuilder build time and prompt size per message.")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--history-turns", type=int, default=60)
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="simulated get_messages latency")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("ORA_MEMORY_DIR", tmp)  # before ora_core.brain.memory creates its dirs
+        results = asyncio.run(run(args.requests, args.users, args.history_turns, args.db_latency_ms / 1000.0))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:16s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,415 @@
+"""
+End-to-end load benchmark for the core message pipeline.
+
+Boots the real core app (uvicorn, on its own event loop thread) against a
+temporary SQLite database, replaces the LLM call with the deterministic mock
+provider plus a simulated latency, and drives concurrent conversations
+through `POST /v1/messages` -> `MainProcess` -> `GET /v1/runs/{id}/events`.
+
+Reports throughput, time-to-first-event, end-to-end latency percentiles,
+SQL write counts and the server loop's scheduling lag, and compares them to
+`bench_core_pipeline.baseline.json` so slowdowns fail loudly:
+
+    python scripts/bench_core_pipeline.py                   # compare to baseline
+    python scripts/bench_core_pipeline.py --write-baseline  # after an intended change
+
+Timing budgets are relative (`--tolerance`, or ORA_BENCH_CORE_TOLERANCE) with
+a small absolute slack for millisecond metrics; writes and commits per run
+must not grow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+CORE_SRC = ROOT / "core" / "src"
+for _path in (ROOT, CORE_SRC):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
+
+BASELINE_PATH = Path(__file__).with_name("bench_core_pipeline.baseline.json")
+TOLERANCE_ENV = "ORA_BENCH_CORE_TOLERANCE"
+
+# (metric path, direction, kind). "time" metrics get the relative tolerance plus
+# `slack_ms`. "count" metrics are per run and fixed by the pipeline's shape; a stray
+# pool-level commit moves them by ~0.01, a new write per run by >= 1, hence the 0.5.
+# p99 latencies are reported but not gated: with a few dozen runs they are the max.
+GATES: tuple[tuple[str, str, str], ...] = (
+    ("throughput_runs_per_s", "higher", "time"),
+    ("ttfe_ms.p50", "lower", "time"),
+    ("ttfe_ms.p95", "lower", "time"),
+    ("e2e_ms.p50", "lower", "time"),
+    ("e2e_ms.p95", "lower", "time"),
+    ("loop_lag_ms.p99", "lower", "time"),
+    ("db.writes_per_run", "lower", "count"),
+    ("db.commits_per_run", "lower", "count"),
+)
+
+_WRITE_RE = re.compile(r'^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)', re.IGNORECASE)
+
+
+def percentiles(values: list[float], points: tuple[int, ...] = (50, 95, 99)) -> dict[str, float]:
+    """Nearest-rank percentiles, rounded to 0.01."""
+    if not values:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(values)
+    out = {}
+    for p in points:
+        rank = max(1, -(-p * len(ordered) // 100))
+        out[f"p{p}"] = round(ordered[rank - 1], 2)
+    return out
+
+
+def _lookup(results: dict[str, Any], path: str) -> float | None:
+    value: Any = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def compare_to_baseline(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    tolerance: float,
+    slack_ms: float = 5.0,
+) -> list[str]:
+    """Return one message per gated metric that regressed past its budget."""
+    if results.get("config") != baseline.get("config"):
+        return [f"config differs from baseline: {results.get('config')} != {baseline.get('config')}"]
+    failures: list[str] = []
+    if results.get("errors"):
+        failures.append(f"errors: {results['errors']} run(s) did not finish cleanly")
+    for path, direction, kind in GATES:
+        base = _lookup(baseline, path)
+        current = _lookup(results, path)
+        if base is None or current is None:
+            continue
+        if kind == "count":
+            limit = base + 0.5
+        elif direction == "higher":
+            limit = base / (1.0 + tolerance)
+        else:
+            limit = base * (1.0 + tolerance) + (slack_ms if path.endswith(("p50", "p95", "p99")) else 0.0)
+        regressed = current < limit if direction == "higher" else current > limit
+        if regressed:
+            bound = ">=" if direction == "higher" else "<="
+            failures.append(f"{path}: {current:g} (baseline {base:g}, budget {bound} {limit:.2f})")
+    return failures
+
+
+class _MockLLM:
+    """Stands in for `omni_engine.generate`: the mock provider's deterministic reply after a simulated delay."""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, seed: int) -> None:
+        from ora_core.providers.mock import MockProviderAdapter
+
+        self.adapter = MockProviderAdapter()
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    async def generate(
+        self,
+        messages: list[dict],
+        client_type: str = "web",
+        stream: bool = True,
+        preference: str | None = None,
+        tool_schemas: list[dict] | None = None,
+    ) -> Any:
+        from ora_core.providers.contracts import ProviderRequest
+
+        self.calls += 1
+        delay_ms = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms))
+        await asyncio.sleep(delay_ms / 1000.0)
+        prompt = next((str(m.get("content") or "") for m in reversed(messages) if isinstance(m, dict) and m.get("role") == "user"), "")
+        response = self.adapter.generate(ProviderRequest(prompt=prompt, model=preference))
+        message = SimpleNamespace(content=response.output_text, tool_calls=None)
+        return SimpleNamespace(
+            model=response.model,
+            usage=None,
+            choices=[SimpleNamespace(message=message, finish_reason=response.finish_reason)],
+        )
+
+
+class _WriteCounter:
+    def __init__(self) -> None:
+        self.writes: dict[str, int] = {}
+        self.commits = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        m = _WRITE_RE.match(statement)
+        if m:
+            key = f"{m.group(1).split()[0].upper()} {m.group(2)}"
+            self.writes[key] = self.writes.get(key, 0) + 1
+
+    def on_commit(self, conn) -> None:
+        self.commits += 1
+
+    def reset(self) -> None:
+        self.writes.clear()
+        self.commits = 0
+
+
+class _CoreServer(threading.Thread):
+    """Runs the core app under uvicorn on a private loop and samples that loop's lag."""
+
+    def __init__(self, app: Any, engine: Any, lag_interval_ms: float) -> None:
+        super().__init__(name="bench-core-server", daemon=True)
+        import uvicorn
+
+        self.engine = engine
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off", access_log=False)
+        )
+        self.lag_interval = lag_interval_ms / 1000.0
+        self.lag_ms: list[float] = []
+        self.sampling = False
+        self.error: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self._main())
+        except BaseException as exc:  # surfaced by start_and_wait()
+            self.error = exc
+
+    async def _main(self) -> None:
+        from ora_core.database.models import Base
+
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sampler = asyncio.create_task(self._sample_lag())
+        try:
+            await self.server.serve()
+        finally:
+            sampler.cancel()
+            await asyncio.gather(sampler, return_exceptions=True)
+            await self.engine.dispose()
+
+    async def _sample_lag(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            if self.sampling:
+                self.lag_ms.append(max(0.0, (loop.time() - expected) * 1000.0))
+
+    def start_and_wait(self, timeout: float = 30.0) -> int:
+        self.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if self.error is not None or not self.is_alive():
+                raise RuntimeError(f"core server failed to start: {self.error!r}")
+            if time.monotonic() > deadline:
+                raise RuntimeError("core server did not start in time")
+            time.sleep(0.01)
+        return int(self.server.servers[0].sockets[0].getsockname()[1])
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.join(timeout=30)
+
+
+def _boot(workdir: Path, args: argparse.Namespace) -> tuple[_CoreServer, _WriteCounter, _MockLLM]:
+    """Import the core against a throwaway database and wire in the mock provider and counters."""
+    db_path = workdir / "core_bench.db"
+    if "ora_core.database.session" in sys.modules:
+        raise RuntimeError("ora_core is already imported; run this benchmark as a script so it gets its own database")
+    os.environ["ORA_BOT_DB"] = str(db_path)  # absolute, so it replaces the repo-root default
+    os.environ["ORA_MEMORY_DIR"] = str(workdir / "memory")
+    os.environ.pop("ORA_CORE_API_TOKEN", None)  # localhost access path
+    os.environ.pop("ORA_DISTRIBUTION_NODE_ENABLE", None)
+
+    from sqlalchemy import event
+
+    # The core prints its startup banner to stdout; keep stdout clean for --json.
+    with contextlib.redirect_stdout(sys.stderr):
+        from ora_core.database import session as db_session
+        from ora_core.engine.omni_engine import omni_engine
+        from ora_core.main import app
+
+    counter = _WriteCounter()
+    event.listen(db_session.engine.sync_engine, "before_cursor_execute", counter.on_execute)
+    event.listen(db_session.engine.sync_engine, "commit", counter.on_commit)
+
+    llm = _MockLLM(args.latency_ms, args.jitter_ms, args.seed)
+    omni_engine.generate = llm.generate  # type: ignore[method-assign]
+    server = _CoreServer(app, db_session.engine, args.lag_interval_ms)
+    return server, counter, llm
+
+
+async def _conversation(
+    client: Any, name: str, turns: int, sem: asyncio.Semaphore, samples: list[dict[str, Any]]
+) -> None:
+    async with sem:
+        conversation_id = None
+        for turn in range(turns):
+            payload = {
+                "conversation_id": conversation_id,
+                "user_identity": {"provider": "web", "id": name, "display_name": name},
+                "content": f"Benchmark {name}, turn {turn}: summarize the plan in one line.",
+                "attachments": [],
+                "idempotency_key": f"{name}-{turn:03d}",
+                "source": "web",
+            }
+            sample: dict[str, Any] = {"ok": False, "events": 0}
+            started = time.perf_counter()
+            try:
+                resp = await client.post("/v1/messages", json=payload)
+                sample["post_ms"] = (time.perf_counter() - started) * 1000.0
+                resp.raise_for_status()
+                body = resp.json()
+                conversation_id = body["conversation_id"]
+                async with client.stream("GET", f"/v1/runs/{body['run_id']}/events") as stream:
+                    async for line in stream.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        now = (time.perf_counter() - started) * 1000.0
+                        sample.setdefault("ttfe_ms", now)
+                        sample["events"] += 1
+                        kind = json.loads(line[6:]).get("event")
+                        if kind in {"final", "error"}:
+                            sample["e2e_ms"] = now
+                            sample["ok"] = kind == "final"
+                            break
+            except Exception as exc:
+                sample["error"] = f"{type(exc).__name__}: {exc}"
+            samples.append(sample)
+
+
+async def _drive(port: int, args: argparse.Namespace, prefix: str = "bench") -> tuple[list[dict[str, Any]], float]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency * 2 + 4, max_keepalive_connections=args.concurrency * 2)
+    samples: list[dict[str, Any]] = []
+    sem = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_conversation(client, f"{prefix}-{i:04d}", args.turns, sem, samples) for i in range(args.conversations)))
+        wall = time.perf_counter() - started
+    return samples, wall
+
+
+def run(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="ora_bench_core_") as tmp:
+        server, counter, llm = _boot(Path(tmp), args)
+        port = server.start_and_wait()
+        try:
+            # One untimed run warms imports, the model registry and SQLite pages.
+            warm = argparse.Namespace(**{**vars(args), "conversations": 1, "turns": 1, "concurrency": 1})
+            asyncio.run(_drive(port, warm, prefix="warmup"))
+            counter.reset()
+            server.sampling = True
+            samples, wall = asyncio.run(_drive(port, args))
+            server.sampling = False
+        finally:
+            server.stop()
+
+    completed = [s for s in samples if s["ok"]]
+    runs = len(samples)
+    writes = sum(counter.writes.values())
+    return {
+        "config": {
+            "conversations": args.conversations,
+            "turns": args.turns,
+            "concurrency": args.concurrency,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+        },
+        "runs": runs,
+        "completed": len(completed),
+        "errors": runs - len(completed),
+        "first_error": next((s.get("error") for s in samples if s.get("error")), None),
+        "wall_s": round(wall, 3),
+        "throughput_runs_per_s": round(len(completed) / wall, 2) if wall > 0 else 0.0,
+        "post_ms": percentiles([s["post_ms"] for s in samples if "post_ms" in s]),
+        "ttfe_ms": percentiles([s["ttfe_ms"] for s in completed]),
+        "e2e_ms": percentiles([s["e2e_ms"] for s in completed]),
+        "events_per_run": round(sum(s["events"] for s in completed) / max(1, len(completed)), 2),
+        "llm_calls": llm.calls,
+        "db": {
+            "writes": writes,
+            "writes_per_run": round(writes / max(1, runs), 2),
+            "commits_per_run": round(counter.commits / max(1, runs), 2),
+            "by_statement": dict(sorted(counter.writes.items())),
+        },
+        "loop_lag_ms": {**percentiles(server.lag_ms, (50, 99)), "max": round(max(server.lag_ms, default=0.0), 2)},
+    }
+
+
+def _default_tolerance() -> float:
+    try:
+        return max(0.0, float(os.getenv(TOLERANCE_ENV, "0.5") or "0.5"))
+    except ValueError:
+        return 0.5
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load-test POST /v1/messages -> MainProcess -> SSE on a temp database.")
+    parser.add_argument("--conversations", type=int, default=24)
+    parser.add_argument("--turns", type=int, default=3, help="messages per conversation, sent one after another")
+    # Each in-flight run holds a pooled connection for its SSE stream and one for MainProcess,
+    # so the default pool (5 + 10 overflow) times out well before 20 concurrent conversations.
+    parser.add_argument("--concurrency", type=int, default=6, help="conversations in flight at once")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="simulated provider latency per LLM call")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--lag-interval-ms", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--no-baseline", action="store_true", help="only report, do not compare")
+    parser.add_argument("--write-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=_default_tolerance(), help=f"relative slowdown allowed (env {TOLERANCE_ENV})")
+    parser.add_argument("--slack-ms", type=float, default=5.0, help="absolute slack added to millisecond budgets")
+    parser.add_argument("--json", action="store_true")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    results = run(args)
+    failures: list[str] = []
+    if results["errors"]:
+        failures.append(f"errors: {results['errors']} run(s) did not finish cleanly ({results['first_error']})")
+    if args.write_baseline:
+        if not failures:
+            args.baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    elif not args.no_baseline:
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+            failures = compare_to_baseline(results, baseline, tolerance=args.tolerance, slack_ms=args.slack_ms)
+        else:
+            failures.append(f"baseline not found: {args.baseline} (run with --write-baseline)")
+    results["regressions"] = failures
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            if key != "regressions":
+                print(f"{key:22s} {value}")
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from PIL import Image  # noqa: E402
+
+from src.utils.image_pipeline import ImageJob, ImagePipeline, center_crop, encode, process_image_bytes  # noqa: E402
+
+
+def _photo(size: tuple[int, int]) -> bytes:
+    """JPEG with photo-like entropy (gradient + noise) so encode/decode costs are realistic."""
+    base = Image.linear_gradient("L").resize(size).convert("RGB")
+    noise = Image.effect_noise(size, 40).convert("RGB")
+    buf = io.BytesIO()
+    Image.blend(base, noise, 0.35).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def _legacy(raw: bytes, job: ImageJob) -> bytes:
+    im = Image.open(io.BytesIO(raw))
+    im.load()
+    if job.aspect is not None:
+        im = center_crop(im, job.aspect)
+    im = im.resize((job.target_w, job.target_h), resample=Image.LANCZOS)
+    return encode(im, job.fmt, job.jpg_quality)
+
+
+async def _max_loop_stall_ms(work) -> tuple[float, float]:
+    """Run `work()` while a 5 ms ticker measures the worst event-loop stall."""
+    stall = 0.0
+    done = False
+
+    async def ticker() -> None:
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, (now - last) * 1000 - 5)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.02)
+    started = time.perf_counter()
+    await work()
+    elapsed = (time.perf_counter() - started) * 1000
+    done = True
+    await task
+    return round(stall, 1), round(elapsed, 1)
+
+
+async def run(size: tuple[int, int]) -> dict[str, object]:
+    raw = _photo(size)
+    upscale = ImageJob(aspect=16 / 9, target_w=3840, target_h=2160, fmt="jpg")
+    downscale = ImageJob(aspect=16 / 9, target_w=1280, target_h=720, fmt="jpg")
+    results: dict[str, object] = {"source": f"{size[0]}x{size[1]}", "source_bytes": len(raw)}
+
+    async def legacy_inline() -> None:
+        _legacy(raw, upscale)
+
+    results["legacy_inline_4k"] = dict(zip(("loop_stall_ms", "wall_ms"), await _max_loop_stall_ms(legacy_inline)))
+
+    pipeline = ImagePipeline(workers=2, queue_max=4)
+    await pipeline.process(_photo((64, 64)), ImageJob(target_w=8, target_h=8))  # spawn workers outside the timing
+
+    async def pooled() -> None:
+        await pipeline.process(raw, upscale)
+
+    results["pool_4k"] = dict(zip(("loop_stall_ms", "wall_ms"), await _max_loop_stall_ms(pooled)))
+    results["pool_4k_cached"] = dict(zip(("loop_stall_ms", "wall_ms"), await _max_loop_stall_ms(pooled)))
+    pipeline.shutdown()
+
+    started = time.perf_counter()
+    _legacy(raw, downscale)
+    legacy_down_ms = (time.perf_counter() - started) * 1000
+    fast = process_image_bytes(raw, downscale)
+    results["downscale_720p"] = {
+        "legacy_ms": round(legacy_down_ms, 1),
+        "draft_reduce_ms": round(sum(fast.timings_ms.values()), 1),
+        "draft_size": fast.draft_size,
+        "stages_ms": fast.timings_ms,
+    }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Event-loop stall and stage timings for the image pipeline.")
+    parser.add_argument("--width", type=int, default=6000)
+    parser.add_argument("--height", type=int, default=4000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run((args.width, args.height)))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:20s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
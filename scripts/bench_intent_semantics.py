@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils import intent_semantics as sem  # noqa: E402
+
+_SAMPLES = [
+    "この画像を説明して。全体から順にお願い。",
+    "CPUのところだけ詳しく見て",
+    "さっきのスクリーンショットの続きを教えて",
+    "この結果をPDFで保存してダウンロードしたい",
+    "What is shown in this screenshot? Focus on the sidebar.",
+    "明日の天気と、今週のニュースをまとめて",
+    "Export the table as csv please",
+    "ありがとう、助かった！",
+]
+
+
+def _legacy_scores(text: str, prototypes: dict[str, list[tuple[float, ...]]]) -> dict[str, float]:
+    """The previous pure-Python path: list accumulate + tuple dot products."""
+
+    def embed(t: str) -> tuple[float, ...]:
+        vec = [0.0] * sem._VECTOR_DIMENSIONS
+        for token in sem._iter_semantic_tokens(t):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            vec[int.from_bytes(digest[:4], "big") % sem._VECTOR_DIMENSIONS] += 1.0 if digest[4] % 2 == 0 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec))
+        return tuple(v / norm for v in vec) if norm > 0 else tuple(vec)
+
+    vec = embed(text)
+    return {name: max(sum(x * y for x, y in zip(vec, p)) for p in protos) for name, protos in prototypes.items()}
+
+
+def _per_call_us(fn, texts: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure intent_semantics scoring cost per text.")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    legacy_protos = {
+        name: [tuple(sem._embed_text(p).tolist()) for p in phrases] for name, phrases in sem._INTENT_PROTOTYPES.items()
+    }
+    # Unique texts per round defeat the embedding cache ("cold"); repeated texts hit it ("warm").
+    cold_texts = [f"{text} #{i}" for i in range(args.rounds) for text in _SAMPLES]
+
+    results: dict[str, float] = {
+        "legacy_python_us": _per_call_us(lambda t: _legacy_scores(t, legacy_protos), cold_texts[: len(_SAMPLES) * 20], 1),
+        "numpy_cold_us": _per_call_us(sem._base_similarity_scores, cold_texts, 1),
+        "numpy_warm_us": _per_call_us(sem._base_similarity_scores, _SAMPLES, args.rounds),
+        "classify_warm_us": _per_call_us(sem.classify_semantic_intent, _SAMPLES, args.rounds),
+    }
+    batch = [f"{text} batch {i}" for i in range(16) for text in _SAMPLES]
+    started = time.perf_counter()
+    sem.semantic_similarity_batch(batch)
+    results["batch_per_text_us"] = (time.perf_counter() - started) / len(batch) * 1e6
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:24s} {value:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def serve(delay_ms: float) -> int:
+    """Trivial JSON-RPC/MCP echo server over newline-delimited stdio.
+
+    Requests are answered from a thread pool so a slow `tools/call` (delay_ms) does not
+    block later requests: the same shape as real servers that do I/O per call.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    out_lock = threading.Lock()
+    pool = ThreadPoolExecutor(max_workers=32)
+
+    def reply(msg_id, result) -> None:
+        line = json.dumps({"jsonrpc": "2.0", "id": msg_id, "result": result}, separators=(",", ":"))
+        with out_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def handle(msg: dict) -> None:
+        method = msg.get("method")
+        if method == "initialize":
+            reply(msg["id"], {"protocolVersion": "2025-11-25", "serverInfo": {"name": "echo", "version": "1"}, "capabilities": {"tools": {"listChanged": True}}})
+        elif method == "tools/list":
+            reply(msg["id"], {"tools": [{"name": "echo", "description": "Echo arguments back.", "inputSchema": {"type": "object"}}]})
+        elif method == "tools/call":
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            args = (msg.get("params") or {}).get("arguments") or {}
+            reply(msg["id"], {"content": [{"type": "text", "text": json.dumps(args)}]})
+        elif "id" in msg:
+            reply(msg["id"], {})
+
+    for raw in sys.stdin:
+        raw = raw.strip()
+        if not raw:
+            continue
+        msg = json.loads(raw)
+        if "id" not in msg:
+            continue  # notification
+        if msg.get("method") == "tools/call" and delay_ms:
+            pool.submit(handle, msg)
+        else:
+            handle(msg)
+    return 0
+
+
+async def _bench(calls: int, concurrency: int, replicas: int, delay_ms: float) -> dict[str, object]:
+    from src.utils.mcp_client import MCPStdioClient
+
+    command = f"{sys.executable} {Path(__file__).resolve()} --serve --delay-ms {delay_ms}"
+    if replicas > 1:
+        from src.utils.mcp_client import MCPStdioPool
+
+        client = MCPStdioPool(name="echo", command=command, replicas=replicas)
+    else:
+        client = MCPStdioClient(name="echo", command=command)
+    started = time.perf_counter()
+    await client.start()
+    start_ms = (time.perf_counter() - started) * 1000
+    await client.list_tools()
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            res = await client.call_tool("echo", {"i": i})
+            assert res.get("content"), res
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+
+    list_started = time.perf_counter()
+    for _ in range(100):
+        await client.list_tools()
+    list_ms = (time.perf_counter() - list_started) * 10  # per call
+
+    await client.close()
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "replicas": replicas,
+        "server_delay_ms": delay_ms,
+        "start_ms": round(start_ms, 1),
+        "calls_per_sec": round(calls / elapsed, 1),
+        "list_tools_ms": round(list_ms, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="MCP stdio client throughput against a local echo server.")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="per tools/call server-side latency")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--replicas", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        return serve(args.delay_ms)
+
+    results = asyncio.run(_bench(args.calls, args.concurrency, args.replicas, args.delay_ms))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:16s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
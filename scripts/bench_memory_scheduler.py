@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.analysis_scheduler import AnalysisScheduler, JobPriority  # noqa: E402
+
+
+class StubProvider:
+    """LLM endpoint with a fixed number of parallel slots (connection pool / rate limit)."""
+
+    def __init__(self, slots: int, chat_sec: float, analysis_sec: float) -> None:
+        self._slots = asyncio.Semaphore(slots)
+        self.chat_sec = chat_sec
+        self.analysis_sec = analysis_sec
+        self.analysis_calls = 0
+
+    async def call(self, seconds: float) -> None:
+        async with self._slots:
+            await asyncio.sleep(seconds)
+
+    async def analyze(self) -> None:
+        self.analysis_calls += 1
+        await self.call(self.analysis_sec)
+
+
+async def _chat_latencies(provider: StubProvider, n: int, interval: float) -> list[float]:
+    async def one() -> float:
+        started = time.perf_counter()
+        await provider.call(provider.chat_sec)
+        return (time.perf_counter() - started) * 1000
+
+    tasks = []
+    for _ in range(n):
+        tasks.append(asyncio.create_task(one()))
+        await asyncio.sleep(interval)
+    return list(await asyncio.gather(*tasks))
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered), 1),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 1),
+    }
+
+
+async def run(users: int, slots: int, chats: int, analysis_sec: float) -> dict[str, object]:
+    results: dict[str, object] = {"backfill_users": users, "provider_slots": slots}
+
+    provider = StubProvider(slots, chat_sec=0.05, analysis_sec=analysis_sec)
+    results["idle"] = _summary(await _chat_latencies(provider, chats, 0.02))
+
+    # Before: one create_task per user, capped only by MemoryCog.sem (10 on the main bot).
+    provider = StubProvider(slots, chat_sec=0.05, analysis_sec=analysis_sec)
+    sem = asyncio.Semaphore(10)
+
+    async def legacy(_uid: int) -> None:
+        async with sem:
+            await provider.analyze()
+
+    storm = [asyncio.create_task(legacy(uid)) for uid in range(users)]
+    await asyncio.sleep(0.01)
+    results["storm_create_task"] = {**_summary(await _chat_latencies(provider, chats, 0.02)), "analysis_calls": provider.analysis_calls}
+    for t in storm:
+        t.cancel()
+    await asyncio.gather(*storm, return_exceptions=True)
+
+    # After: the shared scheduler (2 workers, small logs batched 4 per call).
+    provider = StubProvider(slots, chat_sec=0.05, analysis_sec=analysis_sec)
+
+    async def runner(_job) -> None:
+        await provider.analyze()
+
+    async def batch_runner(_jobs) -> list:
+        await provider.analyze()
+        return []
+
+    sched = AnalysisScheduler(runner, batch_runner=batch_runner, concurrency=2, max_pending=users, batch_max_users=4)
+    msgs = [{"id": 1, "content": "hi", "timestamp": "t"}]
+    for uid in range(users):
+        sched.submit(uid, msgs, priority=JobPriority.BACKFILL)
+    await asyncio.sleep(0.01)
+    chat = _summary(await _chat_latencies(provider, chats, 0.02))
+    started = time.perf_counter()
+    await sched.join()
+    stats = sched.stats()
+    await sched.stop()
+    results["storm_scheduler"] = {
+        **chat,
+        "analysis_calls": provider.analysis_calls,
+        "backfill_drain_s": round(time.perf_counter() - started, 2),
+        "batched_jobs": stats["batched_jobs"],
+    }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Chat latency under a MemoryCog backfill storm (stub LLM).")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--slots", type=int, default=8, help="parallel requests the stub provider accepts")
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--analysis-sec", type=float, default=0.4)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.users, args.slots, args.chats, args.analysis_sec))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:18s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
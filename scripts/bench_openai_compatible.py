@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for path in (ROOT, ROOT / "core" / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+class FakeOpenAIServer:
+    """
+    Minimal OpenAI-compatible HTTP/1.1 server on asyncio (keep-alive, SSE streaming).
+
+    Every completion "generates" for `delay` seconds; streamed completions send one
+    chunk per `chunk_delay`. `connections` counts accepted TCP connections and
+    `aborted_streams` counts streams the client hung up on before `[DONE]`.
+    """
+
+    def __init__(self, *, delay: float = 0.05, chunk_delay: float = 0.02, chunks: int = 5) -> None:
+        self.delay = delay
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+        self.connections = 0
+        self.requests = 0
+        self.aborted_streams = 0
+        self.completed_streams = 0
+        self._server: asyncio.base_events.Server | None = None
+        self._handlers: set[asyncio.Task] = set()
+        self.base_url = ""
+
+    async def start(self) -> "FakeOpenAIServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=1024)
+        port = self._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeOpenAIServer":
+        return await self.start()
+
+    async def __aexit__(self, *_exc: object) -> None:
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                body = await reader.readexactly(int(headers.get("content-length") or 0))
+                self.requests += 1
+                payload = json.loads(body or b"{}")
+                if payload.get("stream"):
+                    await self._stream(writer)
+                else:
+                    await asyncio.sleep(self.delay)
+                    data = json.dumps(
+                        {"choices": [{"message": {"role": "assistant", "content": f"echo {len(payload.get('messages') or [])}"}}]}
+                    ).encode()
+                    writer.write(
+                        b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                        + f"Content-Length: {len(data)}\r\n\r\n".encode()
+                        + data
+                    )
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        try:
+            for i in range(self.chunks):
+                await asyncio.sleep(self.chunk_delay)
+                event = json.dumps({"choices": [{"delta": {"content": f"t{i} "}}]})
+                _write_chunk(writer, f"data: {event}\n\n".encode())
+                await writer.drain()
+            _write_chunk(writer, b"data: [DONE]\n\n")
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except ConnectionError:
+            self.aborted_streams += 1
+            raise
+        if writer.transport.is_closing():
+            self.aborted_streams += 1
+            raise ConnectionResetError
+        self.completed_streams += 1
+
+
+def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+def _adapter(base_url: str, max_connections: int):
+    from ora_core.providers.openai_compatible import OpenAICompatibleProviderAdapter
+
+    return OpenAICompatibleProviderAdapter(
+        {
+            "YONERAI_OPENAI_COMPATIBLE_BASE_URL": base_url,
+            "YONERAI_OPENAI_COMPATIBLE_API_KEY": "bench-key",
+            "YONERAI_OPENAI_COMPATIBLE_LIVE": "1",
+            "YONERAI_OPENAI_COMPATIBLE_MAX_CONNECTIONS": str(max_connections),
+        }
+    )
+
+
+def _legacy_urlopen(base_url: str) -> None:
+    """The previous transport: one urllib request (and TCP connection) per completion."""
+    import urllib.request
+
+    request = urllib.request.Request(
+        f"{base_url}/chat/completions",
+        data=json.dumps({"model": "m", "messages": [{"role": "user", "content": "hi"}]}).encode(),
+        method="POST",
+        headers={"Content-Type": "application/json", "Authorization": "Bearer bench-key"},
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        json.loads(response.read())
+
+
+async def run(requests: int, concurrency: int, threads: int, delay: float) -> dict[str, object]:
+    from ora_core.providers import ProviderRequest
+    from ora_core.providers.openai_compatible import aclose_provider_clients
+
+    results: dict[str, object] = {"requests": requests, "concurrency": concurrency, "thread_pool": threads, "server_delay_ms": delay * 1000}
+    loop = asyncio.get_running_loop()
+
+    async with FakeOpenAIServer(delay=delay) as server:
+        pool = ThreadPoolExecutor(max_workers=threads)
+        started = time.perf_counter()
+        await asyncio.gather(*(loop.run_in_executor(pool, _legacy_urlopen, server.base_url) for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        pool.shutdown()
+        results["urlopen_threads"] = {"req_per_sec": round(requests / elapsed, 1), "tcp_connections": server.connections}
+
+    async with FakeOpenAIServer(delay=delay) as server:
+        adapter = _adapter(server.base_url, concurrency)
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one() -> None:
+            async with sem:
+                await adapter.agenerate(ProviderRequest(prompt="hi"), allow_live_call=True)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+        results["async_pool"] = {"req_per_sec": round(requests / elapsed, 1), "tcp_connections": server.connections}
+
+        # Time to first streamed token.
+        started = time.perf_counter()
+        stream = adapter.astream(ProviderRequest(prompt="hi"), allow_live_call=True)
+        await stream.__anext__()
+        results["stream_first_delta_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        await stream.aclose()
+        await aclose_provider_clients()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible provider throughput against a local fake server.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32, help="thread pool size for the urlopen baseline")
+    parser.add_argument("--delay-ms", type=float, default=50.0, help="fake generation time per completion")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.requests, args.concurrency, args.threads, args.delay_ms / 1000))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:22s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
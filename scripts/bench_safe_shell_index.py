@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import argparse
+import os
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.safe_shell import SafeShell  # noqa: E402
+
+_WORDS = (
+    "async def return self await import from class value result config logger "
+    "message channel guild token router tool state cache index query payload"
+).split()
+
+
+def make_repo(root: Path, files: int, *, seed: int = 7) -> list[str]:
+    """Synthetic source tree: ~`files` small files, 4 directory levels, a few planted needles."""
+    rng = random.Random(seed)
+    needles: list[str] = []
+    created = time.time() - 3600
+    for n in range(files):
+        rel = Path(f"pkg{n % 20}", f"mod{n % 400}", f"sub{n % 7}", f"file_{n}.py")
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [
+            f"{rng.choice(_WORDS)} {rng.choice(_WORDS)}_{rng.randrange(10_000)} = {rng.choice(_WORDS)}({rng.randrange(100)})"
+            for _ in range(rng.randrange(20, 120))
+        ]
+        if n % 9973 == 0:
+            lines.insert(rng.randrange(len(lines)), "def rare_needle_function(payload): pass")
+            needles.append(rel.as_posix())
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        # Like a real checkout: old enough that the index trusts mtime/size between walks.
+        os.utime(path, (created, created))
+    return needles
+
+
+def _timed(shell: SafeShell, cmd: str) -> tuple[float, dict]:
+    started = time.perf_counter()
+    result = shell._run_builtin_sync(cmd)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare SafeShell grep/find with and without the trigram index.")
+    parser.add_argument("--files", type=int, default=50_000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        started = time.perf_counter()
+        needles = make_repo(root, args.files)
+        results: dict[str, object] = {"files": args.files, "create_s": round(time.perf_counter() - started, 2)}
+
+        legacy = SafeShell(root, use_index=False)
+        indexed = SafeShell(root, use_index=True)
+
+        started = time.perf_counter()
+        indexed.index.refresh(force=True)
+        results["index_build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        results["index_signature_mb"] = round(indexed.index.signature_bytes / 2**20, 2)
+        started = time.perf_counter()
+        indexed.index.refresh(force=True)
+        results["index_refresh_unchanged_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        queries = {
+            "grep_rare": "grep -n -m 20 rare_needle_function .",
+            "grep_rare_icase": "grep -n -i -m 20 RARE_NEEDLE .",
+            "grep_common": "grep -n -m 50 await .",
+            "find_path": "find -m 50 file_4999.\\.py .",
+        }
+        for name, cmd in queries.items():
+            legacy_ms, legacy_out = _timed(legacy, cmd)
+            index_ms, index_out = _timed(indexed, cmd)
+            results[name] = {
+                "legacy_ms": round(legacy_ms, 1),
+                "legacy_error": legacy_out["stderr"] or None,
+                "index_ms": round(index_ms, 1),
+                "index_hits": len(index_out["stdout"].splitlines()),
+                "index_error": index_out["stderr"] or None,
+            }
+        results["needles_planted"] = len(needles)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:28s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class FakeSearchProvider:
+    """Upstream stand-in: fixed latency, counts calls, returns deterministic results."""
+
+    def __init__(self, latency_sec: float = 0.05) -> None:
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self.calls_by_query: dict[str, int] = {}
+
+    async def search(self, query: str, limit: int = 5) -> list[dict]:
+        self.calls += 1
+        self.calls_by_query[query] = self.calls_by_query.get(query, 0) + 1
+        await asyncio.sleep(self.latency_sec)
+        return [{"title": f"{query} #{i}", "link": f"https://example.invalid/{i}", "snippet": query} for i in range(limit)]
+
+
+def workload(requests: int, distinct: int, users: int, seed: int = 7) -> list[tuple[float, str, str]]:
+    """Duplicate-heavy traffic: Zipf-ish query popularity, spelling/case noise, arrivals in bursts."""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(distinct)]
+    out: list[tuple[float, str, str]] = []
+    t = 0.0
+    for _ in range(requests):
+        t += rng.expovariate(400.0)  # ~400 req/s with natural bursts
+        q = rng.choices(range(distinct), weights=weights)[0]
+        text = f"query number {q}"
+        if rng.random() < 0.3:
+            text = "  " + text.upper() + " "
+        out.append((t, f"user{rng.randrange(users)}", text))
+    return out
+
+
+def _pct(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+
+async def _replay(traffic, lookup) -> dict[str, object]:
+    latencies: list[float] = []
+    started = time.perf_counter()
+
+    async def one(at: float, user: str, query: str) -> None:
+        await asyncio.sleep(max(0.0, at - (time.perf_counter() - started)))
+        t0 = time.perf_counter()
+        await lookup(user, query)
+        latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(*item) for item in traffic))
+    return {"p50_ms": _pct(latencies, 0.5), "p95_ms": _pct(latencies, 0.95)}
+
+
+async def run(requests: int, distinct: int, users: int, latency_sec: float) -> dict[str, object]:
+    from src.utils.search_cache import SearchCache, search_cache_key
+
+    traffic = workload(requests, distinct, users)
+    results: dict[str, object] = {"requests": requests, "distinct_queries": distinct, "users": users}
+
+    upstream = FakeSearchProvider(latency_sec)
+
+    async def uncached(_user: str, query: str) -> list[dict]:
+        return await upstream.search(query)
+
+    results["uncached"] = {**await _replay(traffic, uncached), "upstream_calls": upstream.calls}
+
+    # The previous core cache: exact key per user, no coalescing, no eviction.
+    upstream = FakeSearchProvider(latency_sec)
+    legacy: dict[str, tuple[list[dict], float]] = {}
+
+    async def per_user_dict(user: str, query: str) -> list[dict]:
+        key = f"{user}:{' '.join(query.strip().lower().split())}"
+        hit = legacy.get(key)
+        if hit and hit[1] > time.time():
+            return hit[0]
+        value = await upstream.search(query)
+        legacy[key] = (value, time.time() + 300)
+        return value
+
+    results["per_user_dict"] = {**await _replay(traffic, per_user_dict), "upstream_calls": upstream.calls}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "search_cache.db")
+        upstream = FakeSearchProvider(latency_sec)
+        cache = SearchCache(max_entries=max(16, distinct // 2), db_path=db_path)
+
+        async def shared(_user: str, query: str) -> list[dict]:
+            key = search_cache_key(query, provider="fake", locale="jp-ja", limit=5)
+            value, _status = await cache.get_or_fetch(key, lambda: upstream.search(query.strip()))
+            return value
+
+        results["shared_cache"] = {
+            **await _replay(traffic, shared),
+            "upstream_calls": upstream.calls,
+            "max_calls_per_query": max(upstream.calls_by_query.values()),
+            **{k: v for k, v in cache.metrics().items() if k in ("hit_rate", "coalesced", "evictions")},
+        }
+        cache.close()
+
+        # Restart: a fresh process-level cache on the same SQLite file.
+        upstream = FakeSearchProvider(latency_sec)
+        cache = SearchCache(max_entries=max(16, distinct // 2), db_path=db_path)
+        results["after_restart"] = {
+            **await _replay(traffic, shared),
+            "upstream_calls": upstream.calls,
+            "persisted_loads": cache.stats["persisted_loads"],
+            "hit_rate": round(cache.hit_rate, 4),
+        }
+        cache.close()
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Search cache under a duplicate-heavy workload with a fake provider.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--distinct", type=int, default=200)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.requests, args.distinct, args.users, args.latency_ms / 1000.0))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:18s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
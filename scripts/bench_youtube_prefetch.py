@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.youtube_stream_cache import ResolvedStream, YouTubeStreamCache  # noqa: E402
+
+
+class FakeExtractor:
+    """Blocking stand-in for yt-dlp extract_info with a fixed latency."""
+
+    def __init__(self, latency_sec: float) -> None:
+        self.latency_sec = latency_sec
+        self.calls = 0
+
+    def __call__(self, query: str) -> ResolvedStream:
+        self.calls += 1
+        time.sleep(self.latency_sec)
+        expire = int(time.time() + 6 * 3600)
+        return ResolvedStream(url=f"https://rr1.googlevideo.com/videoplayback?expire={expire}&q={query}", title=query, duration=1)
+
+
+async def _play_queue(queries: list[str], *, cache: YouTubeStreamCache, prefetch_ahead: int, track_sec: float, ffmpeg_start_sec: float) -> list[float]:
+    """Play tracks back to back; return the silence (ms) at each track change."""
+    gaps: list[float] = []
+    ended_at: float | None = None
+    for i, q in enumerate(queries):
+        await cache.resolve(q)
+        await asyncio.sleep(ffmpeg_start_sec)
+        if ended_at is not None:
+            gaps.append((time.perf_counter() - ended_at) * 1000)
+        if prefetch_ahead:
+            cache.prefetch(queries[i + 1 : i + 1 + prefetch_ahead])
+        await asyncio.sleep(track_sec)
+        ended_at = time.perf_counter()
+    return gaps
+
+
+async def run(tracks: int, latency_sec: float, track_sec: float, ffmpeg_start_sec: float) -> dict[str, object]:
+    results: dict[str, object] = {"tracks": tracks, "extract_latency_ms": latency_sec * 1000, "ffmpeg_start_ms": ffmpeg_start_sec * 1000}
+    for label, ahead in (("resolve_at_track_change", 0), ("prefetch_next_2", 2)):
+        extractor = FakeExtractor(latency_sec)
+        cache = YouTubeStreamCache(extractor, ttl_sec=1800, expiry_margin_sec=900)
+        queries = [f"track {n}" for n in range(tracks)]
+        gaps = await _play_queue(queries, cache=cache, prefetch_ahead=ahead, track_sec=track_sec, ffmpeg_start_sec=ffmpeg_start_sec)
+        await cache.drain()
+        results[label] = {
+            "gap_ms_median": round(statistics.median(gaps), 1),
+            "gap_ms_max": round(max(gaps), 1),
+            "extractions": extractor.calls,
+        }
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Track-to-track silence with and without stream prefetch (fake extractor).")
+    parser.add_argument("--tracks", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=1.5, help="fake extract_info latency, seconds")
+    parser.add_argument("--track-sec", type=float, default=2.0, help="simulated track length, seconds")
+    parser.add_argument("--ffmpeg-start", type=float, default=0.08, help="simulated ffmpeg startup, seconds")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(max(2, args.tracks), args.latency, args.track_sec, args.ffmpeg_start))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:24s} {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+CLI_SRC = ROOT / "clients" / "cli"
+BUDGET_SCALE_ENV = "YONERAI_CLI_IMPORT_BUDGET_SCALE"
+
+# Modules that must never load before interactive mode starts.
+INTERACTIVE_ONLY = ("prompt_toolkit", "rich", "yonerai_cli.interactive", "yonerai_cli.tui.renderer")
+# Heavy runtime dependencies only the commands that talk to Core/providers may pull in.
+HEAVY_RUNTIME = ("httpx", "aiohttp", "requests", "ora_core")
+
+
+@dataclass(frozen=True)
+class ImportBudget:
+    argv: tuple[str, ...]
+    budget_ms: float
+    forbidden_prefixes: tuple[str, ...]
+    allowed_prefixes: tuple[str, ...] = ()
+
+
+BUDGETS: tuple[ImportBudget, ...] = (
+    ImportBudget(
+        argv=("--version",),
+        budget_ms=150.0,
+        forbidden_prefixes=(*INTERACTIVE_ONLY, *HEAVY_RUNTIME, "yonerai_cli.commands.", "yonerai_cli.screens.", "yonerai_cli.cli_parser"),
+    ),
+    ImportBudget(
+        argv=("health", "--help"),
+        budget_ms=200.0,
+        forbidden_prefixes=(*INTERACTIVE_ONLY, *HEAVY_RUNTIME, "yonerai_cli.commands.", "yonerai_cli.screens."),
+    ),
+    ImportBudget(
+        argv=("config", "--help"),
+        budget_ms=250.0,
+        forbidden_prefixes=(*INTERACTIVE_ONLY, *HEAVY_RUNTIME, "yonerai_cli.commands.", "yonerai_cli.screens.diagnostics"),
+        allowed_prefixes=("yonerai_cli.commands.config",),
+    ),
+)
+
+_HARNESS = (
+    "import sys\n"
+    "from yonerai_cli.cli import main\n"
+    "try:\n"
+    "    main({argv!r})\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+
+
+def _parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    rows: list[tuple[int, int, str]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].split(":", 1)[1].strip())
+            cumulative_us = int(parts[1].strip())
+        except (IndexError, ValueError):
+            continue
+        rows.append((self_us, cumulative_us, parts[2].rstrip()))
+    return rows
+
+
+def _run_importtime(code: str) -> list[tuple[int, int, str]]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(CLI_SRC), env.get("PYTHONPATH", "")]))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    return _parse_importtime(completed.stderr)
+
+
+def measure(argv: tuple[str, ...]) -> dict[str, object]:
+    """Import cost of one CLI invocation, excluding interpreter startup imports."""
+    startup = {name.strip() for _, _, name in _run_importtime("pass")}
+    rows = _run_importtime(_HARNESS.format(argv=list(argv)))
+    modules = [name.strip() for _, _, name in rows if name.strip() not in startup]
+    total_us = sum(self_us for self_us, _, name in rows if name.strip() not in startup)
+    return {"argv": list(argv), "import_ms": round(total_us / 1000.0, 2), "modules": modules}
+
+
+def budget_scale(default: float = 1.0) -> float:
+    raw = (os.getenv(BUDGET_SCALE_ENV) or "").strip()
+    try:
+        return max(0.1, float(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+def check(budget: ImportBudget, *, default_scale: float = 1.0) -> dict[str, object]:
+    result = measure(budget.argv)
+    modules = [str(name) for name in result["modules"]]  # type: ignore[union-attr]
+    forbidden = sorted(
+        {
+            name
+            for name in modules
+            if name.startswith(budget.forbidden_prefixes) and not name.startswith(budget.allowed_prefixes or ("\0",))
+        }
+    )
+    limit_ms = budget.budget_ms * budget_scale(default_scale)
+    return {
+        "argv": list(budget.argv),
+        "import_ms": result["import_ms"],
+        "budget_ms": round(limit_ms, 2),
+        "forbidden_imports": forbidden,
+        "ok": not forbidden and float(result["import_ms"]) <= limit_ms,  # type: ignore[arg-type]
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure `yonerai` CLI import time against per-command budgets.")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON.")
+    args = parser.parse_args(argv)
+
+    results = [check(budget) for budget in BUDGETS]
+    if args.json:
+        print(json.dumps({"ok": all(r["ok"] for r in results), "results": results}, ensure_ascii=False, indent=2))
+    else:
+        for r in results:
+            status = "ok" if r["ok"] else "OVER"
+            print(f"{status:4} {' '.join(r['argv']):<20} {r['import_ms']:>8.2f} ms / {r['budget_ms']:.0f} ms")
+            forbidden = list(r["forbidden_imports"])
+            for name in forbidden[:10]:
+                print(f"     forbidden import: {name}")
+            if len(forbidden) > 10:
+                print(f"     ... and {len(forbidden) - 10} more")
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
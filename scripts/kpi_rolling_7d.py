@@ -3,10 +3,17 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from src.utils.trace_rollup import TraceRollupStore, default_store_path
+
 
 def _parse_ts(raw: str) -> datetime | None:
     s = str(raw or "").strip()
@@ -45,8 +52,51 @@ def main() -> int:
         help="Path to trace JSONL. Default: ORA_TRACE_LOG or logs/agent_trace.jsonl",
     )
     parser.add_argument("--days", type=int, default=7, help="Rolling window in days (default: 7)")
+    parser.add_argument(
+        "--store",
+        default=default_store_path(),
+        help="Path to the rollup SQLite store. Default: ORA_TRACE_ROLLUP_DB or <log dir>/agent_trace_rollup.db",
+    )
+    parser.add_argument(
+        "--source",
+        choices=("auto", "store", "log"),
+        default="auto",
+        help="auto: use the rollup store once it has been backfilled (--rebuild), else scan the JSONL log",
+    )
+    parser.add_argument(
+        "--group-by",
+        default="",
+        help="Comma-separated dimensions for the store query: route_band,provider,model",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild the rollup store from the JSONL log before querying",
+    )
     args = parser.parse_args()
 
+    if args.rebuild:
+        store = TraceRollupStore(args.store)
+        store.clear()
+        ingested = store.backfill_jsonl(args.log)
+        print(json.dumps({"rebuilt": str(args.store), "ingested": ingested}, ensure_ascii=False), file=sys.stderr)
+
+    # trace_event creates the store on the first metrics event, so existing is not enough:
+    # only a backfilled store is known to cover runs logged before it appeared.
+    backfilled = Path(args.store).exists() and TraceRollupStore(args.store).backfilled_at() is not None
+    use_store = args.source == "store" or (args.source == "auto" and backfilled)
+    if not backfilled and (use_store or Path(args.store).exists()):
+        print(
+            f"warning: rollup store {args.store} was never backfilled and may not cover the full window; "
+            + ("run with --rebuild once" if use_store else "scanning the JSONL log instead (run with --rebuild once)"),
+            file=sys.stderr,
+        )
+    if use_store:
+        dims = [d.strip() for d in str(args.group_by).split(",") if d.strip()]
+        out = TraceRollupStore(args.store).rolling_kpis(days=int(args.days), group_by=dims)
+        print(json.dumps(out, ensure_ascii=False))
+        return 0
+
     log_path = Path(args.log)
     if not log_path.exists():
         print(
@@ -37,11 +37,13 @@ from .logging_conf import setup_logging
 from .storage import Store
 from .utils.connection_manager import ConnectionManager
 from .utils.healer import Healer
+from .utils.http_sessions import get_session_registry
 from .utils.link_client import LinkClient
 from .utils.llm_client import LLMClient
 from .utils.logger import GuildLogger
 from .utils.search_client import SearchClient
 from .utils.stt_client import WhisperClient
+from .utils.tts_cache import prewarm_phrases_from_env
 from .utils.tts_client import VoiceVoxClient
 from .utils.voice_manager import VoiceManager
 
@@ -85,6 +87,8 @@ class ORABot(commands.Bot):
         self.started_at = time.time()
         self._backup_task: Optional[asyncio.Task] = None
         self._voice_restore_snapshot_task: Optional[asyncio.Task] = None
+        self._tts_prewarm_task: Optional[asyncio.Task] = None
+        self._browser_prewarm_task: Optional[asyncio.Task] = None
         self.unified_client = None
         self.google_client = None
         self.vector_memory = None
@@ -247,6 +251,13 @@ class ORABot(commands.Bot):
         stt_client = WhisperClient(model=self.config.stt_model)
         # Voice manager handles VC connections and hotword detection
         self.voice_manager = VoiceManager(self, vv_client, stt_client)
+        prewarm_phrases = prewarm_phrases_from_env()
+        if prewarm_phrases:
+            self._tts_prewarm_task = asyncio.create_task(self.voice_manager.prewarm_tts(prewarm_phrases))
+        if os.getenv("ORA_BROWSER_POOL_PREWARM", "1").strip().lower() not in {"0", "false", "no", "off"}:
+            from .utils.browser import browser_manager
+
+            self._browser_prewarm_task = asyncio.create_task(browser_manager.prewarm())
 
         # 2. Register Core Cogs
         await self.add_cog(CoreCog(self, self.link_client, self.store))
@@ -414,6 +425,14 @@ class ORABot(commands.Bot):
         # 1.5 Stop cloudflared tunnel children spawned by this bot.
         await self._stop_all_tunnels()
 
+        # 1.6 Close the browser session and its warm context pool (no-op if never started).
+        try:
+            from .utils.browser import browser_manager
+
+            await browser_manager.shutdown()
+        except Exception:
+            pass
+
         # 2. Final Backup (Shielded)
         logger.info("Performing final backup...")
         try:
@@ -949,8 +968,9 @@ async def run_bot() -> None:
     intents.guild_messages = True
     intents.message_content = True
 
-    # Create shared ClientSession
-    async with aiohttp.ClientSession() as session:
+    # Bot-wide HTTP session registry (shared connector); closed when the bot exits.
+    async with get_session_registry() as http_sessions:
+        session = http_sessions.session()
         connection_manager = ConnectionManager(
             api_base_url=config.ora_api_base_url,
             force_standalone=config.force_standalone
@@ -8,6 +8,7 @@ from discord.ext import commands
 from src.services.layer_upload_limits import is_layer_attachment_too_large
 
 from ..utils.comfy_client import ComfyWorkflow
+from ..utils.comfy_jobs import ComfyQueueFull, format_job_status
 
 logger = logging.getLogger("CreativeCog")
 
@@ -165,12 +166,14 @@ class CreativeCog(commands.Cog):
         await interaction.response.defer(thinking=True)
 
         try:
-            # Generate
-            mp4_data = await self.bot.loop.run_in_executor(
-                None,
-                lambda: self.comfy_client.generate_video(
-                    prompt, negative_prompt, width=width, height=height, frame_count=frames
-                ),
+            async def _on_status(snapshot):
+                try:
+                    await interaction.edit_original_response(content=format_job_status(snapshot))
+                except discord.HTTPException:
+                    pass
+
+            mp4_data = await self.comfy_client.generate_video(
+                prompt, negative_prompt, width=width, height=height, frame_count=frames, on_status=_on_status
             )
 
             if mp4_data:
@@ -179,6 +182,8 @@ class CreativeCog(commands.Cog):
             else:
                 await interaction.followup.send("❌ Video generation failed. Check logs or ComfyUI console.")
 
+        except ComfyQueueFull:
+            await interaction.followup.send("⏳ The ComfyUI queue is full. Try again in a few minutes.")
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {e}")
 
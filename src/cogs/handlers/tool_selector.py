@@ -1,17 +1,288 @@
 import logging
 import os
+import re
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 from src.utils.llm_client import LLMClient
-from src.utils.intent_semantics import classify_semantic_intent, has_explicit_export_constraint
+from src.utils.env import env_float, env_int
+from src.utils.intent_semantics import PrototypeIndex, classify_semantic_intent, has_explicit_export_constraint
 from src.utils.risk_scoring import score_tool_risk
 # S5 Optimization: Use Registry instead of heavy ToolHandler import
 from src.cogs.tools.registry import get_tool_schemas
 
 logger = logging.getLogger(__name__)
 
+
+def _env_flag(name: str, default: str = "1") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Granular Categories (S3). Insertion order is the bucket order; the prompt lists them sorted.
+_CATEGORY_DESCRIPTIONS: Dict[str, str] = {
+    "WEB_READ": "READ-ONLY Web Access. Browse, Screenshot, Dump content. NO downloading/saving files.",
+    "WEB_FETCH": "FILE DOWNLOADING & RECORDING. Select ONLY if user explicitly asks to 'Save', 'Download', 'Record' or 'Keep' media.",
+    "SANDBOX": "STATIC sandbox inspection (download repo ZIP into temp + scan). Select ONLY if user explicitly asks to download/verify/scan repos.",
+    "MEDIA_ANALYZE": "VIEWING/ANALYZING Images or Video. No generation.",
+    "MEDIA_CREATE": "GENERATING/EDITING Images, Video, Music. (DALL-E, Sora, Suno).",
+    "VOICE_AUDIO": "Voice Channel (VC) operations. Join, Leave, Speak (TTS), Play Music.",
+    "DISCORD_SERVER": "Server Management. Ban, Kick, Roles, User Info, Channel Ops.",
+    "CODEBASE": "Local codebase inspection tools (grep/find/read/tree). Select only for code/repo/debug requests.",
+    "MCP": "Remote MCP (Model Context Protocol) tools from connected MCP servers.",
+    "SYSTEM_UTIL": "Safe System Utils. Reminders, Memory, Help, Status checks. (SAFE DEFAULT)",
+    "OTHER": "Anything else.",
+}
+
+# NOTE:
+# Tool names like "read_web_page" and "read_messages" contain "read" and were
+# previously misclassified as CODEBASE due to substring heuristics. That caused
+# the router to return 0 tools for URL prompts when only the public allowlist
+# was visible (common for guests). We keep an explicit mapping for these
+# "safe read" tools to stabilize behavior.
+_SAFE_SYSTEM_TOOLS: frozenset[str] = frozenset(
+    {
+        # Prefer keeping SYSTEM_UTIL small and actually safe.
+        "say",
+        "weather",
+        "read_chat_history",
+        "read_messages",
+        "get_logs",
+        "system_info",
+        "router_health",
+        "check_privilege",
+    }
+)
+
+_EXPLICIT_CATEGORY_BY_TOOL_NAME: Dict[str, str] = {
+    # Web reading tool (skill) does not follow the "web_*" prefix convention.
+    "read_web_page": "WEB_READ",
+    # Discord history readers should not be treated as codebase tools.
+    "read_messages": "SYSTEM_UTIL",
+    "read_chat_history": "SYSTEM_UTIL",
+}
+
+_CODEBASE_TOOL_NAMES: frozenset[str] = frozenset(
+    {
+        # SafeShell-backed local inspection tools.
+        "read_file",
+        "list_files",
+        "search_code",
+        "get_system_tree",
+    }
+)
+
+
+def _classify_tool(tool: dict) -> str:
+    """Category bucket for one tool schema (explicit mapping beats heuristics)."""
+    name = tool["name"].lower()
+    tags = set(tool.get("tags", []))
+
+    forced = _EXPLICIT_CATEGORY_BY_TOOL_NAME.get(name)
+    if forced and forced in _CATEGORY_DESCRIPTIONS:
+        return forced
+
+    # Sandbox tools (static inspection only)
+    if ("sandbox" in tags) or name.startswith("sandbox_"):
+        return "SANDBOX"
+
+    # MCP remote tools
+    if ("mcp" in tags) or name.startswith("mcp__"):
+        return "MCP"
+
+    # System/Default (early): keep "safe read" tools out of CODEBASE bucket.
+    if (name in _SAFE_SYSTEM_TOOLS) or ("system" in tags) or ("monitor" in tags) or ("health" in tags):
+        return "SYSTEM_UTIL"
+
+    # Web Split
+    if name.startswith("web_"):
+        if any(x in name for x in ["download", "record", "save", "fetch"]):
+            return "WEB_FETCH"
+        return "WEB_READ"
+
+    # Media Split
+    if any(x in name for x in ["generate", "create", "imagine", "sora", "painting"]):
+        return "MEDIA_CREATE"
+    if any(x in name for x in ["vision", "analyze", "ocr", "describe"]):
+        return "MEDIA_ANALYZE"
+
+    # Voice/Music
+    if any(x in name for x in ["voice", "speak", "tts", "music", "join", "leave"]) or "vc" in tags:
+        return "VOICE_AUDIO"
+
+    # Codebase / local search
+    if ("code" in tags) or name.startswith("code_") or (name in _CODEBASE_TOOL_NAMES) or any(x in name for x in ["grep", "find", "tree"]):
+        return "CODEBASE"
+
+    # Discord
+    if any(x in name for x in ["ban", "kick", "role", "user", "server", "channel", "wipe"]):
+        return "DISCORD_SERVER"
+
+    return "OTHER"
+
+
+def _build_system_prompt(categories: Dict[str, Dict[str, Any]], platform: str) -> str:
+    # 2. Build Prompt (S6: Prefix Stabilization)
+    # Construct STATIC parts first for KV Cache optimization
+
+    # Sort categories for stability
+    sorted_cats = sorted(categories.items()) # List of tuples, keys sorted alphabetically
+
+    cat_prompt_list = []
+    for cat_key, cat_data in sorted_cats:
+        if cat_data["tools"]:
+            cat_prompt_list.append(f"- {cat_key}: {cat_data['desc']}")
+
+    # Static System Prompt (Strictly Canonical)
+    #
+    # IMPORTANT: Do not rely on keyword heuristics in the bot for routing.
+    # The router should infer intent (screenshot/control/download) conceptually and emit it as JSON.
+    return (
+        f"You are the ORA System Category Router. Your goal is to select the TOOL CATEGORIES required to fulfill the user's intent.\n"
+        f"Current Platform: {platform.upper()}\n"
+        f"Instructions:\n"
+        f"1. **SAFETY FIRST**: If user asks to download/save, use WEB_FETCH. If just looking, use WEB_READ.\n"
+        f"2. ANALYZE the User's GOAL (Concept-Based). Input may be in ANY language.\n"
+        f"3. SELECT ALL Tool Categories required.\n"
+        f"4. **OUTPUT FORMAT** (JSON ONLY, no markdown):\n"
+        f"   Preferred: {{\"categories\":[...],\"intents\":{{\"screenshot\":true|false,\"browser_control\":true|false,\"download\":true|false}}}}\n"
+        f"   Example: {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"screenshot\":true,\"browser_control\":false,\"download\":false}}}}\n\n"
+        f"Available Categories:\n" + "\n".join(cat_prompt_list) + "\n\n"
+        f"[FEW-SHOT EXAMPLES]\n"
+        f"- 'Save this video' -> {{\"categories\":[\"WEB_FETCH\"],\"intents\":{{\"download\":true,\"screenshot\":false,\"browser_control\":false}}}}\n"
+        f"- 'Screenshot this' -> {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"screenshot\":true,\"browser_control\":false,\"download\":false}}}}\n"
+        f"- 'Open the browser and click X' -> {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"browser_control\":true,\"screenshot\":false,\"download\":false}}}}\n"
+        f"- 'Who is this user?' -> {{\"categories\":[\"DISCORD_SERVER\"],\"intents\":{{\"screenshot\":false,\"browser_control\":false,\"download\":false}}}}\n"
+        f"- 'Play music' -> {{\"categories\":[\"VOICE_AUDIO\"],\"intents\":{{\"screenshot\":false,\"browser_control\":false,\"download\":false}}}}\n"
+        f"- '動画を保存して' -> {{\"categories\":[\"WEB_FETCH\"],\"intents\":{{\"download\":true,\"screenshot\":false,\"browser_control\":false}}}}\n"
+        f"- 'このページをスクショして' -> {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"screenshot\":true,\"browser_control\":false,\"download\":false}}}}\n"
+        f"- 'Use an MCP tool' -> {{\"categories\":[\"MCP\"],\"intents\":{{\"screenshot\":false,\"browser_control\":false,\"download\":false}}}}\n"
+    )
+
+
+class _RouterBundle:
+    """Per (tools_bundle_id, platform) routing artifacts that only depend on the tool set."""
+
+    __slots__ = ("category_indexes", "system_prompt", "prefix_hash")
+
+    def __init__(self, category_indexes: Dict[str, Tuple[int, ...]], system_prompt: str, prefix_hash: str):
+        # Indexes into the name-sorted tool list: identical bundle ids imply identical sorted lists,
+        # and the cache never holds on to (or hands out) a caller's tool dicts.
+        self.category_indexes = category_indexes
+        self.system_prompt = system_prompt
+        self.prefix_hash = prefix_hash
+
+
+_BUNDLE_CACHE_MAX = 32
+_bundle_cache: "OrderedDict[Tuple[str, str], _RouterBundle]" = OrderedDict()
+_bundle_cache_lock = threading.Lock()
+
+
+def _get_router_bundle(tools_bundle_id: str, platform: str, sorted_tools: List[dict]) -> Tuple[_RouterBundle, bool]:
+    """Returns (bundle, cache_hit). The tool set changes rarely, so the category map and the
+    system prompt (and its prefix hash) are built once per bundle instead of on every message."""
+    key = (tools_bundle_id, platform)
+    with _bundle_cache_lock:
+        bundle = _bundle_cache.get(key)
+        if bundle is not None:
+            _bundle_cache.move_to_end(key)
+            return bundle, True
+
+    buckets: Dict[str, List[int]] = {cat: [] for cat in _CATEGORY_DESCRIPTIONS}
+    for idx, tool in enumerate(sorted_tools):
+        buckets[_classify_tool(tool)].append(idx)
+    shaped = {cat: {"desc": desc, "tools": buckets[cat]} for cat, desc in _CATEGORY_DESCRIPTIONS.items()}
+    system_prompt = _build_system_prompt(shaped, platform)
+    bundle = _RouterBundle(
+        {cat: tuple(idxs) for cat, idxs in buckets.items()},
+        system_prompt,
+        # S6: Prefix Hash for Cache Hit Verification
+        hashlib.sha256(system_prompt.encode()).hexdigest()[:16],
+    )
+    with _bundle_cache_lock:
+        _bundle_cache[key] = bundle
+        _bundle_cache.move_to_end(key)
+        while len(_bundle_cache) > _BUNDLE_CACHE_MAX:
+            _bundle_cache.popitem(last=False)
+    return bundle, False
+
+
+# Local pre-router: prototype phrases per category for prompts that are unambiguous enough
+# to skip the router LLM. WEB_FETCH / SANDBOX / MCP are never routed locally (explicit intent only).
+_PREROUTE_PROTOTYPES: Dict[str, Tuple[str, ...]] = {
+    "SYSTEM_UTIL": (
+        "こんにちは",
+        "おはよう",
+        "こんばんは",
+        "ありがとう",
+        "元気？",
+        "おやすみ",
+        "hello",
+        "good morning",
+        "thank you",
+        "how are you",
+        "リマインダーを設定して",
+        "remind me later",
+        "今日の天気を教えて",
+        "what's the weather today",
+    ),
+    "VOICE_AUDIO": (
+        "VCに来て",
+        "VCに参加して",
+        "VCから抜けて",
+        "ボイスチャンネルに入って",
+        "音楽を流して",
+        "曲を再生して",
+        "次の曲にスキップして",
+        "join the voice channel",
+        "leave the voice channel",
+        "play some music",
+        "skip this song",
+    ),
+    "MEDIA_CREATE": (
+        "画像を生成して",
+        "絵を描いて",
+        "イラストを作って",
+        "generate an image of",
+        "draw a picture of",
+        "create an image",
+    ),
+    "DISCORD_SERVER": (
+        "ロールを付与して",
+        "このユーザーは誰",
+        "サーバーの情報を教えて",
+        "who is this user",
+        "give me the role",
+        "show server info",
+    ),
+}
+# Keyword cues per category. The pre-router picks a single label, so a prompt that also cues a
+# different category ("天気を教えて、あとニュースも検索して") must go to the full router instead.
+_PREROUTE_CUES: Dict[str, Tuple[str, ...]] = {
+    "SYSTEM_UTIL": ("天気", "weather", "リマインド", "remind"),
+    "VOICE_AUDIO": ("vc", "voice", "ボイス", "音楽", "曲", "再生", "流して", "music", "song", "play "),
+    "MEDIA_CREATE": ("画像", "絵", "イラスト", "image", "picture", "draw", "generate"),
+    "DISCORD_SERVER": ("ロール", "サーバー", "ユーザー", "role", "server", "user"),
+    "WEB_READ": ("検索", "調べ", "ニュース", "記事", "サイト", "search", "news", "google", "browse", "wiki"),
+    "WEB_FETCH": ("ダウンロード", "保存", "download", "save"),
+    "CODEBASE": ("コード", "バグ", "code", "bug"),
+}
+# Clause joiners: a second clause usually asks for a second thing.
+_PREROUTE_JOINERS = re.compile(r"\b(?:and|then|also)\b|[、,。;&]|そして|それから|ついでに|あと(?:で|は)?")
+_preroute_index: Optional[PrototypeIndex] = None
+
+
+def _get_preroute_index() -> PrototypeIndex:
+    global _preroute_index
+    if _preroute_index is None:
+        _preroute_index = PrototypeIndex(_PREROUTE_PROTOTYPES)
+    return _preroute_index
+
+
 class ToolSelector:
     """
     RAG-style Tool Selector (Router).
@@ -47,6 +318,24 @@ class ToolSelector:
             model=self.model_name
         )
 
+        # Router decision LRU + local pre-router (skip the LLM roundtrip for repeated / obvious prompts).
+        self.decision_cache_size = env_int("ORA_ROUTER_DECISION_CACHE_SIZE", 512, 0, 100_000)
+        self.decision_cache_ttl_sec = env_float("ORA_ROUTER_DECISION_CACHE_TTL_SEC", 900.0, 0.0, 86_400.0)
+        self.preroute_enabled = _env_flag("ORA_ROUTER_PREROUTE", "1")
+        self.preroute_min_score = env_float("ORA_ROUTER_PREROUTE_MIN_SCORE", 0.72, 0.0, 1.0)
+        self.preroute_min_margin = env_float("ORA_ROUTER_PREROUTE_MIN_MARGIN", 0.25, 0.0, 1.0)
+        self._decision_cache: "OrderedDict[Tuple[str, str, str, str, bool], Tuple[float, List[str], Dict[str, bool]]]" = OrderedDict()
+        self._llm_roundtrip_ema_ms = 0.0
+        self._stats: Dict[str, float] = {
+            "calls": 0,
+            "bundle_hits": 0,
+            "decision_cache_hits": 0,
+            "preroute_hits": 0,
+            "llm_decisions": 0,
+            "fallbacks": 0,
+            "saved_ms": 0.0,
+        }
+
     @staticmethod
     def _coerce_intent_flag(value: Any) -> bool:
         """Safely coerce router intent values into booleans."""
@@ -75,9 +364,7 @@ class ToolSelector:
         """
         Analyzes prompt and selects relevant tool CATEGORIES (Granular).
         """
-        import time
         import uuid
-        import hashlib
 
         start_time_total = time.perf_counter()
         # S4-1: Use provided correlation_id or generate a request short-id
@@ -96,180 +383,17 @@ class ToolSelector:
         tools_json = json.dumps(sorted_tools, sort_keys=True, separators=(",", ":"))
         tools_bundle_id = hashlib.sha256(tools_json.encode()).hexdigest()[:16]
 
-        # 1. Define Granular Categories (S3)
+        # 1. Category map + system prompt: memoized per bundle (S3/S6)
+        bundle, bundle_hit = _get_router_bundle(tools_bundle_id, platform, sorted_tools)
         categories = {
-            "WEB_READ": {
-                "desc": "READ-ONLY Web Access. Browse, Screenshot, Dump content. NO downloading/saving files.",
-                "tools": []
-            },
-            "WEB_FETCH": {
-                "desc": "FILE DOWNLOADING & RECORDING. Select ONLY if user explicitly asks to 'Save', 'Download', 'Record' or 'Keep' media.",
-                "tools": []
-            },
-            "SANDBOX": {
-                "desc": "STATIC sandbox inspection (download repo ZIP into temp + scan). Select ONLY if user explicitly asks to download/verify/scan repos.",
-                "tools": []
-            },
-            "MEDIA_ANALYZE": {
-                "desc": "VIEWING/ANALYZING Images or Video. No generation.",
-                "tools": []
-            },
-            "MEDIA_CREATE": {
-                "desc": "GENERATING/EDITING Images, Video, Music. (DALL-E, Sora, Suno).",
-                "tools": []
-            },
-            "VOICE_AUDIO": {
-                "desc": "Voice Channel (VC) operations. Join, Leave, Speak (TTS), Play Music.",
-                "tools": []
-            },
-            "DISCORD_SERVER": {
-                "desc": "Server Management. Ban, Kick, Roles, User Info, Channel Ops.",
-                "tools": []
-            },
-            "CODEBASE": {
-                "desc": "Local codebase inspection tools (grep/find/read/tree). Select only for code/repo/debug requests.",
-                "tools": [],
-            },
-            "MCP": {
-                "desc": "Remote MCP (Model Context Protocol) tools from connected MCP servers.",
-                "tools": [],
-            },
-            "SYSTEM_UTIL": {
-                "desc": "Safe System Utils. Reminders, Memory, Help, Status checks. (SAFE DEFAULT)",
-                "tools": []
-            },
-            "OTHER": {"desc": "Anything else.", "tools": []}
-        }
-
-        # --- CLASSIFICATION LOGIC (Mapping Tools to Categories) ---
-        # Use sorted_tools here to be deterministic.
-        #
-        # NOTE:
-        # Tool names like "read_web_page" and "read_messages" contain "read" and were
-        # previously misclassified as CODEBASE due to substring heuristics. That caused
-        # the router to return 0 tools for URL prompts when only the public allowlist
-        # was visible (common for guests). We keep an explicit mapping for these
-        # "safe read" tools to stabilize behavior.
-        safe_system_tools: set[str] = {
-            # Prefer keeping SYSTEM_UTIL small and actually safe.
-            "say",
-            "weather",
-            "read_chat_history",
-            "read_messages",
-            "get_logs",
-            "system_info",
-            "router_health",
-            "check_privilege",
-        }
-
-        explicit_category_by_tool_name: dict[str, str] = {
-            # Web reading tool (skill) does not follow the "web_*" prefix convention.
-            "read_web_page": "WEB_READ",
-            # Discord history readers should not be treated as codebase tools.
-            "read_messages": "SYSTEM_UTIL",
-            "read_chat_history": "SYSTEM_UTIL",
+            cat_key: {"desc": desc, "tools": [sorted_tools[i] for i in bundle.category_indexes[cat_key]]}
+            for cat_key, desc in _CATEGORY_DESCRIPTIONS.items()
         }
-
-        codebase_tool_names: set[str] = {
-            # SafeShell-backed local inspection tools.
-            "read_file",
-            "list_files",
-            "search_code",
-            "get_system_tree",
-        }
-
-        for tool in sorted_tools:
-            name = tool["name"].lower()
-            tags = set(tool.get("tags", []))
-
-            # Explicit mapping beats heuristics (stability over cleverness).
-            forced = explicit_category_by_tool_name.get(name)
-            if forced and forced in categories:
-                categories[forced]["tools"].append(tool)
-                continue
-
-            # Sandbox tools (static inspection only)
-            if ("sandbox" in tags) or name.startswith("sandbox_"):
-                categories["SANDBOX"]["tools"].append(tool)
-                continue
-
-            # MCP remote tools
-            if ("mcp" in tags) or name.startswith("mcp__"):
-                categories["MCP"]["tools"].append(tool)
-                continue
-
-            # System/Default (early): keep "safe read" tools out of CODEBASE bucket.
-            if (name in safe_system_tools) or ("system" in tags) or ("monitor" in tags) or ("health" in tags):
-                categories["SYSTEM_UTIL"]["tools"].append(tool)
-                continue
-
-            # Web Split
-            if name.startswith("web_"):
-                if any(x in name for x in ["download", "record", "save", "fetch"]):
-                    categories["WEB_FETCH"]["tools"].append(tool)
-                else:
-                    categories["WEB_READ"]["tools"].append(tool)
-
-            # Media Split
-            elif any(x in name for x in ["generate", "create", "imagine", "sora", "painting"]):
-                 categories["MEDIA_CREATE"]["tools"].append(tool)
-            elif any(x in name for x in ["vision", "analyze", "ocr", "describe"]):
-                 categories["MEDIA_ANALYZE"]["tools"].append(tool)
-
-            # Voice/Music
-            elif any(x in name for x in ["voice", "speak", "tts", "music", "join", "leave"]) or "vc" in tags:
-                 categories["VOICE_AUDIO"]["tools"].append(tool)
-
-            # Codebase / local search
-            elif ("code" in tags) or name.startswith("code_") or (name in codebase_tool_names) or any(x in name for x in ["grep", "find", "tree"]):
-                 categories["CODEBASE"]["tools"].append(tool)
-
-            # Discord
-            elif any(x in name for x in ["ban", "kick", "role", "user", "server", "channel", "wipe"]):
-                 categories["DISCORD_SERVER"]["tools"].append(tool)
-
-            else:
-                categories["OTHER"]["tools"].append(tool)
-
-        # 2. Build Prompt (S6: Prefix Stabilization)
-        # Construct STATIC parts first for KV Cache optimization
-
-        # Sort categories for stability
-        sorted_cats = sorted(categories.items()) # List of tuples, keys sorted alphabetically
-
-        cat_prompt_list = []
-        for cat_key, cat_data in sorted_cats:
-            if cat_data["tools"]:
-                cat_prompt_list.append(f"- {cat_key}: {cat_data['desc']}")
-
-        # Static System Prompt (Strictly Canonical)
-        #
-        # IMPORTANT: Do not rely on keyword heuristics in the bot for routing.
-        # The router should infer intent (screenshot/control/download) conceptually and emit it as JSON.
-        system_prompt = (
-            f"You are the ORA System Category Router. Your goal is to select the TOOL CATEGORIES required to fulfill the user's intent.\n"
-            f"Current Platform: {platform.upper()}\n"
-            f"Instructions:\n"
-            f"1. **SAFETY FIRST**: If user asks to download/save, use WEB_FETCH. If just looking, use WEB_READ.\n"
-            f"2. ANALYZE the User's GOAL (Concept-Based). Input may be in ANY language.\n"
-            f"3. SELECT ALL Tool Categories required.\n"
-            f"4. **OUTPUT FORMAT** (JSON ONLY, no markdown):\n"
-            f"   Preferred: {{\"categories\":[...],\"intents\":{{\"screenshot\":true|false,\"browser_control\":true|false,\"download\":true|false}}}}\n"
-            f"   Example: {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"screenshot\":true,\"browser_control\":false,\"download\":false}}}}\n\n"
-            f"Available Categories:\n" + "\n".join(cat_prompt_list) + "\n\n"
-            f"[FEW-SHOT EXAMPLES]\n"
-            f"- 'Save this video' -> {{\"categories\":[\"WEB_FETCH\"],\"intents\":{{\"download\":true,\"screenshot\":false,\"browser_control\":false}}}}\n"
-            f"- 'Screenshot this' -> {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"screenshot\":true,\"browser_control\":false,\"download\":false}}}}\n"
-            f"- 'Open the browser and click X' -> {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"browser_control\":true,\"screenshot\":false,\"download\":false}}}}\n"
-            f"- 'Who is this user?' -> {{\"categories\":[\"DISCORD_SERVER\"],\"intents\":{{\"screenshot\":false,\"browser_control\":false,\"download\":false}}}}\n"
-             f"- 'Play music' -> {{\"categories\":[\"VOICE_AUDIO\"],\"intents\":{{\"screenshot\":false,\"browser_control\":false,\"download\":false}}}}\n"
-             f"- '動画を保存して' -> {{\"categories\":[\"WEB_FETCH\"],\"intents\":{{\"download\":true,\"screenshot\":false,\"browser_control\":false}}}}\n"
-             f"- 'このページをスクショして' -> {{\"categories\":[\"WEB_READ\"],\"intents\":{{\"screenshot\":true,\"browser_control\":false,\"download\":false}}}}\n"
-             f"- 'Use an MCP tool' -> {{\"categories\":[\"MCP\"],\"intents\":{{\"screenshot\":false,\"browser_control\":false,\"download\":false}}}}\n"
-         )
-
-        # S6: Prefix Hash for Cache Hit Verification
-        prefix_hash = hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+        system_prompt = bundle.system_prompt
+        prefix_hash = bundle.prefix_hash
+        self._stats["calls"] += 1
+        if bundle_hit:
+            self._stats["bundle_hits"] += 1
 
         user_content = f"{rag_context}\nUser Prompt: {prompt}" if rag_context else f"User Prompt: {prompt}"
         messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_content}]
@@ -285,84 +409,35 @@ class ToolSelector:
             "router_roundtrip_ms": 0, # LLM Time
             "router_local_ms": 0,     # Total - LLM
             "prefix_hash": prefix_hash,
-            "tools_bundle_id": tools_bundle_id
+            "tools_bundle_id": tools_bundle_id,
+            "bundle_cache_hit": bundle_hit,
+            "decision_source": "llm",
+            "router_saved_ms": 0,
         }
 
-        try:
-            # 3. Call LLM (Deterministic S1 with Retry S4)
-            # Force temperature=0 for stability
-            # S4: Retry Loop (Max 2 attempts) for JSON validity
-            max_retries = 2
-            selected_categories = []
-            router_intents: Dict[str, bool] = {"screenshot": False, "browser_control": False, "download": False}
-
-            for attempt in range(max_retries + 1):
-                t0_llm = time.perf_counter()
-                response_text, _, _ = await self.llm_client.chat(
-                    messages,
-                    temperature=0.0,
-                    model=self.model_name,
-                )
-                t1_llm = time.perf_counter()
-
-                # Accumulate roundtrip time (last successful or attempted call)
-                log_payload["router_roundtrip_ms"] = round((t1_llm - t0_llm) * 1000, 2)
-
-                if not response_text:
-                    if attempt < max_retries:
-                        logger.warning(f"Router returned empty response (Attempt {attempt+1}). Retrying...")
-                        log_payload["retry_count"] += 1
-                        continue
-                    else:
-                        raise ValueError("Empty response from Router after retries")
-
-                # 4. Parse JSON (Strict S1/S2)
-                clean_text = response_text.replace("```json", "").replace("```", "").strip()
-                # Handle list-like strings that might be wrapped in quotes or brackets
-                if not clean_text.startswith("[") and "[" in clean_text:
-                    start = clean_text.find("[")
-                    end = clean_text.rfind("]") + 1
-                    clean_text = clean_text[start:end]
-
-                try:
-                    parsed = json.loads(clean_text)
-                    # Backward compatible: accept either list OR object.
-                    if isinstance(parsed, list):
-                        cats_raw = parsed
-                    elif isinstance(parsed, dict):
-                        cats_raw = parsed.get("categories") or parsed.get("selected_categories") or []
-                        intents_raw = parsed.get("intents") or {}
-                        if isinstance(intents_raw, dict):
-                            for k in ("screenshot", "browser_control", "download"):
-                                router_intents[k] = self._coerce_intent_flag(intents_raw.get(k, False))
-                    else:
-                        cats_raw = []
-
-                    if isinstance(cats_raw, list):
-                        # S4: Filter Unknown Categories (Strict Allowlist)
-                        valid_keys = set(categories.keys())
-                        selected_categories = [k for k in cats_raw if k in valid_keys]
-                        if len(selected_categories) < len(cats_raw):
-                            logger.warning(f"Filtered out unknown categories: {set(cats_raw) - set(selected_categories)}")
-                        break  # Success
-
-                    logger.warning(f"Router returned invalid JSON shape: {type(parsed)}")
-                except json.JSONDecodeError:
-                    logger.warning(f"Router JSON Decode Error: {clean_text}")
-
-                if attempt < max_retries:
-                    # Optional: Add error feedback to prompt? Simplified: just retry.
-                    logger.warning(f"Retrying Router (Attempt {attempt+1})...")
-                    log_payload["retry_count"] += 1
-                    continue
+        router_intents: Dict[str, bool] = {"screenshot": False, "browser_control": False, "download": False}
+        decision_key = self._decision_key(prompt, tools_bundle_id, platform, rag_context, has_vision_attachment)
+        decision = self._cached_decision(decision_key)
+        if decision is not None:
+            log_payload["decision_source"] = "cache"
+        else:
+            decision = self._preroute(prompt, categories, has_vision_attachment=has_vision_attachment)
+            if decision is not None:
+                log_payload["decision_source"] = "prerouter"
 
-            # Use 'selected_categories' from loop
-            if not selected_categories:
-                raise ValueError("Failed to parse valid categories after retries")
+        try:
+            if decision is not None:
+                selected_categories, router_intents = decision
+                self._record_saved_latency(log_payload)
+            else:
+                selected_categories, router_intents = await self._route_via_llm(messages, categories, log_payload)
+                self._remember_decision(decision_key, selected_categories, router_intents)
 
         except Exception as e:
             logger.warning(f"⚠️ Router Failed via LLM ({e}). Invoking Safety Fallback.", extra={"error": str(e)})
             log_payload["fallback_triggered"] = True
+            log_payload["decision_source"] = "fallback"
+            self._stats["fallbacks"] += 1
 
             # FALLBACK (S2): Do not return nothing. Return SAFE defaults + Heuristics.
             selected_categories = ["SYSTEM_UTIL"] # Always allow system safe tools
@@ -715,6 +790,188 @@ class ToolSelector:
 
         return final_tools
 
+    async def _route_via_llm(
+        self,
+        messages: List[Dict[str, str]],
+        categories: Dict[str, Dict[str, Any]],
+        log_payload: Dict[str, Any],
+    ) -> Tuple[List[str], Dict[str, bool]]:
+        """Asks the router LLM for categories + intents. Raises when no valid answer is produced."""
+        # 3. Call LLM (Deterministic S1 with Retry S4)
+        # Force temperature=0 for stability
+        # S4: Retry Loop (Max 2 attempts) for JSON validity
+        max_retries = 2
+        selected_categories: List[str] = []
+        router_intents: Dict[str, bool] = {"screenshot": False, "browser_control": False, "download": False}
+
+        for attempt in range(max_retries + 1):
+            t0_llm = time.perf_counter()
+            response_text, _, _ = await self.llm_client.chat(
+                messages,
+                temperature=0.0,
+                model=self.model_name,
+            )
+            t1_llm = time.perf_counter()
+
+            # Accumulate roundtrip time (last successful or attempted call)
+            log_payload["router_roundtrip_ms"] = round((t1_llm - t0_llm) * 1000, 2)
+
+            if not response_text:
+                if attempt < max_retries:
+                    logger.warning(f"Router returned empty response (Attempt {attempt+1}). Retrying...")
+                    log_payload["retry_count"] += 1
+                    continue
+                else:
+                    raise ValueError("Empty response from Router after retries")
+
+            # 4. Parse JSON (Strict S1/S2)
+            clean_text = response_text.replace("```json", "").replace("```", "").strip()
+            # Handle list-like strings that might be wrapped in quotes or brackets
+            if not clean_text.startswith("[") and "[" in clean_text:
+                start = clean_text.find("[")
+                end = clean_text.rfind("]") + 1
+                clean_text = clean_text[start:end]
+
+            try:
+                parsed = json.loads(clean_text)
+                # Backward compatible: accept either list OR object.
+                if isinstance(parsed, list):
+                    cats_raw = parsed
+                elif isinstance(parsed, dict):
+                    cats_raw = parsed.get("categories") or parsed.get("selected_categories") or []
+                    intents_raw = parsed.get("intents") or {}
+                    if isinstance(intents_raw, dict):
+                        for k in ("screenshot", "browser_control", "download"):
+                            router_intents[k] = self._coerce_intent_flag(intents_raw.get(k, False))
+                else:
+                    cats_raw = []
+
+                if isinstance(cats_raw, list):
+                    # S4: Filter Unknown Categories (Strict Allowlist)
+                    valid_keys = set(categories.keys())
+                    selected_categories = [k for k in cats_raw if k in valid_keys]
+                    if len(selected_categories) < len(cats_raw):
+                        logger.warning(f"Filtered out unknown categories: {set(cats_raw) - set(selected_categories)}")
+                    break  # Success
+
+                logger.warning(f"Router returned invalid JSON shape: {type(parsed)}")
+            except json.JSONDecodeError:
+                logger.warning(f"Router JSON Decode Error: {clean_text}")
+
+            if attempt < max_retries:
+                # Optional: Add error feedback to prompt? Simplified: just retry.
+                logger.warning(f"Retrying Router (Attempt {attempt+1})...")
+                log_payload["retry_count"] += 1
+                continue
+
+        # Use 'selected_categories' from loop
+        if not selected_categories:
+            raise ValueError("Failed to parse valid categories after retries")
+
+        self._stats["llm_decisions"] += 1
+        roundtrip = float(log_payload["router_roundtrip_ms"])
+        if self._llm_roundtrip_ema_ms <= 0:
+            self._llm_roundtrip_ema_ms = roundtrip
+        else:
+            self._llm_roundtrip_ema_ms = 0.8 * self._llm_roundtrip_ema_ms + 0.2 * roundtrip
+        return selected_categories, router_intents
+
+    @staticmethod
+    def _decision_key(
+        prompt: str,
+        tools_bundle_id: str,
+        platform: str,
+        rag_context: str,
+        has_vision_attachment: bool,
+    ) -> Tuple[str, str, str, str, bool]:
+        normalized = " ".join((prompt or "").lower().split())
+        # The LLM sees the RAG context too, so a different context is a different decision.
+        context_hash = hashlib.sha256((rag_context or "").encode()).hexdigest()[:12] if rag_context else ""
+        return (normalized, tools_bundle_id, platform, context_hash, bool(has_vision_attachment))
+
+    def _cached_decision(self, key: Tuple[str, str, str, str, bool]) -> Optional[Tuple[List[str], Dict[str, bool]]]:
+        if self.decision_cache_size <= 0:
+            return None
+        entry = self._decision_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, cats, intents = entry
+        if self.decision_cache_ttl_sec and time.monotonic() - stored_at > self.decision_cache_ttl_sec:
+            self._decision_cache.pop(key, None)
+            return None
+        self._decision_cache.move_to_end(key)
+        self._stats["decision_cache_hits"] += 1
+        # Copies: the guards below narrow selected_categories in place.
+        return list(cats), dict(intents)
+
+    def _remember_decision(
+        self,
+        key: Tuple[str, str, str, str, bool],
+        selected_categories: List[str],
+        router_intents: Dict[str, bool],
+    ) -> None:
+        if self.decision_cache_size <= 0:
+            return
+        self._decision_cache[key] = (time.monotonic(), list(selected_categories), dict(router_intents))
+        self._decision_cache.move_to_end(key)
+        while len(self._decision_cache) > self.decision_cache_size:
+            self._decision_cache.popitem(last=False)
+
+    def _preroute(
+        self,
+        prompt: str,
+        categories: Dict[str, Dict[str, Any]],
+        *,
+        has_vision_attachment: bool = False,
+    ) -> Optional[Tuple[List[str], Dict[str, bool]]]:
+        """High-confidence local routing with the hashed n-gram embedding; None defers to the LLM."""
+        if not self.preroute_enabled or has_vision_attachment:
+            return None
+        text = (prompt or "").strip()
+        if not text or len(text) > 200 or "http://" in text or "https://" in text:
+            return None
+        if has_explicit_export_constraint(text):
+            return None
+        lowered = text.lower()
+        if _PREROUTE_JOINERS.search(lowered):
+            return None
+        label, score, margin = _get_preroute_index().best(text)
+        if score < self.preroute_min_score or margin < self.preroute_min_margin:
+            return None
+        if any(
+            other != label and any(cue in lowered for cue in cues) for other, cues in _PREROUTE_CUES.items()
+        ):
+            return None
+        if not categories.get(label, {}).get("tools"):
+            return None
+        self._stats["preroute_hits"] += 1
+        # Intents stay false: the keyword guards below still decide screenshot/download/sandbox.
+        return [label], {"screenshot": False, "browser_control": False, "download": False}
+
+    def _record_saved_latency(self, log_payload: Dict[str, Any]) -> None:
+        saved = round(self._llm_roundtrip_ema_ms, 2)
+        log_payload["router_saved_ms"] = saved
+        self._stats["saved_ms"] += saved
+
+    def router_cache_stats(self) -> Dict[str, Any]:
+        """Hit rates of the bundle cache, decision cache and pre-router, plus estimated LLM time saved."""
+        calls = int(self._stats["calls"])
+
+        def rate(n: float) -> float:
+            return round(n / calls, 3) if calls else 0.0
+
+        return {
+            "calls": calls,
+            "bundle_cache_hit_rate": rate(self._stats["bundle_hits"]),
+            "decision_cache_hit_rate": rate(self._stats["decision_cache_hits"]),
+            "preroute_hit_rate": rate(self._stats["preroute_hits"]),
+            "llm_decisions": int(self._stats["llm_decisions"]),
+            "fallbacks": int(self._stats["fallbacks"]),
+            "decision_cache_entries": len(self._decision_cache),
+            "llm_roundtrip_ema_ms": round(self._llm_roundtrip_ema_ms, 2),
+            "saved_ms_total": round(self._stats["saved_ms"], 2),
+        }
+
     def _cap_tools(
         self,
         tools: List[dict],
@@ -4,16 +4,18 @@ import json
 import logging
 import os
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
 from discord.ext import commands
 
 from src.cogs.mcp_policy import is_mcp_tool_denied, load_mcp_deny_patterns
 from src.cogs.tools.registry import get_tool_meta, register_tool, unregister_tools
-from src.utils.mcp_client import MCPStdioClient
+from src.utils.mcp_client import MCPStdioClient, MCPStdioPool
 
 logger = logging.getLogger(__name__)
 
+MCPClientLike = Union[MCPStdioClient, MCPStdioPool]
+
 
 def _is_enabled() -> bool:
     return (os.getenv("ORA_MCP_ENABLED") or "0").strip().lower() in {"1", "true", "yes", "on"}
@@ -49,6 +51,17 @@ def _load_mcp_servers_from_env() -> list[dict]:
     return out
 
 
+def _server_replicas(server: dict) -> int:
+    """Warm process count for one server: config `replicas`, else ORA_MCP_REPLICAS (default 1)."""
+    raw = server.get("replicas")
+    if raw is None:
+        raw = os.getenv("ORA_MCP_REPLICAS") or "1"
+    try:
+        return max(1, min(8, int(raw)))
+    except (TypeError, ValueError):
+        return 1
+
+
 def _load_deny_patterns() -> list[str]:
     return load_mcp_deny_patterns()
 
@@ -87,6 +100,8 @@ class MCPCog(commands.Cog):
 
     - Disabled by default (`ORA_MCP_ENABLED=0`).
     - Tools are registered dynamically under names like `mcp__<server>__<tool>`.
+    - Busy servers can run as warm replicas (`replicas` / `ORA_MCP_REPLICAS`); calls go to the least-busy one.
+    - A server's tools are re-registered when it sends `notifications/tools/list_changed`.
     - Access control is still enforced by ORA's tool allowlists (owner gets everything).
     """
 
@@ -94,7 +109,7 @@ class MCPCog(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self._clients: dict[str, MCPStdioClient] = {}
+        self._clients: dict[str, MCPClientLike] = {}
         # local tool name -> (server_name, remote_tool_name)
         self._tool_map: dict[str, tuple[str, str]] = {}
 
@@ -124,64 +139,88 @@ class MCPCog(commands.Cog):
                 env = {}
             env = {str(k): str(v) for k, v in env.items()}
 
-            client = MCPStdioClient(name=name, command=cmd, cwd=cwd, env=env)
+            replicas = _server_replicas(s)
+            if replicas > 1:
+                client: MCPClientLike = MCPStdioPool(name=name, command=cmd, cwd=cwd, env=env, replicas=replicas)
+                try:
+                    await client.start()  # warm every replica before the first tool call
+                except Exception as e:
+                    logger.warning("MCP: failed to start server=%s replicas=%d: %s", name, replicas, e)
+            else:
+                client = MCPStdioClient(name=name, command=cmd, cwd=cwd, env=env)
             self._clients[name] = client
+            client.on_tools_changed(lambda n=name, spec=s: self._refresh_server_tools(n, spec))
 
-            try:
-                tools = await client.list_tools()
-            except Exception as e:
-                logger.warning("MCP: failed to list tools for server=%s: %s", name, e)
-                continue
+            await self._register_server_tools(name, s)
 
-            allowed_tools = s.get("allowed_tools")
-            if isinstance(allowed_tools, str):
-                allowed_tools = [t.strip() for t in allowed_tools.split(",") if t.strip()]
-            if allowed_tools is not None and not isinstance(allowed_tools, list):
-                allowed_tools = None
-            allowed_set = {str(t).strip() for t in (allowed_tools or []) if str(t).strip()}
+        logger.info("MCP: registered %d tools across %d server(s)", len(self._tool_map), len(self._clients))
 
-            allow_dangerous = bool(s.get("allow_dangerous_tools")) or (
-                (os.getenv("ORA_MCP_ALLOW_DANGEROUS", "0").strip().lower() in {"1", "true", "yes", "on"})
+    async def _register_server_tools(self, name: str, s: dict) -> None:
+        client = self._clients.get(name)
+        if client is None:
+            return
+        try:
+            tools = await client.list_tools()
+        except Exception as e:
+            logger.warning("MCP: failed to list tools for server=%s: %s", name, e)
+            return
+
+        allowed_tools = s.get("allowed_tools")
+        if isinstance(allowed_tools, str):
+            allowed_tools = [t.strip() for t in allowed_tools.split(",") if t.strip()]
+        if allowed_tools is not None and not isinstance(allowed_tools, list):
+            allowed_tools = None
+        allowed_set = {str(t).strip() for t in (allowed_tools or []) if str(t).strip()}
+
+        allow_dangerous = bool(s.get("allow_dangerous_tools")) or (
+            (os.getenv("ORA_MCP_ALLOW_DANGEROUS", "0").strip().lower() in {"1", "true", "yes", "on"})
+        )
+        deny_patterns = _load_deny_patterns()
+
+        for t in tools:
+            remote_name = str(t.name or "").strip()
+            if not remote_name:
+                continue
+            # If allowlist is provided, register only those tools.
+            if allowed_set and remote_name not in allowed_set:
+                continue
+            # Deny obvious dangerous tools unless explicitly allowed.
+            if is_mcp_tool_denied(remote_name, deny_patterns, allow_dangerous=allow_dangerous):
+                logger.info("MCP: skipping denied tool server=%s tool=%s", name, remote_name)
+                continue
+
+            local_name = f"{self.TOOL_PREFIX}{name}__{_safe_name(t.name)}"
+            self._tool_map[local_name] = (name, t.name)
+
+            params = t.input_schema if isinstance(t.input_schema, dict) else {}
+            if not params.get("type"):
+                params = {"type": "object", "properties": params.get("properties", {}) if isinstance(params, dict) else {}}
+
+            schema = {
+                "name": local_name,
+                "description": (t.description or "").strip() or f"MCP tool '{t.name}' (server={name}).",
+                "parameters": params,
+                "tags": ["mcp", f"mcp_server:{name}"],
+            }
+
+            register_tool(
+                local_name,
+                impl="src.cogs.tools.mcp_tools:dispatch",
+                schema=schema,
+                tags=["mcp", "remote", name],
+                capability="mcp_remote_tool",
+                version="0.0.1",
+                meta={"server": name, "remote_tool": t.name},
             )
-            deny_patterns = _load_deny_patterns()
-
-            for t in tools:
-                remote_name = str(t.name or "").strip()
-                if not remote_name:
-                    continue
-                # If allowlist is provided, register only those tools.
-                if allowed_set and remote_name not in allowed_set:
-                    continue
-                # Deny obvious dangerous tools unless explicitly allowed.
-                if is_mcp_tool_denied(remote_name, deny_patterns, allow_dangerous=allow_dangerous):
-                    logger.info("MCP: skipping denied tool server=%s tool=%s", name, remote_name)
-                    continue
-
-                local_name = f"{self.TOOL_PREFIX}{name}__{_safe_name(t.name)}"
-                self._tool_map[local_name] = (name, t.name)
-
-                params = t.input_schema if isinstance(t.input_schema, dict) else {}
-                if not params.get("type"):
-                    params = {"type": "object", "properties": params.get("properties", {}) if isinstance(params, dict) else {}}
-
-                schema = {
-                    "name": local_name,
-                    "description": (t.description or "").strip() or f"MCP tool '{t.name}' (server={name}).",
-                    "parameters": params,
-                    "tags": ["mcp", f"mcp_server:{name}"],
-                }
-
-                register_tool(
-                    local_name,
-                    impl="src.cogs.tools.mcp_tools:dispatch",
-                    schema=schema,
-                    tags=["mcp", "remote", name],
-                    capability="mcp_remote_tool",
-                    version="0.0.1",
-                    meta={"server": name, "remote_tool": t.name},
-                )
 
-        logger.info("MCP: registered %d tools across %d server(s)", len(self._tool_map), len(self._clients))
+    async def _refresh_server_tools(self, name: str, s: dict) -> None:
+        """Re-register one server's tools after it sent notifications/tools/list_changed."""
+        prefix = f"{self.TOOL_PREFIX}{name}__"
+        unregister_tools(prefix)
+        for local_name in [k for k in self._tool_map if k.startswith(prefix)]:
+            del self._tool_map[local_name]
+        await self._register_server_tools(name, s)
+        logger.info("MCP: refreshed tools for server=%s", name)
 
     async def cog_unload(self) -> None:
         try:
@@ -38,6 +38,7 @@ from ..utils.youtube import (
     search_youtube,
     is_youtube_playlist_url,
     get_youtube_playlist_entries,
+    prefetch_youtube_audio_streams,
 )
 
 import re
@@ -427,7 +428,7 @@ class MediaCog(commands.Cog):
             )
         elif stream_url:
             played = await self._voice_manager.play_music(
-                interaction.user, stream_url, title, is_stream=True, duration=_duration or 0.0
+                interaction.user, stream_url, title, is_stream=True, duration=_duration or 0.0, source=query
             )
 
         # Build response message
@@ -744,6 +745,8 @@ class MediaCog(commands.Cog):
                 embed.add_field(name="Top results", value="\n".join(lines)[:1000], inline=False)
 
                 view = MusicPickView(cog=self, requester_id=int(effective_author.id), results=results, query=q, timeout=60.0)
+                # Most picks are the top hit: resolve it while the user is still choosing.
+                prefetch_youtube_audio_streams([str(results[0].get("webpage_url") or "")])
                 msg = await ctx.send(embed=embed, view=view)
                 view.message = msg
                 return
@@ -756,7 +759,7 @@ class MediaCog(commands.Cog):
 
         # 2. Play (Await once!)
         played = await self._voice_manager.play_music(
-            effective_author, stream_url, title, is_stream=True, duration=duration_sec or 0.0
+            effective_author, stream_url, title, is_stream=True, duration=duration_sec or 0.0, source=q
         )
 
         if played:
@@ -1015,7 +1018,7 @@ class MediaCog(commands.Cog):
 
                     if stream_url and title:
                         ok = await self._voice_manager.play_music(
-                            actor, stream_url, title, is_stream=True, duration=float(dur or 0.0)
+                            actor, stream_url, title, is_stream=True, duration=float(dur or 0.0), source=q
                         )
                         if ok:
                             queued += 1
@@ -1073,7 +1076,7 @@ class MediaCog(commands.Cog):
                     title_for_play = str(yt_title or tr.get("title") or q).strip()
                     if stream_url and title_for_play:
                         ok = await self._voice_manager.play_music(
-                            actor, stream_url, title_for_play, is_stream=True, duration=float(dur or 0.0)
+                            actor, stream_url, title_for_play, is_stream=True, duration=float(dur or 0.0), source=q
                         )
                         if ok:
                             queued += 1
@@ -30,6 +30,7 @@ from discord.ext import commands, tasks
 
 from src.config import MEMORY_DIR
 from src.services.markdown_memory import MarkdownMemory
+from src.utils.analysis_scheduler import AnalysisJob, AnalysisScheduler, JobPriority
 from src.utils.cloud_sync import cloud_sync
 
 logger = logging.getLogger(__name__)
@@ -133,6 +134,14 @@ class MemoryCog(commands.Cog):
         self.sem = asyncio.Semaphore(limit)
         self._io_lock = asyncio.Lock()  # Prevent concurrent file access
 
+        # All profile analyses go through one bounded priority queue (live > manual > periodic > backfill > idle).
+        self.analysis_scheduler = AnalysisScheduler(
+            self._run_analysis_job,
+            batch_runner=self._run_analysis_batch,
+            budget_probe=self._analysis_budget_ratio,
+            concurrency=None if os.getenv("ORA_MEMORY_ANALYSIS_CONCURRENCY") else (4 if worker_mode else 2),
+        )
+
         # [RESTORED] Hub & Spoke: Re-enabled optimization for Discord users
 
         # Cleanup should run in ALL modes to ensure UI is clean
@@ -173,6 +182,10 @@ class MemoryCog(commands.Cog):
             self.refresh_watcher.start()
 
     def cog_unload(self):
+        try:
+            asyncio.get_running_loop().create_task(self.analysis_scheduler.stop())
+        except RuntimeError:
+            pass
         self.status_loop.cancel()
         self.memory_worker.cancel()
         self.name_sweeper.cancel()
@@ -386,8 +399,8 @@ class MemoryCog(commands.Cog):
 
                     if msgs:
                         logger.info(f"🔥 [Surplus Burner] Burning tokens on {uid}...")
-                        asyncio.create_task(self._analyze_wrapper(uid, msgs, gid, True))
-                        burned += 1
+                        if await self._schedule_analysis(uid, msgs, gid, True, JobPriority.IDLE):
+                            burned += 1
 
                 except Exception as e:
                     logger.error(f"Burner failed for {cid}: {e}")
@@ -520,10 +533,14 @@ class MemoryCog(commands.Cog):
             msgs_to_process = self.message_buffer[message.author.id][:]  # Copy
             self.message_buffer[message.author.id] = []  # Clear
 
-            # Fire off analysis (Background)
+            # Fire off analysis (Background, highest priority)
             asyncio.create_task(
-                self._analyze_wrapper(
-                    message.author.id, msgs_to_process, message.guild.id if message.guild else None, is_pub
+                self._schedule_analysis(
+                    message.author.id,
+                    msgs_to_process,
+                    message.guild.id if message.guild else None,
+                    is_pub,
+                    JobPriority.LIVE,
                 )
             )
 
@@ -1321,6 +1338,165 @@ class MemoryCog(commands.Cog):
         async with self.sem:
             await self._analyze_batch(user_id, messages, guild_id, is_public)
 
+    async def _schedule_analysis(
+        self,
+        user_id: int,
+        messages: list,
+        guild_id: int | str = None,
+        is_public: bool = True,
+        priority: JobPriority = JobPriority.PERIODIC,
+    ) -> bool:
+        """Queue an analysis on the shared scheduler. Returns False if it was refused."""
+        outcome = self.analysis_scheduler.submit(user_id, messages, guild_id, is_public, priority)
+        if outcome in ("queued", "merged"):
+            return True
+        reason = "予算上限に近いため保留" if outcome == "budget" else "分析キューが満杯"
+        logger.info(f"Memory: {priority.name} analysis for {user_id} not queued ({outcome})")
+        await self.set_user_status(user_id, "Pending", f"⏸ {reason}", guild_id, is_public)
+        return False
+
+    async def _run_analysis_job(self, job: AnalysisJob) -> None:
+        async with self.sem:
+            await self._analyze_batch(job.user_id, job.messages, job.guild_id, job.is_public)
+
+    def _analysis_budget_ratio(self) -> Optional[float]:
+        ora_cog = self.bot.get_cog("ORACog")
+        cost_manager = getattr(ora_cog, "cost_manager", None) if ora_cog else None
+        if not cost_manager:
+            return None
+        return max(
+            cost_manager.get_usage_ratio("stable", "openai"),
+            cost_manager.get_usage_ratio("optimization", "openai"),
+        )
+
+    def analysis_queue_status(self) -> Dict[str, Any]:
+        """Queue depth / throughput of the profile analysis scheduler (for dashboards and logs)."""
+        return self.analysis_scheduler.stats()
+
+    async def _run_analysis_batch(self, jobs: list[AnalysisJob]) -> list[AnalysisJob]:
+        """Analyze several small background logs in one LLM call.
+
+        Returns the jobs the model did not answer for; the scheduler re-runs those alone.
+        Cost is reserved and committed per user, each job paying its share of the call.
+        """
+        import secrets
+
+        from src.utils.cost_manager import Usage
+
+        ora_cog = self.bot.get_cog("ORACog")
+        cost_manager = ora_cog.cost_manager if ora_cog else None
+        rid = secrets.token_hex(4)
+
+        logs = {id(job): "\n".join([f"[{m.get('timestamp')}] {m.get('content')}" for m in job.messages]) for job in jobs}
+        reserved: dict[int, str] = {}  # id(job) -> reservation id
+        if cost_manager:
+            admitted: list[AnalysisJob] = []
+            for i, job in enumerate(jobs):
+                est_usage = Usage(tokens_in=len(logs[id(job)]) // 4 + 500 // len(jobs), tokens_out=2500, usd=0.0)
+                job_rid = f"{rid}-{i}"
+                decision = cost_manager.can_call_and_reserve("optimization", "openai", job.user_id, job_rid, est_usage)
+                if not decision.allowed:
+                    logger.warning(f"Memory: バッチ最適化をスキップしました (ユーザー: {job.user_id}) - 理由: {decision.reason}")
+                    await self.set_user_status(job.user_id, "Pending", f"⛔ 制限超過: {decision.reason}", job.guild_id, job.is_public)
+                    continue
+                reserved[id(job)] = job_rid
+                admitted.append(job)
+            jobs = admitted
+            if not jobs:
+                return []
+
+        labels = {f"U{i + 1}": job for i, job in enumerate(jobs)}
+        sections = [f"=== {label} ===\n{logs[id(job)]}" for label, job in labels.items()]
+        all_logs = "\n\n".join(sections)
+        max_output = min(16384, 2500 * len(jobs))
+
+        prompt = [
+            {
+                "role": "developer",
+                "content": (
+                    "You are a World-Class Psychologist AI implementing a '4-Layer Memory System'. Analysis Mode: Standard (batched). "
+                    "Output MUST be in Japanese. Each labelled section is a DIFFERENT user; never mix facts between them."
+                ),
+            },
+            {
+                "role": "user",
+                "content": (
+                    "For EACH labelled user below, extract Layer 1 (session metadata), Layer 2 (stable facts, traits, "
+                    "a short impression under 20 chars, interests, deep_analysis) and Layer 3 (digest of this conversation).\n\n"
+                    f"{all_logs}\n\n"
+                    "Output strictly in this JSON format (All values in Japanese):\n"
+                    "{\n"
+                    '  "users": {\n'
+                    '    "U1": { "layer1_session_meta": { "environment": "...", "mood": "...", "device_est": "..." },\n'
+                    '            "layer2_user_memory": { "facts": ["..."], "traits": ["..."], "impression": "...", "interests": ["..."], "deep_analysis": "..." },\n'
+                    '            "layer3_recent_summaries": [ { "title": "...", "timestamp": "...", "snippet": "..." } ] }\n'
+                    "  }\n"
+                    "}\n"
+                    "IMPORTANT: Output ONLY the raw JSON with one entry per label. Do NOT use markdown code blocks."
+                ),
+            },
+        ]
+
+        for job in jobs:
+            await self.set_user_status(job.user_id, "Processing", "Processing (batch)...", job.guild_id, job.is_public)
+
+        try:
+            async with self.sem:
+                response_text, _, usage_dict = await asyncio.wait_for(
+                    self._llm.chat("openai", prompt, temperature=None, max_tokens=max_output), timeout=600.0
+                )
+            if cost_manager and usage_dict:
+                u_in = usage_dict.get("prompt_tokens") or usage_dict.get("input_tokens", 0)
+                u_out = usage_dict.get("completion_tokens") or usage_dict.get("output_tokens", 0)
+                # Input is split by each user's share of the logs, output evenly.
+                total_chars = sum(len(logs[id(job)]) for job in jobs) or 1
+                for job in jobs:
+                    share = len(logs[id(job)]) / total_chars
+                    j_in = round(u_in * share)
+                    j_out = round(u_out / len(jobs))
+                    c_usd = (j_in * 0.00000015) + (j_out * 0.00000060)
+                    job_rid = reserved.pop(id(job))
+                    cost_manager.commit("optimization", "openai", job.user_id, job_rid, Usage(tokens_in=j_in, tokens_out=j_out, usd=c_usd))
+            data = self._parse_analysis_json(response_text)
+        except Exception as e:
+            logger.error(f"Memory: バッチ分析失敗 ({len(jobs)}人): {e}")
+            if cost_manager:
+                for job in jobs:
+                    job_rid = reserved.pop(id(job), None)
+                    if job_rid:
+                        cost_manager.rollback("optimization", "openai", job.user_id, job_rid)
+            for job in jobs:
+                await self.set_user_status(job.user_id, "Error", "分析失敗", job.guild_id, job.is_public)
+            return []
+
+        per_user = data.get("users") if isinstance(data, dict) else None
+        leftovers: list[AnalysisJob] = []
+        for label, job in labels.items():
+            entry = per_user.get(label) if isinstance(per_user, dict) else None
+            if not isinstance(entry, dict):
+                leftovers.append(job)
+                continue
+            l2 = entry.get("layer2_user_memory", {}) or {}
+            user = self.bot.get_user(int(job.user_id))
+            name = user.display_name if user else "Unknown"
+            await self.update_user_profile(
+                job.user_id,
+                {
+                    "name": name,
+                    "traits": l2.get("traits", []),
+                    "impression": l2.get("impression", "Analyzed"),
+                    "layer1_session_meta": entry.get("layer1_session_meta", {}),
+                    "layer2_user_memory": l2,
+                    "layer3_recent_summaries": entry.get("layer3_recent_summaries", []),
+                    "status": "Optimized",
+                    "message_count": len(job.messages),
+                },
+                job.guild_id,
+                job.is_public,
+            )
+        logger.info(f"Memory: バッチ分析完了: {len(jobs) - len(leftovers)}/{len(jobs)}人")
+        return leftovers
+
     async def _persist_message(
         self, user_id: int, entry: Dict[str, Any], guild_id: Optional[int], is_public: bool = True
     ):
@@ -1497,8 +1673,8 @@ class MemoryCog(commands.Cog):
                         current_profile["status"] = "Pending"
                         await self.update_user_profile(uid, current_profile, gid)
 
-                        asyncio.create_task(
-                            self._analyze_wrapper(uid, g_msgs, gid, is_public=True)
+                        await self._schedule_analysis(
+                            uid, g_msgs, gid, True, JobPriority.PERIODIC
                         )  # Default to public in worker for now
                     else:
                         # Not enough yet, put back in buffer?
@@ -1588,9 +1764,9 @@ class MemoryCog(commands.Cog):
         priv_msgs = [m for m in collected_msgs if not m.get("is_public", True)]
 
         if pub_msgs:
-            asyncio.create_task(self._analyze_wrapper(user_id, pub_msgs, guild_id, is_public=True))
+            await self._schedule_analysis(user_id, pub_msgs, guild_id, True, JobPriority.MANUAL)
         if priv_msgs:
-            asyncio.create_task(self._analyze_wrapper(user_id, priv_msgs, guild_id, is_public=False))
+            await self._schedule_analysis(user_id, priv_msgs, guild_id, False, JobPriority.MANUAL)
 
         return True, f"Optimization queued ({len(pub_msgs)} public, {len(priv_msgs)} private msgs)."
 
@@ -1617,9 +1793,9 @@ class MemoryCog(commands.Cog):
         priv_batch = [m for m in messages if not m.get("is_public", True)]
 
         if pub_batch:
-            asyncio.create_task(self._analyze_wrapper(user_id, pub_batch, guild_id, is_public=True))
+            await self._schedule_analysis(user_id, pub_batch, guild_id, True, JobPriority.MANUAL)
         if priv_batch:
-            asyncio.create_task(self._analyze_wrapper(user_id, priv_batch, guild_id, is_public=False))
+            await self._schedule_analysis(user_id, priv_batch, guild_id, False, JobPriority.MANUAL)
 
     async def _find_user_history_targeted(
         self, user_id: int, guild_id: int, scan_depth: int = 500, allow_api: bool = False
@@ -1897,10 +2073,10 @@ class MemoryCog(commands.Cog):
                     profile["name"] = member.display_name
                     await self.update_user_profile(member.id, profile, guild.id)
 
-                    asyncio.create_task(self._analyze_wrapper(member.id, history, guild.id))
-                    count += 1
+                    if await self._schedule_analysis(member.id, history, guild.id, True, JobPriority.BACKFILL):
+                        count += 1
                     # Full Speed Mode (User Requested)
-                    # Semaphore will control concurrency
+                    # The analysis scheduler controls concurrency
                     await asyncio.sleep(0.1)
                 else:
                     logger.debug(f"AutoScan: {member.display_name} - No history found. Marking as Optimized (Empty).")
@@ -2144,7 +2320,7 @@ class MemoryCog(commands.Cog):
                         "last_updated": datetime.now().isoformat(),
                     }
                     await self.update_user_profile(uid, profile, guild.id)
-                    asyncio.create_task(self._analyze_wrapper(uid, history, guild.id))
+                    await self._schedule_analysis(uid, history, guild.id, True, JobPriority.BACKFILL)
                 else:
                     # Case B: No History -> Mark Optimized (Empty) to remove "Gray" status
                     logger.info(f"Memory: Ghost {member.display_name} has NO msgs. Marking Optimized (Empty).")
@@ -2356,6 +2532,13 @@ class MemoryCog(commands.Cog):
         # 1. Check Optimize Queue (IPC)
         await self.refresh_watcher()
 
+        q = self.analysis_scheduler.stats()
+        if q["pending"] or q["running"]:
+            logger.info(
+                f"Memory: analysis queue pending={q['pending']} running={q['running']} "
+                f"throughput={q['throughput_per_min']}/min wait_p95={q['wait_ms_p95']}ms"
+            )
+
         # 2. Check Archiver Health (Worker Only)
         if self.worker_mode and not self.idle_log_archiver.is_running():
             try:
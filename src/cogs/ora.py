@@ -358,6 +358,7 @@ class ORACog(commands.Cog):
         # [Feature] Startup Sync & Fallback
         # Check OpenAI usage immediately to update limiter.
         self.bot.loop.create_task(self._startup_sync())
+        self.bot.loop.create_task(self.safe_shell.warm_index())
 
     async def _startup_sync(self):
         """Syncs OpenAI usage and updates local limiter state."""
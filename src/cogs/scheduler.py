@@ -1,14 +1,16 @@
 import asyncio
+import heapq
 import logging
 import os
 import time
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 import discord
 from discord.ext import commands, tasks
 
 from src.utils.agent_trace import trace_event
 from src.utils.core_client import core_client
+from src.utils.env import env_int
 
 logger = logging.getLogger(__name__)
 
@@ -22,17 +24,39 @@ class SchedulerCog(commands.Cog):
     - Runs tasks as LLM-only: available_tools=[] so Core cannot request tool dispatch.
       (We can extend later with explicit allowlists + approval gates.)
     - Stores audit trail in SQLite (scheduled_task_runs).
+
+    Wakeups are event-driven: enabled tasks are loaded once into a min-heap of
+    (next_run_at, task_id) and the loop sleeps until the earliest due time or until
+    `notify_task_changed()` (create / delete / toggle). Nothing is queried while idle.
+    Everything overdue is claimed in one pass and runs concurrently, bounded by
+    ORA_SCHEDULER_MAX_CONCURRENCY.
     """
 
-    def __init__(self, bot: commands.Bot) -> None:
+    def __init__(
+        self,
+        bot: commands.Bot,
+        *,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
         self.bot = bot
-        self._sem = asyncio.Semaphore(int(os.getenv("ORA_SCHEDULER_MAX_CONCURRENCY", "1") or "1"))
+        self._sem = asyncio.Semaphore(env_int("ORA_SCHEDULER_MAX_CONCURRENCY", 4, 1, 32))
 
         self._enabled = (os.getenv("ORA_SCHEDULER_ENABLED", "0").strip() in {"1", "true", "yes", "on"})
-        tick = int(os.getenv("ORA_SCHEDULER_TICK_SEC", "15") or "15")
-        self._tick_sec = max(5, min(120, tick))
+        # Upper bound on one sleep, so a wall-clock jump is corrected within this window (no DB access).
+        self._max_sleep_sec = float(env_int("ORA_SCHEDULER_MAX_SLEEP_SEC", 300, 1, 86400))
+        self._clock = clock
+        self._sleep = sleep
+
+        self._heap: list[tuple[float, int]] = []
+        self._next_run: dict[int, float] = {}  # task_id -> due time; heap entries not matching are stale
+        self._rows: dict[int, dict] = {}
+        self._dirty: set[int] = set()
+        self._resync_all = False
+        self._changed = asyncio.Event()
+        self._inflight: set[asyncio.Task] = set()
+        self.stats = {"loads": 0, "refreshes": 0, "claims": 0, "fired": 0}
 
-        # tasks.loop interval can't be set dynamically after decoration, so we start our own loop.
         self._task: Optional[asyncio.Task] = None
 
     async def cog_load(self) -> None:
@@ -40,136 +64,230 @@ class SchedulerCog(commands.Cog):
             logger.info("Scheduler disabled (ORA_SCHEDULER_ENABLED=0).")
             return
         self._task = asyncio.create_task(self._run_loop())
-        logger.info("Scheduler started (tick=%ss, concurrency=%s).", self._tick_sec, self._sem._value)
+        logger.info("Scheduler started (event-driven, concurrency=%s).", self._sem._value)
 
     async def cog_unload(self) -> None:
         if self._task:
             self._task.cancel()
             self._task = None
 
+    def notify_task_changed(self, task_id: Optional[int] = None) -> None:
+        """Re-read one task (or, with None, all tasks) before the next wakeup decision."""
+        if task_id is None:
+            self._resync_all = True
+        else:
+            self._dirty.add(int(task_id))
+        self._changed.set()
+
+    def next_due_at(self) -> Optional[float]:
+        self._drop_stale_top()
+        return self._heap[0][0] if self._heap else None
+
+    def _schedule(self, row: dict) -> None:
+        task_id = int(row["id"])
+        due = float(row["next_run_at"])
+        self._rows[task_id] = row
+        if self._next_run.get(task_id) != due:
+            self._next_run[task_id] = due
+            heapq.heappush(self._heap, (due, task_id))
+
+    def _unschedule(self, task_id: int) -> None:
+        self._next_run.pop(task_id, None)
+        self._rows.pop(task_id, None)
+
+    def _drop_stale_top(self) -> None:
+        while self._heap and self._next_run.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    async def _load_schedule(self, store) -> None:
+        rows = await store.list_enabled_scheduled_tasks()
+        self.stats["loads"] += 1
+        self._heap.clear()
+        self._next_run.clear()
+        self._rows.clear()
+        for row in rows:
+            self._schedule(row)
+
+    async def _refresh(self, store, task_id: int) -> None:
+        self.stats["refreshes"] += 1
+        row = await store.get_scheduled_task(task_id=task_id)
+        if row is None:
+            self._unschedule(task_id)
+        else:
+            self._schedule(row)
+
+    async def _apply_changes(self, store) -> None:
+        if self._resync_all:
+            self._resync_all = False
+            self._dirty.clear()
+            await self._load_schedule(store)
+            return
+        while self._dirty:
+            await self._refresh(store, self._dirty.pop())
+
+    async def _wait(self, delay: Optional[float]) -> None:
+        """Sleep until `delay` elapses (None: until notified) or a change is notified."""
+        if self._changed.is_set():
+            return
+        waiter = asyncio.ensure_future(self._changed.wait())
+        sleeper = asyncio.ensure_future(self._sleep(min(delay, self._max_sleep_sec) if delay is not None else self._max_sleep_sec))
+        try:
+            await asyncio.wait({waiter, sleeper}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for fut in (waiter, sleeper):
+                fut.cancel()
+
     async def _run_loop(self) -> None:
+        loaded = False
         while True:
             try:
-                await self._tick()
+                store = getattr(self.bot, "store", None)
+                if store is None:
+                    await self._wait(5.0)
+                    continue
+                self._changed.clear()
+                if not loaded:
+                    await self._load_schedule(store)
+                    loaded = True
+                await self._apply_changes(store)
+                self._fire_due(store)
+                due = self.next_due_at()
+                await self._wait(None if due is None else max(0.0, due - self._clock()))
             except asyncio.CancelledError:
                 return
             except Exception as e:
-                logger.error("Scheduler tick failed: %s", e, exc_info=True)
-            await asyncio.sleep(self._tick_sec)
+                logger.error("Scheduler loop failed: %s", e, exc_info=True)
+                self._resync_all = True
+                await self._sleep(5.0)
+
+    def _fire_due(self, store) -> None:
+        now = self._clock()
+        while True:
+            self._drop_stale_top()
+            if not self._heap or self._heap[0][0] > now:
+                return
+            due, task_id = heapq.heappop(self._heap)
+            self._next_run.pop(task_id, None)  # rescheduled from the claim result
+            row = self._rows.get(task_id)
+            if row is None:
+                continue
+            task = asyncio.create_task(self._claim_and_execute(store, row, now))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
 
-    async def _tick(self) -> None:
+    async def _claim_and_execute(self, store, row: dict, now: float) -> None:
+        task_id = int(row["id"])
+        now_ts = int(now)
+        # claim first; if claim fails, someone else took it or it moved.
+        claimed = await store.claim_scheduled_task(task_id=task_id, now_ts=now_ts)
+        self.stats["claims"] += 1
+        if not claimed:
+            self.notify_task_changed(task_id)
+            return
+        interval = max(30, int(row.get("interval_sec") or 30))
+        if task_id not in self._next_run and task_id in self._rows:
+            self._schedule({**row, "next_run_at": now_ts + interval})
+            self._changed.set()
+        self.stats["fired"] += 1
+        async with self._sem:
+            await self._execute_task(row)
+
+    async def _execute_task(self, task: dict) -> None:
         store = getattr(self.bot, "store", None)
         if store is None:
             return
-        now_ts = int(time.time())
-        due = await store.get_due_scheduled_tasks(now_ts=now_ts, limit=5)
-        if not due:
-            return
 
-        for task in due:
-            # claim first; if claim fails, someone else took it or it moved.
-            claimed = await store.claim_scheduled_task(task_id=task["id"], now_ts=now_ts)
-            if not claimed:
-                continue
-            asyncio.create_task(self._execute_task(task))
+        task_id = int(task["id"])
+        owner_id = int(task["owner_id"])
+        channel_id = int(task["channel_id"])
+        guild_id = task.get("guild_id")
+        prompt = str(task.get("prompt") or "").strip()
+        model_pref = task.get("model_pref")
 
-    async def _execute_task(self, task: dict) -> None:
-        async with self._sem:
-            store = getattr(self.bot, "store", None)
-            if store is None:
-                return
+        started_at = int(time.time())
+        run_row_id = await store.insert_task_run(task_id=task_id, started_at=started_at, status="running")
 
-            task_id = int(task["id"])
-            owner_id = int(task["owner_id"])
-            channel_id = int(task["channel_id"])
-            guild_id = task.get("guild_id")
-            prompt = str(task.get("prompt") or "").strip()
-            model_pref = task.get("model_pref")
+        correlation_id = f"sched:{task_id}:{started_at}"
+        trace_event("scheduler.task_start", correlation_id=correlation_id, task_id=str(task_id), channel_id=str(channel_id))
 
-            started_at = int(time.time())
-            run_row_id = await store.insert_task_run(task_id=task_id, started_at=started_at, status="running")
+        try:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                channel = await self.bot.fetch_channel(channel_id)
+            if not channel or not hasattr(channel, "send"):
+                raise RuntimeError("target channel not found or not sendable")
 
-            correlation_id = f"sched:{task_id}:{started_at}"
-            trace_event("scheduler.task_start", correlation_id=correlation_id, task_id=str(task_id), channel_id=str(channel_id))
+            # Bind memory to the channel (so summaries can be contextual, but still "LLM-only").
+            kind = "channel"
+            ext_id = f"{guild_id}:{channel_id}" if guild_id else f"dm:{owner_id}"
+            context_binding = {"provider": "discord", "kind": kind, "external_id": ext_id}
 
-            try:
-                channel = self.bot.get_channel(channel_id)
-                if channel is None:
-                    channel = await self.bot.fetch_channel(channel_id)
-                if not channel or not hasattr(channel, "send"):
-                    raise RuntimeError("target channel not found or not sendable")
-
-                # Bind memory to the channel (so summaries can be contextual, but still "LLM-only").
-                kind = "channel"
-                ext_id = f"{guild_id}:{channel_id}" if guild_id else f"dm:{owner_id}"
-                context_binding = {"provider": "discord", "kind": kind, "external_id": ext_id}
-
-                client_context = {
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "guild_id": str(guild_id) if guild_id else None,
-                    "channel_id": str(channel_id),
-                    "is_admin": True,
-                    "scheduled_task_id": str(task_id),
-                }
-
-                # LLM-only contract for safety/reproducibility.
-                safe_prompt = (
-                    "[SCHEDULED TASK]\n"
-                    "Rules:\n"
-                    "- This is an automated run. Do not request tool calls.\n"
-                    "- Output concise Japanese.\n\n"
-                    f"{prompt}"
-                )
-
-                resp = await core_client.send_message(
-                    content=safe_prompt,
-                    provider_id=str(owner_id),
-                    display_name="ORA Scheduler",
-                    conversation_id=None,
-                    idempotency_key=f"scheduler:{task_id}:{started_at}",
-                    context_binding=context_binding,
-                    attachments=[],
-                    stream=False,
-                    client_context=client_context,
-                    available_tools=[],  # critical: no tool dispatch
-                    source="scheduler",
-                    llm_preference=model_pref,
-                    correlation_id=correlation_id,
-                    origin_context={"admin_verified": True},
-                )
-                if "error" in resp:
-                    raise RuntimeError(str(resp.get("error")))
-                run_id = resp.get("run_id")
-                if not run_id:
-                    raise RuntimeError("missing run_id from core")
-
-                final = await core_client.get_final_response(run_id, timeout=300)
-                if not final:
-                    raise RuntimeError("empty final response")
-
-                # Post result to channel (no attachments).
-                await channel.send(f"⏰ **Scheduled Task #{task_id}**\n{final.strip()}")
-
-                finished_at = int(time.time())
-                await store.finish_task_run(
-                    run_row_id=run_row_id,
-                    finished_at=finished_at,
-                    status="ok",
-                    core_run_id=str(run_id),
-                    output=final,
-                )
-                trace_event("scheduler.task_done", correlation_id=correlation_id, task_id=str(task_id), status="ok")
+            client_context = {
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "guild_id": str(guild_id) if guild_id else None,
+                "channel_id": str(channel_id),
+                "is_admin": True,
+                "scheduled_task_id": str(task_id),
+            }
 
-            except Exception as e:
-                finished_at = int(time.time())
-                await store.finish_task_run(
-                    run_row_id=run_row_id,
-                    finished_at=finished_at,
-                    status="failed",
-                    error=str(e),
-                )
-                trace_event("scheduler.task_done", correlation_id=correlation_id, task_id=str(task_id), status="failed", error=str(e))
-                logger.error("Scheduled task %s failed: %s", task_id, e, exc_info=True)
+            # LLM-only contract for safety/reproducibility.
+            safe_prompt = (
+                "[SCHEDULED TASK]\n"
+                "Rules:\n"
+                "- This is an automated run. Do not request tool calls.\n"
+                "- Output concise Japanese.\n\n"
+                f"{prompt}"
+            )
+
+            resp = await core_client.send_message(
+                content=safe_prompt,
+                provider_id=str(owner_id),
+                display_name="ORA Scheduler",
+                conversation_id=None,
+                idempotency_key=f"scheduler:{task_id}:{started_at}",
+                context_binding=context_binding,
+                attachments=[],
+                stream=False,
+                client_context=client_context,
+                available_tools=[],  # critical: no tool dispatch
+                source="scheduler",
+                llm_preference=model_pref,
+                correlation_id=correlation_id,
+                origin_context={"admin_verified": True},
+            )
+            if "error" in resp:
+                raise RuntimeError(str(resp.get("error")))
+            run_id = resp.get("run_id")
+            if not run_id:
+                raise RuntimeError("missing run_id from core")
+
+            final = await core_client.get_final_response(run_id, timeout=300)
+            if not final:
+                raise RuntimeError("empty final response")
+
+            # Post result to channel (no attachments).
+            await channel.send(f"⏰ **Scheduled Task #{task_id}**\n{final.strip()}")
+
+            finished_at = int(time.time())
+            await store.finish_task_run(
+                run_row_id=run_row_id,
+                finished_at=finished_at,
+                status="ok",
+                core_run_id=str(run_id),
+                output=final,
+            )
+            trace_event("scheduler.task_done", correlation_id=correlation_id, task_id=str(task_id), status="ok")
+
+        except Exception as e:
+            finished_at = int(time.time())
+            await store.finish_task_run(
+                run_row_id=run_row_id,
+                finished_at=finished_at,
+                status="failed",
+                error=str(e),
+            )
+            trace_event("scheduler.task_done", correlation_id=correlation_id, task_id=str(task_id), status="failed", error=str(e))
+            logger.error("Scheduled task %s failed: %s", task_id, e, exc_info=True)
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -5,6 +5,8 @@ import aiohttp
 import logging
 from typing import Optional
 
+from src.utils.http_sessions import borrow_session
+
 logger = logging.getLogger(__name__)
 
 async def generate_image(args: dict, message: discord.Message, status_manager, bot=None) -> str:
@@ -21,7 +23,7 @@ async def generate_image(args: dict, message: discord.Message, status_manager, b
     try:
         # Assuming generate_video returns bytes of mp4/gif/image
         # If it's DALL-E, it might differ. The original code called 'generate_video'.
-        data = await bot.loop.run_in_executor(None, lambda: creative_cog.comfy_client.generate_video(prompt, ""))
+        data = await creative_cog.comfy_client.generate_video(prompt, "")
         if data:
             f = discord.File(io.BytesIO(data), filename="generated.mp4")
             await message.reply(content=f"🎨 **Generated**: {prompt}", file=f)
@@ -48,7 +50,7 @@ async def layer_separation(args: dict, message: discord.Message, status_manager,
     if not creative_cog: return "❌ CreativeCog offline."
     
     try:
-        async with aiohttp.ClientSession() as session:
+        async with borrow_session() as session:
             data = aiohttp.FormData()
             data.add_field("file", await target_img.read(), filename=target_img.filename)
             async with session.post(creative_cog.layer_api, data=data) as resp:
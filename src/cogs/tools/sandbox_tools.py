@@ -15,6 +15,8 @@ from urllib.parse import urlparse
 import aiohttp
 import discord
 
+from src.utils.http_sessions import shared_session
+
 
 _GITHUB_HOSTS = {"github.com", "www.github.com"}
 _GITHUB_API = "api.github.com"
@@ -428,9 +430,8 @@ async def download_repo(args: dict, message: discord.Message, status_manager, bo
     if bot is not None and hasattr(bot, "session") and isinstance(getattr(bot, "session"), aiohttp.ClientSession):
         session = bot.session
     else:
-        session = aiohttp.ClientSession()
+        session = shared_session()
 
-    created_own_session = session is not getattr(bot, "session", None)
     zip_path: Optional[Path] = None
     extracted_root: Optional[Path] = None
     try:
@@ -561,11 +562,6 @@ async def download_repo(args: dict, message: discord.Message, status_manager, bo
                 pass
         return {"result": f"❌ sandbox_download_failed: {type(e).__name__}: {e}"}
     finally:
-        if created_own_session:
-            try:
-                await session.close()
-            except Exception:
-                pass
         if not keep:
             shutil.rmtree(sbx_dir, ignore_errors=True)
 
@@ -13,6 +13,13 @@ def _fmt_ts(ts: Optional[int]) -> str:
         return str(ts)
 
 
+def _notify_scheduler(bot, task_id: int) -> None:
+    """Wake the SchedulerCog so it re-reads this task instead of waiting for its next due time."""
+    cog = bot.get_cog("SchedulerCog") if hasattr(bot, "get_cog") else None
+    if cog is not None and hasattr(cog, "notify_task_changed"):
+        cog.notify_task_changed(task_id)
+
+
 async def schedule_task(args: dict, message: discord.Message, status_manager, bot=None):
     """
     Owner-only: create a periodic scheduled task (LLM-only).
@@ -45,6 +52,7 @@ async def schedule_task(args: dict, message: discord.Message, status_manager, bo
         model_pref=model_pref,
         enabled=enabled,
     )
+    _notify_scheduler(bot, task_id)
     return f"✅ Scheduled task created: #{task_id} (interval={interval_sec}s, enabled={enabled}, channel_id={channel_id})"
 
 
@@ -80,6 +88,8 @@ async def delete_scheduled_task(args: dict, message: discord.Message, status_man
     if store is None:
         return "❌ Store not initialized."
     ok = await store.delete_scheduled_task(owner_id=message.author.id, task_id=task_id)
+    if ok:
+        _notify_scheduler(bot, task_id)
     return "✅ Deleted." if ok else "❌ Not found."
 
 
@@ -94,5 +104,7 @@ async def toggle_scheduled_task(args: dict, message: discord.Message, status_man
     if store is None:
         return "❌ Store not initialized."
     ok = await store.set_scheduled_task_enabled(owner_id=message.author.id, task_id=task_id, enabled=enabled)
+    if ok:
+        _notify_scheduler(bot, task_id)
     return f"✅ Updated: enabled={enabled}" if ok else "❌ Not found."
 
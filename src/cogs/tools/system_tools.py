@@ -13,6 +13,19 @@ async def info(args: dict, message: discord.Message, status_manager, bot=None) -
     if bot:
         embed.add_field(name="Latency", value=f"{bot.latency*1000:.1f}ms")
         embed.add_field(name="Guilds", value=str(len(bot.guilds)))
+    try:
+        from src.utils.http_sessions import get_session_registry
+
+        pool = get_session_registry().stats()
+        embed.add_field(
+            name="HTTP Pool",
+            value=(
+                f"{pool['in_use']}/{pool['limit']} in use, {pool['waiting']} waiting\n"
+                f"reuse {pool['reuse_ratio'] * 100:.0f}% | queued {pool['queued']}"
+            ),
+        )
+    except Exception:
+        pass
     
     await message.reply(embed=embed)
     return "Status sent. [SILENT_COMPLETION]"
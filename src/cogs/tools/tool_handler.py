@@ -11,6 +11,8 @@ import aiohttp
 import discord
 import inspect
 
+from src.utils.http_sessions import borrow_session
+
 # S5 Optimization: Removed top-level imports of Skills
 # from src.skills.loader import SkillLoader
 # from src.skills.music_skill import MusicSkill
@@ -485,7 +487,7 @@ class ToolHandler:
         if not creative_cog:
             return "Creative system offline."
         try:
-            mp4_data = await self.bot.loop.run_in_executor(None, lambda: creative_cog.comfy_client.generate_video(prompt, ""))
+            mp4_data = await creative_cog.comfy_client.generate_video(prompt, "")
             if mp4_data:
                 f = discord.File(io.BytesIO(mp4_data), filename="ora_imagine.mp4")
                 await message.reply(content=f"🎨 **Generated Visual**: {prompt}", file=f)
@@ -510,7 +512,7 @@ class ToolHandler:
             return "Creative system offline."
 
         try:
-            async with aiohttp.ClientSession() as session:
+            async with borrow_session() as session:
                 data = aiohttp.FormData()
                 data.add_field("file", await target_img.read(), filename=target_img.filename)
                 async with session.post(creative_cog.layer_api, data=data) as resp:
@@ -566,7 +568,7 @@ class ToolHandler:
 
         async def _api_healthy() -> bool:
             try:
-                async with aiohttp.ClientSession() as session:
+                async with borrow_session() as session:
                     async with session.get("http://127.0.0.1:8000/api/browser/state", timeout=3) as resp:
                         return resp.status == 200
             except Exception:
@@ -818,7 +820,7 @@ class ToolHandler:
 
             # 3. Poll Local API for URL
             public_url = None
-            async with aiohttp.ClientSession() as session:
+            async with borrow_session() as session:
                 for i in range(10):
                     await asyncio.sleep(2)
                     try:
@@ -114,14 +114,16 @@ async def screenshot(args: dict, message: discord.Message, status_manager, bot=N
         await status_manager.next_step("Processing screenshot request...")
 
     try:
-        # Ensure active
-        await browser_manager.ensure_active()
-
         # Optional Navigation
         target_url = args.get("url")
         if target_url:
              target_url = target_url.strip().strip('"').strip("'").strip("<").strip(">")
 
+        # Ensure active. Browsing somewhere new gets this user a clean (pooled) context;
+        # a plain "screenshot" keeps showing the current shared page.
+        owner = str(message.author.id) if target_url and message is not None else None
+        await browser_manager.ensure_active(owner=owner)
+
         # View Settings
         dark_mode = args.get("dark_mode")
         width = args.get("width")
@@ -158,7 +160,7 @@ async def screenshot(args: dict, message: discord.Message, status_manager, bot=N
 
         if target_url:
             if status_manager: await status_manager.next_step(f"Navigating to {target_url}...")
-            await browser_manager.navigate(target_url)
+            await browser_manager.navigate(target_url, owner=owner)
 
         if delay > 0:
             await asyncio.sleep(delay)
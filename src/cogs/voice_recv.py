@@ -1,46 +1,47 @@
 import asyncio
 import logging
+import threading
 import time
 from typing import Any, Optional
 
 import discord
-import numpy as np
 from discord import app_commands
 from discord.ext import commands, voice_recv
 from src.utils.access_control import can_use_voice_listen
+from src.utils.stt_service import get_stt_service
+from src.utils.voice_vad import SegmentEvent, SpeechSegmenter, VADConfig
 
 logger = logging.getLogger(__name__)
 
-try:
-    from faster_whisper import WhisperModel
-
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
-    logger.warning("faster-whisper がインストールされていません。音声認識機能は無効化されます。")
-
 # ruff: noqa: E402
 from collections import defaultdict
 
 
 class UserVoiceBuffer:
-    def __init__(self):
-        self.buffer = bytearray()
-        self.last_packet_time = time.time()
-        self.speaking = False
-        self.speaking_frames = 0
-        self.last_stop_time = 0
+    def __init__(self, vad_config: Optional[VADConfig] = None):
+        self.segmenter = SpeechSegmenter(vad_config)
+        self.last_stop_time = 0.0
+        self.partial_inflight = False
+
+    @property
+    def speaking(self) -> bool:
+        return self.segmenter.speaking
 
 
 class VoiceSink(voice_recv.AudioSink):
     def __init__(self, cog):
         super().__init__()
         self.cog = cog
-        self.user_data = defaultdict(UserVoiceBuffer)
+        self.vad_config = VADConfig.from_env()
+        self.user_data = defaultdict(lambda: UserVoiceBuffer(self.vad_config))
         self.sample_rate = 48000
         self.channels = 2  # Discord sends stereo
         self.sample_width = 2  # 16-bit PCM
         self.conversation_mode = False
+        # Segment events for process_audio_loop; write() runs on the voice_recv thread.
+        self.events: asyncio.Queue[tuple[int, SegmentEvent]] = asyncio.Queue()
+        self._loop = cog.bot.loop
+        self._lock = threading.Lock()
 
     def wants_opus(self) -> bool:
         return False
@@ -49,29 +50,38 @@ class VoiceSink(voice_recv.AudioSink):
         if user is None:
             return
 
-        ud = self.user_data[user.id]
-        ud.last_packet_time = time.time()
-        ud.buffer.extend(data.pcm)
+        with self._lock:
+            ud = self.user_data[user.id]
+            events = ud.segmenter.push(data.pcm, time.monotonic())
 
-        # Barge-in Logic
-        ud.speaking_frames += 1
-
-        # Threshold: 5 frames (~100ms)
-        if ud.speaking_frames >= 5:
-            if not ud.speaking:
-                ud.speaking = True
+        for event in events:
+            if event.kind == "start":
                 logger.info(f"ユーザー {user.name} が話し始めました。")
-
-                # Trigger Barge-in (Stop TTS)
-                # Check cooldown (500ms)
-                if time.time() - ud.last_stop_time > 0.5:
-                    media_cog = self.cog.bot.get_cog("MediaCog")
-                    if media_cog:
-                        # Stop playback
-                        if hasattr(self.cog.bot, "voice_manager"):
-                            self.cog.bot.voice_manager.stop_playback(user.guild.id)
-                        ud.last_stop_time = time.time()
-                        logger.info("バージイン検知: 再生を停止しました。")
+                self._barge_in(user, ud)
+            else:
+                self._emit(user.id, event)
+
+    def _barge_in(self, user: Any, ud: UserVoiceBuffer) -> None:
+        # Only VAD-confirmed speech stops TTS, so background noise no longer cuts playback.
+        # Check cooldown (500ms)
+        if time.time() - ud.last_stop_time <= 0.5:
+            return
+        media_cog = self.cog.bot.get_cog("MediaCog")
+        if media_cog and hasattr(self.cog.bot, "voice_manager"):
+            self._loop.call_soon_threadsafe(self.cog.bot.voice_manager.stop_playback, user.guild.id)
+            ud.last_stop_time = time.time()
+            logger.info("バージイン検知: 再生を停止しました。")
+
+    def _emit(self, user_id: int, event: SegmentEvent) -> None:
+        self._loop.call_soon_threadsafe(self.events.put_nowait, (user_id, event))
+
+    def flush_idle(self, now: float) -> None:
+        """Close utterances for speakers whose packets stopped (called from the event loop)."""
+        with self._lock:
+            pending = [(user_id, ud.segmenter.flush_if_idle(now)) for user_id, ud in list(self.user_data.items())]
+        for user_id, events in pending:
+            for event in events:
+                self.events.put_nowait((user_id, event))
 
     def cleanup(self):
         pass
@@ -80,26 +90,15 @@ class VoiceSink(voice_recv.AudioSink):
 class VoiceRecvCog(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.model = None
+        # Whisper models, workers and batching live in the shared STT service.
+        self.stt = get_stt_service()
         self.active_sinks = {}  # guild_id -> VoiceSink
         self.processing_tasks = {}  # guild_id -> Task
 
-        if WHISPER_AVAILABLE:
-            try:
-                # Try to load on GPU first (using CTranslate2's auto detection)
-                logger.info("Faster-Whisper モデル (small) をGPUでロード中...")
-                self.model = WhisperModel("small", device="cuda", compute_type="float16")
-                logger.info("✅ Faster-Whisper モデルのロード完了 (GPU)")
-            except Exception as e:
-                logger.warning(f"GPUでのWhisperロード失敗: {e}")
-                logger.info("CPUへフォールバックします (small model, int8)...")
-                # Fallback to CPU
-                # Fallback to CPU
-                self.model = WhisperModel("small", device="cpu", compute_type="int8")
-                logger.info("⚠️ Faster-Whisper モデルをCPU (int8) でロードしました。")
-
-            # Suppress RTCP spam from voice_recv
-            logging.getLogger("discord.ext.voice_recv").setLevel(logging.WARNING)
+        if not self.stt.available:
+            logger.warning("faster-whisper がインストールされていません。音声認識機能は無効化されます。")
+        # Suppress RTCP spam from voice_recv
+        logging.getLogger("discord.ext.voice_recv").setLevel(logging.WARNING)
 
     @app_commands.command(name="listen", description="ボイスチャンネルで全員の声を聞き取ります。")
     async def listen(self, interaction: discord.Interaction):
@@ -111,13 +110,14 @@ class VoiceRecvCog(commands.Cog):
             await interaction.response.send_message("ボイスチャンネルに参加してから実行してください。", ephemeral=True)
             return
 
-        if not WHISPER_AVAILABLE:
+        if not self.stt.available:
             await interaction.response.send_message(
                 "Whisperがインストールされていないため、この機能は使用できません。", ephemeral=True
             )
             return
 
         await interaction.response.defer(ephemeral=True)
+        asyncio.create_task(self.stt.warmup())
 
         vc = interaction.guild.voice_client
         if not vc:
@@ -188,42 +188,52 @@ class VoiceRecvCog(commands.Cog):
         await interaction.response.send_message("音声認識を終了しました。", ephemeral=True)
 
     async def process_audio_loop(self, guild_id: int, text_channel: discord.TextChannel):
-        """Monitor buffer and transcribe when silence is detected."""
+        """Consume VAD segment events and transcribe partial and finished utterances."""
         logger.info(f"音声処理ループを開始: Guild {guild_id}")
         from src.web.endpoints import manager
 
+        last_flush = time.monotonic()
         while True:
-            await asyncio.sleep(0.5)
-
             sink = self.active_sinks.get(guild_id)
             if not sink:
                 break
 
-            # Iterate over all users in the sink
-            # Create a list of items to avoid runtime error if dict changes during iteration
-            # But keys (users) change rarely.
-            user_items = list(sink.user_data.items())
-
-            for user_id, ud in user_items:
-                # Check for silence (no packets for 1.0 second)
-                if ud.speaking and (time.time() - ud.last_packet_time > 1.0):
-                    # Silence detected for this user
-                    ud.speaking = False
-                    ud.speaking_frames = 0
-
-                    # Get data and clear buffer
-                    audio_data = bytes(ud.buffer)
-                    ud.buffer = bytearray()
-
-                    if len(audio_data) < 48000 * 2 * 0.5:  # Ignore < 0.5s
-                        continue
-
-                    # Transcribe in thread (Concurrent for each user)
-                    asyncio.create_task(self._handle_transcription(user_id, audio_data, sink, text_channel, manager))
+            try:
+                user_id, event = await asyncio.wait_for(sink.events.get(), timeout=0.1)
+            except asyncio.TimeoutError:
+                event = None
+
+            now = time.monotonic()
+            if now - last_flush >= 0.1:
+                sink.flush_idle(now)
+                last_flush = now
+
+            if event is None:
+                continue
+
+            if event.kind == "partial":
+                # At most one partial decode per speaker; stale partials are simply skipped.
+                ud = sink.user_data.get(user_id)
+                if ud is None or ud.partial_inflight:
+                    continue
+                ud.partial_inflight = True
+                asyncio.create_task(self._handle_partial_transcription(user_id, event.audio, ud, manager))
+            elif event.kind == "end":
+                # Queued on the shared STT pool; short utterances from several speakers are batched.
+                asyncio.create_task(self._handle_transcription(user_id, event.audio, sink, text_channel, manager))
+
+    async def _handle_partial_transcription(self, user_id, audio_data, ud, manager):
+        """Transcribe the utterance so far and push it to the Web UI while the user keeps talking."""
+        try:
+            text = await self.stt.transcribe(audio_data, drop_if_busy=True)
+            if text:
+                await manager.broadcast(f"PARTIAL_TRANSCRIPTION({user_id}):{text}")
+        finally:
+            ud.partial_inflight = False
 
     async def _handle_transcription(self, user_id, audio_data, sink, text_channel, manager):
         """Handle transcription for a single user."""
-        text = await asyncio.to_thread(self.transcribe, audio_data)
+        text = await self.stt.transcribe(audio_data)
 
         if text:
             # Broadcast to Web UI
@@ -255,32 +265,6 @@ class VoiceRecvCog(commands.Cog):
                         # Trigger ORA (Voice Mode)
                         await ora_cog.handle_prompt(dummy_message, text, is_voice=True)
 
-    def transcribe(self, pcm_data: bytes) -> str:
-        """Convert PCM to float32 and transcribe with Faster-Whisper."""
-        if not pcm_data:
-            return ""
-        try:
-            # Convert PCM 16-bit stereo to float32 mono
-            audio_np = np.frombuffer(pcm_data, dtype=np.int16).flatten().astype(np.float32) / 32768.0
-
-            # Stereo to Mono
-            audio_np = audio_np.reshape(-1, 2)
-            audio_np = audio_np.mean(axis=1)
-
-            # Resample to 16kHz (Simple decimation)
-            audio_16k = audio_np[::3]
-
-            # Faster-Whisper takes numpy array directly
-            # Returns segments generator and info
-            segments, info = self.model.transcribe(audio_16k, language="ja", beam_size=5)
-
-            # Use list() to consume generator and get all text
-            text = " ".join([segment.text for segment in segments])
-            return text.strip()
-        except Exception as e:
-            logger.error(f"文字起こし失敗: {e}")
-            return ""
-
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(VoiceRecvCog(bot))
@@ -521,8 +521,9 @@ class Config:
         # OpenAI Configuration
         openai_key = os.getenv("OPENAI_API_KEY")
 
-        # Speech-to-text configuration
-        stt_model = os.getenv("STT_MODEL", "tiny")
+        # Speech-to-text configuration: heads the STT service's model ladder (small -> base -> tiny
+        # by default, the size the voice path has always used); smaller values cap quality.
+        stt_model = os.getenv("STT_MODEL", "small")
 
         # Default for speaking search progress (0=off, 1=on)
         speak_search_progress_default_raw = os.getenv("SPEAK_SEARCH_PROGRESS_DEFAULT", "0")
@@ -1,19 +1,19 @@
 import asyncio
-import io
 import ipaddress
 import logging
 import os
 import re
 import socket
 import tempfile
+import time
 import urllib.parse
 import uuid
 from typing import Any, Optional, Tuple
 
 import aiohttp
 import discord
-from PIL import Image
 
+from src.utils.image_pipeline import ImageJob, ImagePipelineBusy, get_image_pipeline, source_hasher
 from src.utils.temp_downloads import create_temporary_download, ensure_download_public_base_url
 
 logger = logging.getLogger(__name__)
@@ -178,7 +178,7 @@ async def _find_image_url(message: discord.Message, history_limit: int) -> Optio
     return None
 
 
-async def _download_image(url: str, *, max_bytes: int = 25 * 1024 * 1024) -> bytes:
+async def _download_image(url: str, *, max_bytes: int = 25 * 1024 * 1024, hasher: Any = None) -> bytes:
     next_url, resolved_ips = await _assert_safe_image_url(url)
 
     timeout = aiohttp.ClientTimeout(total=30, connect=8)
@@ -210,10 +210,15 @@ async def _download_image(url: str, *, max_bytes: int = 25 * 1024 * 1024) -> byt
                             raise RuntimeError("image too large")
                     except Exception:
                         pass
-                data = await resp.read()
-                if len(data) > max_bytes:
-                    raise RuntimeError("image too large")
-                return data
+                # Stream so an oversized body is cut off at max_bytes, and hash while it arrives.
+                buf = bytearray()
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    buf += chunk
+                    if len(buf) > max_bytes:
+                        raise RuntimeError("image too large")
+                    if hasher is not None:
+                        hasher.update(chunk)
+                return bytes(buf)
 
     raise RuntimeError("too many redirects")
 
@@ -327,60 +332,6 @@ def _assert_peer_ip_safe(resp: aiohttp.ClientResponse, resolved_ips: set[str]) -
             continue
 
 
-def _center_crop(im: Image.Image, aspect: float) -> Image.Image:
-    w, h = im.size
-    if w <= 0 or h <= 0:
-        return im
-    cur = w / h
-    if abs(cur - aspect) < 1e-6:
-        return im
-
-    if cur > aspect:
-        # too wide -> crop width
-        new_w = int(round(h * aspect))
-        x0 = max(0, (w - new_w) // 2)
-        return im.crop((x0, 0, x0 + new_w, h))
-    # too tall -> crop height
-    new_h = int(round(w / aspect))
-    y0 = max(0, (h - new_h) // 2)
-    return im.crop((0, y0, w, y0 + new_h))
-
-
-def _contain(im: Image.Image, aspect: float, *, bg=(0, 0, 0)) -> Image.Image:
-    w, h = im.size
-    if w <= 0 or h <= 0:
-        return im
-    cur = w / h
-    if abs(cur - aspect) < 1e-6:
-        return im
-
-    if cur > aspect:
-        # too wide -> add vertical padding
-        new_h = int(round(w / aspect))
-        canvas = Image.new("RGB", (w, new_h), color=bg)
-        y0 = (new_h - h) // 2
-        canvas.paste(im.convert("RGB"), (0, y0))
-        return canvas
-    # too tall -> add horizontal padding
-    new_w = int(round(h * aspect))
-    canvas = Image.new("RGB", (new_w, h), color=bg)
-    x0 = (new_w - w) // 2
-    canvas.paste(im.convert("RGB"), (x0, 0))
-    return canvas
-
-
-def _save_image_bytes(im: Image.Image, fmt: str, jpg_quality: int) -> bytes:
-    buf = io.BytesIO()
-    if fmt == "jpg":
-        q = int(jpg_quality or 88)
-        q = max(40, min(q, 95))
-        im.convert("RGB").save(buf, format="JPEG", quality=q, optimize=True, progressive=True)
-    else:
-        # png
-        im.save(buf, format="PNG", optimize=True)
-    return buf.getvalue()
-
-
 async def execute(args: dict, message: discord.Message, bot: Any = None) -> Any:
     history_limit = int(args.get("history_limit") or 25)
     image_url = (args.get("image_url") or "").strip()
@@ -420,43 +371,42 @@ async def execute(args: dict, message: discord.Message, bot: Any = None) -> Any:
         out_fmt = "png"
     jpg_quality = int(args.get("jpg_quality") or 88)
 
-    # Download + process
-    try:
-        raw = await _download_image(image_url)
-        im = Image.open(io.BytesIO(raw))
-        im.load()
-    except Exception as e:
-        return f"❌ 画像の取得/読み込みに失敗しました: {e}"
-
-    src_w, src_h = im.size
-
-    if aspect is not None:
-        if mode == "contain":
-            im2 = _contain(im, aspect)
-        else:
-            im2 = _center_crop(im, aspect)
-    else:
-        im2 = im
-
-    if target_w and target_h:
-        im2 = im2.resize((int(target_w), int(target_h)), resample=Image.LANCZOS)
-
-    # Save to bytes (auto fallback if too big)
-    data = _save_image_bytes(im2, out_fmt, jpg_quality)
-
     ten_mb = 10 * 1024 * 1024
     guild_limit = message.guild.filesize_limit if getattr(message, "guild", None) else ten_mb
     limit_bytes = min(int(guild_limit or ten_mb), ten_mb)
     safe_upload_limit = max(1, int(limit_bytes * 0.95))
 
-    if len(data) > safe_upload_limit and out_fmt == "png":
-        # fallback to jpg if png is too big
-        for q in (90, 85, 80, 75, 70):
-            data = _save_image_bytes(im2, "jpg", q)
-            out_fmt = "jpg"
-            jpg_quality = q
-            if len(data) <= safe_upload_limit:
-                break
+    # Download, then decode/crop/resize/encode off the event loop (PNG falls back to JPG above the limit).
+    try:
+        started = time.perf_counter()
+        hasher = source_hasher()
+        raw = await _download_image(image_url, hasher=hasher)
+        download_ms = (time.perf_counter() - started) * 1000
+    except Exception as e:
+        return f"❌ 画像の取得/読み込みに失敗しました: {e}"
+
+    job = ImageJob(
+        aspect=aspect,
+        mode=mode,
+        target_w=int(target_w or 0),
+        target_h=int(target_h or 0),
+        fmt=out_fmt,
+        jpg_quality=jpg_quality,
+        max_bytes=safe_upload_limit,
+    )
+    try:
+        processed = await get_image_pipeline().process(raw, job, source_digest=hasher.digest())
+    except ImagePipelineBusy:
+        return "⏳ 画像処理が混み合っています。少し待ってからもう一度お試しください。"
+    except Exception as e:
+        return f"❌ 画像の取得/読み込みに失敗しました: {e}"
+
+    data = processed.data
+    out_fmt = processed.fmt
+    jpg_quality = processed.jpg_quality
+    src_w, src_h = processed.src_size
+    timings_ms = {"download": round(download_ms, 2), **processed.timings_ms}
+    logger.debug("image_crop_upscale timings_ms=%s cached=%s", timings_ms, processed.cached)
 
     # Output paths
     cfg = getattr(bot, "config", None) if bot else None
@@ -494,6 +444,8 @@ async def execute(args: dict, message: discord.Message, bot: Any = None) -> Any:
                     "mode": mode,
                     "format": out_fmt,
                     "size_bytes": size_bytes,
+                    "timings_ms": timings_ms,
+                    "cached": processed.cached,
                 },
             }
 
@@ -529,6 +481,8 @@ async def execute(args: dict, message: discord.Message, bot: Any = None) -> Any:
                 "download_page_url": dl_page_url,
                 "token": manifest.get("token"),
                 "size_bytes": size_bytes,
+                "timings_ms": timings_ms,
+                "cached": processed.cached,
             },
         }
 
@@ -453,7 +453,10 @@ async def execute(args: dict, message=None) -> str:
     logger.info("ReadPage: Reading %s", _sanitize_url_for_logs(url))
 
     try:
-        async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
+        # Not the shared pool: its DNS cache and keep-alive reuse would make _assert_peer_ip_safe compare
+        # a cached/reused peer against a fresh lookup. Every request here resolves and connects anew.
+        connector = aiohttp.TCPConnector(use_dns_cache=False, force_close=True)
+        async with aiohttp.ClientSession(connector=connector, headers=headers, timeout=timeout) as session:
             # 1) X/Twitter status -> try oEmbed first (most reliable without API key)
             if _is_x_status(url):
                 ok, out = await _fetch_x_oembed(session, url)
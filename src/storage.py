@@ -9,7 +9,7 @@ import sqlite3
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Sequence, Tuple
+from typing import Any, Optional, Sequence, Tuple
 
 import aiosqlite
 
@@ -949,21 +949,45 @@ class Store:
                 (int(now_ts), int(limit)),
             ) as cur:
                 rows = await cur.fetchall()
-        out: list[dict] = []
-        for r in rows:
-            out.append(
-                {
-                    "id": int(r[0]),
-                    "owner_id": int(r[1]),
-                    "guild_id": r[2],
-                    "channel_id": int(r[3]),
-                    "prompt": r[4],
-                    "interval_sec": int(r[5]),
-                    "model_pref": r[6],
-                    "next_run_at": int(r[7]),
-                }
-            )
-        return out
+        return [self._scheduled_task_row(r) for r in rows]
+
+    @staticmethod
+    def _scheduled_task_row(r: Any) -> dict:
+        return {
+            "id": int(r[0]),
+            "owner_id": int(r[1]),
+            "guild_id": r[2],
+            "channel_id": int(r[3]),
+            "prompt": r[4],
+            "interval_sec": int(r[5]),
+            "model_pref": r[6],
+            "next_run_at": int(r[7]),
+        }
+
+    async def list_enabled_scheduled_tasks(self) -> list[dict]:
+        """All enabled tasks (same shape as get_due_scheduled_tasks), for the scheduler's in-memory heap."""
+        async with aiosqlite.connect(self._db_path) as db:
+            async with db.execute(
+                (
+                    "SELECT id, owner_id, guild_id, channel_id, prompt, interval_sec, model_pref, next_run_at "
+                    "FROM scheduled_tasks WHERE enabled=1 ORDER BY next_run_at ASC"
+                ),
+            ) as cur:
+                rows = await cur.fetchall()
+        return [self._scheduled_task_row(r) for r in rows]
+
+    async def get_scheduled_task(self, *, task_id: int) -> Optional[dict]:
+        """One enabled task, or None if it was deleted or disabled."""
+        async with aiosqlite.connect(self._db_path) as db:
+            async with db.execute(
+                (
+                    "SELECT id, owner_id, guild_id, channel_id, prompt, interval_sec, model_pref, next_run_at "
+                    "FROM scheduled_tasks WHERE id=? AND enabled=1"
+                ),
+                (int(task_id),),
+            ) as cur:
+                row = await cur.fetchone()
+        return self._scheduled_task_row(row) if row else None
 
     async def claim_scheduled_task(self, *, task_id: int, now_ts: int) -> bool:
         """
@@ -4,6 +4,8 @@ import re
 from datetime import datetime, timezone
 from typing import Any, Dict
 
+from src.utils.trace_rollup import METRICS_EVENT, record_trace_event
+
 SENSITIVE_KEYS = ("token", "secret", "password", "api_key", "authorization", "cookie", "webhook")
 
 
@@ -57,8 +59,9 @@ def trace_event(event: str, correlation_id: str = "", **payload: Any) -> None:
     """Write a sanitized single-line JSON trace event for agent debugging."""
     if not _is_enabled():
         return
+    now = datetime.now(timezone.utc)
     record = {
-        "ts": datetime.now(timezone.utc).isoformat(),
+        "ts": now.isoformat(),
         "event": event,
         "cid": correlation_id,
         "payload": _sanitize(payload),
@@ -67,3 +70,5 @@ def trace_event(event: str, correlation_id: str = "", **payload: Any) -> None:
     os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
     with open(path, "a", encoding="utf-8", errors="ignore") as f:
         f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    if event == METRICS_EVENT:
+        record_trace_event(event, record["payload"], ts=now)
@@ -0,0 +1,342 @@
+"""
+Bounded priority scheduler for background LLM analysis jobs (MemoryCog profiles).
+
+Every trigger used to fire `asyncio.create_task(...)` directly, so a history
+scan or a busy guild could start hundreds of analyses at once: they all parked
+on one semaphore, held their message lists in memory, and burned provider quota
+in whatever order the loop happened to wake them.
+
+- One queue, a fixed number of workers (ORA_MEMORY_ANALYSIS_CONCURRENCY).
+- Priority classes: live chat triggers run before manual requests, which run
+  before the periodic worker, history backfill and idle token burning.
+- One pending job per (user, guild, scope): re-submits merge their messages into
+  the queued job (keeping the better priority) instead of queueing a duplicate.
+- Small background jobs are batched: several users' short logs go into one LLM
+  call when a batch runner is provided. Only public logs from the same guild
+  share a prompt; private/DM logs are always analyzed alone.
+- Budget gate: above ORA_MEMORY_BUDGET_STOP_RATIO of the daily budget, only
+  LIVE jobs are admitted or dispatched; the rest wait (or are refused at submit).
+- The queue is bounded (ORA_MEMORY_QUEUE_MAX). When full, a better-priority job
+  evicts the newest job of the worst class; otherwise the submit is refused.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Optional
+
+from src.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+
+class JobPriority(IntEnum):
+    LIVE = 0  # 5-message trigger from on_message
+    MANUAL = 1  # dashboard / slash-command requests
+    PERIODIC = 2  # memory_worker buffer flush
+    BACKFILL = 3  # history scans, ghost-user recovery
+    IDLE = 4  # surplus token burner
+
+
+JobKey = tuple[int, Any, bool]  # (user_id, guild_id, is_public)
+
+
+@dataclass
+class AnalysisJob:
+    user_id: int
+    guild_id: Any
+    is_public: bool
+    messages: list[dict[str, Any]]
+    priority: JobPriority
+    enqueued_at: float = field(default_factory=time.monotonic)
+    seq: int = 0
+    batchable: bool = True
+
+    @property
+    def key(self) -> JobKey:
+        return (self.user_id, self.guild_id, self.is_public)
+
+
+Runner = Callable[[AnalysisJob], Awaitable[None]]
+BatchRunner = Callable[[list[AnalysisJob]], Awaitable[list[AnalysisJob]]]
+BudgetProbe = Callable[[], Optional[float]]
+
+
+def _message_identity(m: dict[str, Any]) -> tuple[Any, ...]:
+    mid = m.get("id")
+    if mid:
+        return ("id", mid)
+    return ("ts", m.get("timestamp"), m.get("content"))
+
+
+class AnalysisScheduler:
+    """Priority queue + worker pool for per-user analysis jobs."""
+
+    def __init__(
+        self,
+        runner: Runner,
+        *,
+        batch_runner: Optional[BatchRunner] = None,
+        budget_probe: Optional[BudgetProbe] = None,
+        concurrency: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        max_messages_per_job: Optional[int] = None,
+        batch_max_users: Optional[int] = None,
+        batch_small_messages: Optional[int] = None,
+        budget_stop_ratio: Optional[float] = None,
+        budget_retry_sec: float = 60.0,
+    ) -> None:
+        self._runner = runner
+        self._batch_runner = batch_runner
+        self._budget_probe = budget_probe
+        self.concurrency = concurrency if concurrency is not None else env_int("ORA_MEMORY_ANALYSIS_CONCURRENCY", 2, 1, 64)
+        self.max_pending = max_pending if max_pending is not None else env_int("ORA_MEMORY_QUEUE_MAX", 200, 1, 100_000)
+        self.max_messages_per_job = (
+            max_messages_per_job if max_messages_per_job is not None else env_int("ORA_MEMORY_JOB_MAX_MESSAGES", 100, 5, 5000)
+        )
+        self.batch_max_users = batch_max_users if batch_max_users is not None else env_int("ORA_MEMORY_BATCH_USERS", 4, 1, 32)
+        self.batch_small_messages = (
+            batch_small_messages if batch_small_messages is not None else env_int("ORA_MEMORY_BATCH_SMALL_MSGS", 12, 1, 500)
+        )
+        self.budget_stop_ratio = (
+            budget_stop_ratio if budget_stop_ratio is not None else env_float("ORA_MEMORY_BUDGET_STOP_RATIO", 0.9, 0.0, 10.0)
+        )
+        self.budget_retry_sec = budget_retry_sec
+
+        self._pending: dict[JobKey, AnalysisJob] = {}
+        self._heap: list[tuple[int, int, JobKey]] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._workers: list[asyncio.Task[None]] = []
+        self._running = 0
+        self._closed = False
+        self._done_at: deque[float] = deque(maxlen=1000)
+        self._waits_ms: deque[float] = deque(maxlen=500)
+        self._stats = {
+            "submitted": 0,
+            "merged": 0,
+            "completed": 0,
+            "failed": 0,
+            "batched_calls": 0,
+            "batched_jobs": 0,
+            "evicted": 0,
+            "rejected_full": 0,
+            "rejected_budget": 0,
+            "deferred_budget": 0,
+        }
+
+    # ---------------------------------------------------------------- submit
+
+    def _budget_blocked(self) -> bool:
+        if self._budget_probe is None:
+            return False
+        try:
+            ratio = self._budget_probe()
+        except Exception:
+            return False
+        return ratio is not None and ratio >= self.budget_stop_ratio
+
+    def submit(
+        self,
+        user_id: int,
+        messages: list[dict[str, Any]],
+        guild_id: Any = None,
+        is_public: bool = True,
+        priority: JobPriority = JobPriority.PERIODIC,
+    ) -> str:
+        """Queue (or merge) an analysis. Returns "queued", "merged", "budget" or "full"."""
+        if not messages or self._closed:
+            return "full"
+        priority = JobPriority(priority)
+        key: JobKey = (user_id, guild_id, is_public)
+
+        existing = self._pending.get(key)
+        if existing is not None:
+            seen = {_message_identity(m) for m in existing.messages}
+            existing.messages.extend(m for m in messages if _message_identity(m) not in seen)
+            del existing.messages[: -self.max_messages_per_job]
+            if priority < existing.priority:
+                existing.priority = priority
+                existing.seq = next(self._seq)
+                heapq.heappush(self._heap, (existing.priority, existing.seq, key))
+            self._stats["merged"] += 1
+            self._wakeup.set()
+            return "merged"
+
+        if priority != JobPriority.LIVE and self._budget_blocked():
+            self._stats["rejected_budget"] += 1
+            return "budget"
+
+        if len(self._pending) >= self.max_pending and not self._evict_worse_than(priority):
+            self._stats["rejected_full"] += 1
+            return "full"
+
+        job = AnalysisJob(
+            user_id=user_id,
+            guild_id=guild_id,
+            is_public=is_public,
+            messages=list(messages)[-self.max_messages_per_job :],
+            priority=priority,
+            seq=next(self._seq),
+        )
+        self._pending[key] = job
+        heapq.heappush(self._heap, (job.priority, job.seq, key))
+        self._stats["submitted"] += 1
+        self._ensure_workers()
+        self._wakeup.set()
+        return "queued"
+
+    def _evict_worse_than(self, priority: JobPriority) -> bool:
+        victim = max(self._pending.values(), key=lambda j: (j.priority, j.seq), default=None)
+        if victim is None or victim.priority <= priority:
+            return False
+        del self._pending[victim.key]
+        self._stats["evicted"] += 1
+        logger.info(f"AnalysisScheduler: evicted {victim.priority.name} job for user {victim.user_id} (queue full)")
+        return True
+
+    # ---------------------------------------------------------------- dispatch
+
+    def _pop_ready(self) -> Optional[AnalysisJob]:
+        """Best pending job that may run now (respects the budget gate)."""
+        blocked = self._budget_blocked()
+        skipped: list[tuple[int, int, JobKey]] = []
+        job: Optional[AnalysisJob] = None
+        while self._heap:
+            prio, seq, key = heapq.heappop(self._heap)
+            cand = self._pending.get(key)
+            if cand is None or cand.seq != seq:
+                continue  # stale heap entry (merged, upgraded or evicted)
+            if blocked and cand.priority != JobPriority.LIVE:
+                skipped.append((prio, seq, key))
+                continue
+            job = self._pending.pop(key)
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        if job is None and skipped:
+            self._stats["deferred_budget"] += 1
+        return job
+
+    def _take_batch_partners(self, first: AnalysisJob) -> list[AnalysisJob]:
+        if (
+            self._batch_runner is None
+            or self.batch_max_users <= 1
+            or first.priority == JobPriority.LIVE
+            or not first.batchable
+            or not first.is_public
+            or first.guild_id is None
+            or len(first.messages) > self.batch_small_messages
+        ):
+            return []
+        partners = [
+            j
+            for j in self._pending.values()
+            if j.priority == first.priority
+            and j.is_public
+            and j.guild_id == first.guild_id
+            and j.batchable
+            and len(j.messages) <= self.batch_small_messages
+        ]
+        partners.sort(key=lambda j: j.seq)
+        partners = partners[: self.batch_max_users - 1]
+        for j in partners:
+            del self._pending[j.key]
+        return partners
+
+    def _ensure_workers(self) -> None:
+        if self._closed:
+            return
+        self._workers = [w for w in self._workers if not w.done()]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        while len(self._workers) < self.concurrency:
+            self._workers.append(loop.create_task(self._worker(), name=f"analysis-worker-{len(self._workers)}"))
+
+    async def _worker(self) -> None:
+        while not self._closed:
+            job = self._pop_ready()
+            if job is None:
+                self._wakeup.clear()
+                timeout = self.budget_retry_sec if self._pending else None
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            batch = [job, *self._take_batch_partners(job)]
+            now = time.monotonic()
+            for j in batch:
+                self._waits_ms.append((now - j.enqueued_at) * 1000)
+            self._running += len(batch)
+            try:
+                if len(batch) > 1 and self._batch_runner is not None:
+                    self._stats["batched_calls"] += 1
+                    self._stats["batched_jobs"] += len(batch)
+                    leftovers = await self._batch_runner(batch) or []
+                    for j in leftovers:  # not covered by the batched answer: retry alone
+                        self.submit(j.user_id, j.messages, j.guild_id, j.is_public, j.priority)
+                        requeued = self._pending.get(j.key)
+                        if requeued is not None:
+                            requeued.batchable = False
+                    done = len(batch) - len(leftovers)
+                else:
+                    await self._runner(job)
+                    done = 1
+                self._stats["completed"] += done
+                stamp = time.monotonic()
+                self._done_at.extend([stamp] * done)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += len(batch)
+                logger.error(f"AnalysisScheduler: job for user {job.user_id} failed: {e}")
+            finally:
+                self._running -= len(batch)
+            await asyncio.sleep(0)
+
+    # ---------------------------------------------------------------- control
+
+    async def join(self, timeout: Optional[float] = None) -> None:
+        """Wait until nothing is pending or running (tests, graceful shutdown)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending or self._running:
+            if deadline is not None and time.monotonic() > deadline:
+                raise asyncio.TimeoutError()
+            await asyncio.sleep(0.01)
+
+    async def stop(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        for w in self._workers:
+            w.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def stats(self) -> dict[str, Any]:
+        now = time.monotonic()
+        by_priority = {p.name.lower(): 0 for p in JobPriority}
+        for j in self._pending.values():
+            by_priority[j.priority.name.lower()] += 1
+        waits = sorted(self._waits_ms)
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "pending_by_priority": by_priority,
+            "running": self._running,
+            "concurrency": self.concurrency,
+            "throughput_per_min": sum(1 for t in self._done_at if now - t <= 60.0),
+            "wait_ms_p50": round(waits[len(waits) // 2], 1) if waits else 0.0,
+            "wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else 0.0,
+            "budget_blocked": self._budget_blocked(),
+        }
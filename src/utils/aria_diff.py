@@ -0,0 +1,187 @@
+"""Subtree diffs for Playwright ARIA snapshots.
+
+Why:
+- `BrowserAgent.observe()` used to hand the whole (truncated) snapshot to the LLM
+  after every action, even when a click only toggled one checkbox.
+- Playwright keeps `[ref=eN]` stable for an element while its role/name do not
+  change, so refs make good node identities across snapshots; ref-less lines are
+  keyed by (parent, text, sibling ordinal).
+- Each node carries a bottom-up digest of its subtree, so unchanged subtrees are
+  skipped in O(1) and only changed/added/removed subtrees are emitted.
+
+Output format (one line per emitted node, original indentation kept):
+- `+ ` node added (its whole subtree follows with `+ `)
+- `~ ` node line changed in place (children are diffed separately)
+- `  ` unchanged ancestor printed once for context
+- `- ` top-most removed node from the previous snapshot
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Hashable
+
+_REF_RE = re.compile(r"\[ref=(?P<ref>[a-z]\d+)\]")
+
+
+@dataclass(slots=True)
+class AriaNode:
+    key: Hashable
+    line: str
+    indent: int
+    parent: int
+    start: int
+    end: int = 0
+    digest: int = 0
+    ref: str | None = None
+    children: list[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class AriaTree:
+    lines: list[str]
+    nodes: list[AriaNode]
+    roots: list[int]
+    by_key: dict[Hashable, int]
+
+    @property
+    def digest(self) -> int:
+        return hash(tuple(self.nodes[idx].digest for idx in self.roots))
+
+    def refs(self) -> list[str]:
+        return [node.ref for node in self.nodes if node.ref]
+
+
+@dataclass(slots=True)
+class AriaDiff:
+    text: str
+    changed_refs: set[str]
+    removed_refs: set[str]
+    unchanged_subtrees: int
+    changed_nodes: int
+    removed_nodes: int
+
+    @property
+    def empty(self) -> bool:
+        return not self.text
+
+
+def parse_aria_tree(text: str) -> AriaTree:
+    """Parse an indentation-structured ARIA snapshot into keyed nodes with subtree digests."""
+    lines = text.splitlines()
+    nodes: list[AriaNode] = []
+    roots: list[int] = []
+    by_key: dict[Hashable, int] = {}
+    occurrences: dict[tuple[int, str], int] = {}
+    stack: list[int] = []
+
+    def close(idx: int, end: int) -> None:
+        node = nodes[idx]
+        node.end = end
+        node.digest = hash((node.line.strip(), tuple(nodes[c].digest for c in node.children)))
+
+    for i, raw in enumerate(lines):
+        content = raw.strip()
+        if not content:
+            continue
+        indent = len(raw) - len(raw.lstrip(" "))
+        while stack and nodes[stack[-1]].indent >= indent:
+            close(stack.pop(), i)
+        parent = stack[-1] if stack else -1
+
+        match = _REF_RE.search(content)
+        ref = match.group("ref") if match else None
+        if ref is not None:
+            key: Hashable = ref
+        else:
+            slot = (parent, content)
+            ordinal = occurrences.get(slot, 0)
+            occurrences[slot] = ordinal + 1
+            key = (nodes[parent].key if parent >= 0 else None, content, ordinal)
+        if key in by_key:
+            # A duplicated ref (e.g. frames re-rendered mid-snapshot): keep it addressable.
+            key = (key, i)
+
+        idx = len(nodes)
+        nodes.append(AriaNode(key=key, line=raw, indent=indent, parent=parent, start=i, ref=ref))
+        by_key[key] = idx
+        if parent >= 0:
+            nodes[parent].children.append(idx)
+        else:
+            roots.append(idx)
+        stack.append(idx)
+
+    while stack:
+        close(stack.pop(), len(lines))
+    return AriaTree(lines=lines, nodes=nodes, roots=roots, by_key=by_key)
+
+
+def diff_aria_trees(prev: AriaTree, cur: AriaTree) -> AriaDiff:
+    """Return only the subtrees of `cur` that differ from `prev`, plus the removed ones."""
+    out: list[str] = []
+    emitted: set[int] = set()
+    changed_refs: set[str] = set()
+    unchanged = 0
+    changed = 0
+
+    def flush_context(idx: int) -> None:
+        chain = []
+        parent = cur.nodes[idx].parent
+        while parent >= 0 and parent not in emitted:
+            chain.append(parent)
+            parent = cur.nodes[parent].parent
+        for ancestor in reversed(chain):
+            emitted.add(ancestor)
+            out.append("  " + cur.nodes[ancestor].line)
+
+    stack = list(reversed(cur.roots))
+    while stack:
+        idx = stack.pop()
+        node = cur.nodes[idx]
+        old_idx = prev.by_key.get(node.key)
+        old = prev.nodes[old_idx] if old_idx is not None else None
+        if old is not None and old.digest == node.digest:
+            unchanged += 1
+            continue
+        if old is None:
+            flush_context(idx)
+            for sub in range(idx, len(cur.nodes)):
+                sub_node = cur.nodes[sub]
+                if sub_node.start >= node.end:
+                    break
+                emitted.add(sub)
+                out.append("+ " + sub_node.line)
+                if sub_node.ref:
+                    changed_refs.add(sub_node.ref)
+                changed += 1
+            continue
+        if old.line.strip() != node.line.strip():
+            flush_context(idx)
+            emitted.add(idx)
+            out.append("~ " + node.line)
+            if node.ref:
+                changed_refs.add(node.ref)
+            changed += 1
+        stack.extend(reversed(node.children))
+
+    removed_refs: set[str] = set()
+    removed = 0
+    for old in prev.nodes:
+        if old.key in cur.by_key:
+            continue
+        if old.ref:
+            removed_refs.add(old.ref)
+        if old.parent >= 0 and prev.nodes[old.parent].key not in cur.by_key:
+            continue
+        removed += 1
+        out.append("- " + old.line)
+
+    return AriaDiff(
+        text="\n".join(out),
+        changed_refs=changed_refs,
+        removed_refs=removed_refs,
+        unchanged_subtrees=unchanged,
+        changed_nodes=changed,
+        removed_nodes=removed,
+    )
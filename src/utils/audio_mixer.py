@@ -0,0 +1,230 @@
+"""
+Frame mixer for Discord playback (48 kHz / 16-bit / stereo, 20 ms frames).
+
+`AudioPlayer` calls `read()` every 20 ms on its own thread, so the mixer is
+written for that loop:
+
+- all scratch buffers (float accumulator, per-sample gain ramp, int16 output,
+  zero-padded input) are allocated once per mixer, not per frame
+- any number of layers (music, TTS, sound effects) each carry a gain envelope;
+  fades are interpolated per sample, so ducking has no 20 ms zipper steps
+- the sum is clipped to int16 instead of wrapping around on overload
+- pure NumPy: no `audioop`, which is gone from the stdlib in Python 3.13
+
+`MixingAudioSource` keeps the constructor of the old audioop-based source
+(music ducked under one overlay) and adds `add_overlay()` for more layers.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Optional
+
+import discord
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000  # 960 per channel
+FRAME_BYTES = FRAME_SAMPLES * CHANNELS * 2  # 3840
+
+
+class GainEnvelope:
+    """Linear gain ramp evaluated per sample across frame boundaries."""
+
+    __slots__ = ("gain", "target", "_step")
+
+    def __init__(self, gain: float = 1.0) -> None:
+        self.gain = float(gain)
+        self.target = float(gain)
+        self._step = 0.0
+
+    def ramp_to(self, target: float, duration_sec: float) -> None:
+        self.target = float(target)
+        samples = max(1.0, float(duration_sec) * SAMPLE_RATE)
+        self._step = abs(self.target - self.gain) / samples
+
+    def set(self, gain: float) -> None:
+        self.gain = self.target = float(gain)
+        self._step = 0.0
+
+    @property
+    def settled(self) -> bool:
+        return self.gain == self.target
+
+    def advance(self, samples: int) -> tuple[float, float]:
+        """Returns (gain at frame start, gain after `samples`) and moves the envelope."""
+        start = self.gain
+        if start != self.target:
+            delta = self._step * samples
+            if abs(self.target - start) <= delta or self._step == 0.0:
+                self.gain = self.target
+            else:
+                self.gain = start + delta if self.target > start else start - delta
+        return start, self.gain
+
+
+class FrameMixer:
+    """Sums N int16 stereo frames with per-sample gains into one clipped frame."""
+
+    def __init__(self) -> None:
+        self._acc = np.zeros((FRAME_SAMPLES, CHANNELS), dtype=np.float32)
+        self._layer = np.zeros((FRAME_SAMPLES, CHANNELS), dtype=np.float32)
+        self._gain = np.zeros((FRAME_SAMPLES, 1), dtype=np.float32)
+        self._ramp = (np.arange(1, FRAME_SAMPLES + 1, dtype=np.float32) / FRAME_SAMPLES).reshape(-1, 1)
+        self._pad = np.zeros(FRAME_SAMPLES * CHANNELS, dtype=np.int16)
+        self._out = np.zeros((FRAME_SAMPLES, CHANNELS), dtype=np.int16)
+
+    def _frame_view(self, data: bytes) -> np.ndarray:
+        if len(data) == FRAME_BYTES:
+            return np.frombuffer(data, dtype=np.int16).reshape(FRAME_SAMPLES, CHANNELS)
+        # Short tail frame (end of stream): copy into the zeroed pad buffer.
+        n = min(len(data), FRAME_BYTES) // 2
+        self._pad[:n] = np.frombuffer(data, dtype=np.int16, count=n)
+        self._pad[n:] = 0
+        return self._pad.reshape(FRAME_SAMPLES, CHANNELS)
+
+    def mix(self, layers: list[tuple[bytes, GainEnvelope]]) -> bytes:
+        acc = self._acc
+        acc.fill(0.0)
+        for data, envelope in layers:
+            start, end = envelope.advance(FRAME_SAMPLES)
+            if not data:
+                continue
+            if start == end == 0.0:
+                continue
+            np.copyto(self._layer, self._frame_view(data), casting="unsafe")
+            if start == end:
+                if start != 1.0:
+                    self._layer *= np.float32(start)
+            else:
+                np.multiply(self._ramp, np.float32(end - start), out=self._gain)
+                self._gain += np.float32(start)
+                self._layer *= self._gain
+            acc += self._layer
+        np.clip(acc, -32768.0, 32767.0, out=acc)
+        np.copyto(self._out, acc, casting="unsafe")
+        return self._out.tobytes()
+
+
+class _Layer:
+    __slots__ = ("source", "envelope", "on_finish", "finished")
+
+    def __init__(self, source: discord.AudioSource, gain: float, on_finish: Optional[Callable[[], None]]) -> None:
+        self.source = source
+        self.envelope = GainEnvelope(gain)
+        self.on_finish = on_finish
+        self.finished = False
+
+
+class MixingAudioSource(discord.AudioSource):
+    """Main source (music) ducked under any number of overlay sources (TTS, effects)."""
+
+    def __init__(
+        self,
+        main_source: discord.AudioSource,
+        overlay_source: Optional[discord.AudioSource] = None,
+        target_volume: float = 0.2,
+        fade_duration: float = 0.5,
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.main = main_source
+        self.target_volume = target_volume
+        self.fade_duration = fade_duration
+        self.main_envelope = GainEnvelope(1.0)
+        self.main_finished = False
+        self._overlays: list[_Layer] = []
+        self._lock = threading.Lock()
+        self._mixer = FrameMixer()
+        if overlay_source is not None:
+            self.add_overlay(overlay_source, on_finish=on_finish)
+
+    @property
+    def overlay(self) -> Optional[discord.AudioSource]:
+        with self._lock:
+            return self._overlays[0].source if self._overlays else None
+
+    @property
+    def overlay_count(self) -> int:
+        with self._lock:
+            return len(self._overlays)
+
+    @property
+    def current_volume(self) -> float:
+        return self.main_envelope.gain
+
+    def add_overlay(
+        self,
+        source: discord.AudioSource,
+        *,
+        gain: float = 1.0,
+        on_finish: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Mix another source on top; the main source ducks while any overlay plays."""
+        with self._lock:
+            self._overlays.append(_Layer(source, gain, on_finish))
+            self.main_envelope.ramp_to(self.target_volume, self.fade_duration)
+
+    def _finish_overlay(self, layer: _Layer) -> None:
+        layer.finished = True
+        try:
+            layer.source.cleanup()
+        except Exception:
+            pass
+        if layer.on_finish:
+            try:
+                layer.on_finish()
+            except Exception as e:
+                logger.error(f"MixingAudioSource callback error: {e}")
+
+    def read(self) -> bytes:
+        main_data = b""
+        if not self.main_finished:
+            main_data = self.main.read()
+            if not main_data:
+                self.main_finished = True
+
+        with self._lock:
+            overlays = list(self._overlays)
+
+        layers: list[tuple[bytes, GainEnvelope]] = [(main_data, self.main_envelope)]
+        done: list[_Layer] = []
+        for layer in overlays:
+            data = layer.source.read()
+            if data:
+                layers.append((data, layer.envelope))
+            else:
+                done.append(layer)
+
+        if done:
+            with self._lock:
+                self._overlays = [layer for layer in self._overlays if layer not in done]
+                if not self._overlays:
+                    # Last overlay ended: bring the music back up.
+                    self.main_envelope.ramp_to(1.0, self.fade_duration)
+            for layer in done:
+                self._finish_overlay(layer)
+
+        if len(layers) == 1:
+            if not main_data:
+                return b""
+            if self.main_envelope.settled and self.main_envelope.gain == 1.0 and len(main_data) == FRAME_BYTES:
+                return main_data
+        return self._mixer.mix(layers)
+
+    def is_opus(self) -> bool:
+        return False
+
+    def cleanup(self) -> None:
+        self.main.cleanup()
+        with self._lock:
+            overlays, self._overlays = self._overlays, []
+        for layer in overlays:
+            try:
+                layer.source.cleanup()
+            except Exception:
+                pass
@@ -3,6 +3,7 @@ import logging
 import os
 from typing import Optional
 from src.utils.browser_agent import BrowserAgent
+from src.utils.browser_pool import BrowserContextPool, PooledContext
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,10 @@ class BrowserManager:
         self.is_recording = False
         self.recording_dir = None
         self.last_url = None
+        # Pre-launched contexts; the agent attaches to a lease instead of launching Chromium itself.
+        self.pool = BrowserContextPool(headless=headless)
+        self._lease: Optional[PooledContext] = None
+        self.owner: Optional[str] = None
 
     def is_ready(self) -> bool:
         """Returns True if the browser agent is started and ready."""
@@ -111,12 +116,52 @@ class BrowserManager:
         except RuntimeError:
             return None
 
-    async def start(self):
-        """Starts the BrowserAgent."""
+    async def prewarm(self) -> None:
+        """Launches Chromium and fills the context pool ahead of the first web tool call."""
+        if self.pool.enabled and self.pool.headless == self.headless:
+            await self.pool.prewarm()
+
+    def pool_metrics(self) -> dict:
+        return self.pool.metrics()
+
+    async def _release_lease(self, *, reuse: bool = True) -> None:
+        lease, self._lease = self._lease, None
+        await self.agent.close()
+        if lease is not None:
+            await self.pool.release(lease, reuse=reuse)
+
+    async def _start_agent(self) -> None:
+        if self.pool.enabled and self.pool.headless == self.headless:
+            try:
+                lease = await self.pool.acquire(owner=self.owner)
+            except Exception as e:
+                logger.warning(f"Browser pool unavailable, launching directly: {e}")
+            else:
+                try:
+                    await self.agent.attach(lease.context, playwright_handle=self.pool.playwright)
+                except Exception:
+                    await self.pool.release(lease, reuse=False)
+                    raise
+                self._lease = lease
+                return
+        await self.agent.start(headless=self.headless)
+
+    async def start(self, owner: Optional[str] = None):
+        """Starts the BrowserAgent.
+
+        With an ``owner`` that differs from the current session's, the current
+        context is wiped and returned to the pool and the new owner gets a clean one.
+        """
         async with self._lock:
+            if owner is not None and owner != self.owner and self.agent.is_started() and not self.is_recording:
+                await self._release_lease()
+            if owner is not None:
+                self.owner = owner
+            if self.agent.needs_restart():
+                await self._release_lease(reuse=False)
             if not self.agent.is_started():
-                await self.agent.start(headless=self.headless)
-                logger.info(f"BrowserAgent started (Headless: {self.headless})")
+                await self._start_agent()
+                logger.info(f"BrowserAgent started (Headless: {self.headless}, pooled: {self._lease is not None})")
 
                 # Default homepage
                 try:
@@ -124,18 +169,27 @@ class BrowserManager:
                 except Exception as e:
                     logger.warning(f"Failed to load default homepage: {e}")
 
-    async def ensure_active(self):
-        """Ensures the browser is active."""
-        if not self.agent.is_started() or self.agent.needs_restart():
-            await self.start()
+    async def ensure_active(self, owner: Optional[str] = None):
+        """Ensures the browser is active (and belongs to ``owner`` when given)."""
+        if (
+            not self.agent.is_started()
+            or self.agent.needs_restart()
+            or (owner is not None and owner != self.owner)
+        ):
+            await self.start(owner=owner)
 
     async def close(self):
-        """Closes the BrowserAgent."""
+        """Closes the BrowserAgent (a pooled context is wiped and kept warm)."""
         async with self._lock:
-            await self.agent.close()
+            await self._release_lease()
             logger.info("BrowserAgent closed.")
 
-    async def navigate(self, url: str) -> str:
+    async def shutdown(self):
+        """Closes the session and the warm pool (bot shutdown)."""
+        await self.close()
+        await self.pool.close()
+
+    async def navigate(self, url: str, owner: Optional[str] = None) -> str:
         """Navigates to a URL and returns the page title."""
         # SECURITY BLOCKLIST
         BLOCKED_DOMAINS = [
@@ -162,7 +216,7 @@ class BrowserManager:
             logger.warning(f"Blocked navigation to sensitive site: {url}")
             raise Exception("Security Block: Accessing IP checking sites is restricted to protect server identity.")
 
-        await self.ensure_active()
+        await self.ensure_active(owner=owner)
         try:
             result = await self.agent.act({"type": "goto", "url": url})
             if not result["ok"]:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 # mypy: ignore-errors
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from collections import deque
 import contextlib
 import logging
@@ -11,6 +11,10 @@ import uuid
 import asyncio
 import re
 import os
+import time
+
+from src.utils.aria_diff import AriaTree, diff_aria_trees, parse_aria_tree
+from src.utils.env import env_float
 
 try:
     import playwright
@@ -36,6 +40,7 @@ else:
 
 BrowserMode = Literal["launch", "cdp"]
 RefMode = Literal["aria", "role", "css"]
+ObserveMode = Literal["full", "diff"]
 
 log = logging.getLogger(__name__)
 
@@ -66,6 +71,59 @@ ARIA_REF_LINE_RE = re.compile(
 MAX_REF_ENTRIES = 200
 MIN_BBOX_ENTRIES = 5
 MAX_SELECTOR_CHARS = 200
+# Per-tab snapshots kept as diff baselines (one per ref generation).
+MAX_SNAPSHOT_HISTORY = 8
+
+# One round-trip instead of a bounding_box() per ref: if none of these moved,
+# boxes of unchanged ARIA nodes are still valid.
+VIEW_STATE_SCRIPT = "() => [location.href, window.scrollX, window.scrollY, window.innerWidth, window.innerHeight]"
+
+
+# --- PARANOID SECURITY ARGS ---
+# 1. Disable WebRTC IP Leak (Critical for VPN users)
+# 2. Disable Geolocation features
+# 3. Anti-Fingerprinting (Hide Automation)
+PARANOID_ARGS: tuple[str, ...] = (
+    "--force-webrtc-ip-handling-policy=disable_non_proxied_udp", # Kills WebRTC leaks
+    "--disable-webrtc", # Try to disable entirely if possible (generic)
+    "--denying-new-preferences",
+    "--disable-blink-features=AutomationControlled", # Hide "navigator.webdriver"
+    "--no-first-run",
+    "--no-service-autorun",
+    "--password-store=basic",
+    "--use-mock-keychain",
+    "--disable-features=IsolateOrigins,site-per-process,GeoLocation", # Disable Geo
+)
+
+
+def resolve_proxy_settings() -> dict[str, str] | None:
+    # Load proxy config in a browser-only safe way.
+    # Do not hard-fail if full bot config (e.g., DISCORD_BOT_TOKEN) is missing.
+    browser_proxy = (os.getenv("BROWSER_PROXY") or "").strip()
+    if not browser_proxy:
+        try:
+            from src.config import Config
+            cfg = Config.load()
+            browser_proxy = (getattr(cfg, "browser_proxy", None) or "").strip()
+        except Exception as cfg_err:
+            log.warning("BrowserAgent: Config.load() unavailable; continuing without proxy. (%s)", cfg_err)
+    if browser_proxy:
+        log.info(f"Using Browser Proxy: {browser_proxy}")
+        return {"server": browser_proxy}
+    return None
+
+
+def require_playwright() -> None:
+    if async_playwright is None:
+        raise RuntimeError(
+            "Browser automation requires the optional dependency 'playwright'. "
+            "Install the browser extra or add Playwright to the environment."
+        ) from PLAYWRIGHT_IMPORT_ERROR
+
+
+def _approx_tokens(chars: int) -> int:
+    # Snapshot text is mostly ASCII role/name pairs; ~4 chars per token is close enough for accounting.
+    return (chars + 3) // 4
 
 CSS_PATH_SCRIPT = """
 el => {
@@ -137,6 +195,10 @@ class BrowserObservation:
     ref_generation: int
     ref_snapshot: str
     refs: list[dict[str, Any]]
+    mode: ObserveMode = "full"
+    base_generation: int | None = None
+    removed_refs: list[str] = field(default_factory=list)
+    stats: dict[str, Any] = field(default_factory=dict)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -146,9 +208,21 @@ class BrowserObservation:
             "ref_generation": self.ref_generation,
             "ref_snapshot": self.ref_snapshot,
             "refs": self.refs,
+            "mode": self.mode,
+            "base_generation": self.base_generation,
+            "removed_refs": self.removed_refs,
+            "stats": self.stats,
         }
 
 
+@dataclass
+class _TabSnapshot:
+    generation: int
+    url: str
+    tree: AriaTree
+    ref_signatures: dict[str, tuple[Any, ...]]
+
+
 class BrowserAgent:
     """Async browser controller for LLM-driven actions."""
 
@@ -158,10 +232,16 @@ class BrowserAgent:
         default_timeout_ms: int = 15_000,
         max_aria_chars: int = 10_000,
         max_action_history: int = 20,
+        observe_mode: ObserveMode | None = None,
     ) -> None:
         self.default_timeout_ms = default_timeout_ms
         self.max_aria_chars = max_aria_chars
         self.max_action_history = max_action_history
+        # Mode used for the observation returned by act(); direct observe() calls stay "full".
+        env_mode = (os.getenv("ORA_BROWSER_OBSERVE_MODE") or "").strip().lower()
+        self.observe_mode: ObserveMode = observe_mode or ("diff" if env_mode == "diff" else "full")
+        # A diff larger than this fraction of the full snapshot is not worth it; resync instead.
+        self.diff_resync_ratio = env_float("ORA_BROWSER_DIFF_RESYNC_RATIO", 0.6, 0.0, 1.0)
 
         self._playwright: Playwright | None = None
         self._browser: Browser | None = None
@@ -170,12 +250,26 @@ class BrowserAgent:
         self._pages: dict[str, Page] = {}
         self._page_ids: dict[Page, str] = {}
         self._active_tab_id: str | None = None
+        self._owns_playwright = False
         self._owns_browser = False
         self._owns_context = False
+        self._context_page_listener: typing.Callable[[Page], Any] | None = None
         self._tab_actions: dict[str, deque[dict[str, Any]]] = {}
         self._refs_by_tab: dict[str, dict[str, RefEntry]] = {}
         self._ref_generation_by_tab: dict[str, int] = {}
         self._aria_snapshot_ref_supported: bool | None = None
+        self._snapshots_by_tab: dict[str, deque[_TabSnapshot]] = {}
+        self._view_state_by_tab: dict[str, tuple[Any, ...]] = {}
+        self._stats: dict[str, float] = {
+            "observations": 0,
+            "diff_observations": 0,
+            "full_resyncs": 0,
+            "refs_reused": 0,
+            "refs_resolved": 0,
+            "full_chars": 0,
+            "sent_chars": 0,
+            "observe_ms_total": 0.0,
+        }
 
     @property
     def page(self) -> Page:
@@ -213,6 +307,7 @@ class BrowserAgent:
         self._tab_actions[tab_id] = deque(maxlen=self.max_action_history)
         self._refs_by_tab[tab_id] = {}
         self._ref_generation_by_tab[tab_id] = 0
+        self._snapshots_by_tab[tab_id] = deque(maxlen=MAX_SNAPSHOT_HISTORY)
 
         def _on_close() -> None:
             self._pages.pop(tab_id, None)
@@ -220,6 +315,8 @@ class BrowserAgent:
             self._tab_actions.pop(tab_id, None)
             self._refs_by_tab.pop(tab_id, None)
             self._ref_generation_by_tab.pop(tab_id, None)
+            self._snapshots_by_tab.pop(tab_id, None)
+            self._view_state_by_tab.pop(tab_id, None)
             if self._active_tab_id == tab_id:
                 fallback = next(iter(self._pages.keys()), None)
                 self._active_tab_id = fallback
@@ -276,45 +373,13 @@ class BrowserAgent:
         record_video_dir: str | None,
         record_video_size: dict[str, int] | None,
     ) -> None:
-        if async_playwright is None:
-            raise RuntimeError(
-                "Browser automation requires the optional dependency 'playwright'. "
-                "Install the browser extra or add Playwright to the environment."
-            ) from PLAYWRIGHT_IMPORT_ERROR
+        require_playwright()
 
         self._playwright = await async_playwright().start()
+        self._owns_playwright = True
         log.info("Playwright version: %s", getattr(playwright, "__version__", "unknown"))
 
-        # Load proxy config in a browser-only safe way.
-        # Do not hard-fail if full bot config (e.g., DISCORD_BOT_TOKEN) is missing.
-        proxy_settings = None
-        browser_proxy = (os.getenv("BROWSER_PROXY") or "").strip()
-        if not browser_proxy:
-            try:
-                from src.config import Config
-                cfg = Config.load()
-                browser_proxy = (getattr(cfg, "browser_proxy", None) or "").strip()
-            except Exception as cfg_err:
-                log.warning("BrowserAgent: Config.load() unavailable; continuing without proxy. (%s)", cfg_err)
-        if browser_proxy:
-            log.info(f"Using Browser Proxy: {browser_proxy}")
-            proxy_settings = {"server": browser_proxy}
-
-        # --- PARANOID SECURITY ARGS ---
-        # 1. Disable WebRTC IP Leak (Critical for VPN users)
-        # 2. Disable Geolocation features
-        # 3. Anti-Fingerprinting (Hide Automation)
-        PARANOID_ARGS = [
-            "--force-webrtc-ip-handling-policy=disable_non_proxied_udp", # Kills WebRTC leaks
-            "--disable-webrtc", # Try to disable entirely if possible (generic)
-            "--denying-new-preferences",
-            "--disable-blink-features=AutomationControlled", # Hide "navigator.webdriver"
-            "--no-first-run",
-            "--no-service-autorun",
-            "--password-store=basic",
-            "--use-mock-keychain",
-            "--disable-features=IsolateOrigins,site-per-process,GeoLocation", # Disable Geo
-        ]
+        proxy_settings = resolve_proxy_settings()
 
         if mode == "launch":
             if user_data_dir:
@@ -326,7 +391,7 @@ class BrowserAgent:
                     record_video_dir=record_video_dir,
                     record_video_size=record_video_size,
                     proxy=proxy_settings,
-                    args=PARANOID_ARGS, # Security Injection
+                    args=list(PARANOID_ARGS), # Security Injection
                     permissions=[], # Block everything by default
                     geolocation=None, # Force no geo
                 )
@@ -338,7 +403,7 @@ class BrowserAgent:
                 self._browser = await self._playwright.chromium.launch(
                     headless=headless,
                     proxy=proxy_settings,
-                    args=PARANOID_ARGS # Security Injection
+                    args=list(PARANOID_ARGS) # Security Injection
                 )
                 self._context = await self._browser.new_context(
                     viewport=viewport,
@@ -366,8 +431,27 @@ class BrowserAgent:
                 )
                 self._owns_context = True
 
+        await self._adopt_context_pages()
+
+    async def attach(self, context: BrowserContext, *, playwright_handle: Playwright) -> None:
+        """Drive a context owned by someone else (see `BrowserContextPool`).
+
+        `close()` then only detaches: the context, browser and Playwright driver stay up.
+        """
+        if self._playwright is not None:
+            await self.close()
+        self._playwright = playwright_handle
+        self._browser = context.browser
+        self._context = context
+        self._owns_playwright = False
+        self._owns_browser = False
+        self._owns_context = False
+        await self._adopt_context_pages()
+
+    async def _adopt_context_pages(self) -> None:
         self._context.set_default_timeout(self.default_timeout_ms)
-        self._context.on("page", lambda page: self._register_page(page, set_active=False))
+        self._context_page_listener = lambda page: self._register_page(page, set_active=False)
+        self._context.on("page", self._context_page_listener)
         if self._context.pages:
             for page in self._context.pages:
                 self._register_page(page, set_active=False)
@@ -379,6 +463,9 @@ class BrowserAgent:
             self._register_page(page, set_active=True)
 
     async def close(self) -> None:
+        if self._context is not None and self._context_page_listener is not None:
+            with contextlib.suppress(Exception):
+                self._context.remove_listener("page", self._context_page_listener)
         if self._context is not None and self._owns_context:
             try:
                 await self._context.close()
@@ -390,7 +477,7 @@ class BrowserAgent:
                 await self._browser.close()
             except Exception:
                 pass
-        if self._playwright is not None:
+        if self._playwright is not None and self._owns_playwright:
             try:
                 await self._playwright.stop()
             except Exception:
@@ -406,20 +493,39 @@ class BrowserAgent:
         self._tab_actions = {}
         self._refs_by_tab = {}
         self._ref_generation_by_tab = {}
+        self._snapshots_by_tab = {}
+        self._view_state_by_tab = {}
         self._aria_snapshot_ref_supported = None
+        self._owns_playwright = False
         self._owns_browser = False
         self._owns_context = False
+        self._context_page_listener = None
+
+    async def observe(self, mode: ObserveMode = "full", *, since: int | None = None) -> BrowserObservation:
+        """Snapshot the active tab.
 
-    async def observe(self) -> BrowserObservation:
+        `mode="diff"` returns only the ARIA subtrees that changed since ref generation
+        `since` (default: the previous observation of this tab) and only the refs whose
+        target changed; every other ref keeps working with the new `ref_generation`.
+        It falls back to a full snapshot after navigation, when the baseline is gone,
+        or when the diff would not be meaningfully smaller.
+        """
         page = self._page
         if page is None:
             return self._empty_observation()
-        return await self._observe_page(page)
+        return await self._observe_page(page, mode=mode, since=since)
 
-    async def _observe_page(self, page: Page, retry_count: int = 3) -> BrowserObservation:
+    async def _observe_page(
+        self,
+        page: Page,
+        retry_count: int = 3,
+        *,
+        mode: ObserveMode = "full",
+        since: int | None = None,
+    ) -> BrowserObservation:
         for attempt in range(retry_count):
             try:
-                return await self._observe_page_inner(page)
+                return await self._observe_page_inner(page, mode=mode, since=since)
             except Exception as e:
                 msg = str(e)
                 # Check for specific Playwright errors related to navigation/context destruction
@@ -441,7 +547,14 @@ class BrowserAgent:
                 return self._empty_observation()
         return self._empty_observation()
 
-    async def _observe_page_inner(self, page: Page) -> BrowserObservation:
+    async def _observe_page_inner(
+        self,
+        page: Page,
+        *,
+        mode: ObserveMode = "full",
+        since: int | None = None,
+    ) -> BrowserObservation:
+        started = time.perf_counter()
         title = await page.title()
 
         aria = ""
@@ -472,21 +585,83 @@ class BrowserAgent:
                 aria = str(snapshot)
             except Exception:
                 aria = ""
+        snapshot_ms = (time.perf_counter() - started) * 1000
 
-        if len(aria) > self.max_aria_chars:
-            aria = aria[: self.max_aria_chars] + "\n...[truncated]"
+        raw_aria = aria
+        aria = self._truncate_aria(aria)
 
         tab_id = self._page_ids.get(page)
         ref_generation = 0
         ref_snapshot = ""
         refs: list[dict[str, Any]] = []
+        observed_mode: ObserveMode = "full"
+        base_generation: int | None = None
+        removed_refs: list[str] = []
+        full_chars = len(aria)
+        refs_ms = diff_ms = 0.0
+        reused_before = self._stats["refs_reused"]
+        resolved_before = self._stats["refs_resolved"]
         if tab_id:
             ref_generation = self._ref_generation_by_tab.get(tab_id, 0) + 1
-            entries = await self._build_ref_entries(page, aria_ref_snapshot)
+            tree = parse_aria_tree(raw_aria)
+            history = self._snapshots_by_tab.setdefault(tab_id, deque(maxlen=MAX_SNAPSHOT_HISTORY))
+            previous_refs = self._refs_by_tab.get(tab_id) or {}
+
+            refs_started = time.perf_counter()
+            view_state = await self._read_view_state(page)
+            reusable: dict[str, RefEntry] = {}
+            if view_state is not None and view_state == self._view_state_by_tab.get(tab_id):
+                reusable = previous_refs
+            if reusable and aria_ref_snapshot and history and history[-1].tree.digest == tree.digest:
+                # Same page, same scroll, same tree: the previous refs (fallback ones included) still hold.
+                entries = [replace(entry) for entry in reusable.values()]
+                self._stats["refs_reused"] += len(entries)
+            else:
+                entries = await self._build_ref_entries(page, aria_ref_snapshot, reusable=reusable)
+            refs_ms = (time.perf_counter() - refs_started) * 1000
+
+            if view_state is None:
+                self._view_state_by_tab.pop(tab_id, None)
+            else:
+                self._view_state_by_tab[tab_id] = view_state
             self._refs_by_tab[tab_id] = {entry.ref: entry for entry in entries}
             self._ref_generation_by_tab[tab_id] = ref_generation
             ref_snapshot = self._format_ref_snapshot(entries)
             refs = [entry.to_dict() for entry in entries]
+            full_chars += len(ref_snapshot)
+
+            signatures = {entry.ref: self._ref_signature(entry) for entry in entries}
+            baseline = self._diff_baseline(history, since, page.url)
+            history.append(_TabSnapshot(ref_generation, page.url, tree, signatures))
+
+            if mode == "diff" and baseline is not None:
+                diff_started = time.perf_counter()
+                diff = diff_aria_trees(baseline.tree, tree)
+                changed = [e for e in entries if baseline.ref_signatures.get(e.ref) != signatures[e.ref]]
+                header = (
+                    f"[diff vs gen {baseline.generation}: {diff.changed_nodes} changed, "
+                    f"{diff.removed_nodes} removed; unlisted refs still valid]"
+                )
+                diff_aria = self._truncate_aria(f"{header}\n{diff.text or '(no changes)'}")
+                diff_ref_snapshot = self._format_ref_snapshot(changed)
+                diff_ms = (time.perf_counter() - diff_started) * 1000
+                if len(diff_aria) + len(diff_ref_snapshot) <= self.diff_resync_ratio * full_chars:
+                    observed_mode = "diff"
+                    base_generation = baseline.generation
+                    aria = diff_aria
+                    ref_snapshot = diff_ref_snapshot
+                    refs = [entry.to_dict() for entry in changed]
+                    removed_refs = sorted(set(baseline.ref_signatures) - set(signatures))
+
+        if mode == "diff" and observed_mode == "full":
+            self._stats["full_resyncs"] += 1
+        sent_chars = len(aria) + len(ref_snapshot)
+        observe_ms = (time.perf_counter() - started) * 1000
+        self._stats["observations"] += 1
+        self._stats["diff_observations"] += observed_mode == "diff"
+        self._stats["full_chars"] += full_chars
+        self._stats["sent_chars"] += sent_chars
+        self._stats["observe_ms_total"] += observe_ms
 
         return BrowserObservation(
             url=page.url,
@@ -495,16 +670,86 @@ class BrowserAgent:
             ref_generation=ref_generation,
             ref_snapshot=ref_snapshot,
             refs=refs,
+            mode=observed_mode,
+            base_generation=base_generation,
+            removed_refs=removed_refs,
+            stats={
+                "observe_ms": round(observe_ms, 2),
+                "snapshot_ms": round(snapshot_ms, 2),
+                "refs_ms": round(refs_ms, 2),
+                "diff_ms": round(diff_ms, 2),
+                "refs_reused": int(self._stats["refs_reused"] - reused_before),
+                "refs_resolved": int(self._stats["refs_resolved"] - resolved_before),
+                "full_chars": full_chars,
+                "sent_chars": sent_chars,
+                "approx_tokens_saved": _approx_tokens(max(0, full_chars - sent_chars)),
+            },
         )
 
+    def _truncate_aria(self, aria: str) -> str:
+        if len(aria) > self.max_aria_chars:
+            return aria[: self.max_aria_chars] + "\n...[truncated]"
+        return aria
+
+    @staticmethod
+    def _diff_baseline(
+        history: deque[_TabSnapshot],
+        since: int | None,
+        url: str,
+    ) -> _TabSnapshot | None:
+        if not history:
+            return None
+        if since is None:
+            baseline = history[-1]
+        else:
+            baseline = next((snap for snap in reversed(history) if snap.generation == since), None)
+        if baseline is None or baseline.url != url:
+            return None
+        return baseline
+
+    @staticmethod
+    def _ref_signature(entry: RefEntry) -> tuple[Any, ...]:
+        return (entry.role, entry.name, entry.nth, entry.mode, entry.selector, entry.frame_name)
+
+    @staticmethod
+    async def _read_view_state(page: Page) -> tuple[Any, ...] | None:
+        try:
+            state = await page.evaluate(VIEW_STATE_SCRIPT)
+        except Exception:
+            return None
+        if not isinstance(state, (list, tuple)):
+            return None
+        return tuple(state)
+
+    def observe_stats(self) -> dict[str, Any]:
+        observations = int(self._stats["observations"])
+        full_chars = int(self._stats["full_chars"])
+        sent_chars = int(self._stats["sent_chars"])
+        reused = int(self._stats["refs_reused"])
+        resolved = int(self._stats["refs_resolved"])
+        return {
+            "observations": observations,
+            "diff_observations": int(self._stats["diff_observations"]),
+            "full_resyncs": int(self._stats["full_resyncs"]),
+            "avg_observe_ms": round(self._stats["observe_ms_total"] / observations, 2) if observations else 0.0,
+            "refs_reused": reused,
+            "refs_resolved": resolved,
+            "ref_reuse_rate": round(reused / (reused + resolved), 3) if reused + resolved else 0.0,
+            "full_chars": full_chars,
+            "sent_chars": sent_chars,
+            "approx_tokens_saved": _approx_tokens(max(0, full_chars - sent_chars)),
+        }
+
     async def _build_ref_entries(
         self,
         page: Page,
         aria_ref_snapshot: str | None,
+        *,
+        reusable: dict[str, RefEntry] | None = None,
     ) -> list[RefEntry]:
         entries: list[RefEntry] = []
         if aria_ref_snapshot:
-            entries = await self._refs_from_aria_snapshot(page, aria_ref_snapshot)
+            entries = await self._refs_from_aria_snapshot(page, aria_ref_snapshot, reusable=reusable)
         bbox_count = sum(1 for entry in entries if entry.bbox)
         if not entries or bbox_count < MIN_BBOX_ENTRIES:
             fallback_entries = await self._refs_from_clickable_targets(
@@ -519,6 +764,8 @@ class BrowserAgent:
         self,
         page: Page,
         aria_ref_snapshot: str,
+        *,
+        reusable: dict[str, RefEntry] | None = None,
     ) -> list[RefEntry]:
         entries: list[RefEntry] = []
         for line in aria_ref_snapshot.splitlines():
@@ -530,6 +777,17 @@ class BrowserAgent:
             ref = match.group("ref")
             if role.lower() not in INTERACTIVE_ROLES:
                 continue
+            previous = reusable.get(ref) if reusable else None
+            if (
+                previous is not None
+                and previous.mode == "aria"
+                and previous.role == role
+                and previous.name == name
+            ):
+                # Same element, same viewport: skip the three round-trips per ref.
+                entries.append(replace(previous, nth=None))
+                self._stats["refs_reused"] += 1
+                continue
             locator = page.locator(f"aria-ref={ref}")
             selector = None
             bbox = None
@@ -542,6 +800,7 @@ class BrowserAgent:
                     selector = await handle.evaluate(CSS_PATH_SCRIPT)
                 with contextlib.suppress(Exception):
                     bbox = await handle.bounding_box()
+            self._stats["refs_resolved"] += 1
             entries.append(
                 RefEntry(
                     ref=ref,
@@ -851,6 +1110,12 @@ class BrowserAgent:
             }
         action_type = str(action.get("type") or "")
         active_tab_id = self._active_tab_id
+        # Error paths below always return a full observation so the caller can resync.
+        observe_mode: ObserveMode = "diff" if (action.get("observe_mode") or self.observe_mode) == "diff" else "full"
+        since: int | None = None
+        with contextlib.suppress(TypeError, ValueError):
+            since_raw = action.get("since", action.get("ref_generation"))
+            since = int(since_raw) if since_raw is not None else None
 
         try:
             if action_type == "goto":
@@ -1164,7 +1429,7 @@ class BrowserAgent:
                     "observation": (await self.observe()).to_dict(),
                 }
 
-            return {"ok": True, "observation": (await self.observe()).to_dict()}
+            return {"ok": True, "observation": (await self.observe(observe_mode, since=since)).to_dict()}
         except PlaywrightTimeoutError as exc:
             return {
                 "ok": False,
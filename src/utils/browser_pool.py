@@ -0,0 +1,364 @@
+"""Warm pool of isolated Chromium contexts for BrowserAgent.
+
+Why:
+- The first web tool call of a session used to pay for Playwright start, Chromium
+  launch and a fresh context (several seconds) inside the user's request.
+- A launched browser hands out new contexts in tens of milliseconds, and a context
+  that has been wiped (cookies, storage, permissions, cache) is as isolated as a new
+  one, so it can be handed to the next user instead of being torn down.
+- Idle contexts (and eventually the browser itself) are reaped after a TTL so a bot
+  that stops browsing gives the memory back.
+
+Knobs:
+- ORA_BROWSER_POOL_SIZE: idle contexts kept warm (0 disables the pool; default 1)
+- ORA_BROWSER_POOL_IDLE_TTL_SEC: idle lifetime of a context / the browser (default 900)
+- ORA_BROWSER_POOL_MAX_USES: leases before a context is retired anyway (default 50)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from urllib.parse import urlsplit
+
+from src.utils.browser_agent import PARANOID_ARGS, require_playwright, resolve_proxy_settings
+from src.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+# (playwright, browser) for a given headless flag; swapped out in tests.
+Launcher = Callable[[bool], Awaitable[tuple[Any, Any]]]
+
+
+async def _launch_chromium(headless: bool) -> tuple[Any, Any]:
+    require_playwright()
+    from src.utils.browser_agent import async_playwright
+
+    pw = await async_playwright().start()
+    try:
+        browser = await pw.chromium.launch(
+            headless=headless,
+            proxy=resolve_proxy_settings(),
+            args=list(PARANOID_ARGS),
+        )
+    except Exception:
+        await pw.stop()
+        raise
+    return pw, browser
+
+
+def _origin(url: str) -> str | None:
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.scheme not in {"http", "https"} or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+@dataclass
+class PooledContext:
+    context: Any
+    page: Any
+    created_at: float
+    idle_since: float = 0.0
+    uses: int = 0
+    owner: str | None = None
+    origins: set[str] = field(default_factory=set)
+
+
+class BrowserContextPool:
+    """Hands out pre-created browser contexts and takes them back once wiped."""
+
+    def __init__(
+        self,
+        *,
+        size: int | None = None,
+        idle_ttl_sec: float | None = None,
+        max_uses: int | None = None,
+        headless: bool = True,
+        launcher: Launcher | None = None,
+    ) -> None:
+        self.size = size if size is not None else env_int("ORA_BROWSER_POOL_SIZE", 1, 0, 8)
+        self.idle_ttl_sec = (
+            idle_ttl_sec
+            if idle_ttl_sec is not None
+            else env_float("ORA_BROWSER_POOL_IDLE_TTL_SEC", 900.0, 30.0, 86_400.0)
+        )
+        self.max_uses = max_uses if max_uses is not None else env_int("ORA_BROWSER_POOL_MAX_USES", 50, 1, 10_000)
+        self.headless = headless
+        self._launcher: Launcher = launcher or _launch_chromium
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._idle: deque[PooledContext] = deque()
+        self._leased: set[int] = set()
+        self._lock = asyncio.Lock()
+        self._refill_task: asyncio.Task | None = None
+        self._reaper_task: asyncio.Task | None = None
+        self._last_activity = time.monotonic()
+        self._stats: dict[str, float] = {
+            "hits": 0,
+            "misses": 0,
+            "launches": 0,
+            "launch_ms_total": 0.0,
+            "launch_ms_last": 0.0,
+            "contexts_created": 0,
+            "context_ms_total": 0.0,
+            "recycled": 0,
+            "discarded": 0,
+            "expired": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    @property
+    def playwright(self) -> Any:
+        return self._playwright
+
+    def _browser_alive(self) -> bool:
+        if self._browser is None:
+            return False
+        try:
+            return bool(self._browser.is_connected())
+        except Exception:
+            return False
+
+    async def _ensure_browser(self) -> None:
+        if self._browser_alive():
+            return
+        await self._shutdown_browser()
+        started = time.perf_counter()
+        self._playwright, self._browser = await self._launcher(self.headless)
+        elapsed = (time.perf_counter() - started) * 1000
+        self._stats["launches"] += 1
+        self._stats["launch_ms_total"] += elapsed
+        self._stats["launch_ms_last"] = elapsed
+        logger.info("BrowserContextPool: launched Chromium in %.0fms (headless=%s)", elapsed, self.headless)
+
+    async def _create(self) -> PooledContext:
+        await self._ensure_browser()
+        started = time.perf_counter()
+        context = await self._browser.new_context(permissions=[], geolocation=None)
+        try:
+            page = await context.new_page()
+        except Exception:
+            with contextlib.suppress(Exception):
+                await context.close()
+            raise
+        self._stats["contexts_created"] += 1
+        self._stats["context_ms_total"] += (time.perf_counter() - started) * 1000
+        pooled = PooledContext(context=context, page=page, created_at=time.monotonic())
+
+        def _track(frame: Any) -> None:
+            origin = _origin(getattr(frame, "url", "") or "")
+            if origin:
+                pooled.origins.add(origin)
+
+        def _watch(new_page: Any) -> None:
+            with contextlib.suppress(Exception):
+                new_page.on("framenavigated", _track)
+
+        _watch(page)
+        with contextlib.suppress(Exception):
+            context.on("page", _watch)
+        return pooled
+
+    async def prewarm(self) -> None:
+        """Launch the browser and fill the idle set; safe to call repeatedly."""
+        if not self.enabled:
+            return
+        try:
+            await self._fill()
+        except Exception as exc:
+            logger.warning("BrowserContextPool: prewarm failed: %s", exc)
+        self._ensure_reaper()
+
+    async def _fill(self) -> None:
+        async with self._lock:
+            while len(self._idle) < self.size:
+                pooled = await self._create()
+                pooled.idle_since = time.monotonic()
+                self._idle.append(pooled)
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        try:
+            self._refill_task = asyncio.get_running_loop().create_task(self.prewarm())
+        except RuntimeError:
+            self._refill_task = None
+
+    async def acquire(self, *, owner: str | None = None) -> PooledContext:
+        """Return a clean context with one open page. Raises if Chromium cannot be launched."""
+        async with self._lock:
+            self._last_activity = time.monotonic()
+            pooled: PooledContext | None = None
+            while self._idle:
+                candidate = self._idle.popleft()
+                if self._browser_alive() and not self._page_closed(candidate.page):
+                    pooled = candidate
+                    break
+                await self._discard(candidate)
+            if pooled is not None:
+                self._stats["hits"] += 1
+            else:
+                self._stats["misses"] += 1
+                pooled = await self._create()
+            pooled.uses += 1
+            pooled.owner = owner
+            self._leased.add(id(pooled))
+        self._schedule_refill()
+        return pooled
+
+    async def release(self, pooled: PooledContext, *, reuse: bool = True) -> None:
+        """Wipe and return a leased context, or close it if it cannot be proven clean."""
+        self._leased.discard(id(pooled))
+        self._last_activity = time.monotonic()
+        keep = (
+            reuse
+            and self.enabled
+            and pooled.uses < self.max_uses
+            and self._browser_alive()
+            and len(self._idle) < self.size
+        )
+        if keep:
+            try:
+                keep = await self._wipe(pooled)
+            except Exception as exc:
+                logger.debug("BrowserContextPool: wipe failed, discarding context: %s", exc)
+                keep = False
+        if not keep:
+            await self._discard(pooled)
+            self._schedule_refill()
+            return
+        pooled.owner = None
+        pooled.idle_since = time.monotonic()
+        self._idle.append(pooled)
+        self._stats["recycled"] += 1
+
+    async def _wipe(self, pooled: PooledContext) -> bool:
+        context = pooled.context
+        pages = list(context.pages)
+        keeper = pooled.page if pooled.page in pages else (pages[0] if pages else None)
+        for page in pages:
+            if page is not keeper:
+                await page.close()
+        if keeper is None:
+            keeper = await context.new_page()
+        pooled.page = keeper
+        await keeper.goto("about:blank")
+
+        state = await context.storage_state()
+        origins = set(pooled.origins)
+        origins.update(item["origin"] for item in state.get("origins", []) if item.get("origin"))
+        cdp = await context.new_cdp_session(keeper)
+        try:
+            for origin in origins:
+                await cdp.send("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            await cdp.send("Network.clearBrowserCache")
+        finally:
+            with contextlib.suppress(Exception):
+                await cdp.detach()
+        await context.clear_cookies()
+        await context.clear_permissions()
+
+        # Only recycle what we can show is empty; anything else gets a fresh context.
+        state = await context.storage_state()
+        if state.get("cookies") or any(item.get("localStorage") for item in state.get("origins", [])):
+            return False
+        pooled.origins.clear()
+        return True
+
+    @staticmethod
+    def _page_closed(page: Any) -> bool:
+        try:
+            return bool(page.is_closed())
+        except Exception:
+            return True
+
+    async def _discard(self, pooled: PooledContext) -> None:
+        self._stats["discarded"] += 1
+        with contextlib.suppress(Exception):
+            await pooled.context.close()
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper_task is not None and not self._reaper_task.done():
+            return
+        with contextlib.suppress(RuntimeError):
+            self._reaper_task = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        interval = max(5.0, min(60.0, self.idle_ttl_sec / 4))
+        while True:
+            await asyncio.sleep(interval)
+            await self.reap()
+            if self._browser is None:
+                return
+
+    async def reap(self, *, now: float | None = None) -> None:
+        """Close contexts idle past the TTL; drop the browser once nothing has used it for a TTL."""
+        now = time.monotonic() if now is None else now
+        async with self._lock:
+            expired = [p for p in self._idle if now - p.idle_since >= self.idle_ttl_sec]
+            for pooled in expired:
+                self._idle.remove(pooled)
+                self._stats["expired"] += 1
+                with contextlib.suppress(Exception):
+                    await pooled.context.close()
+            if not self._idle and not self._leased and now - self._last_activity >= self.idle_ttl_sec:
+                await self._shutdown_browser()
+
+    async def _shutdown_browser(self) -> None:
+        browser, pw = self._browser, self._playwright
+        self._browser = None
+        self._playwright = None
+        if browser is not None:
+            with contextlib.suppress(Exception):
+                await browser.close()
+        if pw is not None:
+            with contextlib.suppress(Exception):
+                await pw.stop()
+
+    async def close(self) -> None:
+        for task in (self._refill_task, self._reaper_task):
+            if task is not None and not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await task
+        async with self._lock:
+            while self._idle:
+                with contextlib.suppress(Exception):
+                    await self._idle.popleft().context.close()
+            self._leased.clear()
+            await self._shutdown_browser()
+
+    def metrics(self) -> dict[str, Any]:
+        hits = int(self._stats["hits"])
+        misses = int(self._stats["misses"])
+        launches = int(self._stats["launches"])
+        created = int(self._stats["contexts_created"])
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "idle": len(self._idle),
+            "leased": len(self._leased),
+            "browser_running": self._browser_alive(),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "launches": launches,
+            "launch_ms_last": round(self._stats["launch_ms_last"], 1),
+            "launch_ms_avg": round(self._stats["launch_ms_total"] / launches, 1) if launches else 0.0,
+            "context_ms_avg": round(self._stats["context_ms_total"] / created, 1) if created else 0.0,
+            "recycled": int(self._stats["recycled"]),
+            "discarded": int(self._stats["discarded"]),
+            "expired": int(self._stats["expired"]),
+        }
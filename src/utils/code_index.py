@@ -0,0 +1,382 @@
+"""
+Trigram index for SafeShell's `grep`/`rg`/`find` builtins.
+
+Without it every search walks the allowed root with `os.walk` and opens files
+until `MAX_FILES_SCANNED` / `MAX_TOTAL_BYTES_SCANNED` trips, so on a large
+checkout most queries fail before finding anything. The index keeps, per file:
+
+- a trigram signature: a one-hash Bloom bitmap over the lowercased text,
+  sized to ~2 bits per distinct trigram (power of two, 2 Kbit .. 1 Mbit, so a
+  typical source file costs 256-512 bytes). Signatures of one size share a
+  NumPy matrix, so "which files can contain these trigrams" is one vectorized
+  AND per size class
+- the relative path, its directory depth and walk order, so `find` and the
+  per-query depth/base filters never touch the filesystem
+
+Queries take the literal runs every match must contain (parsed from the regex)
+and only open files whose signature has all their trigrams; the caller still
+verifies each candidate with the real regex, so results are exact. Files that
+are too large to index (or unreadable) are always candidates.
+
+Every query first re-validates the index with a stat-only walk, so files
+written a moment ago are found; only files whose mtime/size changed are
+re-read. A file whose mtime is too close to when it was indexed to rule out
+a same-size rewrite within one timestamp tick is re-read on the next walk.
+`ORA_CODE_INDEX_REFRESH_SEC` (default 0) opts into reusing a walk for that
+many seconds, at the cost of missing changes made in between.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from src.utils.env import env_float, env_int
+
+try:  # Python 3.11+
+    import re._parser as _sre_parse  # type: ignore[import-not-found]
+    import re._constants as _sre_constants  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_constants as _sre_constants  # type: ignore[no-redef]
+    import sre_parse as _sre_parse  # type: ignore[no-redef]
+
+logger = logging.getLogger(__name__)
+
+MIN_SIGNATURE_BITS = 2048
+MAX_SIGNATURE_BITS = 1 << 20
+# Coarsest mtime granularity we guard against (FAT/SMB-style 2 s timestamps).
+_RACY_MTIME_NS = 2_000_000_000
+_MULT = (np.uint64(0x9E3779B97F4A7C15), np.uint64(0xC2B2AE3D27D4EB4F), np.uint64(0x165667B19E3779F9))
+_REPEATS = {_sre_constants.MAX_REPEAT, _sre_constants.MIN_REPEAT}
+if hasattr(_sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(_sre_constants.POSSESSIVE_REPEAT)
+# Lowercasing sigma depends on context, so it never contributes to a literal run.
+_CONTEXT_CASED = frozenset("Σσς")
+# Under re.IGNORECASE these also match non-ASCII letters whose lower() differs (ı, İ, ſ).
+_ICASE_UNSTABLE = frozenset("iIsS")
+
+
+def _trigram_hashes(text: str) -> np.ndarray:
+    """64-bit hash of every character trigram of `text` (already lowercased)."""
+    if len(text) < 3:
+        return np.zeros(0, dtype=np.uint64)
+    cps = np.frombuffer(text.encode("utf-32-le", errors="surrogatepass"), dtype=np.uint32).astype(np.uint64)
+    h = (cps[:-2] * _MULT[0]) ^ (cps[1:-1] * _MULT[1]) ^ (cps[2:] * _MULT[2])
+    h ^= h >> np.uint64(29)
+    return h
+
+
+_ESTIMATOR_BITS = 1 << 17
+
+
+def _estimate_distinct(hashes: np.ndarray) -> int:
+    """Linear-counting estimate of distinct hashes (exact dedup is the slow part of indexing)."""
+    if len(hashes) < MIN_SIGNATURE_BITS // 2:
+        return len(hashes)
+    seen = np.zeros(_ESTIMATOR_BITS, dtype=bool)
+    seen[(hashes >> np.uint64(40)).astype(np.intp) & (_ESTIMATOR_BITS - 1)] = True
+    empty = _ESTIMATOR_BITS - int(np.count_nonzero(seen))
+    if empty == 0:
+        return MAX_SIGNATURE_BITS
+    return int(-_ESTIMATOR_BITS * np.log(empty / _ESTIMATOR_BITS))
+
+
+def _signature_bits_for(distinct: int) -> int:
+    bits = MIN_SIGNATURE_BITS
+    while bits < 2 * distinct and bits < MAX_SIGNATURE_BITS:
+        bits <<= 1
+    return bits
+
+
+def _pack(hashes: np.ndarray, bits: int) -> np.ndarray:
+    bitmap = np.zeros(bits, dtype=bool)
+    bitmap[(hashes % np.uint64(bits)).astype(np.intp)] = True
+    return np.packbits(bitmap)
+
+
+class _SignatureStore:
+    """Rows of same-size signatures in one growable matrix."""
+
+    __slots__ = ("bits", "matrix", "used", "free")
+
+    def __init__(self, bits: int) -> None:
+        self.bits = bits
+        self.matrix = np.zeros((0, bits // 8), dtype=np.uint8)
+        self.used = 0
+        self.free: list[int] = []
+
+    def put(self, signature: np.ndarray) -> int:
+        if self.free:
+            row = self.free.pop()
+        else:
+            row = self.used
+            self.used += 1
+            if row >= len(self.matrix):
+                grown = np.zeros((max(64, len(self.matrix) * 2), self.bits // 8), dtype=np.uint8)
+                grown[: len(self.matrix)] = self.matrix
+                self.matrix = grown
+        self.matrix[row] = signature
+        return row
+
+
+def required_literals(pattern: str, *, ignore_case: bool = False) -> list[str]:
+    """Literal runs (len >= 3) that every match of `pattern` must contain. [] if unknown."""
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE if ignore_case else 0)
+    except Exception:
+        return []
+    ignore_case = ignore_case or bool(parsed.state.flags & re.IGNORECASE)
+
+    runs: list[str] = []
+    current: list[str] = []
+
+    def flush() -> None:
+        if current:
+            runs.append("".join(current))
+            current.clear()
+
+    def walk(items: Iterable) -> None:
+        for op, av in items:
+            if op is _sre_constants.LITERAL:
+                ch = chr(av)
+                unstable = ignore_case and (ch in _ICASE_UNSTABLE or (not ch.isascii() and ch.lower() != ch.upper()))
+                if unstable or ch in _CONTEXT_CASED:
+                    flush()
+                    continue
+                current.append(ch)
+            elif op is _sre_constants.SUBPATTERN and not av[1] and not av[2]:
+                # Plain group: its contents are contiguous with the surrounding literals.
+                walk(av[3])
+            elif op in _REPEATS:
+                flush()
+                low, _high, item = av
+                if low >= 1:
+                    walk(item)
+                    flush()
+            else:
+                flush()
+
+    walk(parsed)
+    flush()
+    return [run for run in runs if len(run) >= 3]
+
+
+class CodeIndex:
+    """Incrementally refreshed trigram signatures for every searchable file under `root`."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        deny_basenames: Iterable[str] = (),
+        max_depth: Optional[int] = None,
+        max_file_bytes: Optional[int] = None,
+        refresh_interval_sec: Optional[float] = None,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.deny_basenames = frozenset(deny_basenames)
+        self.max_depth = (
+            max_depth if max_depth is not None else env_int("ORA_CODE_INDEX_MAX_DEPTH", 16, 1, 64)
+        )
+        self.max_file_bytes = (
+            max_file_bytes
+            if max_file_bytes is not None
+            else env_int("ORA_CODE_INDEX_MAX_FILE_BYTES", 2_000_000, 1_000, 100_000_000)
+        )
+        self.refresh_interval_sec = (
+            refresh_interval_sec
+            if refresh_interval_sec is not None
+            else env_float("ORA_CODE_INDEX_REFRESH_SEC", 0.0, 0.0, 3600.0)
+        )
+        # _lock guards the published snapshot (_order_*); _refresh_lock makes refreshes single-flight.
+        # A refresh never rewrites a row the published snapshot points at: changed files get a new
+        # row and old rows are only freed when the new snapshot is swapped in.
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # size class 0 = "always a candidate" (too large / unreadable); others keyed by bit width
+        self._stores: dict[int, _SignatureStore] = {}
+        # rel -> (mtime_ns, size, bits, row, stable); stable False = re-read on the next walk
+        self._entries: dict[str, tuple[int, int, int, int, bool]] = {}
+        self._order_paths: list[str] = []
+        self._order_bits = np.zeros(0, dtype=np.int64)
+        self._order_rows = np.zeros(0, dtype=np.intp)
+        self._order_depth = np.zeros(0, dtype=np.int32)
+        self._last_refresh = 0.0
+        self._refresh_started = 0.0
+        self.files_reindexed = 0
+        self.last_refresh_ms = 0.0
+
+    @property
+    def file_count(self) -> int:
+        return len(self._order_paths)
+
+    @property
+    def signature_bytes(self) -> int:
+        return sum(store.matrix.nbytes for store in self._stores.values())
+
+    def _index_file(self, path: str, size: int) -> tuple[int, int]:
+        """Stores the file's signature; returns (bits, row), bits == 0 meaning unindexed."""
+        if size > self.max_file_bytes:
+            return 0, 0
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as fh:
+                text = fh.read()
+        except Exception:
+            # Unreadable now; always a candidate so the real scan reports what it sees.
+            return 0, 0
+        hashes = _trigram_hashes(text.lower())
+        bits = _signature_bits_for(_estimate_distinct(hashes))
+        store = self._stores.get(bits)
+        if store is None:
+            store = self._stores[bits] = _SignatureStore(bits)
+        return bits, store.put(_pack(hashes, bits))
+
+    def _is_fresh(self) -> bool:
+        return bool(self._last_refresh) and time.monotonic() - self._last_refresh < self.refresh_interval_sec
+
+    def _ensure_fresh(self) -> None:
+        """Re-validate before answering a query. Queries that arrive while a walk is running
+        wait for it and then walk again, unless a walk started after they did."""
+        requested = time.monotonic()
+        with self._refresh_lock:
+            if self._refresh_started >= requested or self._is_fresh():
+                return
+            self._rebuild()
+
+    def refresh(self, *, force: bool = False) -> None:
+        """Re-walk the root; re-read only files whose mtime/size changed."""
+        with self._refresh_lock:
+            if not force and self._is_fresh():
+                return
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        self._refresh_started = time.monotonic()
+        started = time.perf_counter()
+        # mtimes at or after this may hide a same-size rewrite within one timestamp tick.
+        racy_after_ns = time.time_ns() - _RACY_MTIME_NS
+        released: list[tuple[int, int]] = []
+        seen: set[str] = set()
+        order_paths: list[str] = []
+        order_bits: list[int] = []
+        order_rows: list[int] = []
+        order_depth: list[int] = []
+        root_str = str(self.root)
+        prefix_len = len(root_str) + 1
+
+        # Same traversal rules as SafeShell's iter_files(): os.walk (no symlinked dirs),
+        # .git and denied names pruned, files sorted within each directory.
+        for root_path, dirs, files in os.walk(root_str):
+            rel_dir = root_path[prefix_len:].replace(os.sep, "/") if root_path != root_str else ""
+            depth = rel_dir.count("/") + 1 if rel_dir else 0
+            if depth >= self.max_depth:
+                dirs[:] = []
+            dirs[:] = [d for d in dirs if d not in self.deny_basenames and d != ".git"]
+            for fname in sorted(files):
+                if fname in self.deny_basenames:
+                    continue
+                rel = f"{rel_dir}/{fname}" if rel_dir else fname
+                full = os.path.join(root_path, fname)
+                try:
+                    st = os.stat(full)
+                except OSError:
+                    continue
+                entry = self._entries.get(rel)
+                if entry is not None and entry[4] and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                    bits, row = entry[2], entry[3]
+                else:
+                    if entry is not None:
+                        released.append((entry[2], entry[3]))
+                    bits, row = self._index_file(full, st.st_size)
+                    self._entries[rel] = (st.st_mtime_ns, st.st_size, bits, row, st.st_mtime_ns < racy_after_ns)
+                    self.files_reindexed += 1
+                seen.add(rel)
+                order_paths.append(rel)
+                order_bits.append(bits)
+                order_rows.append(row)
+                order_depth.append(depth)
+
+        for rel in [rel for rel in self._entries if rel not in seen]:
+            _mtime, _size, bits, row, _stable = self._entries.pop(rel)
+            released.append((bits, row))
+
+        with self._lock:
+            self._order_paths = order_paths
+            self._order_bits = np.asarray(order_bits, dtype=np.int64)
+            self._order_rows = np.asarray(order_rows, dtype=np.intp)
+            self._order_depth = np.asarray(order_depth, dtype=np.int32)
+            for bits, row in released:
+                if bits:
+                    self._stores[bits].free.append(row)
+        self._last_refresh = time.monotonic()
+        self.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+    def _select(self, base: Path, max_depth: int) -> Optional[np.ndarray]:
+        """Walk-order positions of the files a query on `base` covers. Caller holds the lock."""
+        try:
+            rel_base = base.resolve().relative_to(self.root).as_posix()
+        except Exception:
+            return None
+        rel_base = "" if rel_base == "." else rel_base
+        base_depth = rel_base.count("/") + 1 if rel_base else 0
+        if base_depth + max_depth > self.max_depth:
+            return None
+        if any(part in self.deny_basenames or part == ".git" for part in rel_base.split("/") if part):
+            return np.zeros(0, dtype=np.intp)
+        keep = np.flatnonzero(self._order_depth <= base_depth + max_depth)
+        if rel_base:
+            prefix = rel_base + "/"
+            paths = self._order_paths
+            keep = np.asarray([i for i in keep if paths[i].startswith(prefix)], dtype=np.intp)
+        return keep
+
+    def files_under(self, base: Path, *, max_depth: int) -> Optional[list[str]]:
+        """Relative paths of files below directory `base` within `max_depth` directory
+        levels of it, in walk order. None if the index does not cover that range."""
+        self._ensure_fresh()
+        with self._lock:
+            keep = self._select(base, max_depth)
+            return None if keep is None else [self._order_paths[i] for i in keep]
+
+    def candidates(
+        self,
+        base: Path,
+        pattern: str,
+        *,
+        ignore_case: bool,
+        max_depth: int,
+    ) -> Optional[list[str]]:
+        """Relative paths (walk order) that may contain a match; None to fall back to a full walk."""
+        literals = required_literals(pattern, ignore_case=ignore_case)
+        hashes = (
+            np.unique(np.concatenate([_trigram_hashes("".join(ch.lower() for ch in run)) for run in literals]))
+            if literals
+            else None
+        )
+        self._ensure_fresh()
+        with self._lock:
+            keep = self._select(base, max_depth)
+            if keep is None:
+                return None
+            paths = self._order_paths
+            if hashes is None or not len(keep):
+                return [paths[i] for i in keep]
+            bits = self._order_bits[keep]
+            rows = self._order_rows[keep]
+            hit = bits == 0  # unindexed files are always candidates
+            for width in np.unique(bits[bits > 0]).tolist():
+                store = self._stores[width]
+                mask = _pack(hashes, width)
+                cols = np.flatnonzero(mask)
+                want = mask[cols]
+                sel = np.flatnonzero(bits == width)
+                block = store.matrix[np.ix_(rows[sel], cols)]
+                hit[sel] = np.all((block & want) == want, axis=1)
+            return [paths[i] for i in keep[hit]]
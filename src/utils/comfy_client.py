@@ -1,23 +1,23 @@
+import asyncio
 import json
 import logging
 import os
 import random
-import time
-import urllib.parse
-import urllib.request
-import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
 import aiohttp
-import websocket
+
+from src.utils.comfy_jobs import ComfyConnection, ComfyError, ComfyQueueFull
 
 logger = logging.getLogger(__name__)
 
+StatusCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
 
 class ComfyWorkflow:
     def __init__(self, server_address: str = "127.0.0.1:8188"):
         self.server_address = server_address
-        self.client_id = str(uuid.uuid4())
+        self.status_interval_sec = float(os.getenv("ORA_COMFY_STATUS_INTERVAL_SEC") or 5.0)
         self.workflows_dir = os.path.join(os.getcwd(), "config", "workflows")
 
         # Load Workflows
@@ -37,17 +37,7 @@ class ComfyWorkflow:
             logger.error(f"Failed to load workflow {filename}: {e}")
             return {}
 
-    def _get_history(self, prompt_id: str) -> Dict[str, Any]:
-        with urllib.request.urlopen(f"http://{self.server_address}/history/{prompt_id}") as response:
-            return json.loads(response.read())
-
-    def _get_image_data(self, filename: str, subfolder: str, folder_type: str) -> bytes:
-        data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-        url_values = urllib.parse.urlencode(data)
-        with urllib.request.urlopen(f"http://{self.server_address}/view?{url_values}") as response:
-            return response.read()
-
-    def generate_image(
+    async def generate_image(
         self,
         positive_prompt: str,
         negative_prompt: str = "",
@@ -55,10 +45,12 @@ class ComfyWorkflow:
         steps: int = 20,
         width: int = 1024,
         height: int = 1024,
+        on_status: Optional[StatusCallback] = None,
     ) -> Optional[bytes]:
         """
-        Executes the workflow with the given prompts using WebSocket.
+        Executes the workflow with the given prompts over the shared ComfyUI connection.
         Returns the raw image bytes of the first generated image.
+        `on_status` receives queue position / progress / ETA snapshots while waiting.
         """
         if not self.image_workflow:
             logger.error("Image Workflow data is empty (flux_api.json missing?).")
@@ -101,102 +93,16 @@ class ComfyWorkflow:
             prompt_workflow["7"]["inputs"]["seed"] = seed
             prompt_workflow["7"]["inputs"]["steps"] = steps
 
-        # 4. Queue Prompt via WebSocket
+        # 5. Queue and wait (Node 9 is SaveImage)
         try:
-            ws = websocket.WebSocket()
-            ws.connect(f"ws://{self.server_address}/ws?clientId={self.client_id}")
-
-            # Send Request
-            p = {"prompt": prompt_workflow, "client_id": self.client_id}
-            data = json.dumps(p).encode("utf-8")
-            req = urllib.request.Request(f"http://{self.server_address}/prompt", data=data)
-            with urllib.request.urlopen(req) as response:
-                prompt_id = json.loads(response.read())["prompt_id"]
-
-            # Listen for Execution
-            # Listen for Execution with Polling Fallback
-            # WebSockets can be unstable (WinError 10054), so we use a hybrid approach.
-            ws_connected = True
-
-            while True:
-                try:
-                    if ws_connected:
-                        try:
-                            out = ws.recv()
-                            if isinstance(out, str):
-                                message = json.loads(out)
-                                if message["type"] == "executing":
-                                    data = message["data"]
-                                    if data["node"] is None and data["prompt_id"] == prompt_id:
-                                        logger.info("ComfyUI finished execution (via WebSocket).")
-                                        break
-                        except Exception as ws_e:
-                            ws_connected = False
-                            logger.info(f"WebSocket disconnected ({ws_e}), switching to polling.")
-
-                    if not ws_connected:
-                        # Polling Mode
-                        time.sleep(2)
-                        try:
-                            history = self._get_history(prompt_id)
-                            if prompt_id in history:
-                                logger.info("ComfyUI finished execution (via Polling).")
-                                break
-                        except Exception:
-                            pass  # Still waiting, no history yet
-
-                except Exception as e:
-                    # General loop safety
-                    logger.warning(f"Error in execution loop: {e}")
-                    time.sleep(1)
-
-                # HEARTBEAT & QUEUE CHECK
-                if not ws_connected:
-                    try:
-                        # Check Queue Status to see if we are stuck in queue or processing
-                        with urllib.request.urlopen(f"http://{self.server_address}/queue") as q_resp:
-                            q_data = json.loads(q_resp.read())
-                            params_running = q_data.get("queue_running", [])
-                            params_pending = q_data.get("queue_pending", [])
-
-                            is_running = any(x[1] == prompt_id for x in params_running)
-                            is_pending = any(x[1] == prompt_id for x in params_pending)
-
-                            if is_running:
-                                logger.info(f"ComfyUI Status: RUNNING (Prompt ID: {prompt_id})")
-                            elif is_pending:
-                                logger.info(
-                                    f"ComfyUI Status: PENDING (Prompt ID: {prompt_id}) - Position in queue: {len(params_pending)}"
-                                )
-                            else:
-                                logger.info(
-                                    f"ComfyUI Status: UNKNOWN (Prompt ID: {prompt_id} not found in Running/Pending/History)"
-                                )
-                    except Exception as q_e:
-                        logger.warning(f"Failed to check queue status: {q_e}")
-
-            # Retrieve History to get filename
-            history = self._get_history(prompt_id)[prompt_id]
-            outputs = history["outputs"]
-
-            # Assuming Node 9 is SaveImage
-            if "9" in outputs:
-                images = outputs["9"]["images"]
-                if images:
-                    img_meta = images[0]  # Get first image
-                    return self._get_image_data(img_meta["filename"], img_meta["subfolder"], img_meta["type"])
-
-            # Debug: Log what keys ARE present
-            logger.error(f"No image output found in history (Node 9). Available output keys: {list(outputs.keys())}")
-            if "outputs" in history:  # Double check structure
-                logger.error(f"Full Outputs Dump: {history['outputs']}")
-            return None
-
+            return await self._queue_and_wait(prompt_workflow, output_node_id="9", kind="image", on_status=on_status)
+        except ComfyQueueFull:
+            raise
         except Exception as e:
             logger.error(f"ComfyUI Generation Error: {e}")
             return None
 
-    def generate_video(
+    async def generate_video(
         self,
         positive_prompt: str,
         negative_prompt: str = "",
@@ -205,6 +111,7 @@ class ComfyWorkflow:
         width: int = 768,
         height: int = 512,
         frame_count: int = 49,
+        on_status: Optional[StatusCallback] = None,
     ) -> Optional[bytes]:
         """
         Executes the LTX-Video workflow.
@@ -261,85 +168,52 @@ class ComfyWorkflow:
 
         # Queue
         try:
-            return self._queue_and_wait(prompt_workflow, output_node_id="30")
+            return await self._queue_and_wait(prompt_workflow, output_node_id="30", kind="video", on_status=on_status)
+        except ComfyQueueFull:
+            raise
         except Exception as e:
             logger.error(f"Video Generation Failed: {e}")
             return None
 
-    def _queue_and_wait(self, workflow: Dict, output_node_id: str) -> Optional[bytes]:
-        """Internal helper to queue a workflow and wait for output."""
-        ws = websocket.WebSocket()
-        ws.connect(f"ws://{self.server_address}/ws?clientId={self.client_id}")
-
-        # Send Request
-        p = {"prompt": workflow, "client_id": self.client_id}
-        data = json.dumps(p).encode("utf-8")
-        req = urllib.request.Request(f"http://{self.server_address}/prompt", data=data)
-        with urllib.request.urlopen(req) as response:
-            prompt_id = json.loads(response.read())["prompt_id"]
-
-        # Poll/WS Wait logic (Re-used from generate_image but cleaner)
-        # ... (For brevity, using the existing logic structure would be better if refactored completely,
-        # but to minimize diff size, I'll essentially inline/copy the wait logic or call a shared method if I extracted it.
-        # I didn't extract it yet. Let's extract it now to 'execute_workflow'?)
-
-        # Actually, let's just copy the wait logic loop for safety to avoid breaking generate_image refactor too much.
-        # Or better: existing generate_image has the loop. I should have extracted it.
-        # For this step, I will duplicate the wait logic to ensure robustness, or try to share it.
-
-        # Let's duplicate strictly for this task to avoid huge diffs on generate_image.
-
-        ws_connected = True
-        start_time = time.time()
-        timeout = 600  # 10 minutes max
-
-        while True:
-            if time.time() - start_time > timeout:
+    async def _queue_and_wait(
+        self,
+        workflow: Dict,
+        output_node_id: str,
+        *,
+        kind: str = "default",
+        on_status: Optional[StatusCallback] = None,
+        timeout: float = 600,
+    ) -> Optional[bytes]:
+        """Queue a workflow on the shared connection and wait for its output (no thread held)."""
+        conn = ComfyConnection.get(self.server_address)
+        job = await conn.submit(workflow, output_node_id, kind=kind)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last_state = None
+        last_sent = 0.0
+
+        while not job.done():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
                 logger.error("ComfyUI Generation Timed Out.")
-                break
-
-            try:
-                if ws_connected:
-                    try:
-                        out = ws.recv()
-                        if isinstance(out, str):
-                            msg = json.loads(out)
-                            if msg["type"] == "executing":
-                                data = msg["data"]
-                                if data["node"] is None and data["prompt_id"] == prompt_id:
-                                    break
-                    except Exception:
-                        ws_connected = False
-
-                if not ws_connected:
-                    time.sleep(2)
-                    try:
-                        hist = self._get_history(prompt_id)
-                        if prompt_id in hist:
-                            break
-                    except Exception:
-                        pass
-            except Exception:
-                time.sleep(1)
+                await conn.cancel(job)
+                return None
+            await job.wait_changed(timeout=min(remaining, self.status_interval_sec))
+            if on_status is None or job.done():
+                continue
+            snap = job.snapshot()
+            # State changes go out immediately; position/progress ticks at most every interval.
+            if snap["state"] != last_state or loop.time() - last_sent >= self.status_interval_sec:
+                last_state, last_sent = snap["state"], loop.time()
+                try:
+                    await on_status(snap)
+                except Exception:
+                    logger.debug("ComfyUI status callback failed", exc_info=True)
 
-        # Get Result
         try:
-            history = self._get_history(prompt_id)[prompt_id]
-            outputs = history["outputs"]
-
-            if output_node_id in outputs:
-                # Video or Image
-                items = (
-                    outputs[output_node_id].get("images")
-                    or outputs[output_node_id].get("gifs")
-                    or outputs[output_node_id].get("videos")
-                )
-                if items:
-                    meta = items[0]
-                    return self._get_image_data(meta["filename"], meta["subfolder"], meta["type"])
-
-            return None
-        except Exception:
+            return await job.result()
+        except ComfyError as e:
+            logger.error(f"ComfyUI job failed: {e}")
             return None
 
     async def unload_models(self):
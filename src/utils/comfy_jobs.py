@@ -0,0 +1,554 @@
+"""
+Shared asyncio connection to one ComfyUI instance, with a queue-aware job submitter.
+
+Each generation used to open its own blocking websocket, fall back to polling
+/history every 2 s and fetch outputs with urllib, holding a worker thread for
+the whole render.
+
+- One websocket per ComfyUI instance (`ComfyConnection.get`). `progress`,
+  `executed` and completion events are routed to the waiting job by prompt id.
+- The output is downloaded as soon as the output node reports `executed`, while
+  the rest of the graph finishes.
+- Local submission queue: a prompt is handed to ComfyUI only while its own queue
+  (every client's prompts, from `status` events) is shallower than
+  ORA_COMFY_MAX_REMOTE_QUEUE. Beyond ORA_COMFY_MAX_LOCAL_QUEUE waiting jobs,
+  `submit` raises ComfyQueueFull.
+- Every job exposes its queue position and an ETA from a moving average of
+  recent render times per job kind, for Discord status messages.
+- When the websocket drops it reconnects with the same client id and reconciles
+  in-flight jobs against /queue and /history.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import urllib.parse
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import aiohttp
+
+from src.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+_OUTPUT_KEYS = ("images", "gifs", "videos")
+_MAX_BUFFERED_EVENTS = 256
+
+
+class ComfyError(RuntimeError):
+    pass
+
+
+class ComfyQueueFull(ComfyError):
+    pass
+
+
+@dataclass
+class ComfyJob:
+    workflow: dict
+    output_node_id: str
+    kind: str = "default"
+    prompt_id: Optional[str] = None
+    state: str = "local"  # local -> submitting -> queued -> running -> done | failed | cancelled
+    position: int = 0  # prompts ahead of this one (ComfyUI queue + local queue)
+    eta_sec: Optional[float] = None
+    progress: Optional[tuple[int, int]] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    downloaded_early: bool = False
+    _future: Optional[asyncio.Future] = field(default=None, repr=False)
+    _download: Optional[asyncio.Task] = field(default=None, repr=False)
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def __post_init__(self) -> None:
+        if self._future is None:
+            self._future = asyncio.get_running_loop().create_future()
+
+    @property
+    def fraction(self) -> Optional[float]:
+        if not self.progress or self.progress[1] <= 0:
+            return None
+        return max(0.0, min(1.0, self.progress[0] / self.progress[1]))
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "prompt_id": self.prompt_id,
+            "state": self.state,
+            "position": self.position,
+            "eta_sec": None if self.eta_sec is None else round(self.eta_sec, 1),
+            "progress": self.fraction,
+            "error": self.error,
+        }
+
+    async def result(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        return await asyncio.wait_for(asyncio.shield(self._future), timeout=timeout)
+
+    async def wait_changed(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the job's state/position/progress changes (or timeout). Returns True on change."""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._changed.clear()
+        return True
+
+    def _touch(self) -> None:
+        self._changed.set()
+
+    def _resolve(self, data: Optional[bytes]) -> None:
+        if not self._future.done():
+            self._future.set_result(data)
+        self._touch()
+
+    def _fail(self, message: str, state: str = "failed") -> None:
+        self.state = state
+        self.error = message
+        self.finished_at = time.monotonic()
+        if not self._future.done():
+            self._future.set_exception(ComfyError(message))
+            self._future.exception()  # mark retrieved; callers get it from result()
+        self._touch()
+
+
+class ComfyConnection:
+    """One websocket + HTTP session per ComfyUI server, shared by every job on this loop."""
+
+    _instances: dict[tuple[str, int], "ComfyConnection"] = {}
+
+    @classmethod
+    def get(cls, server_address: str) -> "ComfyConnection":
+        loop = asyncio.get_running_loop()
+        key = (server_address, id(loop))
+        conn = cls._instances.get(key)
+        if conn is None or conn._closed or conn._loop is not loop:
+            conn = cls(server_address)
+            cls._instances[key] = conn
+        return conn
+
+    def __init__(
+        self,
+        server_address: str,
+        *,
+        max_remote_queue: Optional[int] = None,
+        max_local_queue: Optional[int] = None,
+        default_render_sec: Optional[float] = None,
+        connect_timeout: float = 10.0,
+        reconnect_max_sec: float = 10.0,
+    ) -> None:
+        self.server_address = server_address
+        self.client_id = str(uuid.uuid4())
+        self.max_remote_queue = (
+            max_remote_queue if max_remote_queue is not None else env_int("ORA_COMFY_MAX_REMOTE_QUEUE", 2, 1, 64)
+        )
+        self.max_local_queue = (
+            max_local_queue if max_local_queue is not None else env_int("ORA_COMFY_MAX_LOCAL_QUEUE", 16, 0, 1000)
+        )
+        self.default_render_sec = (
+            default_render_sec if default_render_sec is not None else env_float("ORA_COMFY_DEFAULT_RENDER_SEC", 60.0, 1.0, 3600.0)
+        )
+        self.connect_timeout = connect_timeout
+        self.reconnect_max_sec = reconnect_max_sec
+
+        self._loop = asyncio.get_running_loop()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws_task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._closed = False
+        self._tasks: set[asyncio.Task] = set()
+
+        self._local: deque[ComfyJob] = deque()
+        self._remote: dict[str, ComfyJob] = {}
+        # Other clients' prompts in ComfyUI's queue (ours are counted exactly) and the
+        # queue's execution order, from the last /queue snapshot.
+        self._foreign = 0
+        self._remote_order: list[str] = []
+        self._posting = 0
+        self._buffered: dict[str, list[dict]] = {}
+        self._queue_refresh: Optional[asyncio.Task] = None
+        self._queue_dirty = False
+        self._render_avg: dict[str, float] = {}
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "reconnects": 0, "early_downloads": 0}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address}"
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    @property
+    def remote_queue(self) -> int:
+        """Prompts in ComfyUI's queue (running + pending, every client), as far as we know."""
+        return self._foreign + len(self._remote) + self._posting
+
+    # --- lifecycle -------------------------------------------------------
+
+    async def start(self) -> None:
+        if self._closed:
+            raise ComfyError("ComfyUI connection is closed")
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+        if self._ws_task is None or self._ws_task.done():
+            self._ws_task = asyncio.create_task(self._ws_loop())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError as e:
+            raise ComfyError(f"ComfyUI unreachable at {self.server_address}") from e
+
+    async def close(self) -> None:
+        self._closed = True
+        tasks = [t for t in (self._ws_task, self._queue_refresh, *self._tasks) if t and not t.done()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for job in list(self._local) + list(self._remote.values()):
+            job._fail("ComfyUI connection closed", state="cancelled")
+        self._local.clear()
+        self._remote.clear()
+        if self._session is not None:
+            await self._session.close()
+        self._connected.clear()
+
+    # --- submission ------------------------------------------------------
+
+    async def submit(self, workflow: dict, output_node_id: str, *, kind: str = "default") -> ComfyJob:
+        """Queue a workflow. Returns immediately; await `job.result()` for the output bytes."""
+        if self.max_local_queue and len(self._local) >= self.max_local_queue:
+            raise ComfyQueueFull(f"ComfyUI queue is full ({len(self._local)} waiting)")
+        await self.start()
+        job = ComfyJob(workflow=workflow, output_node_id=str(output_node_id), kind=kind)
+        self._local.append(job)
+        self.stats["submitted"] += 1
+        self._pump()
+        return job
+
+    async def cancel(self, job: ComfyJob) -> None:
+        if job.done():
+            return
+        if job in self._local:
+            self._local.remove(job)
+        elif job.prompt_id and job.state == "queued":
+            # Still pending in ComfyUI: drop it there too (never interrupt a running render).
+            try:
+                await self._post_json("/queue", {"delete": [job.prompt_id]})
+            except Exception:
+                logger.debug("ComfyUI queue delete failed prompt_id=%s", job.prompt_id, exc_info=True)
+        if job.prompt_id:
+            self._remote.pop(job.prompt_id, None)
+        job._fail("cancelled", state="cancelled")
+        self._pump()
+
+    def _pump(self) -> None:
+        """Hand local jobs to ComfyUI while its queue is shallow enough."""
+        while self._local and self.connected and self.remote_queue < self.max_remote_queue:
+            job = self._local.popleft()
+            job.state = "submitting"
+            self._posting += 1
+            self._spawn(self._post_prompt(job))
+        self._update_positions()
+
+    async def _post_prompt(self, job: ComfyJob) -> None:
+        try:
+            res = await self._post_json("/prompt", {"prompt": job.workflow, "client_id": self.client_id})
+            prompt_id = str(res.get("prompt_id") or "")
+            if not prompt_id:
+                raise ComfyError(f"ComfyUI rejected prompt: {str(res.get('node_errors') or res)[:200]}")
+        except Exception as e:
+            self._posting -= 1
+            self.stats["failed"] += 1
+            job._fail(str(e) or type(e).__name__)
+            self._pump()
+            return
+        self._posting -= 1
+        job.prompt_id = prompt_id
+        if job.state == "submitting":
+            job.state = "queued"
+        self._remote[prompt_id] = job
+        # Events can beat the POST response; replay what arrived for this prompt meanwhile.
+        for msg in self._buffered.pop(prompt_id, []):
+            self._handle_event(msg)
+        if not self._posting:
+            self._buffered.clear()
+        self._refresh_queue_soon()
+        self._update_positions()
+
+    # --- websocket -------------------------------------------------------
+
+    async def _ws_loop(self) -> None:
+        backoff = 0.5
+        url = f"ws://{self.server_address}/ws?clientId={self.client_id}"
+        while not self._closed:
+            try:
+                assert self._session is not None
+                async with self._session.ws_connect(url, heartbeat=30, max_msg_size=0) as ws:
+                    backoff = 0.5
+                    # Learn ComfyUI's queue depth before admitting anything.
+                    await self._reconcile()
+                    self._connected.set()
+                    self._pump()
+                    async for m in ws:
+                        if m.type == aiohttp.WSMsgType.TEXT:
+                            try:
+                                msg = json.loads(m.data)
+                            except ValueError:
+                                continue
+                            if isinstance(msg, dict):
+                                self._handle_event(msg)
+                        elif m.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+                        # Binary frames are latent previews; nothing waits on them.
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug("ComfyUI websocket error server=%s: %s", self.server_address, e)
+            self._connected.clear()
+            if self._closed:
+                break
+            self.stats["reconnects"] += 1
+            logger.info("ComfyUI websocket disconnected server=%s; reconnecting in %.1fs", self.server_address, backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.reconnect_max_sec)
+
+    async def _reconcile(self) -> None:
+        """After (re)connecting: resync the queue and finish jobs that completed while we were away."""
+        try:
+            in_queue = await self._refresh_queue()
+        except Exception:
+            logger.debug("ComfyUI /queue failed server=%s", self.server_address, exc_info=True)
+            return
+        for prompt_id, job in list(self._remote.items()):
+            if prompt_id not in in_queue:
+                self._finish(job)
+
+    def _handle_event(self, msg: dict) -> None:
+        kind = msg.get("type")
+        data = msg.get("data") if isinstance(msg.get("data"), dict) else {}
+        if kind == "status":
+            exec_info = ((data.get("status") or {}).get("exec_info")) or {}
+            remaining = exec_info.get("queue_remaining")
+            if isinstance(remaining, int):
+                # A total can predate our own POSTs, so it may only raise the foreign estimate;
+                # drops are confirmed by a /queue snapshot before more work is admitted.
+                self._foreign = max(self._foreign, remaining - len(self._remote) - self._posting)
+                self._refresh_queue_soon()
+            return
+
+        prompt_id = data.get("prompt_id")
+        job = self._remote.get(prompt_id) if prompt_id else None
+        if job is None:
+            if prompt_id and self._posting and sum(len(v) for v in self._buffered.values()) < _MAX_BUFFERED_EVENTS:
+                self._buffered.setdefault(prompt_id, []).append(msg)
+            return
+
+        if kind == "execution_start":
+            job.state = "running"
+            job.started_at = time.monotonic()
+            self._update_positions()
+        elif kind == "progress":
+            try:
+                job.progress = (int(data.get("value") or 0), int(data.get("max") or 0))
+            except (TypeError, ValueError):
+                pass
+            job.eta_sec = self._eta(job)
+            job._touch()
+        elif kind == "executed":
+            if str(data.get("node")) == job.output_node_id and job._download is None:
+                item = _first_output_item(data.get("output"))
+                if item is not None:
+                    job._download = self._spawn(self._download(item))
+                    job.downloaded_early = True
+                    self.stats["early_downloads"] += 1
+        elif kind == "executing":
+            if data.get("node") is None:
+                self._finish(job)
+        elif kind == "execution_success":
+            self._finish(job)
+        elif kind in ("execution_error", "execution_interrupted"):
+            self._remote.pop(job.prompt_id or "", None)
+            self.stats["failed"] += 1
+            detail = data.get("exception_message") or kind
+            job._fail(f"ComfyUI {kind}: {str(detail)[:300]}")
+            self._pump()
+
+    def _finish(self, job: ComfyJob) -> None:
+        if self._remote.pop(job.prompt_id or "", None) is None:
+            return  # already finished (executing=None and execution_success both arrive)
+        job.finished_at = time.monotonic()
+        if job.started_at is not None:
+            took = job.finished_at - job.started_at
+            prev = self._render_avg.get(job.kind)
+            self._render_avg[job.kind] = took if prev is None else prev * 0.7 + took * 0.3
+        self._spawn(self._complete(job))
+        self._pump()
+
+    async def _complete(self, job: ComfyJob) -> None:
+        try:
+            if job._download is not None:
+                data = await job._download
+            else:
+                data = await self._fetch_from_history(job)
+        except Exception as e:
+            self.stats["failed"] += 1
+            job._fail(f"ComfyUI output download failed: {e}")
+            return
+        job.state = "done"
+        job.position = 0
+        job.eta_sec = 0.0
+        self.stats["completed"] += 1
+        job._resolve(data)
+
+    async def _fetch_from_history(self, job: ComfyJob) -> Optional[bytes]:
+        history = await self._get_json(f"/history/{job.prompt_id}")
+        outputs = ((history.get(job.prompt_id) or {}).get("outputs")) or {}
+        item = _first_output_item(outputs.get(job.output_node_id))
+        if item is None:
+            logger.error(
+                "No output found in history (Node %s). Available output keys: %s", job.output_node_id, list(outputs.keys())
+            )
+            return None
+        return await self._download(item)
+
+    # --- queue position / ETA -------------------------------------------
+
+    def _refresh_queue_soon(self) -> None:
+        # Also refresh while foreign prompts are counted: `status` can only raise that
+        # estimate, so /queue is what lets it fall again when nothing of ours is waiting.
+        if not self._foreign and not self._local and not any(j.state in ("queued", "submitting") for j in self._remote.values()):
+            return
+        if self._queue_refresh is not None and not self._queue_refresh.done():
+            self._queue_dirty = True
+            return
+        self._queue_refresh = self._spawn(self._refresh_queue_loop())
+
+    async def _refresh_queue_loop(self) -> None:
+        while True:
+            self._queue_dirty = False
+            try:
+                await self._refresh_queue()
+            except Exception:
+                logger.debug("ComfyUI /queue refresh failed", exc_info=True)
+                return
+            if not self._queue_dirty:
+                return
+
+    async def _refresh_queue(self) -> set[str]:
+        q = await self._get_json("/queue")
+        running = [e for e in (q.get("queue_running") or []) if isinstance(e, list) and len(e) > 1]
+        pending = [e for e in (q.get("queue_pending") or []) if isinstance(e, list) and len(e) > 1]
+        pending.sort(key=lambda e: e[0] if isinstance(e[0], (int, float)) else 0)
+        self._remote_order = [str(e[1]) for e in running + pending]
+        # A prompt still being POSTed can show up here unrecognised and count as foreign
+        # for one snapshot; over-counting only delays admission.
+        self._foreign = sum(1 for pid in self._remote_order if pid not in self._remote)
+        self._update_positions()
+        self._pump()
+        return set(self._remote_order)
+
+    def _avg(self, kind: str) -> float:
+        return self._render_avg.get(kind, self.default_render_sec)
+
+    def _eta(self, job: ComfyJob) -> Optional[float]:
+        avg = self._avg(job.kind)
+        if job.state == "running":
+            if job.fraction is not None:
+                return avg * (1.0 - job.fraction)
+            return max(0.0, avg - (time.monotonic() - (job.started_at or time.monotonic())))
+        if job.state in ("done", "failed", "cancelled"):
+            return 0.0
+        return (job.position + 1) * avg
+
+    def _update_positions(self) -> None:
+        order = {pid: i for i, pid in enumerate(self._remote_order)}
+        for pid, job in self._remote.items():
+            if job.state == "running":
+                pos = 0
+            elif pid in order:
+                pos = order[pid]
+            else:
+                pos = max(0, self.remote_queue - 1)
+            self._set_position(job, pos)
+        for i, job in enumerate(self._local):
+            self._set_position(job, self.remote_queue + i)
+
+    def _set_position(self, job: ComfyJob, position: int) -> None:
+        old = (job.position, job.state)
+        job.position = position
+        job.eta_sec = self._eta(job)
+        if old != (job.position, job.state) or job.state == "running":
+            job._touch()
+
+    # --- HTTP ------------------------------------------------------------
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _get_json(self, path: str) -> dict:
+        assert self._session is not None
+        async with self._session.get(self.base_url + path, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        return data if isinstance(data, dict) else {}
+
+    async def _post_json(self, path: str, payload: dict) -> dict:
+        assert self._session is not None
+        async with self._session.post(self.base_url + path, json=payload, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+            text = await resp.text()
+            if resp.status >= 400:
+                raise ComfyError(f"ComfyUI {path} HTTP {resp.status}: {text[:200]}")
+        try:
+            data = json.loads(text) if text else {}
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    async def _download(self, item: dict) -> bytes:
+        assert self._session is not None
+        query = urllib.parse.urlencode(
+            {"filename": item.get("filename", ""), "subfolder": item.get("subfolder", ""), "type": item.get("type", "output")}
+        )
+        async with self._session.get(f"{self.base_url}/view?{query}", timeout=aiohttp.ClientTimeout(total=300)) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+
+def _first_output_item(node_output: Any) -> Optional[dict]:
+    if not isinstance(node_output, dict):
+        return None
+    for key in _OUTPUT_KEYS:
+        items = node_output.get(key)
+        if isinstance(items, list) and items and isinstance(items[0], dict):
+            return items[0]
+    return None
+
+
+def format_job_status(snapshot: dict) -> str:
+    """Short status line for Discord: queue position / progress and ETA."""
+    eta = snapshot.get("eta_sec")
+    eta_txt = ""
+    if isinstance(eta, (int, float)):
+        eta_txt = f" · ETA ~{int(eta) // 60}m{int(eta) % 60:02d}s" if eta >= 60 else f" · ETA ~{int(eta)}s"
+    state = snapshot.get("state")
+    if state == "running":
+        frac = snapshot.get("progress")
+        pct = f" {int(frac * 100)}%" if isinstance(frac, (int, float)) else ""
+        return f"🎨 Rendering{pct}{eta_txt}"
+    if state in ("local", "submitting", "queued"):
+        return f"⏳ Queue position {int(snapshot.get('position') or 0) + 1}{eta_txt}"
+    if state == "done":
+        return "✅ Done"
+    return f"❌ {snapshot.get('error') or state}"
@@ -3,6 +3,8 @@ from typing import Literal
 
 import aiohttp
 
+from src.utils.http_sessions import shared_session
+
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -15,7 +17,6 @@ class ConnectionManager:
         self.api_base_url = api_base_url
         self.force_standalone = force_standalone
         self.mode: Literal["API", "STANDALONE"] = "STANDALONE"
-        self._session: aiohttp.ClientSession | None = None
         self._last_check = 0
         
         # Initial state determination
@@ -27,9 +28,8 @@ class ConnectionManager:
             logger.info(f"ConnectionManager initialized. Target API: {api_base_url}")
 
     async def get_session(self) -> aiohttp.ClientSession:
-        if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
-        return self._session
+        # Owned by the bot-wide session registry; closed with the bot, not here.
+        return shared_session()
 
     async def check_health(self) -> bool:
         """
@@ -60,8 +60,7 @@ class ConnectionManager:
             return False
 
     async def close(self):
-        if self._session:
-            await self._session.close()
+        return None
 
     @property
     def is_standalone(self) -> bool:
@@ -40,6 +40,17 @@ except Exception:
         del method, path
         return {}
 
+try:
+    from src.utils.http_sessions import borrow_session
+except Exception:
+    import contextlib
+
+    @contextlib.asynccontextmanager
+    async def borrow_session(name: str = "default", **session_kwargs: Any):
+        del name
+        async with aiohttp.ClientSession(**session_kwargs) as session:
+            yield session
+
 logger = logging.getLogger(__name__)
 
 
@@ -249,7 +260,7 @@ class CoreAPIClient:
             },
         }
 
-        async with aiohttp.ClientSession() as session:
+        async with borrow_session() as session:
             try:
                 async with session.post(url, json=payload, headers=headers) as resp:
                     if resp.status == 200:
@@ -293,8 +304,8 @@ class CoreAPIClient:
                     origin_context=origin_context,
                     run_id=run_id,
                 )
-                async with aiohttp.ClientSession(timeout=timeout_cfg) as session:
-                    async with session.get(url, headers=headers) as resp:
+                async with borrow_session() as session:
+                    async with session.get(url, headers=headers, timeout=timeout_cfg) as resp:
                         if resp.status != 200:
                             logger.error("Failed to connect to events (%s)", resp.status)
                             return
@@ -375,7 +386,7 @@ class CoreAPIClient:
             origin_context=origin_context,
             run_id=run_id,
         )
-        async with aiohttp.ClientSession() as session:
+        async with borrow_session() as session:
             try:
                 async with session.post(url, json=payload, headers=headers) as resp:
                     if resp.status == 200:
@@ -0,0 +1,27 @@
+"""Clamped ``ORA_*`` numeric knobs read from the environment.
+
+A missing, blank or unparsable value falls back to ``default``; the result is
+always clamped into ``[lo, hi]`` so a bad setting cannot disable a bound.
+"""
+
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, default: int, lo: int, hi: int) -> int:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        val = int(raw) if raw else default
+    except Exception:
+        val = default
+    return max(lo, min(hi, val))
+
+
+def env_float(name: str, default: float, lo: float, hi: float) -> float:
+    raw = (os.getenv(name) or "").strip()
+    try:
+        val = float(raw) if raw else default
+    except Exception:
+        val = default
+    return max(lo, min(hi, val))
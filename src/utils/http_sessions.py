@@ -0,0 +1,244 @@
+"""
+Bot-wide aiohttp session registry.
+
+Creating an `aiohttp.ClientSession` per call throws away the connection pool and
+the DNS cache every time (TCP + TLS handshake per VOICEVOX sentence, per Core
+poll, per tool fetch). This module keeps one `TCPConnector` per event loop and
+hands out sessions bound to it:
+
+- per-host connection limits, keep-alive and a DNS cache on the shared connector
+- named sessions (different default headers/timeouts) share that connector
+- request / connection / queueing counters via `aiohttp.TraceConfig`, so pool
+  saturation shows up as `queued` waits instead of silent latency
+- no cookie jar by default: the shared sessions fetch user-supplied URLs for
+  many users, and a cookie set on one user's fetch must not ride along on the
+  next user's request to the same site (pass `cookie_jar=` to opt in)
+
+Sessions handed out here are owned by the registry: callers must not close them.
+The bot closes the registry when it shuts down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+from src.utils.env import env_float, env_int
+
+
+class _PoolCounters:
+    __slots__ = ("requests", "connections_created", "connections_reused", "queued", "queued_ms", "dns_cache_hits", "dns_cache_misses")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.queued = 0
+        self.queued_ms = 0.0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+
+
+class SessionRegistry:
+    """Owns the shared connector and the sessions built on top of it."""
+
+    def __init__(
+        self,
+        *,
+        limit: int | None = None,
+        limit_per_host: int | None = None,
+        dns_ttl_sec: int | None = None,
+        keepalive_sec: float | None = None,
+    ) -> None:
+        self.limit = limit if limit is not None else env_int("ORA_HTTP_POOL_LIMIT", 100, 1, 10000)
+        self.limit_per_host = (
+            limit_per_host if limit_per_host is not None else env_int("ORA_HTTP_POOL_LIMIT_PER_HOST", 16, 0, 10000)
+        )
+        self.dns_ttl_sec = dns_ttl_sec if dns_ttl_sec is not None else env_int("ORA_HTTP_DNS_TTL_SEC", 300, 0, 86400)
+        self.keepalive_sec = (
+            keepalive_sec if keepalive_sec is not None else env_float("ORA_HTTP_KEEPALIVE_SEC", 30.0, 1.0, 600.0)
+        )
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connector: aiohttp.TCPConnector | None = None
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._closing: set[asyncio.Future[Any]] = set()
+        self._counters = _PoolCounters()
+        self._trace = self._build_trace_config()
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        counters = self._counters
+        trace = aiohttp.TraceConfig()
+
+        async def _on_request_start(_session: Any, ctx: Any, _params: Any) -> None:
+            counters.requests += 1
+
+        async def _on_queued_start(_session: Any, ctx: Any, _params: Any) -> None:
+            ctx.queued_at = time.perf_counter()
+            counters.queued += 1
+
+        async def _on_queued_end(_session: Any, ctx: Any, _params: Any) -> None:
+            started = getattr(ctx, "queued_at", None)
+            if started is not None:
+                counters.queued_ms += (time.perf_counter() - started) * 1000.0
+
+        async def _on_create_end(_session: Any, ctx: Any, _params: Any) -> None:
+            counters.connections_created += 1
+
+        async def _on_reuse(_session: Any, ctx: Any, _params: Any) -> None:
+            counters.connections_reused += 1
+
+        async def _on_dns_hit(_session: Any, ctx: Any, _params: Any) -> None:
+            counters.dns_cache_hits += 1
+
+        async def _on_dns_miss(_session: Any, ctx: Any, _params: Any) -> None:
+            counters.dns_cache_misses += 1
+
+        trace.on_request_start.append(_on_request_start)
+        trace.on_connection_queued_start.append(_on_queued_start)
+        trace.on_connection_queued_end.append(_on_queued_end)
+        trace.on_connection_create_end.append(_on_create_end)
+        trace.on_connection_reuseconn.append(_on_reuse)
+        trace.on_dns_cache_hit.append(_on_dns_hit)
+        trace.on_dns_cache_miss.append(_on_dns_miss)
+        return trace
+
+    def _ensure_connector(self) -> aiohttp.TCPConnector:
+        loop = asyncio.get_running_loop()
+        if self._connector is None or self._connector.closed or self._loop is not loop:
+            # A different loop means the old connector's sockets are unusable here; close them on their own loop.
+            self._discard(self._loop, list(self._sessions.values()), self._connector)
+            self._sessions = {}
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl_sec or None,
+                use_dns_cache=self.dns_ttl_sec > 0,
+                keepalive_timeout=self.keepalive_sec,
+            )
+            self._loop = loop
+        return self._connector
+
+    def _discard(
+        self,
+        old_loop: asyncio.AbstractEventLoop | None,
+        sessions: list[aiohttp.ClientSession],
+        connector: aiohttp.TCPConnector | None,
+    ) -> None:
+        if not sessions and (connector is None or connector.closed):
+            return
+        coro = _close_quietly(sessions, connector)
+        if old_loop is not None and old_loop.is_running() and old_loop is not asyncio.get_running_loop():
+            fut: asyncio.Future[Any] = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, old_loop))
+        else:
+            # Stopped or closed loop: aiohttp releases the sockets without it.
+            fut = asyncio.ensure_future(coro)
+        self._closing.add(fut)
+        fut.add_done_callback(self._closing.discard)
+
+    def session(self, name: str = "default", **session_kwargs: Any) -> aiohttp.ClientSession:
+        """
+        Return the shared session for `name`, creating it on first use.
+
+        `session_kwargs` (headers, timeout, ...) only apply when the named session
+        is created; use a distinct name for a distinct default configuration.
+        Must be called from inside the running event loop.
+        """
+        connector = self._ensure_connector()
+        sess = self._sessions.get(name)
+        if sess is None or sess.closed:
+            session_kwargs.pop("connector", None)
+            session_kwargs.pop("connector_owner", None)
+            trace_configs = list(session_kwargs.pop("trace_configs", None) or [])
+            session_kwargs.setdefault("cookie_jar", aiohttp.DummyCookieJar())
+            sess = aiohttp.ClientSession(
+                connector=connector,
+                connector_owner=False,
+                trace_configs=[self._trace, *trace_configs],
+                **session_kwargs,
+            )
+            self._sessions[name] = sess
+        return sess
+
+    def stats(self) -> dict[str, Any]:
+        """Pool saturation snapshot for status/metrics endpoints."""
+        c = self._counters
+        conn = self._connector
+        in_use = len(getattr(conn, "_acquired", ()) or ()) if conn is not None else 0
+        waiting = 0
+        busiest_host = 0
+        if conn is not None:
+            waiting = sum(len(w) for w in (getattr(conn, "_waiters", {}) or {}).values())
+            per_host = getattr(conn, "_acquired_per_host", {}) or {}
+            busiest_host = max((len(v) for v in per_host.values()), default=0)
+        total_conns = c.connections_created + c.connections_reused
+        return {
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "sessions": sorted(name for name, s in self._sessions.items() if not s.closed),
+            "in_use": in_use,
+            "waiting": waiting,
+            "saturation": round(in_use / self.limit, 4) if self.limit else 0.0,
+            "busiest_host_in_use": busiest_host,
+            "requests": c.requests,
+            "connections_created": c.connections_created,
+            "connections_reused": c.connections_reused,
+            "reuse_ratio": round(c.connections_reused / total_conns, 4) if total_conns else 0.0,
+            "queued": c.queued,
+            "queued_ms": round(c.queued_ms, 2),
+            "dns_cache_hits": c.dns_cache_hits,
+            "dns_cache_misses": c.dns_cache_misses,
+        }
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        for sess in sessions.values():
+            if not sess.closed:
+                await sess.close()
+        connector, self._connector = self._connector, None
+        if connector is not None and not connector.closed:
+            await connector.close()
+        self._loop = None
+
+    async def __aenter__(self) -> "SessionRegistry":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+async def _close_quietly(sessions: list[aiohttp.ClientSession], connector: aiohttp.TCPConnector | None) -> None:
+    for sess in sessions:
+        with contextlib.suppress(Exception):
+            await sess.close()
+    if connector is not None:
+        with contextlib.suppress(Exception):
+            await connector.close()
+
+
+_registry: SessionRegistry | None = None
+
+
+def get_session_registry() -> SessionRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SessionRegistry()
+    return _registry
+
+
+def shared_session(name: str = "default", **session_kwargs: Any) -> aiohttp.ClientSession:
+    """Shortcut for `get_session_registry().session(...)`; do not close the result."""
+    return get_session_registry().session(name, **session_kwargs)
+
+
+@contextlib.asynccontextmanager
+async def borrow_session(name: str = "default", **session_kwargs: Any) -> AsyncIterator[aiohttp.ClientSession]:
+    """
+    Drop-in for `async with aiohttp.ClientSession() as session:` that yields the
+    shared session and leaves it open on exit. Pass per-call timeouts/headers on
+    the request instead of the session.
+    """
+    yield shared_session(name, **session_kwargs)
@@ -0,0 +1,368 @@
+"""
+Off-loop decode / crop / resize / encode for the image_crop_upscale skill.
+
+`image_crop_upscale.execute` used to `Image.open` a download of up to 25 MB,
+crop it, LANCZOS-resize it to 4K and PNG-encode it (then re-encode as JPEG
+when too large) inside the coroutine, stalling the Discord gateway for
+hundreds of milliseconds to seconds per image. This module:
+
+- runs the whole decode -> transform -> resize -> encode chain in a small
+  process pool (PIL holds the GIL for most of PNG encode and LANCZOS), behind a
+  bounded queue: when `workers + queue` jobs are in flight new ones are refused
+  with `ImagePipelineBusy` instead of piling up
+- shrinks large JPEGs while decoding with `Image.draft()` (DCT scaling) and
+  uses `Image.reduce()` before the final LANCZOS pass on big downscales
+- caches encoded results by (source hash, params) within a byte budget, so
+  re-running the same crop on the same picture skips the pool entirely
+- reports per-stage timings with every result and aggregates them in `stats()`
+
+- gives workers an explicit decompression-bomb limit that raises instead of
+  warning; a job that kills a worker is retried once in a fresh pool and then
+  failed, never decoded in the bot process
+
+Knobs: ORA_IMAGE_WORKERS (0 = run in a thread instead of processes),
+ORA_IMAGE_QUEUE_MAX, ORA_IMAGE_CACHE_MB, ORA_IMAGE_MAX_MEGAPIXELS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, replace
+from typing import Optional
+
+from PIL import Image
+
+from src.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("decode", "transform", "resize", "encode")
+
+
+def source_hasher():
+    """Hash object for cache keys; feed it while downloading to skip the hash stage."""
+    return hashlib.blake2b(digest_size=20)
+
+
+def _hash_bytes(raw: bytes) -> bytes:
+    hasher = source_hasher()
+    hasher.update(raw)
+    return hasher.digest()
+
+
+def _init_worker(max_pixels: int) -> None:
+    """Pool initializer: an explicit pixel limit, and PIL's bomb warning becomes an error."""
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    warnings.simplefilter("error", Image.DecompressionBombWarning)
+
+
+class ImagePipelineBusy(RuntimeError):
+    """Raised when the bounded queue is full."""
+
+
+@dataclass(frozen=True)
+class ImageJob:
+    aspect: Optional[float] = None  # None keeps the source aspect
+    mode: str = "center_crop"  # or "contain"
+    target_w: int = 0  # 0x0 keeps the (cropped) size
+    target_h: int = 0
+    fmt: str = "png"  # or "jpg"
+    jpg_quality: int = 88
+    # PNG output above this falls back to progressively lower JPEG qualities.
+    max_bytes: int = 0
+
+
+@dataclass
+class ImageResult:
+    data: bytes
+    fmt: str
+    jpg_quality: int
+    src_size: tuple[int, int]
+    out_size: tuple[int, int]
+    draft_size: Optional[tuple[int, int]] = None
+    timings_ms: dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+
+
+def center_crop(im: Image.Image, aspect: float) -> Image.Image:
+    w, h = im.size
+    if w <= 0 or h <= 0:
+        return im
+    cur = w / h
+    if abs(cur - aspect) < 1e-6:
+        return im
+
+    if cur > aspect:
+        # too wide -> crop width
+        new_w = int(round(h * aspect))
+        x0 = max(0, (w - new_w) // 2)
+        return im.crop((x0, 0, x0 + new_w, h))
+    # too tall -> crop height
+    new_h = int(round(w / aspect))
+    y0 = max(0, (h - new_h) // 2)
+    return im.crop((0, y0, w, y0 + new_h))
+
+
+def contain(im: Image.Image, aspect: float, *, bg=(0, 0, 0)) -> Image.Image:
+    w, h = im.size
+    if w <= 0 or h <= 0:
+        return im
+    cur = w / h
+    if abs(cur - aspect) < 1e-6:
+        return im
+
+    if cur > aspect:
+        # too wide -> add vertical padding
+        new_h = int(round(w / aspect))
+        canvas = Image.new("RGB", (w, new_h), color=bg)
+        y0 = (new_h - h) // 2
+        canvas.paste(im.convert("RGB"), (0, y0))
+        return canvas
+    # too tall -> add horizontal padding
+    new_w = int(round(h * aspect))
+    canvas = Image.new("RGB", (new_w, h), color=bg)
+    x0 = (new_w - w) // 2
+    canvas.paste(im.convert("RGB"), (x0, 0))
+    return canvas
+
+
+def encode(im: Image.Image, fmt: str, jpg_quality: int) -> bytes:
+    buf = io.BytesIO()
+    if fmt == "jpg":
+        q = int(jpg_quality or 88)
+        q = max(40, min(q, 95))
+        im.convert("RGB").save(buf, format="JPEG", quality=q, optimize=True, progressive=True)
+    else:
+        # png
+        im.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def _transformed_size(w: int, h: int, job: ImageJob) -> tuple[int, int]:
+    if job.aspect is None or w <= 0 or h <= 0 or abs(w / h - job.aspect) < 1e-6:
+        return w, h
+    too_wide = w / h > job.aspect
+    if job.mode == "contain":
+        return (w, int(round(w / job.aspect))) if too_wide else (int(round(h * job.aspect)), h)
+    return (int(round(h * job.aspect)), h) if too_wide else (w, int(round(w / job.aspect)))
+
+
+def process_image_bytes(raw: bytes, job: ImageJob) -> ImageResult:
+    """Decode, crop/contain, resize and encode one image. Pure and picklable (runs in workers)."""
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    im = Image.open(io.BytesIO(raw))
+    src_size = im.size
+    draft_size = None
+    if job.target_w and job.target_h and im.format == "JPEG":
+        tw, th = _transformed_size(*src_size, job)
+        scale = max(job.target_w / tw, job.target_h / th)
+        if scale < 0.5:
+            # DCT scaling: libjpeg decodes at 1/2, 1/4 or 1/8 size, never below the request.
+            want = (math.ceil(src_size[0] * scale), math.ceil(src_size[1] * scale))
+            im.draft(im.mode, want)
+            if im.size != src_size:
+                draft_size = im.size
+    im.load()
+    timings["decode"] = (time.perf_counter() - started) * 1000
+
+    mark = time.perf_counter()
+    if job.aspect is not None:
+        im = contain(im, job.aspect) if job.mode == "contain" else center_crop(im, job.aspect)
+    timings["transform"] = (time.perf_counter() - mark) * 1000
+
+    mark = time.perf_counter()
+    if job.target_w and job.target_h:
+        # Same idea as resize(reducing_gap=2): a cheap box reduce first, LANCZOS for the last <=2x.
+        factor = int(min(im.size[0] / job.target_w, im.size[1] / job.target_h) / 2)
+        if factor >= 2:
+            im = im.reduce(factor)
+        im = im.resize((int(job.target_w), int(job.target_h)), resample=Image.LANCZOS)
+    timings["resize"] = (time.perf_counter() - mark) * 1000
+
+    mark = time.perf_counter()
+    fmt, quality = job.fmt, job.jpg_quality
+    data = encode(im, fmt, quality)
+    if job.max_bytes and len(data) > job.max_bytes and fmt == "png":
+        # fallback to jpg if png is too big
+        for q in (90, 85, 80, 75, 70):
+            data = encode(im, "jpg", q)
+            fmt, quality = "jpg", q
+            if len(data) <= job.max_bytes:
+                break
+    timings["encode"] = (time.perf_counter() - mark) * 1000
+
+    return ImageResult(
+        data=data,
+        fmt=fmt,
+        jpg_quality=quality,
+        src_size=src_size,
+        out_size=im.size,
+        draft_size=draft_size,
+        timings_ms={k: round(v, 2) for k, v in timings.items()},
+    )
+
+
+class ImagePipeline:
+    """Bounded off-loop executor plus result cache for `process_image_bytes`."""
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        queue_max: Optional[int] = None,
+        cache_bytes: Optional[int] = None,
+    ) -> None:
+        self.workers = workers if workers is not None else env_int("ORA_IMAGE_WORKERS", min(2, os.cpu_count() or 1), 0, 8)
+        self.queue_max = queue_max if queue_max is not None else env_int("ORA_IMAGE_QUEUE_MAX", 4, 0, 64)
+        self.cache_bytes = (
+            cache_bytes if cache_bytes is not None else env_int("ORA_IMAGE_CACHE_MB", 64, 0, 4096) * 1024 * 1024
+        )
+        self.max_pixels = env_int("ORA_IMAGE_MAX_MEGAPIXELS", 64, 1, 1024) * 1_000_000
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = asyncio.Semaphore(max(1, self.workers))
+        self._in_flight = 0
+        self._cache: OrderedDict[tuple, ImageResult] = OrderedDict()
+        self._cache_used = 0
+        self._stats: dict[str, float] = {
+            "jobs": 0,
+            "cache_hits": 0,
+            "rejected": 0,
+            "errors": 0,
+            **{f"{stage}_ms_total": 0.0 for stage in ("hash", "queue", *STAGES)},
+        }
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                # spawn: the bot process has live threads (discord, aiohttp) that fork would copy mid-state.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.max_pixels,),
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: Optional[ProcessPoolExecutor] = None) -> None:
+        with self._executor_lock:
+            if broken is not None and self._executor is not broken:
+                return  # another job already replaced the broken pool
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def process(self, raw: bytes, job: ImageJob, *, source_digest: Optional[bytes] = None) -> ImageResult:
+        capacity = max(1, self.workers) + self.queue_max
+        if self._in_flight >= capacity:
+            self._stats["rejected"] += 1
+            raise ImagePipelineBusy("image pipeline is busy")
+        self._in_flight += 1
+        try:
+            return await self._process(raw, job, source_digest)
+        finally:
+            self._in_flight -= 1
+
+    async def _process(self, raw: bytes, job: ImageJob, digest: Optional[bytes]) -> ImageResult:
+        started = time.perf_counter()
+        if digest is None:
+            # hashlib releases the GIL on large buffers, so a thread keeps 25 MB hashes off the loop.
+            digest = await asyncio.to_thread(lambda: _hash_bytes(raw))
+        hash_ms = (time.perf_counter() - started) * 1000
+        key = (digest, job)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._stats["cache_hits"] += 1
+            self._stats["hash_ms_total"] += hash_ms
+            return replace(cached, cached=True, timings_ms={"hash": round(hash_ms, 2)})
+
+        mark = time.perf_counter()
+        async with self._slots:
+            queue_ms = (time.perf_counter() - mark) * 1000
+            try:
+                result = await self._run(raw, job)
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+
+        result.timings_ms = {"hash": round(hash_ms, 2), "queue": round(queue_ms, 2), **result.timings_ms}
+        result.timings_ms["total"] = round((time.perf_counter() - started) * 1000, 2)
+        self._stats["jobs"] += 1
+        for stage in ("hash", "queue", *STAGES):
+            self._stats[f"{stage}_ms_total"] += result.timings_ms.get(stage, 0.0)
+        self._remember(key, result)
+        return result
+
+    async def _run(self, raw: bytes, job: ImageJob) -> ImageResult:
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(process_image_bytes, raw, job)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, process_image_bytes, raw, job)
+        except BrokenProcessPool:
+            # A worker died (OOM on a decompression bomb, killed, ...). Retry once in a fresh pool;
+            # decoding in the bot process instead would give up the isolation the pool exists for.
+            logger.warning("Image worker pool broke; retrying this job once in a fresh pool.")
+            self._reset_executor(executor)
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, process_image_bytes, raw, job)
+        except BrokenProcessPool:
+            logger.warning("Image worker pool broke again; failing the job.")
+            self._reset_executor(executor)
+            raise
+
+    def _remember(self, key: tuple, result: ImageResult) -> None:
+        size = len(result.data)
+        if size > self.cache_bytes // 2:
+            return
+        self._cache[key] = result
+        self._cache_used += size
+        while self._cache_used > self.cache_bytes and self._cache:
+            _, evicted = self._cache.popitem(last=False)
+            self._cache_used -= len(evicted.data)
+
+    def stats(self) -> dict[str, float]:
+        jobs = int(self._stats["jobs"])
+        out: dict[str, float] = {
+            "jobs": jobs,
+            "cache_hits": int(self._stats["cache_hits"]),
+            "rejected": int(self._stats["rejected"]),
+            "errors": int(self._stats["errors"]),
+            "in_flight": self._in_flight,
+            "cache_entries": len(self._cache),
+            "cache_bytes": self._cache_used,
+        }
+        for stage in ("hash", "queue", *STAGES):
+            out[f"avg_{stage}_ms"] = round(self._stats[f"{stage}_ms_total"] / jobs, 2) if jobs else 0.0
+        return out
+
+    def shutdown(self) -> None:
+        self._reset_executor()
+
+
+_pipeline: Optional[ImagePipeline] = None
+
+
+def get_image_pipeline() -> ImagePipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ImagePipeline()
+    return _pipeline
@@ -3,9 +3,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 from functools import lru_cache
 import hashlib
-import math
 import re
-from typing import Iterable
+import threading
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
 
 
 _VECTOR_DIMENSIONS = 256
@@ -158,39 +160,123 @@ def classify_semantic_intent(
     )
 
 
+class PrototypeIndex:
+    """Nearest-prototype scorer over the hashed n-gram embedding, for arbitrary label sets.
+
+    All prototype vectors live in one (P, D) matrix, so scoring a text is a single
+    matrix-vector product followed by a per-label max. `add()` appends labels or
+    phrases; the matrix is rebuilt lazily on the next score, never per call.
+    """
+
+    def __init__(self, prototypes: Mapping[str, Iterable[str]] | None = None) -> None:
+        self._phrases: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+        self._matrix: np.ndarray | None = None
+        self._starts: np.ndarray | None = None
+        for label, phrases in (prototypes or {}).items():
+            self.add(label, phrases)
+
+    @property
+    def labels(self) -> tuple[str, ...]:
+        return tuple(self._phrases)
+
+    def add(self, label: str, phrases: Iterable[str]) -> None:
+        with self._lock:
+            self._phrases.setdefault(label, []).extend(str(p) for p in phrases)
+            self._matrix = None
+
+    def _compiled(self) -> tuple[np.ndarray, np.ndarray, tuple[str, ...]]:
+        with self._lock:
+            labels = tuple(label for label, phrases in self._phrases.items() if phrases)
+            if self._matrix is None:
+                rows = [phrase for label in labels for phrase in self._phrases[label]]
+                self._matrix = embed_texts(rows) if rows else np.zeros((0, _VECTOR_DIMENSIONS))
+                counts = [len(self._phrases[label]) for label in labels]
+                self._starts = np.cumsum([0, *counts[:-1]]).astype(np.intp)
+            return self._matrix, self._starts, labels
+
+    def scores(self, text: str) -> dict[str, float]:
+        return self.scores_batch([text])[0]
+
+    def scores_batch(self, texts: Sequence[str]) -> list[dict[str, float]]:
+        """Scores for many texts with one (N, D) x (D, P) product."""
+        matrix, starts, labels = self._compiled()
+        empty_labels = [label for label in self._phrases if label not in labels]
+        if not texts:
+            return []
+        if not labels:
+            return [dict.fromkeys(empty_labels, 0.0) for _ in texts]
+        sims = embed_texts(texts) @ matrix.T
+        per_label = np.maximum.reduceat(sims, starts, axis=1)
+        out = []
+        for row in per_label.tolist():
+            scores = dict(zip(labels, row))
+            for label in empty_labels:
+                scores[label] = 0.0
+            out.append(scores)
+        return out
+
+    def best(self, text: str) -> tuple[str, float, float]:
+        """(top label, top score, margin over the runner-up)."""
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        if not ranked:
+            return "", 0.0, 0.0
+        second = ranked[1][1] if len(ranked) > 1 else 0.0
+        return ranked[0][0], ranked[0][1], ranked[0][1] - second
+
+
+_intent_index = PrototypeIndex(_INTENT_PROTOTYPES)
+
+
+def register_intent_prototypes(intent_name: str, phrases: Iterable[str]) -> None:
+    """Adds an intent (or more phrases for an existing one) to the shared classifier.
+
+    Registered intents are scored in the same matrix product as the built-in ones
+    and show up in `SemanticIntentResult.scores`; they also take part in the
+    top-intent / margin ranking.
+    """
+    _intent_index.add(intent_name, phrases)
+
+
+def semantic_similarity_batch(texts: Sequence[str]) -> list[dict[str, float]]:
+    """Raw prototype similarities for many texts at once (no context adjustments)."""
+    return _intent_index.scores_batch(list(texts))
+
+
 def _base_similarity_scores(text: str) -> dict[str, float]:
-    vec = _embed_text(text)
-    scores: dict[str, float] = {}
-    for intent_name, proto_vecs in _prototype_vectors().items():
-        similarities = [_cosine_similarity(vec, proto_vec) for proto_vec in proto_vecs]
-        scores[intent_name] = max(similarities) if similarities else 0.0
-    return scores
-
-
-@lru_cache(maxsize=1)
-def _prototype_vectors() -> dict[str, tuple[tuple[float, ...], ...]]:
-    return {
-        intent_name: tuple(_embed_text(proto) for proto in prototypes)
-        for intent_name, prototypes in _INTENT_PROTOTYPES.items()
-    }
-
-
-def _embed_text(text: str) -> tuple[float, ...]:
-    vec = [0.0] * _VECTOR_DIMENSIONS
-    for token in _iter_semantic_tokens(text):
-        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
-        bucket = int.from_bytes(digest[:4], "big") % _VECTOR_DIMENSIONS
-        sign = 1.0 if digest[4] % 2 == 0 else -1.0
-        vec[bucket] += sign
-
-    norm = math.sqrt(sum(value * value for value in vec))
-    if norm <= 0:
-        return tuple(0.0 for _ in vec)
-    return tuple(value / norm for value in vec)
-
-
-def _cosine_similarity(a: tuple[float, ...], b: tuple[float, ...]) -> float:
-    return sum(x * y for x, y in zip(a, b))
+    return _intent_index.scores(text)
+
+
+@lru_cache(maxsize=65536)
+def _token_feature(token: str) -> tuple[int, float]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    bucket = int.from_bytes(digest[:4], "big") % _VECTOR_DIMENSIONS
+    sign = 1.0 if digest[4] % 2 == 0 else -1.0
+    return bucket, sign
+
+
+@lru_cache(maxsize=1024)
+def _embed_text(text: str) -> np.ndarray:
+    # The same request text is embedded by ContextBuilder, the tool selector and process;
+    # the vector is cached read-only so callers cannot corrupt the shared copy.
+    features = [_token_feature(token) for token in _iter_semantic_tokens(text)]
+    if features:
+        buckets, signs = zip(*features)
+        vec = np.bincount(buckets, weights=signs, minlength=_VECTOR_DIMENSIONS)
+    else:
+        vec = np.zeros(_VECTOR_DIMENSIONS)
+    norm = float(np.sqrt(vec @ vec))
+    if norm > 0:
+        vec = vec / norm
+    vec.setflags(write=False)
+    return vec
+
+
+def embed_texts(texts: Sequence[str]) -> np.ndarray:
+    """(N, D) matrix of unit-norm embeddings (zero rows for empty texts)."""
+    if not texts:
+        return np.zeros((0, _VECTOR_DIMENSIONS))
+    return np.stack([_embed_text(str(text or "")) for text in texts])
 
 
 def _iter_semantic_tokens(text: str) -> Iterable[str]:
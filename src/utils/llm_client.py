@@ -10,6 +10,8 @@ from typing import Any, Dict, List, Optional
 
 import aiohttp
 
+from src.utils.http_sessions import borrow_session, shared_session
+
 logger = logging.getLogger(__name__)
 
 
@@ -574,7 +576,7 @@ class LLMClient:
 
                 raise RuntimeError(f"LLM request failed ({model_name}): {str(e).replace('127.0.0.1', '[RESTRICTED]')}") from e
         else:
-            async with aiohttp.ClientSession() as session:
+            async with borrow_session() as session:
                 try:
                     data = await robust_json_request(
                         session,
@@ -712,35 +714,25 @@ class LLMClient:
         # Ollama payload
         ollama_payload = {"model": self._model, "keep_alive": 0}
 
-        # Use throw-away session or existing
-        ctx = self._session if self._session else aiohttp.ClientSession()
+        # Use the injected session or the bot-wide shared one
+        session = self._session or shared_session()
 
         try:
-            # We need to handle session context manager manually depending on if we own it
-            session = ctx
-            if not self._session:
-                await session.__aenter__()
-
+            # A. Try LM Studio Unload
             try:
-                # A. Try LM Studio Unload
-                try:
-                    async with session.post(urls[0], headers=headers, json={}, timeout=2) as resp:
-                        if resp.status == 200:
-                            logger.info("✅ LM Studio Model Unloaded.")
-                except Exception:
-                    pass
+                async with session.post(urls[0], headers=headers, json={}, timeout=2) as resp:
+                    if resp.status == 200:
+                        logger.info("✅ LM Studio Model Unloaded.")
+            except Exception:
+                pass
 
-                # B. Try Ollama Unload
-                try:
-                    async with session.post(urls[1], headers=headers, json=ollama_payload, timeout=2) as resp:
-                        if resp.status == 200:
-                            logger.info("✅ Ollama Model Unloaded (keep_alive=0).")
-                except Exception:
-                    pass
-
-            finally:
-                if not self._session:
-                    await session.__aexit__(None, None, None)
+            # B. Try Ollama Unload
+            try:
+                async with session.post(urls[1], headers=headers, json=ollama_payload, timeout=2) as resp:
+                    if resp.status == 200:
+                        logger.info("✅ Ollama Model Unloaded (keep_alive=0).")
+            except Exception:
+                pass
 
             # C. Try 'lms' CLI (LM Studio 0.3+)
             try:
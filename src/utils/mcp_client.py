@@ -5,17 +5,18 @@ import json
 import logging
 import os
 import shlex
-import subprocess
 import sys
-import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_PROTOCOL_VERSION = os.environ.get("ORA_MCP_PROTOCOL_VERSION", "2025-11-25")
 DEFAULT_STDIO_FRAMING = os.environ.get("ORA_MCP_STDIO_FRAMING", "jsonl").strip().lower()
 WIN32SYSLOADER_IMPORT_SENTINEL = "_win32sysloader"
+# Per-message ceiling; also the StreamReader line limit so large jsonl results still parse.
+_MAX_MESSAGE_BYTES = 50_000_000
+TOOLS_LIST_CHANGED = "notifications/tools/list_changed"
 
 
 def _redact_cmd(cmd: list[str]) -> str:
@@ -49,26 +50,16 @@ def _encode_frame(payload: dict, *, framing: str) -> bytes:
     return header + body
 
 
-def _read_exact_blocking(stream, n: int) -> bytes:
-    buf = bytearray()
-    while len(buf) < n:
-        chunk = stream.read(n - len(buf))
-        if not chunk:
-            break
-        buf.extend(chunk)
-    return bytes(buf)
-
-
-def _read_mcp_message_blocking(stream, *, framing: str) -> Optional[dict]:
+async def _read_mcp_message(reader: asyncio.StreamReader, *, framing: str) -> Optional[dict]:
     """
-    Read one MCP/JSON-RPC message from a blocking stdio stream.
+    Read one MCP/JSON-RPC message from an asyncio stdio stream.
 
     Supports:
     - jsonl: newline-delimited JSON (MCP Python stdio transport)
     - lsp: Content-Length framing (some JSON-RPC stdio servers)
     """
     while True:
-        line = stream.readline()
+        line = await reader.readline()
         if not line:
             return None
         stripped = line.strip()
@@ -86,7 +77,7 @@ def _read_mcp_message_blocking(stream, *, framing: str) -> Optional[dict]:
 
             header_lines = [line]
             while True:
-                l2 = stream.readline()
+                l2 = await reader.readline()
                 if not l2:
                     return None
                 header_lines.append(l2)
@@ -101,10 +92,11 @@ def _read_mcp_message_blocking(stream, *, framing: str) -> Optional[dict]:
                     except Exception:
                         length = None
                     break
-            if not length or length <= 0 or length > 50_000_000:
+            if not length or length <= 0 or length > _MAX_MESSAGE_BYTES:
                 continue
-            body = _read_exact_blocking(stream, length)
-            if not body:
+            try:
+                body = await reader.readexactly(length)
+            except asyncio.IncompleteReadError:
                 return None
             try:
                 return json.loads(body.decode("utf-8", errors="ignore"))
@@ -130,6 +122,9 @@ class MCPStdioClient:
     Minimal MCP client over stdio.
 
     This intentionally avoids any external MCP dependency so ORA remains portable.
+    The transport is a native asyncio subprocess pipe: requests are pipelined (many
+    in flight, matched by JSON-RPC id), one reader task resolves responses, and no
+    thread is involved per message.
     """
 
     def __init__(self, *, name: str, command: str, cwd: Optional[str] = None, env: Optional[Dict[str, str]] = None):
@@ -145,48 +140,66 @@ class MCPStdioClient:
         self.env = env or {}
         self.framing = DEFAULT_STDIO_FRAMING if DEFAULT_STDIO_FRAMING in ("jsonl", "lsp") else "jsonl"
 
-        self._proc: Optional[subprocess.Popen[bytes]] = None
-        self._stdout_thread: Optional[threading.Thread] = None
-        self._stderr_thread: Optional[threading.Thread] = None
-        self._loop: Optional[asyncio.AbstractEventLoop] = None
-        self._pending_lock = threading.Lock()
-        self._write_lock = threading.Lock()
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._start_task: Optional[asyncio.Task] = None
         self._pending: dict[int, asyncio.Future] = {}
         self._id = 1
-        self._lock = asyncio.Lock()
         self._disabled = False
         self._disabled_reason: Optional[str] = None
-        self._disable_lock = threading.Lock()
+
+        # tools/list is cached until the server says it changed (or restarts as a different build).
+        self._tools_cache: Optional[list[MCPTool]] = None
+        self._server_info: Optional[dict] = None
+        self._tools_changed_listeners: list[Callable[[], Any]] = []
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None
+
+    @property
+    def outstanding(self) -> int:
+        """Requests sent but not answered yet (used for least-outstanding dispatch)."""
+        return len(self._pending)
+
+    def on_tools_changed(self, callback: Callable[[], Any]) -> None:
+        """Register a callback fired when the server sends notifications/tools/list_changed."""
+        self._tools_changed_listeners.append(callback)
 
     async def start(self) -> None:
         if self._disabled:
             raise RuntimeError(f"MCP disabled server={self.name} reason_code={self._disabled_reason}")
-        if self._proc and self._proc.poll() is None:
+        if self.running and self._start_task is not None and self._start_task.done():
             return
+        if self._start_task is None or self._start_task.done():
+            self._start_task = asyncio.get_running_loop().create_task(self._spawn())
+        # Concurrent callers wait for the same spawn + handshake instead of racing it.
+        await asyncio.shield(self._start_task)
+        if self._disabled:
+            await self.close()
+            raise RuntimeError(f"MCP disabled server={self.name} reason_code={self._disabled_reason}")
 
+    async def _spawn(self) -> None:
         merged_env = os.environ.copy()
         merged_env.update({k: str(v) for k, v in (self.env or {}).items()})
 
         logger.info("MCP starting server=%s cmd=%s", self.name, _redact_cmd(self.command))
-        self._loop = asyncio.get_running_loop()
-        self._proc = subprocess.Popen(
-            self.command,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+        self._proc = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             cwd=self.cwd,
             env=merged_env,
+            limit=_MAX_MESSAGE_BYTES,
         )
-        assert self._proc.stdin and self._proc.stdout and self._proc.stderr
-
-        self._stdout_thread = threading.Thread(target=self._stdout_loop, name=f"mcp-{self.name}-stdout", daemon=True)
-        self._stderr_thread = threading.Thread(target=self._stderr_loop, name=f"mcp-{self.name}-stderr", daemon=True)
-        self._stdout_thread.start()
-        self._stderr_thread.start()
+        self._reader_task = asyncio.get_running_loop().create_task(self._stdout_loop(self._proc))
+        self._stderr_task = asyncio.get_running_loop().create_task(self._stderr_loop())
         # Best-effort initialization handshake (MCP uses an LSP-like initialize + initialized).
         # Some servers require this before tools/list will work; others ignore it.
         try:
-            await self.request(
+            init = await self._request_raw(
                 "initialize",
                 {
                     "protocolVersion": DEFAULT_PROTOCOL_VERSION,
@@ -195,115 +208,145 @@ class MCPStdioClient:
                 },
                 timeout=10,
             )
-            await self.notify("notifications/initialized", None)
+            await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+            server_info = init.get("serverInfo") if isinstance(init, dict) else None
+            if server_info != self._server_info:
+                self._tools_cache = None
+            self._server_info = server_info if isinstance(server_info, dict) else None
         except Exception:
             # Don't hard-fail for compatibility with older/non-standard servers.
+            self._tools_cache = None
             logger.debug("MCP initialize handshake failed server=%s", self.name, exc_info=True)
-        if self._disabled:
-            await self.close()
-            raise RuntimeError(f"MCP disabled server={self.name} reason_code={self._disabled_reason}")
 
     def _disable_with_reason(self, reason_code: str) -> None:
-        with self._disable_lock:
-            if self._disabled:
-                return
-            self._disabled = True
-            self._disabled_reason = reason_code
+        if self._disabled:
+            return
+        self._disabled = True
+        self._disabled_reason = reason_code
         logger.warning(
             "MCP[%s] disabled reason_code=%s action=no_restart",
             self.name,
             reason_code,
         )
 
+    def _terminate_proc(self) -> None:
+        try:
+            if self._proc and self._proc.returncode is None:
+                self._proc.terminate()
+        except Exception:
+            pass
+
     async def close(self) -> None:
-        if self._proc and self._proc.poll() is None:
+        proc = self._proc
+        if proc and proc.returncode is None:
             try:
-                self._proc.terminate()
+                if proc.stdin:
+                    proc.stdin.close()
             except Exception:
                 pass
+            self._terminate_proc()
             try:
-                await asyncio.wait_for(asyncio.to_thread(self._proc.wait), timeout=3)
+                await asyncio.wait_for(proc.wait(), timeout=3)
             except Exception:
                 try:
-                    self._proc.kill()
+                    proc.kill()
                 except Exception:
                     pass
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done() and task is not asyncio.current_task():
+                task.cancel()
+        self._fail_pending(ConnectionError(f"MCP server closed server={self.name}"))
         self._proc = None
-        self._stdout_thread = None
-        self._stderr_thread = None
-        self._loop = None
-
-    def _resolve_pending(self, mid: int, msg: dict) -> None:
-        with self._pending_lock:
-            fut = self._pending.pop(mid, None)
-        if fut and not fut.done():
-            fut.set_result(msg)
-
-    def _stdout_loop(self) -> None:
-        assert self._proc and self._proc.stdout and self._loop
-        while True:
-            msg = _read_mcp_message_blocking(self._proc.stdout, framing=self.framing)
-            if msg is None:
-                return
-            if not isinstance(msg, dict):
-                continue
-            if "id" in msg and (msg.get("result") is not None or msg.get("error") is not None):
+        self._reader_task = None
+        self._stderr_task = None
+        self._start_task = None
+
+    def _fail_pending(self, exc: BaseException) -> None:
+        pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            if not fut.done():
+                fut.set_exception(exc)
+
+    async def _stdout_loop(self, proc: asyncio.subprocess.Process) -> None:
+        assert proc.stdout
+        try:
+            while True:
+                msg = await _read_mcp_message(proc.stdout, framing=self.framing)
+                if msg is None:
+                    break
+                if not isinstance(msg, dict):
+                    continue
+                if "id" in msg and (msg.get("result") is not None or msg.get("error") is not None):
+                    try:
+                        mid = int(msg.get("id"))
+                    except Exception:
+                        continue
+                    fut = self._pending.pop(mid, None)
+                    if fut and not fut.done():
+                        fut.set_result(msg)
+                elif msg.get("method"):
+                    await self._handle_server_message(msg)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.debug("MCP reader failed server=%s", self.name, exc_info=True)
+        if proc is self._proc:
+            self._fail_pending(ConnectionError(f"MCP server exited server={self.name} rc={proc.returncode}"))
+
+    async def _handle_server_message(self, msg: dict) -> None:
+        method = msg.get("method")
+        if method == TOOLS_LIST_CHANGED:
+            self._tools_cache = None
+            logger.info("MCP[%s] tools list changed", self.name)
+            for cb in list(self._tools_changed_listeners):
                 try:
-                    mid = int(msg.get("id"))
+                    res = cb()
+                    if asyncio.iscoroutine(res):
+                        asyncio.get_running_loop().create_task(res)
                 except Exception:
-                    continue
-                self._loop.call_soon_threadsafe(self._resolve_pending, mid, msg)
+                    logger.debug("MCP tools-changed listener failed server=%s", self.name, exc_info=True)
+        elif method == "ping" and "id" in msg:
+            await self._send({"jsonrpc": "2.0", "id": msg["id"], "result": {}})
 
-    def _stderr_loop(self) -> None:
+    async def _stderr_loop(self) -> None:
         assert self._proc and self._proc.stderr
         from src.utils.redaction import redact_text
 
+        stream = self._proc.stderr
         while True:
-            line = self._proc.stderr.readline()
+            line = await stream.readline()
             if not line:
                 return
             txt = line.decode("utf-8", errors="ignore").rstrip()
             if txt:
                 if WIN32SYSLOADER_IMPORT_SENTINEL in txt.lower():
                     self._disable_with_reason("mcp_import_error_win32sysloader")
-                    try:
-                        if self._proc and self._proc.poll() is None:
-                            self._proc.terminate()
-                    except Exception:
-                        pass
+                    self._terminate_proc()
                     return
                 logger.warning("MCP[%s] stderr: %s", self.name, redact_text(txt))
 
-    async def request(self, method: str, params: Optional[dict] = None, timeout: int = 60) -> dict:
-        await self.start()
-        assert self._proc and self._proc.stdin and self._loop
-
-        async with self._lock:
-            req_id = self._id
-            self._id += 1
-
-            fut: asyncio.Future = self._loop.create_future()
-            with self._pending_lock:
-                self._pending[req_id] = fut
-            payload = {"jsonrpc": "2.0", "id": req_id, "method": method}
-            if params is not None:
-                payload["params"] = params
-            data = _encode_frame(payload, framing=self.framing)
-
-            def _write() -> None:
-                assert self._proc and self._proc.stdin
-                with self._write_lock:
-                    self._proc.stdin.write(data)
-                    self._proc.stdin.flush()
-
-            await asyncio.to_thread(_write)
-
+    async def _send(self, payload: dict) -> None:
+        proc = self._proc
+        if proc is None or proc.stdin is None or proc.returncode is not None:
+            raise ConnectionError(f"MCP server not running server={self.name}")
+        proc.stdin.write(_encode_frame(payload, framing=self.framing))
+        await proc.stdin.drain()
+
+    async def _request_raw(self, method: str, params: Optional[dict], timeout: float) -> dict:
+        req_id = self._id
+        self._id += 1
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[req_id] = fut
+        payload: dict[str, Any] = {"jsonrpc": "2.0", "id": req_id, "method": method}
+        if params is not None:
+            payload["params"] = params
         try:
+            await self._send(payload)
             msg = await asyncio.wait_for(fut, timeout=timeout)
         except asyncio.TimeoutError as e:
-            with self._pending_lock:
-                self._pending.pop(req_id, None)
             raise TimeoutError(f"MCP timeout server={self.name} method={method}") from e
+        finally:
+            self._pending.pop(req_id, None)
 
         if not isinstance(msg, dict):
             raise RuntimeError(f"MCP invalid response server={self.name}")
@@ -311,25 +354,20 @@ class MCPStdioClient:
             raise RuntimeError(f"MCP error server={self.name} method={method}: {msg.get('error')}")
         return msg.get("result") or {}
 
-    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+    async def request(self, method: str, params: Optional[dict] = None, timeout: int = 60) -> dict:
         await self.start()
-        assert self._proc and self._proc.stdin
+        return await self._request_raw(method, params, timeout)
 
-        payload = {"jsonrpc": "2.0", "method": method}
+    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+        await self.start()
+        payload: dict[str, Any] = {"jsonrpc": "2.0", "method": method}
         if params is not None:
             payload["params"] = params
+        await self._send(payload)
 
-        data = _encode_frame(payload, framing=self.framing)
-
-        def _write() -> None:
-            assert self._proc and self._proc.stdin
-            with self._write_lock:
-                self._proc.stdin.write(data)
-                self._proc.stdin.flush()
-
-        await asyncio.to_thread(_write)
-
-    async def list_tools(self) -> list[MCPTool]:
+    async def list_tools(self, *, refresh: bool = False) -> list[MCPTool]:
+        if self._tools_cache is not None and not refresh:
+            return list(self._tools_cache)
         # Spec/common: tools/list
         res = None
         last_err: Optional[Exception] = None
@@ -365,7 +403,8 @@ class MCPStdioClient:
                 if not isinstance(schema, dict):
                     schema = {}
                 out.append(MCPTool(name=name, description=desc, input_schema=schema))
-        return out
+        self._tools_cache = out
+        return list(out)
 
     async def call_tool(self, tool_name: str, arguments: Optional[dict] = None, timeout: int = 180) -> dict:
         args = arguments if isinstance(arguments, dict) else {}
@@ -378,7 +417,7 @@ class MCPStdioClient:
                 break
             except Exception as e:
                 last_err = e
-                if self._disabled:
+                if self._disabled or isinstance(e, (TimeoutError, ConnectionError)):
                     break
                 continue
         if res is None and last_err is not None:
@@ -391,3 +430,83 @@ class MCPStdioClient:
         if not isinstance(res, dict):
             return {"ok": False, "error": "invalid_response", "raw": res}
         return res
+
+
+class MCPStdioPool:
+    """
+    Warm replicas of one stdio MCP server with least-outstanding-requests dispatch.
+
+    Most stdio servers handle one request at a time, so a hot server becomes a queue.
+    The pool keeps `replicas` processes running and sends each call to the replica with
+    the fewest requests in flight. It exposes the same surface as MCPStdioClient.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str,
+        command: str,
+        replicas: int = 2,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
+    ):
+        self.name = name
+        self.command_str = command
+        self.replicas = [
+            MCPStdioClient(name=f"{name}#{i}" if i else name, command=command, cwd=cwd, env=env)
+            for i in range(max(1, int(replicas)))
+        ]
+        # Tool lists are identical across replicas; the first one owns the cache.
+        self._tools_changed_listeners: list[Callable[[], Any]] = []
+        for r in self.replicas:
+            r.on_tools_changed(self._replica_tools_changed)
+
+    @property
+    def _disabled(self) -> bool:
+        return all(r._disabled for r in self.replicas)
+
+    @property
+    def outstanding(self) -> int:
+        return sum(r.outstanding for r in self.replicas)
+
+    def on_tools_changed(self, callback: Callable[[], Any]) -> None:
+        self._tools_changed_listeners.append(callback)
+
+    def _replica_tools_changed(self) -> None:
+        for r in self.replicas:
+            r._tools_cache = None
+        for cb in list(self._tools_changed_listeners):
+            res = cb()
+            if asyncio.iscoroutine(res):
+                asyncio.get_running_loop().create_task(res)
+
+    def _pick(self) -> MCPStdioClient:
+        live = [r for r in self.replicas if not r._disabled]
+        if not live:
+            first = self.replicas[0]
+            raise RuntimeError(f"MCP disabled server={self.name} reason_code={first._disabled_reason}")
+        # Prefer replicas that are already up; among them, the least busy one.
+        return min(live, key=lambda r: (not r.running, r.outstanding))
+
+    async def start(self) -> None:
+        results = await asyncio.gather(*(r.start() for r in self.replicas), return_exceptions=True)
+        if all(isinstance(res, BaseException) for res in results):
+            raise results[0]  # type: ignore[misc]
+
+    async def close(self) -> None:
+        await asyncio.gather(*(r.close() for r in self.replicas), return_exceptions=True)
+
+    async def request(self, method: str, params: Optional[dict] = None, timeout: int = 60) -> dict:
+        return await self._pick().request(method, params, timeout=timeout)
+
+    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+        await asyncio.gather(*(r.notify(method, params) for r in self.replicas if not r._disabled))
+
+    async def list_tools(self, *, refresh: bool = False) -> list[MCPTool]:
+        for r in self.replicas:
+            if not r._disabled:
+                return await r.list_tools(refresh=refresh)
+        return []
+
+    async def call_tool(self, tool_name: str, arguments: Optional[dict] = None, timeout: int = 180) -> dict:
+        return await self._pick().call_tool(tool_name, arguments, timeout=timeout)
@@ -1,13 +1,203 @@
+"""
+Secret redaction for trace events, log lines and outbound payloads.
+
+These helpers run on every ledger event, MCP log line and tool result, and
+large tool outputs (page dumps, command logs) are the common case. The rules
+therefore go through one shared engine:
+
+- All rules of a set are compiled into a single alternation, in priority
+  order, and the text is scanned and rewritten once instead of once per rule.
+- Every alternative starts with a literal, so `re` can skip straight to
+  candidate characters. A leading `\\b<literal>` is rewritten as
+  `<literal>(?<=\\b<literal>)`. Rules without a literal start (the bot-token
+  heuristic, e-mail, IPv4) give a `scan` form that starts at a literal inside
+  the match (the dot, the `@`), plus the `lead` characters the real match may
+  extend left over; the true start is recovered from there.
+- The scan literals double as a fast negative check: a text that contains
+  none of them is returned untouched without running a regex at all.
+- Output is identical to applying the rules one after another. When two
+  matches could interact (touching spans, a higher-priority literal inside a
+  lower-priority match, or a word character glued to either edge, where
+  `\\b` would see the replacement differently), that text is redone rule by
+  rule. Realistic text practically never takes this path.
+
+`RedactionEngine` is reused by `src.utils.sanitizer` for its PII rules.
+"""
+
 from __future__ import annotations
 
 import json
 import re
 import urllib.parse
-from typing import Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable
 
 # Keep this module dependency-free and safe to import anywhere (including CI/tests).
 
 
+@dataclass(frozen=True)
+class RedactionRule:
+    name: str
+    pattern: str
+    replacement: str
+    # Optional scan form: matches the tail of every match, starting at a literal.
+    # Must not use top-level `|`. Defaults to `pattern` (with a leading \b hoisted).
+    scan: str = ""
+    # Regex character class (without brackets) the match may extend over to the
+    # left of where `scan` starts.
+    lead: str = ""
+
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+def _literal_prefix(pattern: str) -> tuple[str, int]:
+    """Return the literal text a pattern always starts with, and its length in the pattern."""
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1].isalnum():
+                break
+            lit, step = pattern[i + 1], 2
+        elif ch in _REGEX_META:
+            break
+        else:
+            lit, step = ch, 1
+        if pattern[i + step : i + step + 1] in ("*", "+", "?", "{"):
+            break
+        out.append(lit)
+        i += step
+    return "".join(out), i
+
+
+def _scan_form(rule: RedactionRule) -> str:
+    if rule.scan:
+        return rule.scan
+    if rule.pattern.startswith("\\b"):
+        literal, size = _literal_prefix(rule.pattern[2:])
+        if literal:
+            head = rule.pattern[2 : 2 + size]
+            return f"{head}(?<=\\b{head}){rule.pattern[2 + size:]}"
+    return rule.pattern
+
+
+def _is_word(ch: str) -> bool:
+    return ch == "_" or ch.isalnum()
+
+
+class RedactionEngine:
+    """Apply an ordered list of rules as if each were `re.sub`-ed in turn, in one pass."""
+
+    def __init__(self, rules: Iterable[RedactionRule]) -> None:
+        self.rules = tuple(rules)
+        if not self.rules:
+            raise ValueError("RedactionEngine needs at least one rule")
+        scans = [_scan_form(rule) for rule in self.rules]
+        # A trailing empty group per alternative tells which rule matched (via lastindex)
+        # without wrapping the alternative, which would hide its literal start from `re`.
+        self._rule_by_group: dict[int, int] = {}
+        groups = 0
+        for i, scan in enumerate(scans):
+            groups += re.compile(scan).groups + 1
+            self._rule_by_group[groups] = i
+        self._combined = re.compile("|".join(f"{scan}()" for scan in scans))
+        self._compiled = tuple(re.compile(rule.pattern) for rule in self.rules)
+        self._replacements = tuple(rule.replacement for rule in self.rules)
+        self._templates = tuple(rule.replacement.replace("\\", "\\\\") for rule in self.rules)
+        self._lead = tuple(re.compile(f"[{rule.lead}]").match if rule.lead else None for rule in self.rules)
+        literals = [_literal_prefix(scan)[0] for scan in scans]
+        self._anchors: tuple[str, ...] | None = tuple(dict.fromkeys(literals)) if all(literals) else None
+        self._higher_anchors = tuple(tuple(dict.fromkeys(a for a in literals[:i] if a)) for i in range(len(literals)))
+        # A replacement ends in a non-word character, so `\\b` flips next to a match whose
+        # edge sits between two word characters. These decide whether that can matter.
+        self._ends_on_boundary = any(rule.pattern.endswith("\\b") for rule in self.rules)
+        self._after_boundary = tuple(
+            re.compile(rule.pattern[2:]).match for rule in self.rules if rule.pattern.startswith("\\b")
+        )
+        self.skipped = 0
+        self.scanned = 0
+        self.fallbacks = 0
+
+    def may_match(self, text: str) -> bool:
+        """Fast negative check: False means no rule can match `text`."""
+        if self._anchors is None:
+            return True
+        for anchor in self._anchors:
+            if anchor in text:
+                return True
+        return False
+
+    def sub(self, text: str) -> tuple[str, int]:
+        """Return `(redacted_text, replacement_count)`."""
+        if not self.may_match(text):
+            self.skipped += 1
+            return text, 0
+        self.scanned += 1
+        parts: list[str] = []
+        pos = 0
+        count = 0
+        n = len(text)
+        for m in self._combined.finditer(text):
+            s, e = m.span()
+            idx = self._rule_by_group[m.lastindex]
+            lead = self._lead[idx]
+            if lead is not None:
+                s = self._true_start(text, idx, lead, s, e, pos if count else 0)
+                if s < 0:
+                    break
+            if (
+                (count and s == pos)
+                or (self._ends_on_boundary and s > 0 and _is_word(text[s - 1]) and _is_word(text[s]))
+                or (
+                    e < n
+                    and _is_word(text[e - 1])
+                    and _is_word(text[e])
+                    and any(match(text, e) for match in self._after_boundary)
+                )
+                or any(text.find(a, s + 1, e + len(a)) != -1 for a in self._higher_anchors[idx])
+            ):
+                break
+            parts.append(text[pos:s])
+            parts.append(self._replacements[idx])
+            pos = e
+            count += 1
+        else:
+            if not count:
+                return text, 0
+            parts.append(text[pos:])
+            return "".join(parts), count
+        self.fallbacks += 1
+        return self.sub_sequential(text)
+
+    def _true_start(self, text: str, idx: int, lead: Any, s: int, e: int, bound: int) -> int:
+        """Leftmost start of the rule's own match ending at `e`, or -1 if it is ambiguous."""
+        lo = s
+        while lo > bound and lead(text, lo - 1):
+            lo -= 1
+        if lo == bound and bound > 0 and lead(text, bound - 1):
+            return -1  # could reach into the previous match
+        pattern = self._compiled[idx]
+        for start in range(lo, s + 1):
+            m = pattern.match(text, start)
+            if m is not None:
+                return start if m.end() == e else -1
+        return -1
+
+    def sub_sequential(self, text: str) -> tuple[str, int]:
+        """Reference semantics: each rule substituted over the previous rule's output."""
+        total = 0
+        for pat, template in zip(self._compiled, self._templates):
+            text, k = pat.subn(template, text)
+            total += k
+        return text, total
+
+    def stats(self) -> dict[str, int]:
+        return {"skipped": self.skipped, "scanned": self.scanned, "fallbacks": self.fallbacks}
+
+
 _SENSITIVE_KEY_MARKERS = (
     "token",
     "secret",
@@ -21,17 +211,38 @@ _SENSITIVE_KEY_MARKERS = (
 )
 
 
-_PATTERNS: list[tuple[str, re.Pattern[str]]] = [
+_SECRET_RULES = (
     # OpenAI-style API keys (including service accounts).
-    ("openai_key", re.compile(r"\bsk-[A-Za-z0-9_-]{20,}\b")),
-    ("openai_svcacct", re.compile(r"\bsk-svcacct-[A-Za-z0-9_-]{20,}\b")),
+    RedactionRule("openai_key", r"\bsk-[A-Za-z0-9_-]{20,}\b", "[REDACTED]"),
+    RedactionRule("openai_svcacct", r"\bsk-svcacct-[A-Za-z0-9_-]{20,}\b", "[REDACTED]"),
     # Google API keys.
-    ("google_key", re.compile(r"\bAIzaSy[A-Za-z0-9_-]{20,}\b")),
+    RedactionRule("google_key", r"\bAIzaSy[A-Za-z0-9_-]{20,}\b", "[REDACTED]"),
     # Discord webhooks.
-    ("discord_webhook", re.compile(r"https?://(?:canary\.|ptb\.)?discord\.com/api/webhooks/\d+/[A-Za-z0-9_-]+")),
+    RedactionRule(
+        "discord_webhook",
+        r"https?://(?:canary\.|ptb\.)?discord\.com/api/webhooks/\d+/[A-Za-z0-9_-]+",
+        "[REDACTED]",
+    ),
     # PEM private keys.
-    ("private_key_block", re.compile(r"-----BEGIN [A-Z ]*PRIVATE KEY-----[\\s\\S]+?-----END [A-Z ]*PRIVATE KEY-----")),
-]
+    RedactionRule(
+        "private_key_block",
+        r"-----BEGIN [A-Z ]*PRIVATE KEY-----[\\s\\S]+?-----END [A-Z ]*PRIVATE KEY-----",
+        "[REDACTED]",
+    ),
+    # Heuristic: Discord bot tokens often look like three dot-separated base64-ish chunks.
+    # This is intentionally conservative to reduce false positives.
+    RedactionRule(
+        "discord_bot_token",
+        r"\b[A-Za-z0-9_-]{20,}\.[A-Za-z0-9_-]{6,}\.[A-Za-z0-9_-]{20,}\b",
+        "[REDACTED]",
+        scan=r"\.(?<=[A-Za-z0-9_-]{20}\.)[A-Za-z0-9_-]{6,}\.[A-Za-z0-9_-]{20,}\b",
+        lead="A-Za-z0-9_-",
+    ),
+)
+
+_SECRET_ENGINE = RedactionEngine(_SECRET_RULES)
+
+_URL_RE = re.compile(r"https?://[^\s\"'<>]+")
 
 
 def _strip_query_from_urls(text: str) -> str:
@@ -45,7 +256,7 @@ def _strip_query_from_urls(text: str) -> str:
         except Exception:
             return raw
 
-    return re.sub(r"https?://[^\s\"'<>]+", repl, text)
+    return _URL_RE.sub(repl, text)
 
 
 def redact_text(text: str) -> str:
@@ -53,14 +264,16 @@ def redact_text(text: str) -> str:
     if not isinstance(text, str) or not text:
         return "" if text is None else str(text)
 
-    out = _strip_query_from_urls(text)
-    for label, pat in _PATTERNS:
-        out = pat.sub("[REDACTED]", out)
+    # Query stripping rewrites part of a URL that the secret rules must still see,
+    # so it runs first; it only has work to do when a URL with a query is present.
+    out = _strip_query_from_urls(text) if "?" in text and "://" in text else text
+    return _SECRET_ENGINE.sub(out)[0]
 
-    # Heuristic: Discord bot tokens often look like three dot-separated base64-ish chunks.
-    # This is intentionally conservative to reduce false positives.
-    out = re.sub(r"\b[A-Za-z0-9_-]{20,}\.[A-Za-z0-9_-]{6,}\.[A-Za-z0-9_-]{20,}\b", "[REDACTED]", out)
-    return out
+
+@lru_cache(maxsize=4096)
+def _is_sensitive_key(key: str) -> bool:
+    lk = key.lower()
+    return any(m in lk for m in _SENSITIVE_KEY_MARKERS)
 
 
 def redact_json(value: Any) -> Any:
@@ -68,11 +281,11 @@ def redact_json(value: Any) -> Any:
     if isinstance(value, dict):
         out: dict[str, Any] = {}
         for k, v in value.items():
-            lk = str(k).lower()
-            if any(m in lk for m in _SENSITIVE_KEY_MARKERS):
-                out[str(k)] = "[REDACTED]"
+            key = str(k)
+            if _is_sensitive_key(key):
+                out[key] = "[REDACTED]"
             else:
-                out[str(k)] = redact_json(v)
+                out[key] = redact_json(v)
         return out
     if isinstance(value, list):
         return [redact_json(v) for v in value]
@@ -8,6 +8,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+from src.utils.code_index import CodeIndex
+
 logger = logging.getLogger(__name__)
 
 # Constants (Ported from legacy)
@@ -78,8 +80,12 @@ class SafeShell:
     Prevents escaping the root directory and reading sensitive files.
     """
 
-    def __init__(self, root_dir: str | Path):
+    def __init__(self, root_dir: str | Path, *, use_index: bool | None = None):
         self.root = Path(root_dir).resolve()
+        if use_index is None:
+            use_index = os.getenv("ORA_SAFE_SHELL_INDEX", "1").strip().lower() in {"1", "true", "yes", "on"}
+        # grep/find candidates come from a trigram index instead of a full os.walk + read.
+        self.index: CodeIndex | None = CodeIndex(self.root, deny_basenames=DENY_BASENAMES) if use_index else None
 
     def _parse_args(self, cmd: str, args: list[str]) -> tuple[set[str], dict[str, str], list[str]]:
         flags: set[str] = set()
@@ -270,6 +276,21 @@ class SafeShell:
                         out.append(fpath)
             return out
 
+        def indexed_files(base: Path, pattern: str | None = None, ignore_case: bool = False) -> list[str] | None:
+            """Index-backed iter_files() for directories: root-relative paths of the files that can
+            match `pattern` (all files if None). None -> use iter_files()."""
+            if self.index is None or not base.is_dir():
+                return None
+            try:
+                if pattern is None:
+                    rels = self.index.files_under(base, max_depth=MAX_DEPTH)
+                else:
+                    rels = self.index.candidates(base, pattern, ignore_case=ignore_case, max_depth=MAX_DEPTH)
+            except Exception:
+                logger.exception("SafeShell index lookup failed; falling back to a directory walk")
+                return None
+            return rels
+
         # --- COMMANDS ---
 
         # 1. LS
@@ -350,7 +371,15 @@ class SafeShell:
                 results = []
                 count = 0
 
-                for fpath in iter_files(target):
+                candidates = indexed_files(target, pattern, ignore_case)
+                if candidates is not None:
+                    # Scan limits apply to the candidate files actually opened.
+                    files = (self.root / rel for rel in candidates)
+                else:
+                    files = iter_files(target)
+                for fpath in files:
+                    if candidates is not None:
+                        check_limits(fpath)
                     try:
                         with fpath.open("r", encoding="utf-8", errors="replace") as fh:
                             for idx, line in enumerate(fh, 1):
@@ -412,8 +441,11 @@ class SafeShell:
             try:
                 regex = re.compile(pattern)
                 hits = []
-                for fpath in iter_files(target):
-                    rel = str(fpath.relative_to(self.root)).replace("\\", "/")
+                # Path-only query: the index listing needs no file I/O, so no scan limits apply.
+                listed = indexed_files(target)
+                if listed is None:
+                    listed = (str(fpath.relative_to(self.root)).replace("\\", "/") for fpath in iter_files(target))
+                for rel in listed:
                     if regex.search(rel):
                         hits.append(rel)
                         if len(hits) >= max_matches:
@@ -424,6 +456,18 @@ class SafeShell:
 
         return {"stdout": "", "stderr": f"Command {name} implementation missing", "exit_code": 1}
 
+    async def warm_index(self) -> None:
+        """Build the search index off the event loop so the first code search doesn't pay for it."""
+        if self.index is None:
+            return
+        try:
+            await asyncio.to_thread(self.index.refresh, force=True)
+            logger.info(
+                f"SafeShell index ready: {self.index.file_count} files in {self.index.last_refresh_ms:.0f}ms"
+            )
+        except Exception as e:
+            logger.warning(f"SafeShell index warm-up failed: {e}")
+
     async def run(self, cmd: str) -> dict[str, Any]:
         """Async wrapper for the prompt handler."""
         # 1. Validate
@@ -1,13 +1,46 @@
 import logging
-import re
 from dataclasses import dataclass
 from typing import Dict, List
 
+from src.utils.redaction import RedactionEngine, RedactionRule
+
 # Lazy load easyocr to avoid startup delay
 # import easyocr
 
 logger = logging.getLogger("ORA.Sanitizer")
 
+# Applied in this order (see RedactionEngine). `scan`/`lead` only let the rules
+# without a literal start share the single pass; matches are unchanged.
+_SENSITIVE_RULES = (
+    RedactionRule("openai_key", r"sk-[a-zA-Z0-9]{20,}", "<OPENAI_KEY>"),
+    RedactionRule("google_key", r"AIza[a-zA-Z0-9_\-]{35}", "<GOOGLE_KEY>"),
+    RedactionRule("grok_key", r"xai-[a-zA-Z0-9]{20,}", "<GROK_KEY>"),
+    RedactionRule(
+        "email",
+        r"([a-zA-Z0-9._-]+@[a-zA-Z0-9._-]+\.[a-zA-Z0-9_-]+)",
+        "<EMAIL>",
+        scan=r"@(?<=[a-zA-Z0-9._-]@)[a-zA-Z0-9._-]+\.[a-zA-Z0-9_-]+",
+        lead="a-zA-Z0-9._-",
+    ),
+    RedactionRule(
+        "discord_invite",
+        r"(?:https?://)?(?:www\.)?discord(?:app)?\.com/invite/[a-zA-Z0-9]+",
+        "<DISCORD_INVITE>",
+        scan=r"discord(?:app)?\.com/invite/[a-zA-Z0-9]+",
+        lead="htps:/w.",
+    ),
+    RedactionRule("windows_path", r"C:\\[a-zA-Z0-9 _\-\\]+", "<LOCAL_PATH>"),
+    RedactionRule("home_path", r"\/home\/[a-zA-Z0-9 _\-\/]+", "<LOCAL_PATH>"),
+    RedactionRule(
+        "ipv4",
+        r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b",
+        "<IP_ADDRESS>",
+        scan=r"\.(?<=\d\.)\d{1,3}\.\d{1,3}\.\d{1,3}\b",
+        lead=r"\d",
+    ),
+)
+_SENSITIVE_ENGINE = RedactionEngine(_SENSITIVE_RULES)
+
 
 @dataclass
 class SanitizedPacket:
@@ -21,18 +54,7 @@ class Sanitizer:
     def __init__(self):
         self.logger = logging.getLogger("ORA.Sanitizer")
         self.reader = None  # Lazy init
-        self.sensitive_patterns = [
-            (r"sk-[a-zA-Z0-9]{20,}", "<OPENAI_KEY>"),
-            (r"AIza[a-zA-Z0-9_\-]{35}", "<GOOGLE_KEY>"),
-            (r"xai-[a-zA-Z0-9]{20,}", "<GROK_KEY>"),
-            (r"([a-zA-Z0-9._-]+@[a-zA-Z0-9._-]+\.[a-zA-Z0-9_-]+)", "<EMAIL>"),
-            (r"(?:https?://)?(?:www\.)?discord(?:app)?\.com/invite/[a-zA-Z0-9]+", "<DISCORD_INVITE>"),
-            (r"C:\\[a-zA-Z0-9 _\-\\]+", "<LOCAL_PATH>"),
-            (r"\/home\/[a-zA-Z0-9 _\-\/]+", "<LOCAL_PATH>"),
-            (r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b", "<IP_ADDRESS>"),  # IPv4
-            # Add more patterns here
-            # Add more patterns here
-        ]
+        self.engine = _SENSITIVE_ENGINE
 
     def sanitize(self, text: str, has_image: bool = False, is_debug_context: bool = False) -> SanitizedPacket:
         reasons: List[str] = []
@@ -88,12 +110,7 @@ class Sanitizer:
             # But converting raw log -> report is complex.
             # Simple rule: If it looks like a raw log, redact paths and key identifiers.
             pass
-        sanitized_text = text
-        for pattern, replacement in self.sensitive_patterns:
-            matches = re.findall(pattern, sanitized_text)
-            if matches:
-                redaction_count += len(matches)
-                sanitized_text = re.sub(pattern, replacement, sanitized_text)
+        sanitized_text, redaction_count = self.engine.sub(text)
 
         # Return OK if not too redacted
         return SanitizedPacket(ok=True, text=sanitized_text, reasons=reasons, redaction_count=redaction_count)
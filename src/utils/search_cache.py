@@ -0,0 +1,327 @@
+"""
+Bounded LRU/TTL cache with request coalescing for web search results.
+
+Search is the slowest and most rate-limited tool call the bot makes, and the
+traffic is duplicate-heavy: the same trending query arrives from many users
+within minutes, and a burst of identical queries used to become one upstream
+call each.
+
+- Entries are keyed on the normalised query (NFKC, casefolded, whitespace
+  collapsed), provider, locale and result limit. Nothing user-specific goes in
+  the key; search results are shared across users.
+- The in-memory map is an LRU capped at `ORA_SEARCH_CACHE_MAX` entries.
+- An entry is fresh for `ORA_SEARCH_CACHE_TTL_SEC`. For another
+  `ORA_SEARCH_CACHE_STALE_SEC` it is still served, but the lookup also starts
+  a background refresh (stale-while-revalidate). Empty result lists only live
+  for `ORA_SEARCH_CACHE_EMPTY_TTL_SEC` and are never served stale, since
+  providers return [] on transient failures.
+- Concurrent lookups of a missing key share one in-flight upstream call
+  (singleflight). Errors are not cached; every waiter sees the exception.
+- With `ORA_SEARCH_CACHE_DB` set, entries are written through to SQLite and
+  read back on a memory miss, so a restart does not start cold. Persistence is
+  best-effort and never raises into the caller.
+
+Used by both the bot (`src.utils.search_client`) and core
+(`ora_core.tools.search`); each process keeps its own in-memory cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from src.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    fresh_until REAL NOT NULL,
+    stale_until REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_stored ON search_cache (stored_at);
+"""
+
+_PRUNE_EVERY = 256
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", query or "").casefold().split())
+
+
+def search_cache_key(query: str, *, provider: str, locale: str = "", limit: int | None = None) -> str:
+    parts = (str(provider or "").strip().lower(), str(locale or "").strip().lower(), str(limit or ""), normalize_query(query))
+    return "\x1f".join(parts)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+    fresh_until: float
+    stale_until: float
+
+
+class SearchCache:
+    """LRU/TTL map plus singleflight; see the module docstring for the policy."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: Optional[int] = None,
+        ttl_sec: Optional[float] = None,
+        stale_sec: Optional[float] = None,
+        empty_ttl_sec: Optional[float] = None,
+        db_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_entries = max_entries if max_entries is not None else env_int("ORA_SEARCH_CACHE_MAX", 1024, 1, 200_000)
+        self.ttl_sec = ttl_sec if ttl_sec is not None else env_float("ORA_SEARCH_CACHE_TTL_SEC", 300.0, 0.0, 7 * 86400.0)
+        self.stale_sec = (
+            stale_sec if stale_sec is not None else env_float("ORA_SEARCH_CACHE_STALE_SEC", 1800.0, 0.0, 7 * 86400.0)
+        )
+        self.empty_ttl_sec = (
+            empty_ttl_sec
+            if empty_ttl_sec is not None
+            else env_float("ORA_SEARCH_CACHE_EMPTY_TTL_SEC", 30.0, 0.0, 86400.0)
+        )
+        if db_path is None:
+            db_path = (os.getenv("ORA_SEARCH_CACHE_DB") or "").strip() or None
+        self.db_path = db_path
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_failed = False
+        self._db_lock = threading.Lock()
+        self._writes = 0
+        self.stats: dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "upstream_calls": 0,
+            "refreshes": 0,
+            "errors": 0,
+            "evictions": 0,
+            "persisted_loads": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        served = self.stats["hits"] + self.stats["stale_hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def metrics(self) -> dict[str, Any]:
+        return {**self.stats, "size": len(self._entries), "inflight": len(self._inflight), "hit_rate": round(self.hit_rate, 4)}
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> tuple[Any, str]:
+        """
+        Return `(value, status)` for `key`, calling `fetch()` upstream only when needed.
+
+        `status` is one of "hit", "stale" (served while a refresh runs), "coalesced"
+        (joined another caller's in-flight fetch) or "miss".
+        """
+        now = self._clock()
+        entry = self._lookup(key, now)
+        if entry is not None:
+            if now < entry.fresh_until:
+                self.stats["hits"] += 1
+                return entry.value, "hit"
+            self.stats["stale_hits"] += 1
+            if self._flight(key) is None:
+                self.stats["refreshes"] += 1
+                self._start_flight(key, fetch)
+            return entry.value, "stale"
+
+        flight = self._flight(key)
+        if flight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(flight), "coalesced"
+        self.stats["misses"] += 1
+        # Shielded: one caller timing out must not cancel the fetch for the others.
+        return await asyncio.shield(self._start_flight(key, fetch)), "miss"
+
+    def put(self, key: str, value: Any) -> None:
+        now = self._clock()
+        if value:
+            entry = _Entry(value, now, now + self.ttl_sec, now + self.ttl_sec + self.stale_sec)
+        else:
+            entry = _Entry(value, now, now + self.empty_ttl_sec, now + self.empty_ttl_sec)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+        self._persist(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        self._entries.pop(key, None)
+        self._db_execute("DELETE FROM search_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._db_execute("DELETE FROM search_cache", ())
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _lookup(self, key: str, now: float) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            self._entries[key] = entry
+            self.stats["persisted_loads"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        if now >= entry.stale_until:
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _flight(self, key: str) -> Optional[asyncio.Task]:
+        task = self._inflight.get(key)
+        # A task left behind by a closed loop (tests, restarts) can never be awaited here.
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def _start_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(self._run(key, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t, key=key: self._flight_done(key, t))
+        return task
+
+    async def _run(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["upstream_calls"] += 1
+        try:
+            value = await fetch()
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        self.put(key, value)
+        return value
+
+    def _flight_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        exc = task.exception()  # retrieved here so background refresh failures are not reported as unhandled
+        if exc is not None:
+            logger.debug("search fetch failed for %r: %s", key, exc)
+
+    # --- persistence -------------------------------------------------------
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._db is not None or self._db_failed or not self.db_path:
+            return self._db
+        try:
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._db = conn
+            self._prune()
+        except Exception as e:
+            logger.warning("search cache persistence disabled (%s): %s", self.db_path, e)
+            self._db_failed = True
+            self._db = None
+        return self._db
+
+    def _prune(self) -> None:
+        assert self._db is not None
+        self._db.execute("DELETE FROM search_cache WHERE stale_until < ?", (self._clock(),))
+        self._db.execute(
+            "DELETE FROM search_cache WHERE key NOT IN (SELECT key FROM search_cache ORDER BY stored_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def _db_execute(self, sql: str, params: tuple) -> None:
+        if not self.db_path:
+            return
+        with self._db_lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(sql, params)
+            except Exception as e:
+                logger.debug("search cache write failed: %s", e)
+
+    def _load(self, key: str) -> Optional[_Entry]:
+        if not self.db_path:
+            return None
+        with self._db_lock:
+            conn = self._connect()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT value, stored_at, fresh_until, stale_until FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                return _Entry(json.loads(row[0]), float(row[1]), float(row[2]), float(row[3]))
+            except Exception as e:
+                logger.debug("search cache read failed: %s", e)
+                return None
+
+    def _persist(self, key: str, entry: _Entry) -> None:
+        if not self.db_path:
+            return
+        try:
+            payload = json.dumps(entry.value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+        with self._db_lock:
+            conn = self._connect()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, stored_at, fresh_until, stale_until) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, entry.stored_at, entry.fresh_until, entry.stale_until),
+                )
+                self._writes += 1
+                if self._writes % _PRUNE_EVERY == 0:
+                    self._prune()
+            except Exception as e:
+                logger.debug("search cache write failed: %s", e)
+
+
+_shared: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """Process-wide cache configured from the `ORA_SEARCH_CACHE_*` environment."""
+    global _shared
+    if _shared is None:
+        _shared = SearchCache()
+    return _shared
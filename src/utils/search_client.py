@@ -7,6 +7,8 @@ import logging
 import time
 from typing import List, Optional, Sequence, Tuple
 
+from src.utils.search_cache import SearchCache, get_search_cache, search_cache_key
+
 try:
     from serpapi import GoogleSearch
 except ImportError:  # pragma: no cover - optional dependency
@@ -16,16 +18,17 @@ logger = logging.getLogger(__name__)
 
 SearchResult = Tuple[str, str]
 
-# Global semaphore for rate limiting
+# Global semaphore for rate limiting (upstream calls only; cache hits never wait on it)
 _SEM = asyncio.Semaphore(10)
 
 
 class SearchClient:
     """Perform web searches using SerpApi when configured."""
 
-    def __init__(self, api_key: Optional[str], engine: Optional[str]) -> None:
+    def __init__(self, api_key: Optional[str], engine: Optional[str], cache: Optional[SearchCache] = None) -> None:
         self._api_key = api_key
         self._engine = engine or "google"
+        self._cache = cache
 
     @property
     def enabled(self) -> bool:
@@ -40,8 +43,23 @@ class SearchClient:
         except ImportError:
             return False
 
+    @property
+    def cache(self) -> SearchCache:
+        return self._cache if self._cache is not None else get_search_cache()
+
     async def search(
         self, query: str, *, limit: int = 5, engine: Optional[str] = None, gl: str = "jp", hl: str = "ja"
+    ) -> Sequence[dict]:
+        """Cached search; identical concurrent queries share one upstream call (see `search_cache`)."""
+        provider = (engine or self._engine) if (self._api_key and GoogleSearch is not None) else "ddg"
+        key = search_cache_key(query, provider=provider, locale=f"{gl}-{hl}", limit=limit)
+        results, _status = await self.cache.get_or_fetch(
+            key, lambda: self._search_upstream(query, limit=limit, engine=engine, gl=gl, hl=hl)
+        )
+        return list(results)
+
+    async def _search_upstream(
+        self, query: str, *, limit: int, engine: Optional[str], gl: str, hl: str
     ) -> Sequence[dict]:
         start_time = time.monotonic()
         deadline = start_time + 30.0  # Total budget 30s
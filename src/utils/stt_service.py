@@ -0,0 +1,456 @@
+"""
+Shared speech-to-text service with a bounded, batching worker pool.
+
+Every voice path used to run Whisper on its own: `VoiceRecvCog` spawned one
+`asyncio.to_thread` per utterance (unbounded threads fighting over one model)
+and `WhisperClient` loaded a second model and padded every clip to 30 s. This
+module owns the models for the whole bot:
+
+- a fixed number of decode workers on a dedicated executor, fed by a bounded
+  queue (partial transcripts are dropped instead of queued when it is busy)
+- short clips from different speakers are packed into one decode window,
+  separated by silence, and split back by segment timestamps; short clips are
+  never padded out to Whisper's 30 s window
+- a model-size ladder (e.g. small -> base -> tiny) that steps down while the
+  queue backs up or decoding falls behind real time, and back up once idle
+- queue wait and real-time factor (decode time / audio time) in `stats()`
+
+faster-whisper is preferred; openai-whisper is used when only it is installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Sequence
+
+import numpy as np
+
+from src.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+try:  # optional dependency
+    from faster_whisper import WhisperModel  # type: ignore
+
+    FASTER_WHISPER_AVAILABLE = True
+except Exception:  # pragma: no cover - depends on environment
+    WhisperModel = None  # type: ignore
+    FASTER_WHISPER_AVAILABLE = False
+
+try:  # optional dependency
+    import whisper as openai_whisper  # type: ignore
+
+    OPENAI_WHISPER_AVAILABLE = True
+except Exception:  # pragma: no cover - depends on environment
+    openai_whisper = None  # type: ignore
+    OPENAI_WHISPER_AVAILABLE = False
+
+STT_SAMPLE_RATE = 16000
+_PACK_GAP_SEC = 1.0
+_PACK_WINDOW_SEC = 28.0
+
+# (start_sec, end_sec, text) segments for one decode call.
+Segments = list[tuple[float, float, str]]
+Decoder = Callable[[np.ndarray], Segments]
+ModelLoader = Callable[[str], Decoder]
+
+
+_WHISPER_SIZES = ("large-v3", "large-v2", "large", "medium", "small", "base", "tiny")
+_DEFAULT_LADDER = ("small", "base", "tiny")
+
+
+def _env_ladder(head: str | None = None) -> list[str]:
+    """ORA_STT_MODEL_LADDER if set; else `head` (STT_MODEL) followed by the smaller default rungs."""
+    raw = os.getenv("ORA_STT_MODEL_LADDER") or ""
+    ladder = [part.strip() for part in raw.split(",") if part.strip()]
+    if ladder:
+        return ladder
+    head = (head or "").strip()
+    if not head:
+        return list(_DEFAULT_LADDER)
+    if head not in _WHISPER_SIZES:
+        return [head]
+    rank = _WHISPER_SIZES.index(head)
+    return [head, *(m for m in _DEFAULT_LADDER if _WHISPER_SIZES.index(m) > rank)]
+
+
+def pcm_to_whisper_audio(pcm: bytes, *, sample_rate: int = 48000, channels: int = 2) -> np.ndarray:
+    """Discord PCM (int16, interleaved) -> mono float32 at 16 kHz, unpadded."""
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+    if channels > 1 and audio.size % channels == 0:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if sample_rate == 48000:
+        audio = audio[::3]
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _faster_whisper_loader(language: str | None, beam_size: int) -> ModelLoader:
+    def load(name: str) -> Decoder:
+        try:
+            model = WhisperModel(name, device="cuda", compute_type="float16")  # type: ignore[misc]
+            logger.info("Faster-Whisper model %s loaded (GPU)", name)
+        except Exception as e:
+            logger.warning("Faster-Whisper GPU load failed (%s); using CPU int8", e)
+            model = WhisperModel(name, device="cpu", compute_type="int8")  # type: ignore[misc]
+            logger.info("Faster-Whisper model %s loaded (CPU int8)", name)
+
+        def decode(audio: np.ndarray) -> Segments:
+            segments, _info = model.transcribe(
+                audio, language=language, beam_size=beam_size, condition_on_previous_text=False
+            )
+            return [(float(s.start), float(s.end), s.text) for s in segments]
+
+        return decode
+
+    return load
+
+
+def _openai_whisper_loader(language: str | None, beam_size: int) -> ModelLoader:
+    def load(name: str) -> Decoder:
+        model = openai_whisper.load_model(name)  # type: ignore[union-attr]
+        logger.info("Whisper model %s loaded", name)
+
+        def decode(audio: np.ndarray) -> Segments:
+            result = model.transcribe(
+                audio,
+                language=language,
+                fp16=False,
+                no_speech_threshold=0.6,
+                condition_on_previous_text=False,
+                beam_size=beam_size,
+            )
+            return [(float(s["start"]), float(s["end"]), s["text"]) for s in result.get("segments", [])]
+
+        return decode
+
+    return load
+
+
+def default_loader(language: str | None = "ja", beam_size: int = 5) -> ModelLoader | None:
+    if FASTER_WHISPER_AVAILABLE:
+        return _faster_whisper_loader(language, beam_size)
+    if OPENAI_WHISPER_AVAILABLE:
+        return _openai_whisper_loader(language, beam_size)
+    return None
+
+
+@dataclass
+class _Job:
+    audio: np.ndarray
+    future: asyncio.Future[str]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def duration(self) -> float:
+        return self.audio.size / STT_SAMPLE_RATE
+
+
+def _pack(jobs: Sequence[_Job]) -> tuple[np.ndarray, list[tuple[float, float]]]:
+    gap = np.zeros(int(_PACK_GAP_SEC * STT_SAMPLE_RATE), dtype=np.float32)
+    parts: list[np.ndarray] = []
+    spans: list[tuple[float, float]] = []
+    cursor = 0.0
+    for i, job in enumerate(jobs):
+        if i:
+            parts.append(gap)
+            cursor += _PACK_GAP_SEC
+        parts.append(job.audio)
+        spans.append((cursor, cursor + job.duration))
+        cursor += job.duration
+    return np.concatenate(parts), spans
+
+
+def _split(segments: Segments, spans: Sequence[tuple[float, float]]) -> list[str]:
+    def distance(span: tuple[float, float], t: float) -> float:
+        return 0.0 if span[0] <= t <= span[1] else min(abs(t - span[0]), abs(t - span[1]))
+
+    texts: list[list[str]] = [[] for _ in spans]
+    for start, end, text in segments:
+        # Assign by midpoint; a segment that lands in a gap goes to the closer neighbour.
+        mid = (start + end) / 2.0
+        best = min(range(len(spans)), key=lambda i: distance(spans[i], mid))
+        texts[best].append(text.strip())
+    return [" ".join(t for t in parts if t).strip() for parts in texts]
+
+
+class STTService:
+    """Bot-wide Whisper pool: one queue, N decode workers, packed batches, model ladder."""
+
+    def __init__(
+        self,
+        *,
+        ladder: Sequence[str] | None = None,
+        workers: int | None = None,
+        queue_max: int | None = None,
+        batch_max: int | None = None,
+        batch_wait_ms: int | None = None,
+        pack_max_sec: float | None = None,
+        downshift_queue: int | None = None,
+        upshift_idle_sec: float | None = None,
+        loader: ModelLoader | None = None,
+        language: str | None = "ja",
+        model: str | None = None,
+    ) -> None:
+        self.ladder = list(ladder) if ladder else _env_ladder(model)
+        self.workers = workers if workers is not None else env_int("ORA_STT_WORKERS", 1, 1, 8)
+        self.queue_max = queue_max if queue_max is not None else env_int("ORA_STT_QUEUE_MAX", 32, 1, 1000)
+        self.batch_max = batch_max if batch_max is not None else env_int("ORA_STT_BATCH_MAX", 4, 1, 16)
+        self.batch_wait_ms = batch_wait_ms if batch_wait_ms is not None else env_int("ORA_STT_BATCH_WAIT_MS", 30, 0, 1000)
+        self.pack_max_sec = pack_max_sec if pack_max_sec is not None else env_float("ORA_STT_PACK_MAX_SEC", 8.0, 0.0, 25.0)
+        self.downshift_queue = (
+            downshift_queue if downshift_queue is not None else env_int("ORA_STT_DOWNSHIFT_QUEUE", 4, 1, 1000)
+        )
+        self.upshift_idle_sec = (
+            upshift_idle_sec if upshift_idle_sec is not None else env_float("ORA_STT_UPSHIFT_IDLE_SEC", 10.0, 0.0, 3600.0)
+        )
+        self._loader = loader if loader is not None else default_loader(language)
+
+        self._models: dict[str, Decoder] = {}
+        self._model_lock = threading.Lock()
+        self._level = 0
+        self._idle_since = time.monotonic()
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._carry: deque[_Job] = deque()
+        self._executor: ThreadPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+        self._wait_ms: deque[float] = deque(maxlen=256)
+        self._rtf: deque[float] = deque(maxlen=256)
+        self._counts = {"jobs": 0, "batches": 0, "packed_jobs": 0, "dropped": 0, "errors": 0, "downshifts": 0, "upshifts": 0}
+
+    @property
+    def available(self) -> bool:
+        return self._loader is not None
+
+    @property
+    def current_model(self) -> str:
+        return self.ladder[self._level]
+
+    def _ensure_started(self) -> asyncio.Queue[_Job]:
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._loop is loop and not loop.is_closed():
+            return self._queue
+        if self._tasks:
+            self._retire_workers()
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_max)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ora-stt")
+        self._tasks = [loop.create_task(self._worker(), name=f"ora-stt-{i}") for i in range(self.workers)]
+        return self._queue
+
+    def _retire_workers(self) -> None:
+        """Stop the workers (and settle their jobs) left on a previous event loop."""
+        old_loop, tasks, queue, carry = self._loop, self._tasks, self._queue, self._carry
+        self._tasks, self._queue, self._carry = [], None, deque()
+        if old_loop is None or old_loop.is_closed():
+            return  # nothing can run or await there any more
+        if old_loop.is_running():
+            asyncio.run_coroutine_threadsafe(_stop_workers(tasks, queue, carry), old_loop)
+            return
+        for task in tasks:
+            task.cancel()
+        _settle_pending(queue, carry)
+
+    async def transcribe(
+        self,
+        pcm: bytes,
+        *,
+        sample_rate: int = 48000,
+        channels: int = 2,
+        drop_if_busy: bool = False,
+    ) -> str:
+        """Transcribe one clip; returns "" on silence, missing backend, or (with drop_if_busy) backlog."""
+        if not pcm or self._loader is None:
+            return ""
+        audio = pcm_to_whisper_audio(pcm, sample_rate=sample_rate, channels=channels)
+        if audio.size < STT_SAMPLE_RATE // 10 or float(np.sqrt(np.mean(audio**2))) < 1e-3:
+            return ""
+        queue = self._ensure_started()
+        if drop_if_busy and queue.qsize() >= self.workers:
+            self._counts["dropped"] += 1
+            return ""
+        job = _Job(audio, self._loop.create_future())  # type: ignore[union-attr]
+        await queue.put(job)
+        return await job.future
+
+    async def warmup(self) -> None:
+        """Load the top model ahead of the first utterance."""
+        if self._loader is None:
+            return
+        self._ensure_started()
+        await self._loop.run_in_executor(self._executor, self._model, self.ladder[0])  # type: ignore[union-attr]
+
+    def _model(self, name: str) -> Decoder:
+        with self._model_lock:
+            decoder = self._models.get(name)
+            if decoder is None:
+                decoder = self._loader(name)  # type: ignore[misc]
+                self._models[name] = decoder
+            return decoder
+
+    async def _next_batch(self, queue: asyncio.Queue[_Job]) -> list[_Job]:
+        batch = [self._carry.popleft() if self._carry else await queue.get()]
+        if self.batch_max <= 1 or batch[0].duration > self.pack_max_sec:
+            return batch
+        try:
+            return await self._fill_batch(queue, batch)
+        except asyncio.CancelledError:
+            _settle(batch)
+            raise
+
+    async def _fill_batch(self, queue: asyncio.Queue[_Job], batch: list[_Job]) -> list[_Job]:
+        deadline = time.monotonic() + self.batch_wait_ms / 1000.0
+        total = batch[0].duration
+        while len(batch) < self.batch_max:
+            try:
+                job = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = await asyncio.wait_for(queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+            if job.duration > self.pack_max_sec or total + _PACK_GAP_SEC + job.duration > _PACK_WINDOW_SEC:
+                # Does not fit this window; it starts the next batch instead.
+                self._carry.append(job)
+                break
+            batch.append(job)
+            total += _PACK_GAP_SEC + job.duration
+        return batch
+
+    async def _worker(self) -> None:
+        queue = self._queue
+        assert queue is not None
+        while True:
+            batch = await self._next_batch(queue)
+            await self._decode_batch(batch)
+
+    async def _decode_batch(self, batch: list[_Job]) -> None:
+        started = time.monotonic()
+        for job in batch:
+            self._wait_ms.append((started - job.enqueued_at) * 1000.0)
+        name = self.current_model
+        audio_sec = sum(job.duration for job in batch)
+        try:
+            texts, elapsed = await self._loop.run_in_executor(self._executor, self._decode, name, batch)  # type: ignore[union-attr]
+        except asyncio.CancelledError:
+            _settle(batch)
+            raise
+        except Exception as e:
+            logger.exception("STT decode failed (%s): %s", name, e)
+            self._counts["errors"] += 1
+            texts, elapsed = [""] * len(batch), 0.0
+        self._counts["jobs"] += len(batch)
+        self._counts["batches"] += 1
+        if len(batch) > 1:
+            self._counts["packed_jobs"] += len(batch)
+        if audio_sec > 0 and elapsed > 0:
+            self._rtf.append(elapsed / audio_sec)
+        for job, text in zip(batch, texts):
+            if not job.future.done():
+                job.future.set_result(text)
+        self._adjust_ladder()
+
+    def _decode(self, name: str, batch: list[_Job]) -> tuple[list[str], float]:
+        decoder = self._model(name)
+        # Timed after the (possibly first) model load so loading does not count against RTF.
+        started = time.perf_counter()
+        if len(batch) == 1:
+            texts = [" ".join(t.strip() for _, _, t in decoder(batch[0].audio) if t.strip())]
+        else:
+            audio, spans = _pack(batch)
+            texts = _split(decoder(audio), spans)
+        return texts, time.perf_counter() - started
+
+    def _adjust_ladder(self) -> None:
+        backlog = (self._queue.qsize() if self._queue is not None else 0) + len(self._carry)
+        now = time.monotonic()
+        recent = list(self._rtf)[-8:]
+        behind = bool(recent) and sum(recent) / len(recent) > 1.0
+        if (backlog >= self.downshift_queue or behind) and self._level < len(self.ladder) - 1:
+            self._level += 1
+            self._counts["downshifts"] += 1
+            self._rtf.clear()
+            logger.info("STT under load (queue=%d); switching to model %s", backlog, self.current_model)
+        if backlog:
+            self._idle_since = now
+        elif self._level > 0 and now - self._idle_since >= self.upshift_idle_sec:
+            self._level -= 1
+            self._counts["upshifts"] += 1
+            self._idle_since = now
+            logger.info("STT load cleared; switching back to model %s", self.current_model)
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self._wait_ms)
+        rtf = list(self._rtf)
+        out: dict[str, Any] = dict(self._counts)
+        out.update(
+            {
+                "model": self.current_model,
+                "ladder": list(self.ladder),
+                "loaded_models": sorted(self._models),
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "queue_wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+                "queue_wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 1) if waits else 0.0,
+                "rtf_avg": round(sum(rtf) / len(rtf), 3) if rtf else 0.0,
+                "avg_batch_size": round(out["jobs"] / out["batches"], 2) if out["batches"] else 0.0,
+            }
+        )
+        return out
+
+    async def close(self) -> None:
+        """Stop the workers; every queued or in-flight transcription resolves to ""."""
+        tasks, queue, carry = self._tasks, self._queue, self._carry
+        self._tasks, self._queue, self._carry = [], None, deque()
+        await _stop_workers(tasks, queue, carry)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _settle(jobs: Iterable[_Job]) -> None:
+    for job in jobs:
+        if not job.future.done():
+            job.future.set_result("")
+
+
+def _settle_pending(queue: asyncio.Queue[_Job] | None, carry: deque[_Job]) -> None:
+    if queue is not None:
+        while not queue.empty():
+            _settle([queue.get_nowait()])
+    _settle(carry)
+    carry.clear()
+
+
+async def _stop_workers(tasks: list[asyncio.Task[None]], queue: asyncio.Queue[_Job] | None, carry: deque[_Job]) -> None:
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    _settle_pending(queue, carry)
+
+
+_service: STTService | None = None
+
+
+def get_stt_service(model: str | None = None, language: str | None = "ja") -> STTService:
+    """The bot-wide service; `model`/`language` only apply to the call that creates it."""
+    global _service
+    if _service is None:
+        _service = STTService(model=model, language=language)
+    return _service
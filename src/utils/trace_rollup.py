@@ -0,0 +1,407 @@
+"""
+Indexed rollup store for `core.run.metrics` trace events.
+
+`logs/agent_trace.jsonl` is an append-only debug log; answering rolling-window
+KPIs from it means re-reading and parsing the whole file. This module keeps an
+hourly-partitioned SQLite rollup next to it instead:
+
+- one row per (hour, route_band, provider, model)
+- counters for samples / budget stops / failures
+- a mergeable log-bucketed latency histogram (DDSketch/HDR-style, ~1% relative
+  error) so p50/p95/p99 can be answered for any window by merging a few rows
+- a `rollup_meta` row recording when the store was backfilled from the JSONL;
+  `trace_event` creates the store on the first metrics event, so without it a
+  fresh store only holds the runs since then
+
+Writes are best-effort and never raise into the caller (tracing must not break runs).
+`trace_event` hands events to a single writer thread, so no SQLite I/O happens on
+the caller's thread (often the event loop); `flush_rollup_writes` waits for it.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+METRICS_EVENT = "core.run.metrics"
+GROUP_FIELDS = ("route_band", "provider", "model")
+
+_HIST_GAMMA = 1.02  # relative accuracy ~= (gamma - 1) / (gamma + 1) ~= 1%
+_LOG_GAMMA = math.log(_HIST_GAMMA)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kpi_rollup (
+    hour TEXT NOT NULL,
+    route_band TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    samples INTEGER NOT NULL DEFAULT 0,
+    budget_stops INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    hist TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (hour, route_band, provider, model)
+);
+CREATE INDEX IF NOT EXISTS idx_kpi_rollup_hour ON kpi_rollup (hour);
+CREATE TABLE IF NOT EXISTS rollup_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_conn_lock = threading.Lock()
+_conns: dict[str, sqlite3.Connection] = {}
+
+
+def default_store_path() -> str:
+    raw = (os.getenv("ORA_TRACE_ROLLUP_DB") or "").strip()
+    if raw:
+        return raw
+    trace_log = os.getenv("ORA_TRACE_LOG", os.path.join("logs", "agent_trace.jsonl"))
+    return os.path.join(os.path.dirname(trace_log) or ".", "agent_trace_rollup.db")
+
+
+def rollup_enabled() -> bool:
+    raw = (os.getenv("ORA_TRACE_ROLLUP") or "1").strip().lower()
+    return raw not in {"0", "false", "no", "off"}
+
+
+def _retention_days() -> int:
+    raw = (os.getenv("ORA_TRACE_ROLLUP_RETENTION_DAYS") or "90").strip()
+    try:
+        val = int(raw)
+    except Exception:
+        val = 90
+    return max(1, min(3650, val))
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed histogram for positive latency values (ms)."""
+
+    __slots__ = ("buckets", "count")
+
+    def __init__(self, buckets: dict[int, int] | None = None) -> None:
+        self.buckets: dict[int, int] = dict(buckets or {})
+        self.count = sum(self.buckets.values())
+
+    @staticmethod
+    def bucket_of(value: float) -> int:
+        return int(math.ceil(math.log(max(float(value), 1e-3)) / _LOG_GAMMA))
+
+    @staticmethod
+    def value_of(index: int) -> float:
+        # Midpoint of (gamma^(i-1), gamma^i] keeps the relative error symmetric.
+        return 2.0 * (_HIST_GAMMA**index) / (_HIST_GAMMA + 1.0)
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value <= 0 or count <= 0:
+            return
+        idx = self.bucket_of(value)
+        self.buckets[idx] = self.buckets.get(idx, 0) + count
+        self.count += count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for idx, n in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + n
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        if self.count <= 0:
+            return 0.0
+        q = max(0.0, min(1.0, float(q)))
+        rank = q * (self.count - 1)
+        seen = 0
+        for idx in sorted(self.buckets):
+            seen += self.buckets[idx]
+            if seen > rank:
+                return self.value_of(idx)
+        return self.value_of(max(self.buckets))
+
+    def to_json(self) -> str:
+        return json.dumps({str(k): v for k, v in self.buckets.items()}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str | None) -> "LatencyHistogram":
+        try:
+            data = json.loads(raw or "{}")
+        except Exception:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+        buckets: dict[int, int] = {}
+        for k, v in data.items():
+            try:
+                buckets[int(k)] = int(v)
+            except Exception:
+                continue
+        return cls(buckets)
+
+
+def _hour_key(ts: datetime) -> str:
+    return ts.astimezone(timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+def _parse_ts(raw: Any) -> datetime | None:
+    s = str(raw or "").strip()
+    if not s:
+        return None
+    try:
+        if s.endswith("Z"):
+            s = s[:-1] + "+00:00"
+        dt = datetime.fromisoformat(s)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc)
+    except Exception:
+        return None
+
+
+def _dim(payload: dict[str, Any], key: str) -> str:
+    return str(payload.get(key) or "unknown").strip()[:80] or "unknown"
+
+
+class TraceRollupStore:
+    """SQLite-backed hourly rollup of run metrics."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_store_path()
+
+    def _connect(self) -> sqlite3.Connection:
+        with _conn_lock:
+            conn = _conns.get(self.path)
+            if conn is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.executescript(_SCHEMA)
+                _conns[self.path] = conn
+            return conn
+
+    def close(self) -> None:
+        with _conn_lock:
+            conn = _conns.pop(self.path, None)
+        if conn is not None:
+            conn.close()
+
+    def record(self, payload: dict[str, Any], ts: datetime | None = None) -> None:
+        """Fold one `core.run.metrics` payload into its hourly partition."""
+        self.record_many([(ts or datetime.now(timezone.utc), payload)])
+
+    def record_many(self, items: Iterable[tuple[datetime, dict[str, Any]]]) -> int:
+        pending: dict[tuple[str, str, str, str], list[Any]] = {}
+        for ts, payload in items:
+            key = (_hour_key(ts), *(_dim(payload, f) for f in GROUP_FIELDS))
+            row = pending.setdefault(key, [0, 0, 0, LatencyHistogram()])
+            row[0] += 1
+            if bool(payload.get("budget_stop")):
+                row[1] += 1
+            if str(payload.get("status") or "") == "failed":
+                row[2] += 1
+            try:
+                total_ms = float(payload.get("total_ms", 0.0))
+            except Exception:
+                total_ms = 0.0
+            row[3].add(total_ms)
+        if not pending:
+            return 0
+
+        conn = self._connect()
+        with _conn_lock, conn:
+            # Take the write lock before reading the histograms: another process folding
+            # into the same rows between our SELECT and UPDATE would lose its buckets.
+            conn.execute("BEGIN IMMEDIATE")
+            for key, (samples, stops, failures, hist) in pending.items():
+                cur = conn.execute(
+                    "SELECT hist FROM kpi_rollup WHERE hour=? AND route_band=? AND provider=? AND model=?",
+                    key,
+                )
+                existing = cur.fetchone()
+                if existing is not None:
+                    merged = LatencyHistogram.from_json(existing[0])
+                    merged.merge(hist)
+                    hist = merged
+                conn.execute(
+                    """
+                    INSERT INTO kpi_rollup (hour, route_band, provider, model, samples, budget_stops, failures, hist)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(hour, route_band, provider, model) DO UPDATE SET
+                        samples = samples + excluded.samples,
+                        budget_stops = budget_stops + excluded.budget_stops,
+                        failures = failures + excluded.failures,
+                        hist = excluded.hist
+                    """,
+                    (*key, samples, stops, failures, hist.to_json()),
+                )
+        return sum(row[0] for row in pending.values())
+
+    def prune(self, now: datetime | None = None) -> int:
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=_retention_days())
+        conn = self._connect()
+        with _conn_lock, conn:
+            cur = conn.execute("DELETE FROM kpi_rollup WHERE hour < ?", (_hour_key(cutoff),))
+            return int(cur.rowcount or 0)
+
+    def clear(self) -> None:
+        conn = self._connect()
+        with _conn_lock, conn:
+            conn.execute("DELETE FROM kpi_rollup")
+            conn.execute("DELETE FROM rollup_meta")
+
+    def backfilled_at(self) -> str | None:
+        """When `backfill_jsonl` last completed (ISO timestamp), or None if it never ran."""
+        conn = self._connect()
+        with _conn_lock:
+            row = conn.execute("SELECT value FROM rollup_meta WHERE key='backfilled_at'").fetchone()
+        return str(row[0]) if row else None
+
+    def backfill_jsonl(self, log_path: str) -> int:
+        """Ingest `core.run.metrics` events from an existing trace JSONL (a missing log counts as empty)."""
+
+        def _iter() -> Iterable[tuple[datetime, dict[str, Any]]]:
+            with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except Exception:
+                        continue
+                    if rec.get("event") != METRICS_EVENT:
+                        continue
+                    ts = _parse_ts(rec.get("ts"))
+                    payload = rec.get("payload")
+                    if ts is None or not isinstance(payload, dict):
+                        continue
+                    yield ts, payload
+
+        ingested = self.record_many(_iter()) if os.path.exists(log_path) else 0
+        conn = self._connect()
+        with _conn_lock, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO rollup_meta (key, value) VALUES ('backfilled_at', ?)",
+                (datetime.now(timezone.utc).isoformat(),),
+            )
+        return ingested
+
+    def rolling_kpis(
+        self,
+        *,
+        days: int = 7,
+        group_by: Iterable[str] = (),
+        now: datetime | None = None,
+    ) -> dict[str, Any]:
+        """Answer rolling-window KPIs by merging hourly partitions."""
+        dims = [g for g in group_by if g in GROUP_FIELDS]
+        window_days = max(1, int(days))
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=window_days)
+        conn = self._connect()
+        with _conn_lock:
+            rows = conn.execute(
+                "SELECT route_band, provider, model, samples, budget_stops, failures, hist "
+                "FROM kpi_rollup WHERE hour >= ?",
+                (_hour_key(cutoff),),
+            ).fetchall()
+
+        total: list[Any] = [0, 0, 0, LatencyHistogram()]
+        groups: dict[tuple[str, ...], list[Any]] = {}
+        for route_band, provider, model, samples, stops, failures, raw_hist in rows:
+            hist = LatencyHistogram.from_json(raw_hist)
+            values = {"route_band": route_band, "provider": provider, "model": model}
+            targets = [total]
+            if dims:
+                targets.append(groups.setdefault(tuple(values[d] for d in dims), [0, 0, 0, LatencyHistogram()]))
+            for acc in targets:
+                acc[0] += int(samples)
+                acc[1] += int(stops)
+                acc[2] += int(failures)
+                acc[3].merge(hist)
+
+        out = {"window_days": window_days, **_summarize(total)}
+        if dims:
+            out["group_by"] = dims
+            out["groups"] = [
+                {**dict(zip(dims, key)), **_summarize(acc)}
+                for key, acc in sorted(groups.items(), key=lambda kv: -kv[1][0])
+            ]
+        return out
+
+
+def _summarize(acc: list[Any]) -> dict[str, Any]:
+    samples, stops, failures, hist = acc
+    return {
+        "sample_count": samples,
+        "budget_stop_rate": round(stops / samples, 4) if samples else 0.0,
+        "failure_rate": round(failures / samples, 4) if samples else 0.0,
+        "p50_total_ms": round(hist.quantile(0.50), 2),
+        "p95_total_ms": round(hist.quantile(0.95), 2),
+        "p99_total_ms": round(hist.quantile(0.99), 2),
+    }
+
+
+_writer_lock = threading.Lock()
+_writer_queue: "queue.SimpleQueue[tuple[str, datetime, dict[str, Any]] | threading.Event]" = queue.SimpleQueue()
+_writer_thread: threading.Thread | None = None
+
+
+def _ensure_writer() -> None:
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name="trace-rollup-writer", daemon=True)
+            _writer_thread.start()
+
+
+def _writer_loop() -> None:
+    while True:
+        items = [_writer_queue.get()]
+        while True:
+            try:
+                items.append(_writer_queue.get_nowait())
+            except queue.Empty:
+                break
+        batches: dict[str, list[tuple[datetime, dict[str, Any]]]] = {}
+        flushed: list[threading.Event] = []
+        for item in items:
+            if isinstance(item, threading.Event):
+                flushed.append(item)
+                continue
+            path, ts, payload = item
+            batches.setdefault(path, []).append((ts, payload))
+        for path, batch in batches.items():
+            try:
+                TraceRollupStore(path).record_many(batch)
+            except Exception:
+                pass
+        for done in flushed:
+            done.set()
+
+
+def flush_rollup_writes(timeout: float = 5.0) -> bool:
+    """Wait until every event queued so far is in the store; False on timeout."""
+    if _writer_thread is None or not _writer_thread.is_alive():
+        return True
+    done = threading.Event()
+    _writer_queue.put(done)
+    return done.wait(timeout)
+
+
+atexit.register(flush_rollup_writes)
+
+
+def record_trace_event(event: str, payload: dict[str, Any], ts: datetime | None = None) -> None:
+    """Hook for `trace_event`: queue metrics events for the rollup writer (best-effort)."""
+    if event != METRICS_EVENT or not rollup_enabled():
+        return
+    try:
+        _ensure_writer()
+        _writer_queue.put((default_store_path(), ts or datetime.now(timezone.utc), dict(payload)))
+    except Exception:
+        return
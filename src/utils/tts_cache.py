@@ -0,0 +1,255 @@
+"""
+Content-addressed cache for synthesized TTS audio.
+
+VOICEVOX needs two HTTP round-trips (`audio_query` + `synthesis`) per utterance,
+and the bot says the same things over and over (greetings, join/leave notices,
+auto-read of short common messages). Audio is keyed by a hash of
+(engine, engine version, speaker, speed, text) and kept in:
+
+- an in-memory LRU bounded by total bytes
+- an on-disk store (sharded by key prefix) bounded by total bytes, LRU by atime
+
+Both tiers honour a TTL so engine/dictionary updates age out. All disk I/O is
+best-effort: a broken cache only costs a re-synthesis, never a failed reply.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from src.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".audio"
+
+
+def tts_cache_key(
+    text: str,
+    *,
+    speaker_id: int | None,
+    speed_scale: float,
+    engine: str = "voicevox",
+    engine_version: str = "",
+) -> str:
+    material = "\x1f".join(
+        [
+            engine,
+            engine_version or "unknown",
+            str(speaker_id if speaker_id is not None else "default"),
+            f"{float(speed_scale):.3f}",
+            text.strip(),
+        ]
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTSAudioCache:
+    """Two-tier (memory + disk) LRU for synthesized audio bytes."""
+
+    def __init__(
+        self,
+        cache_dir: str | os.PathLike[str],
+        *,
+        max_memory_bytes: int | None = None,
+        max_disk_bytes: int | None = None,
+        ttl_sec: int | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_bytes = (
+            max_memory_bytes if max_memory_bytes is not None else env_int("ORA_TTS_CACHE_MEMORY_MB", 32, 0, 4096) * 1024 * 1024
+        )
+        self.max_disk_bytes = (
+            max_disk_bytes if max_disk_bytes is not None else env_int("ORA_TTS_CACHE_DISK_MB", 512, 0, 65536) * 1024 * 1024
+        )
+        self.ttl_sec = ttl_sec if ttl_sec is not None else env_int("ORA_TTS_CACHE_TTL_SEC", 30 * 86400, 0, 3650 * 86400)
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: int | None = None
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{_SUFFIX}"
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_sec > 0 and now - stored_at > self.ttl_sec
+
+    def _remember(self, key: str, audio: bytes, stored_at: float) -> None:
+        if len(audio) > self.max_memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old[0])
+            self._memory[key] = (audio, stored_at)
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                _, (evicted, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if not self._expired(hit[1], now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return hit[0]
+                del self._memory[key]
+                self._memory_bytes -= len(hit[0])
+
+        path = self._path(key)
+        try:
+            st = path.stat()
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        # mtime is the write time (TTL); atime is bumped explicitly on hits for disk LRU.
+        stored_at = st.st_mtime
+        if self._expired(stored_at, now):
+            self._unlink(path, st.st_size)
+            with self._lock:
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+            return None
+        try:
+            audio = path.read_bytes()
+            os.utime(path, (now, st.st_mtime))
+        except OSError:
+            with self._lock:
+                self._stats["misses"] += 1
+            return None
+        with self._lock:
+            self._stats["disk_hits"] += 1
+        self._remember(key, audio, stored_at)
+        return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        if not audio:
+            return
+        now = time.time()
+        self._remember(key, audio, now)
+        with self._lock:
+            self._stats["stores"] += 1
+        if self.max_disk_bytes <= 0 or len(audio) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        usage = self._disk_usage()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                previous = path.stat().st_size
+            except OSError:
+                previous = 0
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(audio)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug("TTS cache write failed: %s", e)
+            return
+        total = usage + len(audio) - previous
+        with self._lock:
+            self._disk_bytes = total
+        if total > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _unlink(self, path: Path, size: int) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes = max(0, self._disk_bytes - size)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        out: list[tuple[float, int, Path]] = []
+        if not self.cache_dir.exists():
+            return out
+        for path in self.cache_dir.glob(f"*/*{_SUFFIX}"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            out.append((st.st_atime, st.st_size, path))
+        return out
+
+    def _disk_usage(self) -> int:
+        with self._lock:
+            cached = self._disk_bytes
+        if cached is not None:
+            return cached
+        total = sum(size for _, size, _ in self._entries())
+        with self._lock:
+            self._disk_bytes = total
+        return total
+
+    def _evict_disk(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        # Trim to 90% so a full cache does not rescan the directory on every write.
+        target = int(self.max_disk_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._stats["evictions"] += evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        for _, size, path in self._entries():
+            self._unlink(path, size)
+        with self._lock:
+            self._disk_bytes = 0
+
+    async def aget(self, key: str) -> bytes | None:
+        with self._lock:
+            hit = self._memory.get(key)
+        if hit is not None and not self._expired(hit[1], time.time()):
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, audio: bytes) -> None:
+        await asyncio.to_thread(self.put, key, audio)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self._stats)
+            out["memory_entries"] = len(self._memory)
+            out["memory_bytes"] = self._memory_bytes
+            out["disk_bytes"] = self._disk_bytes
+        lookups = out["memory_hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = round((out["memory_hits"] + out["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return out
+
+
+def prewarm_phrases_from_env() -> list[str]:
+    """Phrases listed in ORA_TTS_PREWARM_PHRASES (separated by `|` or newlines)."""
+    raw = os.getenv("ORA_TTS_PREWARM_PHRASES") or ""
+    phrases: list[str] = []
+    for part in raw.replace("\n", "|").split("|"):
+        part = part.strip()
+        if part and part not in phrases:
+            phrases.append(part)
+    return phrases[:200]
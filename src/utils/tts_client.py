@@ -3,18 +3,52 @@
 from __future__ import annotations
 
 import logging
+import time
 
 import aiohttp
 
+from src.utils.http_sessions import borrow_session
+
 logger = logging.getLogger(__name__)
 
 
 class VoiceVoxClient:
     """Minimal VOICEVOX HTTP client that synthesises WAV audio from text."""
 
+    # A failed /version lookup is remembered this long so an unreachable
+    # engine does not add a round-trip (and its timeout) to every synthesis.
+    VERSION_RETRY_SEC = 30.0
+
     def __init__(self, base_url: str, speaker_id: int) -> None:
         self._base_url = base_url.rstrip("/")
         self._speaker_id = speaker_id
+        self._engine_version: str | None = None
+        self._version_failed_at: float | None = None
+
+    @property
+    def speaker_id(self) -> int:
+        return self._speaker_id
+
+    async def get_version(self) -> str:
+        """Engine version (part of the TTS cache key); empty string if unreachable."""
+        if self._engine_version is not None:
+            return self._engine_version
+        if self._version_failed_at is not None and time.monotonic() - self._version_failed_at < self.VERSION_RETRY_SEC:
+            return ""
+        version = ""
+        try:
+            async with borrow_session() as session:
+                async with session.get(f"{self._base_url}/version", timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                    if resp.status == 200:
+                        version = str(await resp.json(content_type=None)).strip()
+        except Exception:
+            pass
+        if not version:
+            self._version_failed_at = time.monotonic()
+            return ""
+        self._engine_version = version
+        self._version_failed_at = None
+        return version
 
     async def synthesize(self, text: str, speaker_id: int = None, speed_scale: float = 1.0) -> bytes:
         """Synthesise ``text`` into WAV audio bytes."""
@@ -26,11 +60,11 @@ class VoiceVoxClient:
         params = {"speaker": sid}
         timeout = aiohttp.ClientTimeout(total=30)
 
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with borrow_session() as session:
             query_url = f"{self._base_url}/audio_query"
             # VOICEVOX expects 'text' and 'speaker' as query parameters
             query_params = {"text": text, "speaker": sid}
-            async with session.post(query_url, params=query_params) as resp:
+            async with session.post(query_url, params=query_params, timeout=timeout) as resp:
                 if resp.status != 200:
                     raise RuntimeError(f"VOICEVOX audio_query failed: status={resp.status}")
                 query = await resp.json()
@@ -45,7 +79,7 @@ class VoiceVoxClient:
             logger.info(f"VOICEVOX audio_query successful (Speed: {query['speedScale']})")
 
             synthesis_url = f"{self._base_url}/synthesis"
-            async with session.post(synthesis_url, params=params, json=query) as resp2:
+            async with session.post(synthesis_url, params=params, json=query, timeout=timeout) as resp2:
                 if resp2.status != 200:
                     raise RuntimeError(f"VOICEVOX synthesis failed: status={resp2.status}")
                 audio = await resp2.read()
@@ -56,9 +90,9 @@ class VoiceVoxClient:
     async def get_speakers(self) -> list[dict]:
         """Fetch available speakers from VoiceVox."""
         timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        async with borrow_session() as session:
             url = f"{self._base_url}/speakers"
-            async with session.get(url) as resp:
+            async with session.get(url, timeout=timeout) as resp:
                 if resp.status != 200:
                     logger.error(f"Failed to fetch speakers: {resp.status}")
                     return []
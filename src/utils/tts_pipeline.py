@@ -0,0 +1,239 @@
+"""
+Sentence-pipelined TTS playback.
+
+Synthesizing a whole LLM reply before playing it makes time-to-first-audio grow
+with reply length. For multi-sentence text the voice manager instead:
+
+- splits the text at sentence boundaries (`。！？` and Latin `.!?`, newlines),
+  merging fragments that are too short to be worth a request and breaking
+  overlong sentences at `、,;`
+- synthesizes ahead of playback with at most `prefetch` requests in flight
+  (`SentencePipeline`), so the next sentence renders while this one plays
+- plays everything through one `ChunkedPCMSource`, which switches to the next
+  chunk's (already spawned) decoder inside the same 20 ms read loop, so there
+  is no gap or `play()` restart between sentences
+
+Barge-in cancels the pipeline: in-flight syntheses are cancelled and queued
+chunks are cleaned up, and the source ends on its next read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+_FRAME_BYTES = 3840  # 20 ms of 48 kHz / 16-bit / stereo
+_SILENCE = bytes(_FRAME_BYTES)
+
+# Sentence end: CJK terminators (+ closing quotes/brackets), or Latin terminators followed by space/end.
+_SENTENCE_END = re.compile(r"(?:[。！？!?]+[」』）)\"']*|(?<!\d)\.(?=\s|$)|\n+)")
+_SOFT_BREAK = re.compile(r"[、,;；]")
+
+
+def split_sentences(text: str, *, min_chars: int = 6, max_chars: int = 120) -> list[str]:
+    """Split text into TTS-sized chunks, keeping punctuation with its sentence."""
+    text = (text or "").strip()
+    if not text:
+        return []
+
+    sentences: list[str] = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        piece = text[start : match.end()].strip()
+        if piece:
+            sentences.append(piece)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+
+    chunks: list[str] = []
+    for sentence in sentences:
+        while len(sentence) > max_chars:
+            window = sentence[:max_chars]
+            breaks = [m.end() for m in _SOFT_BREAK.finditer(window)]
+            cut = breaks[-1] if breaks and breaks[-1] >= max_chars // 3 else max_chars
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if not sentence:
+            continue
+        if chunks and len(chunks[-1]) < min_chars and len(chunks[-1]) + len(sentence) <= max_chars:
+            # Tiny fragments ("はい。", "OK.") ride along with the next sentence.
+            chunks[-1] = f"{chunks[-1]} {sentence}" if chunks[-1][-1].isascii() else chunks[-1] + sentence
+        else:
+            chunks.append(sentence)
+    return chunks
+
+
+class SentencePipeline:
+    """Synthesizes chunks in order with a bounded number of requests in flight."""
+
+    def __init__(
+        self,
+        chunks: list[str],
+        synthesize: Callable[[str], Awaitable[bytes]],
+        *,
+        prefetch: int = 2,
+    ) -> None:
+        self._chunks = deque(chunks)
+        self._synthesize = synthesize
+        self.prefetch = max(1, prefetch)
+        self._tasks: deque[asyncio.Task[bytes]] = deque()
+        self._current: Optional[asyncio.Future[bytes]] = None
+        self.cancelled = False
+        self.failed = 0
+
+    @property
+    def in_flight(self) -> int:
+        tasks = [*self._tasks, self._current] if self._current is not None else list(self._tasks)
+        return sum(1 for task in tasks if not task.done())
+
+    def _fill(self) -> None:
+        while not self.cancelled and self._chunks and len(self._tasks) < self.prefetch:
+            self._tasks.append(asyncio.ensure_future(self._synthesize(self._chunks.popleft())))
+
+    async def next(self) -> Optional[bytes]:
+        """Audio for the next chunk in order; None when done or cancelled. Failed chunks are skipped."""
+        while True:
+            self._fill()
+            if self.cancelled or not self._tasks:
+                return None
+            # The awaited chunk counts toward the window; the rest are already synthesizing
+            # and overlap with the playback of whatever this call returns.
+            task = self._current = self._tasks.popleft()
+            try:
+                audio = await task
+            except asyncio.CancelledError:
+                if self.cancelled:
+                    return None
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.warning("TTS chunk synthesis failed, skipping: %s", e)
+                continue
+            finally:
+                self._current = None
+            if audio:
+                return audio
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self._chunks.clear()
+        if self._current is not None:
+            self._current.cancel()
+        while self._tasks:
+            self._tasks.popleft().cancel()
+
+
+class ChunkedPCMSource(discord.AudioSource):
+    """Plays a growing sequence of PCM sources back to back in one player.
+
+    `feed()` and `close()` are called from the event loop; `read()` runs on the
+    voice player thread. While more chunks are expected but not ready yet, the
+    source emits silence instead of ending playback.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._sources: deque[discord.AudioSource] = deque()
+        self._closed = False
+        self._advanced = asyncio.Event() if loop is not None else None
+        self.chunks_played = 0
+        self.underrun_frames = 0
+
+    @property
+    def closed(self) -> bool:
+        with self._lock:
+            return self._closed
+
+    @property
+    def pending(self) -> int:
+        """Chunks queued behind the one currently playing."""
+        with self._lock:
+            return max(0, len(self._sources) - 1)
+
+    def feed(self, source: discord.AudioSource) -> None:
+        with self._lock:
+            if self._closed:
+                drop = True
+            else:
+                self._sources.append(source)
+                drop = False
+        if drop:
+            source.cleanup()
+
+    def close(self) -> None:
+        """No more chunks will be fed; playback ends after the queued ones."""
+        with self._lock:
+            self._closed = True
+        self._notify()
+
+    def cancel(self) -> None:
+        """Drop everything (barge-in); the next read() ends playback."""
+        with self._lock:
+            self._closed = True
+            sources, self._sources = list(self._sources), deque()
+        for source in sources:
+            try:
+                source.cleanup()
+            except Exception:
+                pass
+        self._notify()
+
+    async def wait_for_room(self, max_pending: int) -> None:
+        """Wait until at most `max_pending` chunks are queued behind the playing one."""
+        while self.pending > max_pending:
+            if self._advanced is None:
+                await asyncio.sleep(0.02)
+                continue
+            self._advanced.clear()
+            if self.pending <= max_pending:
+                return
+            await self._advanced.wait()
+
+    def _notify(self) -> None:
+        if self._advanced is None or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._advanced.set)
+        except RuntimeError:
+            pass  # loop closed during shutdown
+
+    def read(self) -> bytes:
+        while True:
+            with self._lock:
+                current = self._sources[0] if self._sources else None
+                closed = self._closed
+            if current is None:
+                if closed:
+                    return b""
+                # Next sentence still synthesizing: keep the player alive with silence.
+                self.underrun_frames += 1
+                return _SILENCE
+            data = current.read()
+            if data:
+                return data
+            with self._lock:
+                if self._sources and self._sources[0] is current:
+                    self._sources.popleft()
+            self.chunks_played += 1
+            try:
+                current.cleanup()
+            except Exception:
+                pass
+            self._notify()
+
+    def is_opus(self) -> bool:
+        return False
+
+    def cleanup(self) -> None:
+        self.cancel()
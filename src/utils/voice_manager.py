@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import asyncio
-import audioop
 import json
 import logging
 import os
@@ -17,13 +16,17 @@ from typing import Any, Awaitable, Callable, Dict, Optional, cast
 import discord
 
 from ..config import STATE_DIR, TEMP_DIR
+from .audio_mixer import MixingAudioSource
 from .edge_tts_client import EdgeTTSClient
+from .env import env_float, env_int
 from .gtts_client import GTTSClient
 
 # from discord.ext import voice_recv
 from .stt_client import WhisperClient
 from .t5_tts_client import T5TTSClient
+from .tts_cache import TTSAudioCache, tts_cache_key
 from .tts_client import VoiceVoxClient
+from .tts_pipeline import ChunkedPCMSource, SentencePipeline, split_sentences
 
 
 class VoiceConnectionError(Exception):
@@ -100,108 +103,6 @@ class HotwordListener:
             pass
 
 
-class MixingAudioSource(discord.AudioSource):
-    def __init__(
-        self,
-        main_source: discord.AudioSource,
-        overlay_source: discord.AudioSource,
-        target_volume: float = 0.2,
-        fade_duration: float = 0.5,
-        on_finish: Optional[Callable[[], None]] = None,
-    ) -> None:
-        self.main = main_source
-        self.overlay = overlay_source
-        self.target_volume = target_volume
-        self.current_volume = 1.0
-        self.fade_duration = fade_duration
-        self.overlay_finished = False
-        self.fading_in = False
-        self.on_finish = on_finish
-        self.callback_fired = False
-        # 20ms per frame (standard Discord audio)
-        self.volume_step = (1.0 - target_volume) / (fade_duration / 0.02)
-
-    def read(self) -> bytes:
-        # Read from main
-        main_data = self.main.read()
-        # If main is done, we treat it as silence but we MUST continue if overlay is active
-        if not main_data:
-            main_data = b""
-
-        # Read from overlay
-        if not self.overlay_finished:
-            overlay_data = self.overlay.read()
-            if not overlay_data:
-                self.overlay_finished = True
-                self.fading_in = True
-                # Trigger callback once
-                if self.on_finish and not self.callback_fired:
-                    self.callback_fired = True
-                    # Execute callback (might need to be non-blocking or just standard func)
-                    try:
-                        self.on_finish()
-                    except Exception as e:
-                        logger.error(f"MixingAudioSource callback error: {e}")
-        else:
-            overlay_data = b""
-
-        # If both are done, return empty
-        if not main_data and not overlay_data:
-            return b""
-
-        # Calculate Volume
-        if not self.overlay_finished and not self.fading_in:
-            # Fading Out (1.0 -> target)
-            if self.current_volume > self.target_volume:
-                self.current_volume = max(self.target_volume, self.current_volume - self.volume_step)
-        elif self.fading_in:
-            # Fading In (target -> 1.0)
-            if self.current_volume < 1.0:
-                self.current_volume = min(1.0, self.current_volume + self.volume_step)
-            else:
-                self.fading_in = False  # Done fading in
-
-        # Apply Volume to Main
-        if main_data:
-            try:
-                # audioop.mul throws error if volume is 0? No, but let's be safe.
-                main_adjusted = audioop.mul(main_data, 2, self.current_volume)
-            except Exception:
-                main_adjusted = main_data
-        else:
-            main_adjusted = b""
-
-        # Mix if overlay exists
-        if overlay_data:
-            if main_adjusted:
-                try:
-                    # audioop.add requires same length
-                    len_main = len(main_adjusted)
-                    len_overlay = len(overlay_data)
-
-                    if len_main == len_overlay:
-                        return audioop.add(main_adjusted, overlay_data, 2)
-                    elif len_main > len_overlay:
-                        # Pad overlay with silence
-                        padding = b"\x00" * (len_main - len_overlay)
-                        return audioop.add(main_adjusted, overlay_data + padding, 2)
-                    else:
-                        # Pad main with silence (should rare for standard 20ms frames)
-                        padding = b"\x00" * (len_overlay - len_main)
-                        return audioop.add(main_adjusted + padding, overlay_data, 2)
-                except Exception as e:
-                    logger.error(f"Mixing failed: {e}")
-                    return main_adjusted
-            else:
-                return overlay_data
-
-        return main_adjusted
-
-    def cleanup(self) -> None:
-        self.main.cleanup()
-        self.overlay.cleanup()
-
-
 class GuildMusicState:
     def __init__(self):
         self.queue = []  # List of (url_or_path, title, is_stream, duration)
@@ -220,6 +121,11 @@ class GuildMusicState:
         self.pitch = 1.0
         self.start_offset = 0.0
         self.current_tts_type: str = "chat"  # Track current playback type for Anti-Spam
+        # Sentence-pipelined TTS (long replies): cancelled together on barge-in
+        self.tts_pipeline: Optional[SentencePipeline] = None
+        self.tts_stream: Optional[ChunkedPCMSource] = None
+        # stream URL -> the YouTube query it was resolved from, so expired URLs can be re-resolved
+        self.stream_sources: Dict[str, str] = {}
 
     # ... (VoiceManager methods) ...
 
@@ -357,6 +263,11 @@ class GuildMusicState:
 class VoiceManager:
     """Manages Discord voice clients for playback, recording, and music queue."""
 
+    # Queued streams resolved in the background while the current track plays.
+    music_prefetch_ahead = 2
+    # Pause between a track ending and the next one starting.
+    music_track_gap_sec = 0.2
+
     def __init__(self, bot: discord.Client, tts: VoiceVoxClient, stt: WhisperClient) -> None:
         self._bot = bot
         self._tts = tts
@@ -386,6 +297,15 @@ class VoiceManager:
         # Audio Cache for static notifications (join/leave)
         self.cache_dir = Path("src/data/cache/audio_notify")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Content-addressed VoiceVox audio cache (memory LRU + disk)
+        self.tts_cache = TTSAudioCache(os.getenv("ORA_TTS_CACHE_DIR") or Path(STATE_DIR) / "cache" / "tts")
+
+        # Multi-sentence replies are synthesized sentence by sentence while earlier ones play
+        self.tts_pipeline_enabled = (os.getenv("ORA_TTS_PIPELINE") or "1").strip().lower() not in {"0", "false", "off"}
+        self.tts_prefetch = env_int("ORA_TTS_PREFETCH", 2, 1, 8)
+        self.music_prefetch_ahead = env_int("ORA_MUSIC_PREFETCH_AHEAD", 2, 0, 8)
+        self.music_track_gap_sec = env_float("ORA_MUSIC_TRACK_GAP_SEC", 0.2, 0.0, 5.0)
         
         # Ensure TEMP_DIR exists
         os.makedirs(TEMP_DIR, exist_ok=True)
@@ -471,6 +391,40 @@ class VoiceManager:
         """Fetch available speakers from VoiceVox Engine."""
         return await self._tts.get_speakers()
 
+    async def _synthesize_voicevox(self, text: str, speaker_id: Optional[int], speed: float) -> bytes:
+        """VoiceVox synthesis through the TTS audio cache."""
+        effective_speaker = speaker_id if speaker_id is not None else self._tts.speaker_id
+        key = tts_cache_key(
+            text,
+            speaker_id=effective_speaker,
+            speed_scale=speed,
+            engine="voicevox",
+            engine_version=await self._tts.get_version(),
+        )
+        audio = await self.tts_cache.aget(key)
+        if audio:
+            return audio
+        audio = await self._tts.synthesize(text, speaker_id=effective_speaker, speed_scale=speed)
+        await self.tts_cache.aput(key, audio)
+        return audio
+
+    async def prewarm_tts(self, phrases: list[str], speaker_id: Optional[int] = None, speed: float = 1.0) -> int:
+        """Synthesize frequently used phrases ahead of time. Returns how many were newly cached."""
+        warmed = 0
+        for phrase in phrases:
+            text = self.clean_for_tts(phrase)
+            if not text:
+                continue
+            before = self.tts_cache.stats()["stores"]
+            try:
+                await self._synthesize_voicevox(text, speaker_id, speed)
+            except Exception as e:
+                logger.debug("TTS prewarm skipped (%s): %s", text[:20], e)
+                continue
+            if self.tts_cache.stats()["stores"] > before:
+                warmed += 1
+        return warmed
+
     def set_user_speaker(self, user_id: int, speaker_id: int) -> None:
         """Set the preferred VoiceVox speaker ID for a user."""
         self._user_speakers[user_id] = speaker_id
@@ -696,6 +650,16 @@ class VoiceManager:
         if speaker_id == -1:
             model_type = "t5"
 
+        # Long standard-voice replies: start playing the first sentence while the rest synthesize
+        stream: Optional[ChunkedPCMSource] = None
+        if self.tts_pipeline_enabled and model_type != "t5" and not cache_key:
+            chunks = split_sentences(text)
+            if len(chunks) > 1:
+                stream = await self._start_tts_pipeline(state, chunks, speaker_id, speed)
+                if stream is None:
+                    state.tts_processing = False
+                    return
+
         try:
             audio = None
 
@@ -710,7 +674,7 @@ class VoiceManager:
                     except Exception as e:
                         logger.error(f"Failed to read cache {cache_key}: {e}")
 
-            if not audio:
+            if not audio and stream is None:
                 # Generate Audio
                 if model_type == "t5":
                     # T5Gemma Exclusive Mode
@@ -722,22 +686,10 @@ class VoiceManager:
                         audio = await self._edge_tts.synthesize(text)
                 else:
                     # Standard Mode
-                    try:
-                        audio = await self._tts.synthesize(text, speaker_id=speaker_id, speed_scale=speed)
-                    except Exception as vv_exc:
-                        if not self.has_warned_voicevox:
-                            logger.warning(f"VoiceVox synthesis failed: {vv_exc}. Falling back to EdgeTTS.")
-                            self.has_warned_voicevox = True
-                        try:
-                            audio = await self._edge_tts.synthesize(text)
-                        except Exception as edge_exc:
-                            logger.warning(f"Edge TTS failed: {edge_exc}. Falling back to gTTS.")
-                            try:
-                                audio = await self._gtts.synthesize(text)
-                            except Exception as gtts_exc:
-                                logger.error(f"All Standard TTS engines failed: {gtts_exc}")
-                                state.tts_processing = False
-                                return
+                    audio = await self._synthesize_standard(text, speaker_id, speed)
+                    if audio is None:
+                        state.tts_processing = False
+                        return
 
                 # [CACHE SAVE]
                 if cache_key and audio:
@@ -773,10 +725,14 @@ class VoiceManager:
 
         try:
             # Create Source
-            tts_source = self._create_source_from_bytes(audio)
+            tts_source = stream if stream is not None else self._create_source_from_bytes(audio)
             tts_source = discord.PCMVolumeTransformer(tts_source, volume=state.tts_volume)
 
-            if voice_client.is_playing() and voice_client.source:
+            if voice_client.is_playing() and isinstance(voice_client.source, MixingAudioSource):
+                # Already mixing: stack another overlay instead of nesting mixers
+                logger.info("Adding TTS overlay to active mix")
+                voice_client.source.add_overlay(tts_source, on_finish=lambda: on_complete())
+            elif voice_client.is_playing() and voice_client.source:
                 # Mixing Mode (Music is playing)
                 logger.info("Mixing TTS with active music (Ducking to 50%)")
                 current_source = voice_client.source
@@ -804,6 +760,68 @@ class VoiceManager:
             # Ensure we don't stall queue
             on_complete(e)
 
+    async def _synthesize_standard(self, text: str, speaker_id: Optional[int], speed: float) -> Optional[bytes]:
+        """VoiceVox, falling back to EdgeTTS and then gTTS. Returns None if every engine fails."""
+        try:
+            return await self._synthesize_voicevox(text, speaker_id, speed)
+        except Exception as vv_exc:
+            if not self.has_warned_voicevox:
+                logger.warning(f"VoiceVox synthesis failed: {vv_exc}. Falling back to EdgeTTS.")
+                self.has_warned_voicevox = True
+        try:
+            return await self._edge_tts.synthesize(text)
+        except Exception as edge_exc:
+            logger.warning(f"Edge TTS failed: {edge_exc}. Falling back to gTTS.")
+        try:
+            return await self._gtts.synthesize(text)
+        except Exception as gtts_exc:
+            logger.error(f"All Standard TTS engines failed: {gtts_exc}")
+            return None
+
+    async def _start_tts_pipeline(
+        self, state: GuildMusicState, chunks: list[str], speaker_id: Optional[int], speed: float
+    ) -> Optional[ChunkedPCMSource]:
+        """Wait for the first sentence only; the rest is fed into the stream while it plays."""
+        started = time.monotonic()
+        pipeline = SentencePipeline(
+            chunks, lambda chunk: self._synthesize_standard(chunk, speaker_id, speed), prefetch=self.tts_prefetch
+        )
+        state.tts_pipeline = pipeline
+        first = await pipeline.next()
+        if first is None:
+            pipeline.cancel()
+            if state.tts_pipeline is pipeline:
+                state.tts_pipeline = None
+            return None
+
+        stream = ChunkedPCMSource(self._bot.loop)
+        stream.feed(self._create_source_from_bytes(first))
+        state.tts_stream = stream
+        logger.info(f"TTS pipeline: {len(chunks)} chunks, first audio after {(time.monotonic() - started) * 1000:.0f}ms")
+        asyncio.create_task(self._feed_tts_pipeline(state, pipeline, stream))
+        return stream
+
+    async def _feed_tts_pipeline(
+        self, state: GuildMusicState, pipeline: SentencePipeline, stream: ChunkedPCMSource
+    ) -> None:
+        try:
+            while not stream.closed:
+                # Keep one decoded chunk queued behind the playing one; synthesis runs further ahead.
+                await stream.wait_for_room(1)
+                audio = await pipeline.next()
+                if audio is None:
+                    break
+                stream.feed(self._create_source_from_bytes(audio))
+        except Exception as e:
+            logger.error(f"TTS pipeline failed: {e}")
+        finally:
+            pipeline.cancel()
+            stream.close()
+            if state.tts_pipeline is pipeline:
+                state.tts_pipeline = None
+            if state.tts_stream is stream:
+                state.tts_stream = None
+
     def _create_source_from_bytes(self, audio: bytes) -> discord.AudioSource:
         # Create a temporary file for the audio
         # Note: We need to keep the file alive while playing.
@@ -884,9 +902,19 @@ class VoiceManager:
             cleanup(e)
 
     async def play_music(
-        self, member: discord.Member, url_or_path: str, title: str, is_stream: bool, duration: float = 0.0
+        self,
+        member: discord.Member,
+        url_or_path: str,
+        title: str,
+        is_stream: bool,
+        duration: float = 0.0,
+        source: Optional[str] = None,
     ) -> bool:
-        """Add music to queue and start playing if idle."""
+        """Add music to queue and start playing if idle.
+
+        `source` is the YouTube URL/query a stream URL was resolved from; with it the
+        entry can be re-resolved ahead of time if the stream URL would expire.
+        """
         voice_client = await self.ensure_voice_client(member)
         if not voice_client:
             return False
@@ -896,12 +924,77 @@ class VoiceManager:
 
         # Add to queue
         state.queue.append((url_or_path, title, is_stream, duration))
+        if is_stream and source:
+            state.stream_sources[url_or_path] = source
 
         if not voice_client.is_playing():
             self._play_next(member.guild.id)
+        else:
+            self._prefetch_upcoming(state)
 
         return True
 
+    def _prefetch_upcoming(self, state: GuildMusicState) -> None:
+        """Warm the stream cache for the next queued tracks (and the current one when looping)."""
+        if self.music_prefetch_ahead <= 0:
+            return
+        upcoming = state.queue[: self.music_prefetch_ahead]
+        if state.is_looping and state.current:
+            upcoming = [state.current, *upcoming]
+        queries = [state.stream_sources[e[0]] for e in upcoming if e[2] and e[0] in state.stream_sources]
+        if not queries:
+            return
+        try:
+            from .youtube import prefetch_youtube_audio_streams
+
+            prefetch_youtube_audio_streams(queries)
+        except Exception as e:
+            logger.debug(f"Stream prefetch skipped: {e}")
+
+    def _fresh_stream_url(self, state: GuildMusicState, url: str) -> Optional[str]:
+        """URL to hand to ffmpeg for a queued stream, or None if it must be re-resolved first."""
+        query = state.stream_sources.get(url)
+        if not query:
+            return url
+        from .youtube import get_youtube_stream_cache
+        from .youtube_stream_cache import stream_url_expiry
+
+        cached = get_youtube_stream_cache().peek(query)
+        if cached is not None and cached.url:
+            if cached.url != url:
+                state.stream_sources[cached.url] = query
+            return cached.url
+        expiry = stream_url_expiry(url)
+        if expiry is not None and expiry <= time.time() + 60:
+            return None
+        return url
+
+    def _forget_stale_sources(self, state: GuildMusicState) -> None:
+        live = {e[0] for e in (*state.queue, *state.history) if e}
+        if state.current:
+            live.add(state.current[0])
+        for url in [u for u in state.stream_sources if u not in live]:
+            del state.stream_sources[url]
+
+    async def _resolve_and_play(self, guild_id: int, url: str, title: str, duration: float) -> None:
+        """Re-resolve an expired stream URL, then start it (the prefetch missed this one)."""
+        state = self.get_music_state(guild_id)
+        query = state.stream_sources.get(url)
+        fresh_url = None
+        if query:
+            from .youtube import get_youtube_audio_stream_url
+
+            fresh_url, _title, _dur = await get_youtube_audio_stream_url(query)
+        if state.current is None or state.current[0] != url:
+            return  # skipped/stopped while resolving
+        if not fresh_url:
+            logger.warning(f"Could not refresh expired stream for {title}; skipping.")
+            self._play_next(guild_id)
+            return
+        state.stream_sources[fresh_url] = query or ""
+        state.current = (fresh_url, title, True, duration)
+        self._start_track(guild_id, fresh_url, title, True)
+
     def _play_next(self, guild_id: int):
         state = self.get_music_state(guild_id)
         if not state.voice_client:
@@ -935,8 +1028,24 @@ class VoiceManager:
                 if len(state.history) > 20:
                     state.history.pop()
             state.current = None
+            self._forget_stale_sources(state)
             return
 
+        self._forget_stale_sources(state)
+        if is_stream:
+            fresh_url = self._fresh_stream_url(state, url_or_path)
+            if fresh_url is None:
+                asyncio.run_coroutine_threadsafe(
+                    self._resolve_and_play(guild_id, url_or_path, title, duration), self._bot.loop
+                )
+                return
+            if fresh_url != url_or_path:
+                url_or_path = fresh_url
+                state.current = (url_or_path, title, is_stream, duration)
+        self._start_track(guild_id, url_or_path, title, is_stream)
+
+    def _start_track(self, guild_id: int, url_or_path: str, title: str, is_stream: bool) -> None:
+        state = self.get_music_state(guild_id)
         # Create Source
         try:
             if is_stream:
@@ -965,7 +1074,9 @@ class VoiceManager:
                 if error:
                     logger.error(f"Player error: {error}")
                 # Schedule next song
-                future = asyncio.run_coroutine_threadsafe(self._schedule_next(guild_id), self._bot.loop)
+                future = asyncio.run_coroutine_threadsafe(
+                    self._schedule_next(guild_id, delay=self.music_track_gap_sec), self._bot.loop
+                )
                 try:
                     future.result()
                 except Exception:
@@ -973,14 +1084,15 @@ class VoiceManager:
 
             state.voice_client.play(source, after=after_callback)
             logger.info(f"Playing: {title} (Volume: {state.volume})")
+            self._prefetch_upcoming(state)
 
         except Exception as e:
             logger.exception(f"Failed to play music: {e}")
             # Try next one
             self._play_next(guild_id)
 
-    async def _schedule_next(self, guild_id: int):
-        await asyncio.sleep(1)  # Wait a bit
+    async def _schedule_next(self, guild_id: int, delay: float = 1.0):
+        await asyncio.sleep(delay)  # Wait a bit
         self._play_next(guild_id)
 
     def stop_music(self, guild_id: int):
@@ -1031,6 +1143,11 @@ class VoiceManager:
     def stop_playback(self, guild_id: int):
         """Stop current playback without clearing queue (for Barge-in)."""
         state = self.get_music_state(guild_id)
+        # Cancel in-flight sentence syntheses too, not just the chunk that is audible
+        if state.tts_pipeline is not None:
+            state.tts_pipeline.cancel()
+        if state.tts_stream is not None:
+            state.tts_stream.cancel()
         if state.voice_client and state.voice_client.is_playing():
             state.voice_client.stop()
 
@@ -0,0 +1,271 @@
+"""
+Streaming voice-activity detection and utterance segmentation for Discord PCM.
+
+Discord hands `voice_recv` sinks 20 ms frames of 48 kHz / 16-bit / stereo PCM.
+`SpeechSegmenter` runs once per speaker and turns that stream into events:
+
+- `start`   speech confirmed after `start_ms` of voiced frames (barge-in trigger)
+- `partial` audio-so-far every `partial_ms` while the speaker is still talking
+- `end`     the finished utterance, after `end_ms` of unvoiced frames, a packet
+            gap (Discord stops sending during silence), or `max_segment_ms`
+
+Frames are classified by an adaptive energy VAD (noise floor tracked with an
+EMA on unvoiced frames), or by `webrtcvad` when it is installed and selected.
+Audio lives in a preallocated ring buffer per speaker with a short pre-roll, so
+steady-state writes do not allocate and the buffer never grows unbounded.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from src.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+try:  # optional dependency
+    import webrtcvad  # type: ignore
+
+    WEBRTC_VAD_AVAILABLE = True
+except Exception:  # pragma: no cover - depends on environment
+    webrtcvad = None  # type: ignore
+    WEBRTC_VAD_AVAILABLE = False
+
+SAMPLE_RATE = 48000
+CHANNELS = 2
+SAMPLE_WIDTH = 2
+FRAME_MS = 20
+FRAME_BYTES = SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH * FRAME_MS // 1000  # 3840
+BYTES_PER_SECOND = SAMPLE_RATE * CHANNELS * SAMPLE_WIDTH
+
+SegmentKind = Literal["start", "partial", "end"]
+
+
+@dataclass(frozen=True)
+class VADConfig:
+    start_ms: int = 100
+    end_ms: int = 500
+    gap_ms: int = 400
+    partial_ms: int = 1500
+    pre_roll_ms: int = 200
+    max_segment_ms: int = 15000
+    min_segment_ms: int = 400
+    min_dbfs: float = -45.0
+    noise_margin_db: float = 9.0
+    backend: str = "auto"
+
+    @classmethod
+    def from_env(cls) -> "VADConfig":
+        return cls(
+            start_ms=env_int("ORA_VAD_START_MS", 100, 20, 2000),
+            end_ms=env_int("ORA_VAD_END_MS", 500, 100, 5000),
+            gap_ms=env_int("ORA_VAD_GAP_MS", 400, 100, 5000),
+            partial_ms=env_int("ORA_VAD_PARTIAL_MS", 1500, 0, 30000),
+            max_segment_ms=env_int("ORA_VAD_MAX_SEGMENT_MS", 15000, 2000, 60000),
+            backend=(os.getenv("ORA_VAD_BACKEND") or "auto").strip().lower(),
+        )
+
+
+@dataclass(frozen=True)
+class SegmentEvent:
+    kind: SegmentKind
+    audio: bytes = b""
+    duration_ms: int = 0
+
+
+class PCMRingBuffer:
+    """Fixed-capacity byte ring; `read_last(n)` returns the newest n bytes in order."""
+
+    __slots__ = ("_buf", "_capacity", "_write", "_size")
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = int(capacity)
+        self._buf = bytearray(self._capacity)
+        self._write = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def clear(self) -> None:
+        self._write = 0
+        self._size = 0
+
+    def append(self, data: bytes | memoryview) -> None:
+        n = len(data)
+        if n >= self._capacity:
+            self._buf[:] = data[n - self._capacity :]
+            self._write = 0
+            self._size = self._capacity
+            return
+        first = min(n, self._capacity - self._write)
+        self._buf[self._write : self._write + first] = data[:first]
+        if first < n:
+            self._buf[: n - first] = data[first:]
+        self._write = (self._write + n) % self._capacity
+        self._size = min(self._capacity, self._size + n)
+
+    def read_last(self, n: int) -> bytes:
+        n = max(0, min(int(n), self._size))
+        start = (self._write - n) % self._capacity
+        if start + n <= self._capacity:
+            return bytes(self._buf[start : start + n])
+        return bytes(self._buf[start:]) + bytes(self._buf[: n - (self._capacity - start)])
+
+
+def frame_dbfs(frame: bytes | memoryview) -> float:
+    samples = np.frombuffer(frame, dtype=np.int16)
+    if samples.size == 0:
+        return -120.0
+    rms = math.sqrt(float(np.dot(samples.astype(np.float32), samples.astype(np.float32))) / samples.size)
+    return 20.0 * math.log10(rms / 32768.0) if rms > 0 else -120.0
+
+
+class EnergyVAD:
+    """Adaptive-threshold energy classifier for single frames."""
+
+    def __init__(self, *, min_dbfs: float = -45.0, noise_margin_db: float = 9.0) -> None:
+        self.min_dbfs = min_dbfs
+        self.noise_margin_db = noise_margin_db
+        self.noise_floor_db = -60.0
+
+    def threshold_db(self) -> float:
+        return max(self.min_dbfs, self.noise_floor_db + self.noise_margin_db)
+
+    def is_speech(self, frame: bytes | memoryview) -> bool:
+        level = frame_dbfs(frame)
+        voiced = level >= self.threshold_db()
+        if not voiced:
+            # Track the background level only on unvoiced frames so speech does not raise the floor.
+            self.noise_floor_db += 0.05 * (level - self.noise_floor_db)
+        return voiced
+
+
+class WebRtcVAD:
+    """`webrtcvad` on the downmixed mono channel (48 kHz, 20 ms frames are supported natively)."""
+
+    def __init__(self, aggressiveness: int = 2) -> None:
+        self._vad = webrtcvad.Vad(max(0, min(3, aggressiveness)))  # type: ignore[union-attr]
+
+    def is_speech(self, frame: bytes | memoryview) -> bool:
+        stereo = np.frombuffer(frame, dtype=np.int16).reshape(-1, CHANNELS).astype(np.int32)
+        mono = (stereo.sum(axis=1) // CHANNELS).astype(np.int16)
+        return bool(self._vad.is_speech(mono.tobytes(), SAMPLE_RATE))
+
+
+def build_frame_vad(config: VADConfig) -> EnergyVAD | WebRtcVAD:
+    if config.backend in {"auto", "webrtc"} and WEBRTC_VAD_AVAILABLE:
+        return WebRtcVAD(env_int("ORA_VAD_WEBRTC_MODE", 2, 0, 3))
+    if config.backend == "webrtc":
+        logger.warning("webrtcvad is not installed; falling back to energy VAD")
+    return EnergyVAD(min_dbfs=config.min_dbfs, noise_margin_db=config.noise_margin_db)
+
+
+class SpeechSegmenter:
+    """Per-speaker frame VAD + hangover state machine over a preallocated ring buffer."""
+
+    def __init__(self, config: VADConfig | None = None, vad: EnergyVAD | WebRtcVAD | None = None) -> None:
+        self.config = config or VADConfig()
+        self.vad = vad or build_frame_vad(self.config)
+        c = self.config
+        self._start_frames = max(1, c.start_ms // FRAME_MS)
+        self._end_frames = max(1, c.end_ms // FRAME_MS)
+        self._partial_frames = c.partial_ms // FRAME_MS if c.partial_ms > 0 else 0
+        self._pre_roll_frames = max(0, c.pre_roll_ms // FRAME_MS)
+        self._max_frames = max(self._start_frames + 1, c.max_segment_ms // FRAME_MS)
+        self._min_frames = max(1, c.min_segment_ms // FRAME_MS)
+        capacity_frames = self._max_frames + self._pre_roll_frames
+        self._ring = PCMRingBuffer(capacity_frames * FRAME_BYTES)
+        self._pending = bytearray()
+        self.speaking = False
+        self.last_packet_at = 0.0
+        self._voiced_run = 0
+        self._unvoiced_run = 0
+        self._segment_frames = 0
+        self._since_partial = 0
+        self._idle_frames = 0
+
+    def push(self, pcm: bytes, now: float) -> list[SegmentEvent]:
+        """Feed raw PCM (any length); returns events produced by the completed frames."""
+        self.last_packet_at = now
+        events: list[SegmentEvent] = []
+        self._pending.extend(pcm)
+        offset = 0
+        view = memoryview(self._pending)
+        try:
+            while len(self._pending) - offset >= FRAME_BYTES:
+                self._on_frame(view[offset : offset + FRAME_BYTES], events)
+                offset += FRAME_BYTES
+        finally:
+            view.release()
+        if offset:
+            del self._pending[:offset]
+        return events
+
+    def flush_if_idle(self, now: float) -> list[SegmentEvent]:
+        """End the utterance when packets stopped arriving (Discord sends nothing during silence)."""
+        if self.speaking and now - self.last_packet_at >= self.config.gap_ms / 1000.0:
+            self._pending.clear()
+            return self._finish()
+        return []
+
+    def _on_frame(self, frame: memoryview, events: list[SegmentEvent]) -> None:
+        voiced = self.vad.is_speech(frame)
+        self._ring.append(frame)
+        if not self.speaking:
+            self._idle_frames = min(self._idle_frames + 1, self._pre_roll_frames + self._start_frames)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self._start_frames:
+                self.speaking = True
+                self._unvoiced_run = 0
+                # The confirming frames plus whatever pre-roll is still in the ring belong to the segment.
+                self._segment_frames = min(self._idle_frames, self._voiced_run + self._pre_roll_frames)
+                self._since_partial = 0
+                events.append(SegmentEvent("start"))
+            return
+
+        self._segment_frames += 1
+        self._since_partial += 1
+        self._unvoiced_run = 0 if voiced else self._unvoiced_run + 1
+        if self._unvoiced_run >= self._end_frames:
+            events.extend(self._finish(trailing_silence=self._unvoiced_run))
+            return
+        if self._segment_frames >= self._max_frames:
+            events.extend(self._finish())
+            return
+        if self._partial_frames and self._since_partial >= self._partial_frames:
+            self._since_partial = 0
+            events.append(self._event("partial", self._segment_frames))
+
+    def _finish(self, trailing_silence: int = 0) -> list[SegmentEvent]:
+        frames = self._segment_frames
+        voiced_frames = frames - trailing_silence
+        self.speaking = False
+        self._voiced_run = 0
+        self._unvoiced_run = 0
+        self._segment_frames = 0
+        self._since_partial = 0
+        self._idle_frames = 0
+        if voiced_frames < self._min_frames:
+            self._ring.clear()
+            return []
+        # Keep a little trailing silence; whisper clips the last syllable otherwise.
+        keep = frames - max(0, trailing_silence - self._pre_roll_frames)
+        event = self._event("end", keep, skip_tail=frames - keep)
+        self._ring.clear()
+        return [event]
+
+    def _event(self, kind: SegmentKind, frames: int, skip_tail: int = 0) -> SegmentEvent:
+        total = self._ring.read_last((frames + skip_tail) * FRAME_BYTES)
+        audio = total[: len(total) - skip_tail * FRAME_BYTES] if skip_tail else total
+        return SegmentEvent(kind, audio, len(audio) * 1000 // BYTES_PER_SECOND)
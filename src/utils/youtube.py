@@ -9,6 +9,8 @@ from typing import Optional, Tuple, Dict, Any
 import yt_dlp
 from urllib.parse import urlparse, parse_qs
 
+from .youtube_stream_cache import ResolvedStream, YouTubeStreamCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,10 +69,10 @@ def _cleanup_prefix(temp_dir: str, prefix: str, keep: Optional[str] = None) -> N
         pass
 
 
-def _get_youtube_audio_stream_url_sync(query: str, proxy: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+def _resolve_youtube_audio_sync(query: str, proxy: Optional[str] = None) -> Optional[ResolvedStream]:
     """
-    Get the audio stream URL for a YouTube video or search query (Synchronous).
-    Returns: (stream_url, title, duration_seconds)
+    Resolve the audio stream for a YouTube video or search query (Synchronous).
+    Returns None when nothing usable was found (or the URL was rejected).
     """
     query = (query or "").strip()
 
@@ -99,7 +101,7 @@ def _get_youtube_audio_stream_url_sync(query: str, proxy: Optional[str] = None)
         }
         if host not in allowed_hosts:
             logger.warning("Rejected non-YouTube URL in get_youtube_audio_stream_url: %s", query)
-            return None, None, None
+            return None
 
     logger.info(f"Resolving YouTube URL for: {query}")
 
@@ -127,29 +129,65 @@ def _get_youtube_audio_stream_url_sync(query: str, proxy: Optional[str] = None)
 
             if not info:
                 logger.warning(f"yt-dlp returned no info for {query}")
-                return None, None, None
+                return None
 
             if "entries" in info:
                 # It's a search result or playlist, take the first item
                 if not info["entries"]:
                     logger.warning(f"yt-dlp returned empty entries for {query}")
-                    return None, None, None
+                    return None
                 info = info["entries"][0]
 
             # Additional check for 'url'
             if not info.get("url"):
                 logger.warning(f"yt-dlp info has no URL: {info.keys()}")
-                return None, info.get("title"), info.get("duration")
 
-            return info.get("url"), info.get("title"), info.get("duration")
+            return ResolvedStream(
+                url=info.get("url"),
+                title=info.get("title"),
+                duration=info.get("duration"),
+                video_id=info.get("id") if isinstance(info.get("id"), str) else None,
+            )
     except Exception as e:
         logger.error(f"Error getting YouTube stream URL: {e}")
+        return None
+
+
+def _get_youtube_audio_stream_url_sync(query: str, proxy: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    """
+    Get the audio stream URL for a YouTube video or search query (Synchronous).
+    Returns: (stream_url, title, duration_seconds)
+    """
+    resolved = _resolve_youtube_audio_sync(query, proxy)
+    if resolved is None:
         return None, None, None
+    return resolved.as_tuple()
+
+
+_stream_cache: Optional[YouTubeStreamCache] = None
+
+
+def get_youtube_stream_cache() -> YouTubeStreamCache:
+    """Process-wide cache of resolved (proxy-less) streams, shared by all guilds."""
+    global _stream_cache
+    if _stream_cache is None:
+        _stream_cache = YouTubeStreamCache(lambda q: _resolve_youtube_audio_sync(q))
+    return _stream_cache
 
 
 async def get_youtube_audio_stream_url(query: str, proxy: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[int]]:
-    """Async wrapper for _get_youtube_audio_stream_url_sync"""
-    return await asyncio.to_thread(_get_youtube_audio_stream_url_sync, query, proxy)
+    """Async wrapper for _get_youtube_audio_stream_url_sync (cached, de-duplicated when no proxy is set)."""
+    if proxy:
+        return await asyncio.to_thread(_get_youtube_audio_stream_url_sync, query, proxy)
+    resolved = await get_youtube_stream_cache().resolve(query)
+    if resolved is None:
+        return None, None, None
+    return resolved.as_tuple()
+
+
+def prefetch_youtube_audio_streams(queries: list[str]) -> int:
+    """Resolve upcoming items in the background; returns how many resolutions were started."""
+    return get_youtube_stream_cache().prefetch(queries)
 
 
 def _download_youtube_audio_sync(query: str, proxy: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[int]]:
@@ -0,0 +1,266 @@
+"""
+TTL cache + singleflight + prefetch for resolved YouTube audio streams.
+
+Resolving a track is a full `yt_dlp.extract_info` (player JS, signature
+deciphering, format selection): seconds of work per call, done in a thread.
+The same items get resolved again and again (the same song requested twice, a
+playlist re-queued, history replays, a picker result that was just searched),
+and whatever happens at track change is dead air in the voice channel.
+
+- Results are cached per item, keyed by video id when the query is a YouTube
+  URL (so watch/youtu.be/shorts spellings share an entry), otherwise by the
+  normalised search text. A search result is also stored under its video id.
+- An entry is fresh until the cache TTL runs out, or until shortly before the
+  `expire=` timestamp that googlevideo bakes into the stream URL, whichever
+  comes first. Stale entries are never handed out.
+- Concurrent requests for the same key share one in-flight resolution, which
+  outlives any one caller being cancelled.
+- `prefetch()` resolves items in the background (bounded concurrency) so the
+  player can pick them up at track change without waiting on yt-dlp.
+- Failed resolutions are not cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from src.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+_VIDEO_ID_RE = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = {
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
+}
+
+
+def youtube_video_id(url: str) -> Optional[str]:
+    """Extract the 11-char video id from a YouTube watch/short/embed/youtu.be URL."""
+    u = (url or "").strip()
+    if not u.startswith(("http://", "https://")):
+        return None
+    try:
+        parsed = urlparse(u)
+    except Exception:
+        return None
+    host = (parsed.hostname or "").lower().strip(".")
+    parts = [p for p in parsed.path.split("/") if p]
+    candidate: Optional[str] = None
+    if host in {"youtu.be", "www.youtu.be"}:
+        candidate = parts[0] if parts else None
+    elif host in _YOUTUBE_HOSTS:
+        if parts[:1] == ["watch"]:
+            candidate = (parse_qs(parsed.query).get("v") or [None])[0]
+        elif len(parts) >= 2 and parts[0] in {"shorts", "embed", "live", "v"}:
+            candidate = parts[1]
+    if candidate and _VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+def stream_cache_key(query: str) -> str:
+    video_id = youtube_video_id(query)
+    if video_id:
+        return f"id:{video_id}"
+    q = " ".join((query or "").split()).lower()
+    if q.startswith("ytsearch1:"):
+        q = q[len("ytsearch1:") :].strip()
+    return f"q:{q}"
+
+
+def stream_url_expiry(stream_url: Optional[str]) -> Optional[float]:
+    """Unix time at which a googlevideo stream URL stops working, if it says so."""
+    if not stream_url:
+        return None
+    try:
+        parsed = urlparse(stream_url)
+        raw = (parse_qs(parsed.query).get("expire") or [None])[0]
+        if raw is None:
+            # Some formats carry the params as path segments: /expire/<ts>/...
+            parts = parsed.path.split("/")
+            if "expire" in parts:
+                raw = parts[parts.index("expire") + 1]
+        return float(raw) if raw else None
+    except Exception:
+        return None
+
+
+@dataclass(frozen=True)
+class ResolvedStream:
+    url: Optional[str]
+    title: Optional[str]
+    duration: Optional[int]
+    video_id: Optional[str] = None
+
+    def as_tuple(self) -> tuple[Optional[str], Optional[str], Optional[int]]:
+        return self.url, self.title, self.duration
+
+
+@dataclass
+class _Entry:
+    stream: ResolvedStream
+    fresh_until: float
+
+
+Resolver = Callable[[str], Optional[ResolvedStream]]
+
+
+class YouTubeStreamCache:
+    """Bounded TTL map of resolved streams with per-key singleflight."""
+
+    def __init__(
+        self,
+        resolver: Resolver,
+        *,
+        ttl_sec: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        expiry_margin_sec: Optional[int] = None,
+        prefetch_concurrency: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._resolver = resolver
+        self.ttl_sec = ttl_sec if ttl_sec is not None else env_int("ORA_YT_STREAM_CACHE_TTL_SEC", 1800, 0, 6 * 3600)
+        self.max_entries = max_entries if max_entries is not None else env_int("ORA_YT_STREAM_CACHE_MAX", 512, 1, 100_000)
+        # A track must still be playable for this long after we hand the URL out.
+        self.expiry_margin_sec = (
+            expiry_margin_sec if expiry_margin_sec is not None else env_int("ORA_YT_STREAM_EXPIRY_MARGIN_SEC", 900, 0, 6 * 3600)
+        )
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[Optional[ResolvedStream]]] = {}
+        self._prefetch_sem = asyncio.Semaphore(
+            prefetch_concurrency if prefetch_concurrency is not None else env_int("ORA_YT_PREFETCH_CONCURRENCY", 2, 1, 8)
+        )
+        self._prefetch_tasks: set[asyncio.Task[Any]] = set()
+        self._prefetching: set[str] = set()
+        self._stats = {"hits": 0, "misses": 0, "joined": 0, "prefetched": 0, "failures": 0, "expired": 0}
+
+    # ------------------------------------------------------------------ lookup
+
+    def peek(self, query: str) -> Optional[ResolvedStream]:
+        """Fresh cached result for `query`, without resolving or counting a lookup."""
+        entry = self._entries.get(stream_cache_key(query))
+        if entry is None:
+            return None
+        if entry.fresh_until <= self._clock():
+            return None
+        return entry.stream
+
+    def _lookup(self, key: str) -> Optional[ResolvedStream]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.fresh_until <= self._clock():
+            self._entries.pop(key, None)
+            self._stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry.stream
+
+    async def resolve(self, query: str) -> Optional[ResolvedStream]:
+        """Cached or shared resolution of `query`; never raises for resolver errors."""
+        key = stream_cache_key(query)
+        cached = self._lookup(key)
+        if cached is not None:
+            self._stats["hits"] += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["joined"] += 1
+        else:
+            self._stats["misses"] += 1
+            # The resolution belongs to no single caller: cancelling whoever started it
+            # only drops that caller's wait, the rest still get the result.
+            task = asyncio.get_running_loop().create_task(self._resolve_uncached(query, key))
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _resolve_uncached(self, query: str, key: str) -> Optional[ResolvedStream]:
+        try:
+            stream = await asyncio.to_thread(self._resolver, query)
+        except Exception as exc:
+            logger.warning("YouTube stream resolution failed for %s: %s", query, exc)
+            stream = None
+        finally:
+            self._inflight.pop(key, None)
+        if stream is None or not stream.url:
+            self._stats["failures"] += 1
+        else:
+            self._store(key, stream)
+        return stream
+
+    def _store(self, key: str, stream: ResolvedStream) -> None:
+        if self.ttl_sec <= 0:
+            return
+        now = self._clock()
+        fresh_until = now + self.ttl_sec
+        url_expiry = stream_url_expiry(stream.url)
+        if url_expiry is not None:
+            fresh_until = min(fresh_until, url_expiry - self.expiry_margin_sec)
+        if fresh_until <= now:
+            return
+        keys = {key}
+        if stream.video_id:
+            keys.add(f"id:{stream.video_id}")
+        for k in keys:
+            self._entries[k] = _Entry(stream=stream, fresh_until=fresh_until)
+            self._entries.move_to_end(k)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ---------------------------------------------------------------- prefetch
+
+    def prefetch(self, queries: Iterable[str]) -> int:
+        """Start background resolution for items not already fresh or in flight."""
+        started = 0
+        for query in queries:
+            q = (query or "").strip()
+            if not q:
+                continue
+            key = stream_cache_key(q)
+            if key in self._inflight or key in self._prefetching or self.peek(q) is not None:
+                continue
+            self._prefetching.add(key)
+            task = asyncio.get_running_loop().create_task(self._prefetch_one(q, key))
+            self._prefetch_tasks.add(task)
+            task.add_done_callback(self._prefetch_tasks.discard)
+            started += 1
+        return started
+
+    async def _prefetch_one(self, query: str, key: str) -> None:
+        try:
+            async with self._prefetch_sem:
+                if self.peek(query) is not None:
+                    return
+                stream = await self.resolve(query)
+                if stream is not None and stream.url:
+                    self._stats["prefetched"] += 1
+        finally:
+            self._prefetching.discard(key)
+
+    async def drain(self) -> None:
+        """Wait for outstanding prefetches (tests, shutdown)."""
+        while self._prefetch_tasks:
+            await asyncio.gather(*list(self._prefetch_tasks), return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["joined"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hit_rate": (self._stats["hits"] + self._stats["joined"]) / lookups if lookups else 0.0,
+        }
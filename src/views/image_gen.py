@@ -6,6 +6,7 @@ import discord
 from discord.ui import Button, View
 
 from src.utils.comfy_client import ComfyWorkflow
+from src.utils.comfy_jobs import ComfyQueueFull, format_job_status
 
 logger = logging.getLogger(__name__)
 
@@ -96,14 +97,27 @@ class StyleSelectView(View):
             # Determine steps based on quality
             steps = 35 if self.is_high_quality else 20
 
-            # Execute Generation in Thread
-            image_data = await asyncio.to_thread(
-                workflow.generate_image,
+            # Queue on the shared ComfyUI connection; one status message is edited in place
+            status_msg = None
+
+            async def _on_status(snapshot):
+                nonlocal status_msg
+                text = format_job_status(snapshot)
+                try:
+                    if status_msg is None:
+                        status_msg = await interaction.followup.send(text, wait=True)
+                    else:
+                        await status_msg.edit(content=text)
+                except discord.HTTPException:
+                    pass
+
+            image_data = await workflow.generate_image(
                 positive_prompt=final_prompt,
                 negative_prompt=safe_negative,
                 steps=steps,
                 width=self.width,
                 height=self.height,
+                on_status=_on_status,
             )
 
             if image_data:
@@ -112,6 +126,9 @@ class StyleSelectView(View):
             else:
                 await interaction.followup.send("❌ 生成に失敗しました (ComfyUIからのデータなし)")
 
+        except ComfyQueueFull:
+            await interaction.followup.send("⏳ 画像生成キューが満杯です。しばらくしてから再試行してください。")
+
         except Exception as e:
             await interaction.followup.send(f"❌ エラー: {e}")
 
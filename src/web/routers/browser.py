@@ -150,7 +150,8 @@ async def get_state():
                 "session": browser_manager.headless,
                 "domain": None,
                 "domain_name": ""
-            }
+            },
+            "pool": browser_manager.pool_metrics(),
         }
     except Exception as e:
          error_id = _write_browser_api_error("/state", e)
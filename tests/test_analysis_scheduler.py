@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.analysis_scheduler import AnalysisJob, AnalysisScheduler, JobPriority
+
+
+def _msgs(n: int, tag: str = "m") -> list[dict]:
+    return [{"id": f"{tag}{i}", "content": f"{tag} {i}", "timestamp": f"t{i}"} for i in range(n)]
+
+
+@pytest.mark.asyncio
+async def test_live_jobs_jump_ahead_of_backfill_and_idle_work() -> None:
+    gate = asyncio.Event()
+    order: list[int] = []
+
+    async def runner(job):
+        if job.user_id == 0:
+            await gate.wait()
+        order.append(job.user_id)
+
+    sched = AnalysisScheduler(runner, concurrency=1)
+    sched.submit(0, _msgs(1), priority=JobPriority.BACKFILL)  # occupies the only worker
+    await asyncio.sleep(0)
+    sched.submit(1, _msgs(1), priority=JobPriority.IDLE)
+    sched.submit(2, _msgs(1), priority=JobPriority.BACKFILL)
+    sched.submit(3, _msgs(1), priority=JobPriority.LIVE)
+    sched.submit(4, _msgs(1), priority=JobPriority.MANUAL)
+    gate.set()
+    await sched.join(timeout=2)
+    await sched.stop()
+
+    assert order == [0, 3, 4, 2, 1]
+    assert sched.stats()["completed"] == 5
+
+
+@pytest.mark.asyncio
+async def test_resubmits_for_a_pending_user_merge_and_upgrade_priority() -> None:
+    gate = asyncio.Event()
+    seen: list[tuple[int, int, str]] = []
+
+    async def runner(job):
+        if job.user_id == 0:
+            await gate.wait()
+        seen.append((job.user_id, len(job.messages), job.priority.name))
+
+    sched = AnalysisScheduler(runner, concurrency=1)
+    sched.submit(0, _msgs(1), priority=JobPriority.LIVE)
+    await asyncio.sleep(0)
+    assert sched.submit(7, _msgs(3), guild_id=1, priority=JobPriority.BACKFILL) == "queued"
+    assert sched.submit(7, _msgs(5), guild_id=1, priority=JobPriority.LIVE) == "merged"  # 3 overlap
+    assert sched.submit(7, _msgs(2), guild_id=1, is_public=False) == "queued"  # other scope, separate job
+    assert sched.stats()["pending"] == 2
+    gate.set()
+    await sched.join(timeout=2)
+    await sched.stop()
+
+    assert seen[1] == (7, 5, "LIVE") and seen[2] == (7, 2, "PERIODIC")
+
+
+@pytest.mark.asyncio
+async def test_small_background_jobs_share_one_llm_call_and_leftovers_rerun_alone() -> None:
+    single: list[int] = []
+    batches: list[list[int]] = []
+
+    async def runner(job):
+        single.append(job.user_id)
+
+    async def batch_runner(jobs):
+        batches.append([j.user_id for j in jobs])
+        return [j for j in jobs if j.user_id == 12]  # "model forgot" user 12
+
+    sched = AnalysisScheduler(runner, batch_runner=batch_runner, concurrency=1, batch_max_users=3, batch_small_messages=5)
+    for uid in (10, 11, 12, 13):
+        sched.submit(uid, _msgs(2, str(uid)), guild_id=9, priority=JobPriority.BACKFILL)
+    sched.submit(20, _msgs(40), guild_id=9, priority=JobPriority.BACKFILL)  # too big to batch
+    sched.submit(30, _msgs(2), guild_id=9, priority=JobPriority.LIVE)  # live is never batched
+    await sched.join(timeout=2)
+    await sched.stop()
+
+    assert batches == [[10, 11, 12]]
+    assert single == [30, 13, 20, 12]
+    stats = sched.stats()
+    assert stats["batched_calls"] == 1 and stats["completed"] == 6
+
+
+@pytest.mark.asyncio
+async def test_private_logs_and_other_guilds_never_share_a_batch() -> None:
+    single: list[int] = []
+    batches: list[list[int]] = []
+
+    async def runner(job):
+        single.append(job.user_id)
+
+    async def batch_runner(jobs):
+        batches.append([j.user_id for j in jobs])
+        return []
+
+    sched = AnalysisScheduler(runner, batch_runner=batch_runner, concurrency=1, batch_max_users=4, batch_small_messages=5)
+    sched.submit(1, _msgs(2, "a"), guild_id=9, is_public=False, priority=JobPriority.BACKFILL)  # private: alone
+    sched.submit(2, _msgs(2, "b"), guild_id=9, priority=JobPriority.BACKFILL)
+    sched.submit(3, _msgs(2, "c"), guild_id=9, is_public=False, priority=JobPriority.BACKFILL)
+    sched.submit(4, _msgs(2, "d"), guild_id=8, priority=JobPriority.BACKFILL)  # other guild
+    sched.submit(5, _msgs(2, "e"), guild_id=9, priority=JobPriority.BACKFILL)
+    sched.submit(6, _msgs(2, "f"), guild_id=None, priority=JobPriority.BACKFILL)  # DM: alone
+    await sched.join(timeout=2)
+    await sched.stop()
+
+    assert batches == [[2, 5]]
+    assert single == [1, 3, 4, 6]
+
+
+@pytest.mark.asyncio
+async def test_budget_gate_holds_background_work_but_lets_live_through() -> None:
+    ratio = {"value": 0.5}
+    gate = asyncio.Event()
+    ran: list[int] = []
+
+    async def runner(job):
+        if job.user_id == 0:
+            await gate.wait()
+            return
+        ran.append(job.user_id)
+
+    sched = AnalysisScheduler(runner, budget_probe=lambda: ratio["value"], budget_stop_ratio=0.9, concurrency=1, budget_retry_sec=0.05)
+    sched.submit(0, _msgs(1), priority=JobPriority.LIVE)
+    await asyncio.sleep(0)
+    sched.submit(1, _msgs(1), priority=JobPriority.BACKFILL)  # admitted while under budget
+
+    ratio["value"] = 0.95
+    assert sched.submit(2, _msgs(1), priority=JobPriority.IDLE) == "budget"
+    assert sched.submit(3, _msgs(1), priority=JobPriority.LIVE) == "queued"
+    gate.set()
+    await asyncio.sleep(0.1)
+    assert ran == [3] and sched.stats()["pending"] == 1  # backfill held back
+
+    ratio["value"] = 0.2
+    await sched.join(timeout=2)
+    await sched.stop()
+    assert ran == [3, 1] and sched.stats()["rejected_budget"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_evicts_worse_work_or_refuses() -> None:
+    gate = asyncio.Event()
+
+    async def runner(job):
+        await gate.wait()
+
+    sched = AnalysisScheduler(runner, concurrency=1, max_pending=2)
+    sched.submit(0, _msgs(1), priority=JobPriority.LIVE)
+    await asyncio.sleep(0)
+    sched.submit(1, _msgs(1), priority=JobPriority.IDLE)
+    sched.submit(2, _msgs(1), priority=JobPriority.BACKFILL)
+    assert sched.submit(3, _msgs(1), priority=JobPriority.IDLE) == "full"
+    assert sched.submit(4, _msgs(1), priority=JobPriority.LIVE) == "queued"  # evicts user 1
+    stats = sched.stats()
+    assert stats["evicted"] == 1 and stats["pending_by_priority"]["idle"] == 0
+    gate.set()
+    await sched.join(timeout=2)
+    await sched.stop()
+
+
+@pytest.mark.asyncio
+async def test_memory_cog_batch_runner_updates_each_profile_from_one_call(monkeypatch) -> None:
+    from src.cogs.memory import MemoryCog
+
+    calls: list[list[dict]] = []
+
+    class _LLM:
+        async def chat(self, provider, messages, temperature=None, max_tokens=None):
+            calls.append(messages)
+            body = {"users": {"U1": {"layer2_user_memory": {"traits": ["朝型"], "impression": "早起き"}}}}
+            return json.dumps(body, ensure_ascii=False), None, None
+
+    cog = MemoryCog.__new__(MemoryCog)
+    cog.bot = SimpleNamespace(get_cog=lambda _name: None, get_user=lambda _uid: None)
+    cog._llm = _LLM()
+    cog.sem = asyncio.Semaphore(2)
+    updates: list[tuple[int, dict]] = []
+    statuses: list[tuple[int, str]] = []
+
+    async def _update(user_id, data, guild_id=None, is_public=True):
+        updates.append((user_id, data))
+
+    async def _status(user_id, status, msg, guild_id=None, is_public=True):
+        statuses.append((user_id, status))
+
+    monkeypatch.setattr(cog, "update_user_profile", _update)
+    monkeypatch.setattr(cog, "set_user_status", _status)
+
+    jobs = [
+        AnalysisJob(user_id=1, guild_id=9, is_public=True, messages=_msgs(2, "a"), priority=JobPriority.BACKFILL),
+        AnalysisJob(user_id=2, guild_id=9, is_public=True, messages=_msgs(2, "b"), priority=JobPriority.BACKFILL),
+    ]
+    leftovers = await cog._run_analysis_batch(jobs)
+
+    assert len(calls) == 1 and "=== U2 ===" in calls[0][1]["content"]
+    assert [j.user_id for j in leftovers] == [2]
+    assert updates == [(1, updates[0][1])] and updates[0][1]["traits"] == ["朝型"]
+    assert statuses == [(1, "Processing"), (2, "Processing")]
+
+
+@pytest.mark.asyncio
+async def test_memory_cog_batch_cost_is_reserved_and_committed_per_user(monkeypatch) -> None:
+    from src.cogs.memory import MemoryCog
+
+    # Other test modules install a bare cost_manager stub; the batch path builds real Usage objects.
+    monkeypatch.delitem(sys.modules, "src.utils.cost_manager", raising=False)
+    importlib.import_module("src.utils.cost_manager")
+
+    class _Decision:
+        def __init__(self, allowed: bool) -> None:
+            self.allowed = allowed
+            self.reason = "" if allowed else "user budget"
+
+    class _Costs:
+        def __init__(self) -> None:
+            self.reserved: dict[str, int] = {}
+            self.committed: list[tuple[int, int, int]] = []
+
+        def can_call_and_reserve(self, lane, provider, user_id, rid, est):
+            if user_id == 3:
+                return _Decision(False)
+            self.reserved[rid] = user_id
+            return _Decision(True)
+
+        def commit(self, lane, provider, user_id, rid, usage):
+            assert self.reserved.pop(rid) == user_id
+            self.committed.append((user_id, usage.tokens_in, usage.tokens_out))
+
+    class _LLM:
+        async def chat(self, provider, messages, temperature=None, max_tokens=None):
+            assert "c 0" not in messages[1]["content"]  # the over-budget user's log is not sent
+            body = {"users": {"U1": {}, "U2": {}}}
+            return json.dumps(body), None, {"prompt_tokens": 900, "completion_tokens": 400}
+
+    costs = _Costs()
+    ora = SimpleNamespace(cost_manager=costs)
+    cog = MemoryCog.__new__(MemoryCog)
+    cog.bot = SimpleNamespace(get_cog=lambda name: ora if name == "ORACog" else None, get_user=lambda _uid: None)
+    cog._llm = _LLM()
+    cog.sem = asyncio.Semaphore(2)
+
+    async def _noop(*_args, **_kwargs):
+        return None
+
+    monkeypatch.setattr(cog, "update_user_profile", _noop)
+    monkeypatch.setattr(cog, "set_user_status", _noop)
+
+    jobs = [
+        AnalysisJob(user_id=1, guild_id=9, is_public=True, messages=_msgs(1, "a"), priority=JobPriority.BACKFILL),
+        AnalysisJob(user_id=2, guild_id=9, is_public=True, messages=_msgs(3, "b"), priority=JobPriority.BACKFILL),
+        AnalysisJob(user_id=3, guild_id=9, is_public=True, messages=_msgs(2, "c"), priority=JobPriority.BACKFILL),
+    ]
+    assert await cog._run_analysis_batch(jobs) == []
+
+    assert costs.reserved == {}
+    assert [uid for uid, _i, _o in costs.committed] == [1, 2]
+    (_, in1, out1), (_, in2, out2) = costs.committed
+    assert out1 == out2 == 200 and in1 + in2 == 900 and in2 > in1
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.utils.audio_mixer import FRAME_BYTES, FRAME_SAMPLES, FrameMixer, GainEnvelope, MixingAudioSource
+
+
+def _frame(value: int) -> bytes:
+    return np.full(FRAME_SAMPLES * 2, value, dtype=np.int16).tobytes()
+
+
+def _samples(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.int16).reshape(-1, 2)
+
+
+class _Source:
+    def __init__(self, value: int, frames: int) -> None:
+        self.value = value
+        self.frames = frames
+        self.cleaned = False
+
+    def read(self) -> bytes:
+        if self.frames <= 0:
+            return b""
+        self.frames -= 1
+        return _frame(self.value)
+
+    def cleanup(self) -> None:
+        self.cleaned = True
+
+
+def test_fade_is_per_sample_and_continuous_across_frames() -> None:
+    mixer = FrameMixer()
+    env = GainEnvelope(1.0)
+    env.ramp_to(0.5, 0.04)  # two frames
+    first = _samples(mixer.mix([(_frame(10000), env)]))[:, 0]
+    second = _samples(mixer.mix([(_frame(10000), env)]))[:, 0]
+    ramp = np.concatenate([first, second]).astype(int)
+
+    assert np.all(np.diff(ramp) <= 0)
+    assert np.max(np.abs(np.diff(ramp))) <= 3  # ~2.6 per sample, no 20 ms steps
+    assert ramp[-1] == 5000
+    assert env.settled
+
+
+def test_sum_is_clipped_not_wrapped() -> None:
+    mixer = FrameMixer()
+    out = _samples(mixer.mix([(_frame(30000), GainEnvelope(1.0)), (_frame(30000), GainEnvelope(1.0))]))
+    assert np.all(out == 32767)
+    out = _samples(mixer.mix([(_frame(-30000), GainEnvelope(1.0)), (_frame(-30000), GainEnvelope(1.0))]))
+    assert np.all(out == -32768)
+
+
+def test_short_tail_frame_is_zero_padded() -> None:
+    mixer = FrameMixer()
+    out = _samples(mixer.mix([(_frame(1000)[:100], GainEnvelope(1.0)), (_frame(2000), GainEnvelope(1.0))]))
+    assert len(out) == FRAME_SAMPLES
+    assert out[0, 0] == 3000 and out[-1, 0] == 2000
+
+
+def test_mixing_source_ducks_music_for_overlays_and_restores() -> None:
+    finished: list[str] = []
+    music = _Source(10000, 100)
+    tts = _Source(1000, 5)
+    mixer = MixingAudioSource(music, tts, target_volume=0.5, fade_duration=0.02, on_finish=lambda: finished.append("tts"))
+    effect = _Source(500, 2)
+    mixer.add_overlay(effect, gain=2.0, on_finish=lambda: finished.append("effect"))
+
+    first = _samples(mixer.read())
+    assert first[-1, 0] == 5000 + 1000 + 1000  # ducked music + tts + effect at 2x
+    frames = [mixer.read() for _ in range(6)]
+    assert finished == ["effect", "tts"]
+    assert effect.cleaned and tts.cleaned
+    assert _samples(frames[3])[-1, 0] == 6000
+    # tts ended on the 6th read: the music ramps back up within that frame.
+    ramp_up = _samples(frames[4])[:, 0]
+    assert ramp_up[0] < 6000 and ramp_up[-1] == 10000
+
+    # Once the fade back up has settled the music frame passes through untouched.
+    restored = [mixer.read() for _ in range(2)]
+    assert _samples(restored[-1])[0, 0] == 10000
+    assert len(restored[-1]) == FRAME_BYTES
+    assert mixer.current_volume == 1.0
+
+
+def test_overlay_keeps_playing_after_music_ends() -> None:
+    mixer = MixingAudioSource(_Source(10000, 1), _Source(1000, 3), target_volume=0.2, fade_duration=0.5)
+    outputs = [mixer.read() for _ in range(5)]
+    assert [bool(o) for o in outputs] == [True, True, True, False, False]
+    assert _samples(outputs[2])[0, 0] == 1000
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import copy
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from scripts import bench_core_pipeline as bench
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_baseline_matches_default_config_and_regressions_fail_loudly() -> None:
+    baseline = json.loads(bench.BASELINE_PATH.read_text(encoding="utf-8"))
+    defaults = vars(bench.build_parser().parse_args([]))
+    assert baseline["config"] == {key: defaults[key] for key in baseline["config"]}
+
+    same = copy.deepcopy(baseline)
+    assert bench.compare_to_baseline(same, baseline, tolerance=0.5) == []
+
+    slow = copy.deepcopy(baseline)
+    slow["e2e_ms"]["p95"] = baseline["e2e_ms"]["p95"] * 2
+    slow["throughput_runs_per_s"] = baseline["throughput_runs_per_s"] / 2
+    slow["db"]["writes_per_run"] = baseline["db"]["writes_per_run"] + 1
+    failures = bench.compare_to_baseline(slow, baseline, tolerance=0.5)
+    assert [f.split(":")[0] for f in failures] == ["throughput_runs_per_s", "e2e_ms.p95", "db.writes_per_run"]
+
+    # Unrelated p99 noise and tiny commit-count drift stay within budget.
+    noisy = copy.deepcopy(baseline)
+    noisy["e2e_ms"]["p99"] = baseline["e2e_ms"]["p99"] * 3
+    noisy["db"]["commits_per_run"] = baseline["db"]["commits_per_run"] + 0.02
+    assert bench.compare_to_baseline(noisy, baseline, tolerance=0.5) == []
+
+    other = copy.deepcopy(baseline)
+    other["config"]["concurrency"] += 1
+    assert bench.compare_to_baseline(other, baseline, tolerance=0.5)[0].startswith("config differs")
+
+
+def test_percentiles_use_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert bench.percentiles(values) == {"p50": 50.0, "p95": 95.0, "p99": 99.0}
+    assert bench.percentiles([3.0]) == {"p50": 3.0, "p95": 3.0, "p99": 3.0}
+    assert bench.percentiles([]) == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+
+def test_small_load_runs_end_to_end_against_a_temp_database() -> None:
+    proc = subprocess.run(
+        [
+            sys.executable,
+            str(ROOT / "scripts" / "bench_core_pipeline.py"),
+            "--conversations", "3",
+            "--turns", "2",
+            "--concurrency", "2",
+            "--latency-ms", "5",
+            "--jitter-ms", "0",
+            "--no-baseline",
+            "--json",
+        ],
+        capture_output=True,
+        text=True,
+        timeout=180,
+        cwd=str(ROOT),
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    results = json.loads(proc.stdout)
+
+    assert results["runs"] == results["completed"] == 6 and results["errors"] == 0
+    assert results["llm_calls"] == 6 + 1  # plus the warm-up run
+    assert 0 < results["ttfe_ms"]["p50"] <= results["e2e_ms"]["p50"]
+    by_statement = results["db"]["by_statement"]
+    assert by_statement["INSERT runs"] == 6 and by_statement["INSERT conversations"] == 3
+    assert by_statement["INSERT messages"] == 12  # user + assistant per run
+    assert results["loop_lag_ms"]["max"] >= 0.0
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import pytest
+
+from src.utils.aria_diff import diff_aria_trees, parse_aria_tree
+from src.utils.browser_agent import BrowserAgent
+
+_PAGE = """- banner:
+  - heading "Shop" [level=1] [ref=e2]
+- main [ref=e3]:
+  - textbox "Name" [ref=e4]
+  - checkbox "Agree" [ref=e5]
+  - list:
+    - listitem: one
+    - listitem: two
+  - button "Save" [ref=e6]
+  - link "Help" [ref=e7]
+  - link "Terms" [ref=e8]"""
+
+
+class _Handle:
+    def __init__(self, page: "_FakePage", ref: str):
+        self._page = page
+        self._ref = ref
+
+    async def evaluate(self, _script):
+        self._page.roundtrips += 1
+        return f"#{self._ref}"
+
+    async def bounding_box(self):
+        self._page.roundtrips += 1
+        return {"x": 0.0, "y": float(int(self._ref[1:]) * 20), "width": 80.0, "height": 16.0}
+
+
+class _Locator:
+    def __init__(self, page: "_FakePage", selector: str):
+        self._page = page
+        self._selector = selector
+
+    async def aria_snapshot(self, ref: bool = False):
+        return self._page.snapshot
+
+    async def element_handle(self):
+        self._page.roundtrips += 1
+        return _Handle(self._page, self._selector.split("=", 1)[1])
+
+
+class _FakePage:
+    def __init__(self, snapshot: str):
+        self.snapshot = snapshot
+        self.url = "https://shop.example/form"
+        self.scroll_y = 0
+        self.frames: list = []
+        self.viewport_size = {"width": 1280, "height": 720}
+        self.roundtrips = 0
+
+    def on(self, *_args):
+        return None
+
+    async def title(self):
+        return "Shop"
+
+    def locator(self, selector: str):
+        return _Locator(self, selector)
+
+    async def evaluate(self, _script):
+        return [self.url, 0, self.scroll_y, 1280, 720]
+
+
+def _agent(snapshot: str = _PAGE) -> tuple[BrowserAgent, _FakePage]:
+    agent = BrowserAgent()
+    page = _FakePage(snapshot)
+    agent._register_page(page)
+    return agent, page
+
+
+def test_diff_emits_only_changed_subtrees_with_context() -> None:
+    before = parse_aria_tree(_PAGE)
+    after = parse_aria_tree(
+        _PAGE.replace('checkbox "Agree" [ref=e5]', 'checkbox "Agree" [checked] [ref=e5]')
+        .replace("    - listitem: two", "    - listitem: two\n    - listitem: three")
+        .replace('  - button "Save" [ref=e6]', '  - button "Saving" [ref=e9]')
+    )
+    diff = diff_aria_trees(before, after)
+    assert diff.text.splitlines() == [
+        "  - main [ref=e3]:",
+        '~   - checkbox "Agree" [checked] [ref=e5]',
+        "    - list:",
+        "+     - listitem: three",
+        '+   - button "Saving" [ref=e9]',
+        '-   - button "Save" [ref=e6]',
+    ]
+    assert diff.changed_refs == {"e5", "e9"} and diff.removed_refs == {"e6"}
+    assert diff_aria_trees(before, parse_aria_tree(_PAGE)).empty
+
+
+@pytest.mark.asyncio
+async def test_diff_observation_sends_changes_and_keeps_unchanged_refs_valid() -> None:
+    agent, page = _agent()
+    full = await agent.observe()
+    assert full.mode == "full" and {r["ref"] for r in full.refs} == {"e4", "e5", "e6", "e7", "e8"}
+
+    page.snapshot = _PAGE.replace('  - button "Save" [ref=e6]', '  - button "Saving" [ref=e9]')
+    obs = await agent.observe("diff")
+    assert obs.mode == "diff" and obs.base_generation == full.ref_generation
+    assert '+   - button "Saving" [ref=e9]' in obs.aria and "Terms" not in obs.aria
+    assert [r["ref"] for r in obs.refs] == ["e9"] and obs.removed_refs == ["e6"]
+    assert obs.stats["sent_chars"] < obs.stats["full_chars"]
+    # Refs from the earlier observation still resolve under the new generation.
+    assert agent._ref_generation_matches(agent._active_tab_id, obs.ref_generation)
+    assert agent._get_ref_entry(agent._active_tab_id, "e7").bbox == full.refs[3]["bbox"]
+
+    # Navigation (or an unknown baseline) resyncs with a full snapshot.
+    page.url = "https://shop.example/done"
+    assert (await agent.observe("diff")).mode == "full"
+    assert (await agent.observe("diff", since=999)).mode == "full"
+    assert agent.observe_stats()["full_resyncs"] == 2
+
+
+@pytest.mark.asyncio
+async def test_unchanged_nodes_reuse_bbox_until_the_viewport_moves() -> None:
+    agent, page = _agent()
+    await agent.observe()
+    first_cost = page.roundtrips
+
+    page.roundtrips = 0
+    obs = await agent.observe("diff")
+    assert page.roundtrips == 0 and obs.stats["refs_reused"] == 5
+    assert obs.aria.endswith("(no changes)") and obs.refs == []
+
+    page.roundtrips = 0
+    page.snapshot = _PAGE.replace('checkbox "Agree" [ref=e5]', 'checkbox "Agree" [checked] [ref=e5]')
+    await agent.observe("diff")
+    assert page.roundtrips == 0  # role/name unchanged, so even e5 keeps its box
+
+    page.roundtrips = 0
+    page.scroll_y = 400
+    obs = await agent.observe("diff")
+    assert page.roundtrips == first_cost and obs.stats["refs_resolved"] == 5
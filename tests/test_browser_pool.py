@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import browser as browser_module
+from src.utils.browser_pool import BrowserContextPool
+
+
+class _FakePage:
+    def __init__(self, context: "_FakeContext"):
+        self.context = context
+        self.url = "about:blank"
+        self.closed = False
+        self._listeners: dict[str, list] = {}
+
+    def on(self, event, cb):
+        self._listeners.setdefault(event, []).append(cb)
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+        self.context.pages.remove(self)
+
+    async def goto(self, url):
+        self.url = url
+        for cb in self._listeners.get("framenavigated", []):
+            cb(SimpleNamespace(url=url))
+
+    async def visit(self, url, *, cookie=None, storage=None):
+        await self.goto(url)
+        origin = url.split("/", 3)[:3]
+        origin = "/".join(origin)
+        if cookie:
+            self.context.cookies.append({"name": cookie, "domain": origin})
+        if storage:
+            self.context.local.setdefault(origin, []).append(storage)
+
+
+class _FakeCDP:
+    def __init__(self, context: "_FakeContext"):
+        self.context = context
+
+    async def send(self, method, params=None):
+        if method == "Storage.clearDataForOrigin" and not self.context.sticky_storage:
+            self.context.local.pop(params["origin"], None)
+
+    async def detach(self):
+        return None
+
+
+class _FakeContext:
+    def __init__(self, browser: "_FakeBrowser"):
+        self.browser = browser
+        self.pages: list[_FakePage] = []
+        self.cookies: list[dict] = []
+        self.local: dict[str, list] = {}
+        self.closed = False
+        self.sticky_storage = False
+        self._listeners: dict[str, list] = {}
+
+    def on(self, event, cb):
+        self._listeners.setdefault(event, []).append(cb)
+
+    def remove_listener(self, event, cb):
+        self._listeners.get(event, []).remove(cb)
+
+    def set_default_timeout(self, _ms):
+        return None
+
+    async def new_page(self):
+        page = _FakePage(self)
+        self.pages.append(page)
+        for cb in self._listeners.get("page", []):
+            cb(page)
+        return page
+
+    async def storage_state(self):
+        return {
+            "cookies": list(self.cookies),
+            "origins": [{"origin": o, "localStorage": list(v)} for o, v in self.local.items()],
+        }
+
+    async def new_cdp_session(self, _page):
+        return _FakeCDP(self)
+
+    async def clear_cookies(self):
+        self.cookies.clear()
+
+    async def clear_permissions(self):
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts: list[_FakeContext] = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **_kwargs):
+        ctx = _FakeContext(self)
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self):
+        self.connected = False
+
+
+def _pool(**kwargs) -> tuple[BrowserContextPool, list[_FakeBrowser]]:
+    browsers: list[_FakeBrowser] = []
+
+    async def _stop():
+        return None
+
+    async def launcher(_headless):
+        browsers.append(_FakeBrowser())
+        return SimpleNamespace(stop=_stop), browsers[-1]
+
+    kwargs.setdefault("size", 1)
+    kwargs.setdefault("idle_ttl_sec", 60)
+    return BrowserContextPool(launcher=launcher, **kwargs), browsers
+
+
+async def _settle(pool: BrowserContextPool) -> None:
+    if pool._refill_task is not None:
+        await pool._refill_task
+
+
+@pytest.mark.asyncio
+async def test_prewarmed_context_is_a_hit_and_refills_in_background() -> None:
+    pool, browsers = _pool()
+    await pool.prewarm()
+    lease = await pool.acquire(owner="alice")
+    await _settle(pool)
+
+    metrics = pool.metrics()
+    assert (metrics["hits"], metrics["misses"], metrics["launches"]) == (1, 0, 1)
+    assert metrics["idle"] == 1 and metrics["leased"] == 1
+    assert len(browsers[0].contexts) == 2 and lease.owner == "alice"
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_released_context_is_wiped_before_the_next_user_gets_it() -> None:
+    pool, _ = _pool(size=1)
+    lease = await pool.acquire(owner="alice")  # cold: launch + miss
+    await _settle(pool)
+    await pool.acquire(owner="bob")  # drain the refilled one
+    await lease.page.visit("https://shop.example/cart", cookie="session", storage="cart=3")
+    extra = await lease.context.new_page()
+    await extra.visit("https://other.example/", storage="x=1")
+
+    await pool.release(lease)
+    assert lease.context.cookies == [] and lease.context.local == {}
+    assert lease.context.pages == [lease.page] and lease.page.url == "about:blank"
+
+    again = await pool.acquire(owner="carol")
+    assert again is lease and again.owner == "carol"
+    assert pool.metrics()["recycled"] == 1 and pool.metrics()["misses"] == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_context_that_cannot_be_proven_clean_is_discarded() -> None:
+    pool, _ = _pool(size=1)
+    lease = await pool.acquire()
+    await _settle(pool)
+    await pool.acquire()
+    lease.context.sticky_storage = True
+    await lease.page.visit("https://shop.example/", storage="token=abc")
+
+    await pool.release(lease)
+    assert lease.context.closed and pool.metrics()["discarded"] == 1
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_idle_ttl_reaps_contexts_then_the_browser() -> None:
+    pool, browsers = _pool(size=2, idle_ttl_sec=60)
+    await pool.prewarm()
+    idle_since = pool._idle[0].idle_since
+
+    await pool.reap(now=idle_since + 30)
+    assert pool.metrics()["idle"] == 2
+
+    await pool.reap(now=idle_since + 3600)
+    metrics = pool.metrics()
+    assert metrics["idle"] == 0 and metrics["expired"] == 2
+    assert not browsers[0].connected and not metrics["browser_running"]
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_browser_manager_hands_each_owner_a_clean_pooled_context(monkeypatch) -> None:
+    monkeypatch.setattr(browser_module.BrowserManager, "_instance", None)
+    manager = browser_module.BrowserManager(headless=True)
+    manager.pool, _ = _pool(size=1)
+
+    async def _act(_action):
+        return {"ok": True, "observation": {"title": ""}}
+
+    monkeypatch.setattr(manager.agent, "act", _act)
+
+    await manager.ensure_active(owner="alice")
+    first = manager._lease
+    assert manager.is_ready() and first is not None
+    await manager.page.visit("https://bank.example/", cookie="sid")
+
+    await manager.ensure_active()  # no owner: keep the current session
+    assert manager._lease is first
+
+    await manager.ensure_active(owner="bob")
+    # alice's context went back to the pool wiped, and (being the only idle one) is bob's now.
+    assert manager.owner == "bob" and manager._lease.owner == "bob"
+    assert manager._lease.context.cookies == [] and manager.page.url == "about:blank"
+    assert manager.pool_metrics()["recycled"] == 1 and manager.pool_metrics()["launches"] == 1
+
+    await manager.shutdown()
+    assert not manager.is_ready()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+
+CLI_SRC = Path(__file__).resolve().parents[1] / "clients" / "cli"
+if str(CLI_SRC) not in sys.path:
+    sys.path.insert(0, str(CLI_SRC))
+
+from yonerai_cli.services import http_pool_service  # noqa: E402
+from yonerai_cli.services.http_pool_service import PooledHttpClient  # noqa: E402
+from yonerai_cli.services.staging_sync_service import StagingSyncServiceError  # noqa: E402
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path.endswith("/redirect"):  # origin-form, or absolute-form when acting as a proxy
+            self.send_response(302)
+            self.send_header("Location", "https://evil.example/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        close = self.path == "/close"
+        body = json.dumps({"ok": True, "path": self.path}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if close:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+        if close:
+            self.close_connection = True
+
+    def log_message(self, _format: str, *_args: Any) -> None:
+        return
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pool_reuses_one_connection_across_requests(origin: str) -> None:
+    pool = PooledHttpClient(keepalive=True)
+    for index in range(3):
+        with pool.open(urllib.request.Request(f"{origin}/item/{index}"), timeout=5) as response:
+            assert response.status == 200
+            assert json.loads(response.read())["path"] == f"/item/{index}"
+
+    stats = pool.stats()
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 2
+    assert stats["idle_connections"] == 1
+    pool.close()
+
+
+def test_pool_drops_connection_the_server_closed(origin: str) -> None:
+    pool = PooledHttpClient(keepalive=True)
+    pool.open(urllib.request.Request(f"{origin}/close"), timeout=5).read()
+    pool.open(urllib.request.Request(f"{origin}/after"), timeout=5).read()
+
+    stats = pool.stats()
+    assert stats["connections_opened"] == 2
+    assert stats["connections_reused"] == 0
+    pool.close()
+
+
+def test_pool_keepalive_can_be_disabled(monkeypatch, origin: str) -> None:
+    monkeypatch.setenv(http_pool_service.KEEPALIVE_ENV, "0")
+    pool = PooledHttpClient()
+    for _ in range(2):
+        pool.open(urllib.request.Request(f"{origin}/x"), timeout=5).read()
+
+    assert pool.stats()["connections_opened"] == 2
+    assert pool.stats()["keepalive"] is False
+
+
+def test_pool_never_follows_redirects(origin: str) -> None:
+    pool = PooledHttpClient(keepalive=True)
+    with pytest.raises(urllib.error.HTTPError) as exc_info:
+        pool.open(urllib.request.Request(f"{origin}/redirect"), timeout=5)
+    assert exc_info.value.code == 302
+    pool.close()
+
+
+def test_staging_transport_keeps_redirect_denial(monkeypatch, origin: str) -> None:
+    from yonerai_cli.services import staging_sync_service
+
+    pool = PooledHttpClient(keepalive=True)
+    monkeypatch.setattr(http_pool_service, "_SHARED_POOL", pool)
+
+    status_code, payload, _headers = staging_sync_service._default_header_json_transport("GET", f"{origin}/v1/status", {}, None, 5)
+    assert status_code == 200
+    assert payload["path"] == "/v1/status"
+
+    with pytest.raises(StagingSyncServiceError) as exc_info:
+        staging_sync_service._default_header_json_transport("GET", f"{origin}/redirect", {}, None, 5)
+    assert exc_info.value.code == "staging_sync_redirect_forbidden"
+    assert http_pool_service.http_pool_stats()["connections_reused"] == 1
+    pool.close()
+
+
+def test_pool_honors_http_proxy_and_no_proxy(monkeypatch, origin: str) -> None:
+    for name in ("http_proxy", "https_proxy", "no_proxy", "HTTPS_PROXY", "NO_PROXY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", origin)  # the test server doubles as the proxy
+    pool = PooledHttpClient()
+    try:
+        with pool.open(urllib.request.Request("http://core.example.invalid/v1/health"), timeout=5) as response:
+            payload = json.loads(response.read().decode("utf-8"))
+        # A proxy receives the absolute URL in the request line.
+        assert payload["path"] == "http://core.example.invalid/v1/health"
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            pool.open(urllib.request.Request("http://core.example.invalid/redirect"), timeout=5)
+        assert excinfo.value.code == 302
+
+        monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+        with pool.open(urllib.request.Request(f"{origin}/direct"), timeout=5) as response:
+            assert json.loads(response.read().decode("utf-8"))["path"] == "/direct"
+        stats = pool.stats()
+        assert stats["proxied"] == 2 and stats["connections_opened"] == 1
+    finally:
+        pool.close()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts import cli_import_budget
+
+
+ROOT = Path(__file__).resolve().parents[1]
+CLI_SRC = ROOT / "clients" / "cli"
+if str(CLI_SRC) not in sys.path:
+    sys.path.insert(0, str(CLI_SRC))
+
+# Headroom for slow or loaded CI runners; YONERAI_CLI_IMPORT_BUDGET_SCALE overrides it.
+CI_BUDGET_SCALE = 3.0
+
+
+@pytest.mark.parametrize("budget", cli_import_budget.BUDGETS, ids=lambda b: " ".join(b.argv))
+def test_cli_invocation_imports_no_forbidden_modules(budget: cli_import_budget.ImportBudget) -> None:
+    result = cli_import_budget.check(budget)
+
+    assert result["forbidden_imports"] == [], result
+
+
+@pytest.mark.parametrize("budget", cli_import_budget.BUDGETS, ids=lambda b: " ".join(b.argv))
+def test_cli_invocation_stays_within_import_time_budget(budget: cli_import_budget.ImportBudget) -> None:
+    result = cli_import_budget.check(budget, default_scale=CI_BUDGET_SCALE)
+
+    assert result["import_ms"] <= result["budget_ms"], result
+
+
+def test_importing_the_cli_package_leaves_heavy_modules_unloaded() -> None:
+    code = (
+        "import sys, yonerai_cli\n"
+        f"heavy = {cli_import_budget.INTERACTIVE_ONLY + cli_import_budget.HEAVY_RUNTIME!r}\n"
+        "print(sorted(m for m in sys.modules if m.startswith(heavy)))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": str(CLI_SRC)}
+    out = subprocess.run([sys.executable, "-c", code], cwd=str(ROOT), env=env, capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "[]"
+
+
+def test_version_flag_prints_version_without_building_parser(capsys) -> None:
+    from yonerai_cli import __version__
+    from yonerai_cli.cli import main
+
+    assert main(["--version"]) == 0
+    assert capsys.readouterr().out.strip() == f"yonerai {__version__}"
+
+
+def test_single_command_parser_matches_full_parser_help() -> None:
+    import argparse
+
+    from yonerai_cli.cli_parser import build_parser, known_commands
+
+    def _choices(parser: argparse.ArgumentParser) -> dict[str, argparse.ArgumentParser]:
+        action = next(a for a in parser._actions if isinstance(a, argparse._SubParsersAction))
+        return dict(action.choices)
+
+    full = _choices(build_parser())
+    assert set(full) == set(known_commands())
+    for command in ("config", "run", "worker", "status", "relay", "install", "health"):
+        scoped = _choices(build_parser(command))
+        assert scoped[command].format_help() == full[command].format_help()
+
+
+def test_tui_package_exports_resolve_lazily() -> None:
+    import yonerai_cli.tui as tui
+
+    assert callable(tui.slash_command_words)
+    assert "open_choice_dialog" in dir(tui)
+    with pytest.raises(AttributeError):
+        getattr(tui, "not_a_tui_export")
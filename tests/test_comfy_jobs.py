@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from src.utils.comfy_jobs import ComfyConnection, ComfyQueueFull, format_job_status
+
+SCRIPT_PATH = Path(__file__).resolve().parents[1] / "scripts" / "bench_comfy_jobs.py"
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_comfy_jobs", SCRIPT_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _wf(tag: int) -> dict:
+    return {"4": {"class_type": "CLIPTextEncode", "inputs": {"text": f"p{tag}"}}, "9": {"class_type": "SaveImage", "inputs": {}}}
+
+
+@pytest.mark.asyncio
+async def test_jobs_share_one_websocket_and_get_their_own_outputs() -> None:
+    bench = _load_bench()
+    async with bench.FakeComfyServer(render_sec=0.05, finalize_sec=0.1, view_sec=0.05) as server:
+        conn = ComfyConnection(server.address, max_remote_queue=4)
+        try:
+            jobs = [await conn.submit(_wf(i), "9", kind="image") for i in range(3)]
+            datas = await asyncio.wait_for(asyncio.gather(*(j.result() for j in jobs)), timeout=5)
+        finally:
+            await conn.close()
+
+    assert server.ws_connections == 1
+    assert datas == [f"image:{j.prompt_id}.png".encode() for j in jobs]
+    # Downloaded on `executed`, overlapping the finalize phase.
+    assert all(j.downloaded_early for j in jobs) and conn.stats["early_downloads"] == 3
+    assert [j.state for j in jobs] == ["done"] * 3
+
+
+@pytest.mark.asyncio
+async def test_local_queue_holds_jobs_while_comfy_is_busy_and_reports_position() -> None:
+    bench = _load_bench()
+    async with bench.FakeComfyServer(render_sec=0.2) as server:
+        server.enqueue_foreign(3)  # the web UI already queued three prompts
+        conn = ComfyConnection(server.address, max_remote_queue=3, max_local_queue=2, default_render_sec=10)
+        try:
+            first = await conn.submit(_wf(1), "9")
+            second = await conn.submit(_wf(2), "9")
+            with pytest.raises(ComfyQueueFull):
+                await conn.submit(_wf(3), "9")
+
+            assert first.state == second.state == "local"  # ComfyUI queue already at the limit
+            assert (first.position, second.position) == (3, 4)
+            assert first.eta_sec == pytest.approx(40.0)
+            assert format_job_status(first.snapshot()) == "⏳ Queue position 4 · ETA ~40s"
+
+            positions: list[int] = []
+            while not second.done():
+                await second.wait_changed(timeout=1)
+                positions.append(second.position)
+            assert await second.result() == f"image:{second.prompt_id}.png".encode()
+        finally:
+            await conn.close()
+
+    assert server.max_queue_seen <= 3
+    assert positions == sorted(positions, reverse=True) and positions[-1] == 0
+
+
+@pytest.mark.asyncio
+async def test_reconnect_mid_render_still_delivers_the_output() -> None:
+    bench = _load_bench()
+    async with bench.FakeComfyServer(render_sec=0.3, steps=3) as server:
+        conn = ComfyConnection(server.address, reconnect_max_sec=0.2)
+        try:
+            job = await conn.submit(_wf(1), "9")
+            while job.state != "running":
+                await job.wait_changed(timeout=1)
+            await server.drop_websockets()
+            data = await asyncio.wait_for(job.result(), timeout=5)
+        finally:
+            await conn.close()
+
+    assert data == f"image:{job.prompt_id}.png".encode()
+    assert conn.stats["reconnects"] >= 1 and server.ws_connections >= 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_pending_job_removes_it_from_comfy() -> None:
+    bench = _load_bench()
+    async with bench.FakeComfyServer(render_sec=0.3) as server:
+        conn = ComfyConnection(server.address, max_remote_queue=4)
+        try:
+            running = await conn.submit(_wf(1), "9")
+            pending = await conn.submit(_wf(2), "9")
+            while pending.prompt_id is None:
+                await pending.wait_changed(timeout=1)
+            await conn.cancel(pending)
+            assert await asyncio.wait_for(running.result(), timeout=5)
+        finally:
+            await conn.close()
+
+    assert pending.state == "cancelled"
+    assert pending.prompt_id not in server.history
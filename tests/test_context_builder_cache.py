@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+CORE_SRC = Path(__file__).resolve().parents[1] / "core" / "src"
+if str(CORE_SRC) not in sys.path:
+    sys.path.insert(0, str(CORE_SRC))
+
+import ora_core.brain.context as context_mod  # noqa: E402
+import ora_core.brain.memory as memory_mod  # noqa: E402
+from ora_core.api.schemas.messages import HistoryMessage, MessageRequest  # noqa: E402
+from ora_core.brain.context import ContextBuilder, estimate_tokens, trim_history_to_budget  # noqa: E402
+
+
+class _CountingRepo:
+    def __init__(self, messages: list[object]) -> None:
+        self.messages = messages
+        self.calls: list[int] = []
+
+    async def get_messages(self, _conversation_id: str, limit: int = 20):
+        self.calls.append(limit)
+        return list(self.messages)[-limit:]
+
+
+def _req(user: str, content: str, timestamp: str, **extra) -> MessageRequest:
+    return MessageRequest(
+        user_identity={"provider": "web", "id": user, "display_name": user},
+        content=content,
+        client_context={"timestamp": timestamp},
+        idempotency_key=f"idem-{user}-{timestamp}",
+        source="web",
+        **extra,
+    )
+
+
+@pytest.fixture
+def profile_stub(monkeypatch: pytest.MonkeyPatch):
+    async def _profile(user_id: str, default_name: str = "User"):
+        return {"name": default_name, "layer2_user_memory": {"facts": [f"likes {user_id}"]}}
+
+    monkeypatch.setattr(memory_mod.memory_store, "get_or_create_profile", _profile)
+
+
+@pytest.mark.asyncio
+async def test_stable_prefix_is_shared_across_users_and_turns_and_follows_soul_mtime(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, profile_stub
+) -> None:
+    soul = tmp_path / "soul.md"
+    soul.write_text("I am the soul v1.\n", encoding="utf-8")
+    monkeypatch.setattr(context_mod, "SOUL_PATH", soul)
+    repo = _CountingRepo([])
+
+    a = await ContextBuilder.build_context(_req("alice", "hi", "2026-10-18 10:00:00"), "ia", "c1", repo)
+    b = await ContextBuilder.build_context(_req("bob", "yo", "2026-10-18 10:00:07"), "ib", "c2", repo)
+
+    assert a[0] == b[0]
+    assert a[0]["content"].startswith("[SYSTEM IDENTITY]\nI am the soul v1.")
+    assert "10:00:00" not in a[0]["content"] and "alice" not in a[0]["content"]
+    assert a[1]["content"].startswith("[SESSION CONTEXT]\nCurrent Time: 2026-10-18 10:00:00\nUser: alice")
+    assert "Facts(L2): likes ia" in a[1]["content"]
+
+    soul.write_text("I am the soul v2, edited.\n", encoding="utf-8")
+    os.utime(soul, ns=(soul.stat().st_mtime_ns + 1_000_000, soul.stat().st_mtime_ns + 1_000_000))
+    c = await ContextBuilder.build_context(_req("carol", "hey", "2026-10-18 10:01:00"), "ic", "c3", repo)
+    assert c[0]["content"].startswith("[SYSTEM IDENTITY]\nI am the soul v2, edited.")
+
+
+def test_history_trim_keeps_newest_turns_within_budget() -> None:
+    history = [{"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i} " + "x" * 200} for i in range(30)]
+    kept = trim_history_to_budget(history, 300)
+    assert kept == history[-len(kept) :]
+    assert sum(estimate_tokens(m["content"]) + 4 for m in kept) <= 300 < sum(
+        estimate_tokens(m["content"]) + 4 for m in history[-len(kept) - 1 :]
+    )
+
+    huge = [{"role": "user", "content": "head " + "本" * 5000 + " tail"}]
+    (only,) = trim_history_to_budget(huge, 200)
+    assert only["content"].endswith(" tail") and estimate_tokens(only["content"]) + 4 <= 201
+    assert trim_history_to_budget(history, 0) == []
+    assert estimate_tokens("abcd" * 10) == 10 and estimate_tokens("日本語") == 3
+
+
+@pytest.mark.asyncio
+async def test_db_history_is_fetched_once_and_trimmed_to_the_token_budget(
+    monkeypatch: pytest.MonkeyPatch, profile_stub
+) -> None:
+    monkeypatch.setenv("ORA_CONTEXT_HISTORY_TOKENS", "120")
+    monkeypatch.setattr(context_mod, "SOUL_PATH", Path("/nonexistent/soul.md"))
+    turns = [SimpleNamespace(id=f"m{i}", author="user" if i % 2 == 0 else "assistant", content=f"turn {i} " + "y" * 80, attachments=[]) for i in range(40)]
+    repo = _CountingRepo(turns)
+
+    messages = await ContextBuilder.build_context(_req("dave", "next?", "2026-10-18 11:00:00"), "id", "c4", repo)
+    history = [m for m in messages[:-1] if m["role"] in ("user", "assistant")]
+    assert len(repo.calls) == 1
+    assert history and history[-1]["content"].startswith("turn 39 ")
+    assert sum(estimate_tokens(m["content"]) + 4 for m in history) <= 120
+
+    # Client-provided history: the DB is read once, only to look for a prior image.
+    repo.calls.clear()
+    req = _req("dave", "続き", "2026-10-18 11:00:05", client_history=[HistoryMessage(role="assistant", content="前の説明")])
+    await ContextBuilder.build_context(req, "id", "c4", repo)
+    assert len(repo.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_reads_are_cached_until_the_file_changes(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(memory_mod, "USER_MEMORY_DIR", str(tmp_path))
+    store = memory_mod.MemoryStore()
+    path = tmp_path / "u1.json"
+    path.write_text(json.dumps({"name": "Eve", "layer2_user_memory": {"facts": []}}), encoding="utf-8")
+
+    opens: list[str] = []
+    real_open = memory_mod.aiofiles.open
+
+    def _counting_open(*args, **kwargs):
+        opens.append(str(args[0]))
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(memory_mod.aiofiles, "open", _counting_open)
+
+    first = await store.read_user_profile("u1")
+    first["name"] = "mutated by caller"
+    second = await store.read_user_profile("u1")
+    assert second["name"] == "Eve" and len(opens) == 1
+
+    path.write_text(json.dumps({"name": "Eve Updated"}), encoding="utf-8")
+    assert (await store.read_user_profile("u1"))["name"] == "Eve Updated"
+    assert len(opens) == 2
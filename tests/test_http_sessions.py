@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from src.utils import http_sessions
+from src.utils.http_sessions import SessionRegistry, borrow_session
+
+
+async def _start_server(app: web.Application) -> tuple[web.AppRunner, str]:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def registry(monkeypatch) -> SessionRegistry:
+    reg = SessionRegistry(limit=10, limit_per_host=1, dns_ttl_sec=60, keepalive_sec=30)
+    monkeypatch.setattr(http_sessions, "_registry", reg)
+    return reg
+
+
+async def test_sequential_requests_reuse_one_connection(registry: SessionRegistry) -> None:
+    async def ok(_request: web.Request) -> web.Response:
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/ok", ok)
+    runner, base = await _start_server(app)
+    try:
+        for _ in range(3):
+            async with borrow_session() as session:
+                async with session.get(f"{base}/ok") as resp:
+                    assert (await resp.json())["ok"] is True
+        session = http_sessions.shared_session()
+        assert not session.closed
+
+        stats = registry.stats()
+        assert stats["requests"] == 3
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 2
+    finally:
+        await registry.close()
+        await runner.cleanup()
+    assert session.closed
+
+
+async def test_per_host_limit_surfaces_queueing(registry: SessionRegistry) -> None:
+    async def slow(_request: web.Request) -> web.Response:
+        await asyncio.sleep(0.05)
+        return web.Response(text="done")
+
+    app = web.Application()
+    app.router.add_get("/slow", slow)
+    runner, base = await _start_server(app)
+    try:
+        session = registry.session()
+
+        async def fetch() -> str:
+            async with session.get(f"{base}/slow") as resp:
+                return await resp.text()
+
+        tasks = [asyncio.create_task(fetch()) for _ in range(3)]
+        await asyncio.sleep(0.02)
+        during = registry.stats()
+        assert during["in_use"] == 1
+        assert during["waiting"] == 2
+        assert during["busiest_host_in_use"] == 1
+
+        assert await asyncio.gather(*tasks) == ["done"] * 3
+        after = registry.stats()
+        assert after["queued"] == 2
+        assert after["queued_ms"] > 0
+    finally:
+        await registry.close()
+        await runner.cleanup()
+
+
+async def test_voicevox_client_draws_from_shared_pool(registry: SessionRegistry) -> None:
+    from src.utils.tts_client import VoiceVoxClient
+
+    async def audio_query(request: web.Request) -> web.Response:
+        return web.json_response({"speedScale": 1.0, "text": request.query["text"]})
+
+    async def synthesis(_request: web.Request) -> web.Response:
+        return web.Response(body=b"RIFFwav")
+
+    app = web.Application()
+    app.router.add_post("/audio_query", audio_query)
+    app.router.add_post("/synthesis", synthesis)
+    runner, base = await _start_server(app)
+    try:
+        client = VoiceVoxClient(base, speaker_id=1)
+        assert await client.synthesize("こんにちは") == b"RIFFwav"
+        assert await client.synthesize("またね") == b"RIFFwav"
+
+        stats = registry.stats()
+        assert stats["requests"] == 4
+        assert stats["connections_created"] == 1
+    finally:
+        await registry.close()
+        await runner.cleanup()
+
+
+async def test_shared_sessions_do_not_carry_cookies_between_fetches(registry: SessionRegistry) -> None:
+    seen: list[str | None] = []
+
+    async def login(_request: web.Request) -> web.Response:
+        resp = web.Response(text="hi")
+        resp.set_cookie("sid", "user-a-session")
+        return resp
+
+    async def page(request: web.Request) -> web.Response:
+        seen.append(request.headers.get("Cookie"))
+        return web.Response(text="page")
+
+    app = web.Application()
+    app.router.add_get("/login", login)
+    app.router.add_get("/page", page)
+    runner, base = await _start_server(app)
+    base = base.replace("127.0.0.1", "localhost")  # aiohttp never stores cookies for IP hosts
+    try:
+        async with borrow_session() as session:
+            async with session.get(f"{base}/login") as resp:
+                assert resp.cookies["sid"].value == "user-a-session"
+        async with borrow_session() as session:
+            async with session.get(f"{base}/page") as resp:
+                await resp.read()
+        assert seen == [None]
+    finally:
+        await registry.close()
+        await runner.cleanup()
+
+
+def test_loop_change_closes_the_previous_loop_sessions() -> None:
+    registry = SessionRegistry()
+
+    async def _first():
+        return registry.session(), registry.session("named")
+
+    async def _second():
+        sess = registry.session()
+        await asyncio.sleep(0)
+        return sess
+
+    old = asyncio.run(_first())
+    new = asyncio.run(_second())
+    assert all(sess.closed for sess in old) and new not in old
+    asyncio.run(registry.close())
+    assert new.closed
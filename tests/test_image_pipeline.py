@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from src.utils.image_pipeline import (
+    ImageJob,
+    ImagePipeline,
+    ImagePipelineBusy,
+    center_crop,
+    process_image_bytes,
+)
+
+
+def _jpeg(size=(4000, 3000)) -> bytes:
+    im = Image.linear_gradient("L").resize(size).convert("RGB")
+    buf = io.BytesIO()
+    im.save(buf, format="JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _png(size=(300, 200)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_jpeg_downscale_decodes_at_draft_size_and_matches_legacy_output_shape() -> None:
+    raw = _jpeg()
+    job = ImageJob(aspect=16 / 9, target_w=960, target_h=540, fmt="jpg")
+    result = process_image_bytes(raw, job)
+
+    assert result.src_size == (4000, 3000)
+    assert result.draft_size == (1000, 750)  # 1/4 DCT scale: smallest that still covers 960x540 after the crop
+    assert result.out_size == (960, 540)
+    assert set(result.timings_ms) == {"decode", "transform", "resize", "encode"}
+
+    legacy = center_crop(Image.open(io.BytesIO(raw)), 16 / 9).resize((960, 540), Image.LANCZOS)
+    fast = Image.open(io.BytesIO(result.data))
+    diff = sum(abs(a - b) for a, b in zip(legacy.convert("L").getdata(), fast.convert("L").getdata()))
+    assert diff / (960 * 540) < 2.0  # mean absolute error on a 0-255 gradient
+
+
+def test_png_over_the_upload_limit_falls_back_to_jpeg() -> None:
+    noisy = Image.effect_noise((400, 225), 90).convert("RGB")
+    buf = io.BytesIO()
+    noisy.save(buf, format="PNG")
+    result = process_image_bytes(buf.getvalue(), ImageJob(target_w=400, target_h=225, max_bytes=150_000))
+    assert result.fmt == "jpg" and len(result.data) <= 150_000
+
+
+@pytest.mark.asyncio
+async def test_pipeline_caches_by_source_hash_and_params() -> None:
+    pipeline = ImagePipeline(workers=0, queue_max=2)
+    raw = _png()
+    first = await pipeline.process(raw, ImageJob(aspect=1.0, target_w=64, target_h=64))
+    again = await pipeline.process(bytes(raw), ImageJob(aspect=1.0, target_w=64, target_h=64))
+    other = await pipeline.process(raw, ImageJob(aspect=1.0, target_w=32, target_h=32))
+
+    assert not first.cached and again.cached and not other.cached
+    assert again.data == first.data and other.out_size == (32, 32)
+    assert "queue" in first.timings_ms and "total" in first.timings_ms
+    stats = pipeline.stats()
+    assert stats["jobs"] == 2 and stats["cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_rejects_work_beyond_the_bounded_queue(monkeypatch) -> None:
+    pipeline = ImagePipeline(workers=0, queue_max=1)  # one running + one queued
+    gate = asyncio.Event()
+
+    async def _slow(raw, job):
+        await gate.wait()
+        return process_image_bytes(raw, job)
+
+    monkeypatch.setattr(pipeline, "_run", _slow)
+    jobs = [asyncio.create_task(pipeline.process(_png(), ImageJob(target_w=10 + n, target_h=10))) for n in range(2)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(ImagePipelineBusy):
+        await pipeline.process(_png(), ImageJob(target_w=99, target_h=10))
+    gate.set()
+    assert [r.out_size for r in await asyncio.gather(*jobs)] == [(10, 10), (11, 10)]
+    assert pipeline.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_pool_worker_produces_the_same_bytes() -> None:
+    pipeline = ImagePipeline(workers=1, queue_max=0, cache_bytes=0)
+    try:
+        job = ImageJob(aspect=16 / 9, target_w=320, target_h=180)
+        result = await pipeline.process(_png(), job)
+    finally:
+        pipeline.shutdown()
+    assert result.data == process_image_bytes(_png(), job).data
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_retries_once_in_a_fresh_pool_then_fails(monkeypatch) -> None:
+    from concurrent.futures import Executor, Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    from src.utils import image_pipeline
+
+    pools: list["_BrokenPool"] = []
+
+    class _BrokenPool(Executor):
+        def __init__(self, **kwargs) -> None:
+            self.submitted = 0
+            pools.append(self)
+
+        def submit(self, fn, *args, **kwargs):
+            self.submitted += 1
+            future: Future = Future()
+            future.set_exception(BrokenProcessPool("worker died"))
+            return future
+
+    async def _no_in_process_fallback(*args, **kwargs):
+        raise AssertionError("image work must not run in the bot process")
+
+    monkeypatch.setattr(image_pipeline, "ProcessPoolExecutor", _BrokenPool)
+    monkeypatch.setattr(image_pipeline.asyncio, "to_thread", _no_in_process_fallback)
+    pipeline = ImagePipeline(workers=1, queue_max=0, cache_bytes=0)
+
+    with pytest.raises(BrokenProcessPool):
+        await pipeline.process(_png(), ImageJob(), source_digest=b"digest")
+    assert [pool.submitted for pool in pools] == [1, 1]
+    assert pipeline._executor is None and pipeline.stats()["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pool_workers_enforce_the_pixel_limit(monkeypatch) -> None:
+    monkeypatch.setenv("ORA_IMAGE_MAX_MEGAPIXELS", "1")
+    pipeline = ImagePipeline(workers=1, queue_max=0, cache_bytes=0)
+    try:
+        with pytest.raises(Image.DecompressionBombWarning):
+            await pipeline.process(_png((2000, 1000)), ImageJob())
+        assert (await pipeline.process(_png(), ImageJob())).out_size == (300, 200)
+    finally:
+        pipeline.shutdown()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import io
+import asyncio
 
 import pytest
 
@@ -9,24 +9,24 @@ from src.utils.mcp_client import MCPStdioClient
 
 class _FakeProc:
     def __init__(self, stderr_bytes: bytes):
-        self.stderr = io.BytesIO(stderr_bytes)
+        self.stderr = asyncio.StreamReader()
+        self.stderr.feed_data(stderr_bytes)
+        self.stderr.feed_eof()
         self._terminated = 0
-        self._poll = None
-
-    def poll(self):
-        return self._poll
+        self.returncode = None
 
     def terminate(self):
         self._terminated += 1
-        self._poll = 0
+        self.returncode = 0
 
 
-def test_stderr_win32sysloader_disables_server_fail_open():
+@pytest.mark.asyncio
+async def test_stderr_win32sysloader_disables_server_fail_open():
     client = MCPStdioClient(name="artist", command="python -m whatever")
     proc = _FakeProc(b"ImportError: cannot import name _win32sysloader\r\n")
     client._proc = proc  # test hook
 
-    client._stderr_loop()
+    await client._stderr_loop()
 
     assert client._disabled is True
     assert client._disabled_reason == "mcp_import_error_win32sysloader"
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.utils.mcp_client import TOOLS_LIST_CHANGED, MCPStdioClient, MCPStdioPool
+
+_ECHO = Path(__file__).resolve().parents[1] / "scripts" / "bench_mcp_stdio.py"
+
+
+def _command(delay_ms: float = 0.0) -> str:
+    return f"{sys.executable} {_ECHO} --serve --delay-ms {delay_ms}"
+
+
+@pytest.mark.asyncio
+async def test_requests_are_pipelined_over_one_process() -> None:
+    client = MCPStdioClient(name="echo", command=_command(delay_ms=100))
+    try:
+        await client.start()
+        started = asyncio.get_running_loop().time()
+        results = await asyncio.gather(*(client.call_tool("echo", {"i": i}) for i in range(10)))
+        elapsed = asyncio.get_running_loop().time() - started
+    finally:
+        await client.close()
+
+    assert [r["content"][0]["text"] for r in results] == [f'{{"i": {i}}}' for i in range(10)]
+    assert elapsed < 0.8  # serialized would be >= 1s
+    assert client.outstanding == 0
+
+
+@pytest.mark.asyncio
+async def test_tools_list_is_cached_until_the_server_announces_a_change() -> None:
+    client = MCPStdioClient(name="echo", command=_command())
+    fired = asyncio.Event()
+    client.on_tools_changed(fired.set)
+    sent: list[str] = []
+    original = client._request_raw
+
+    async def _counting(method, params, timeout):
+        sent.append(method)
+        return await original(method, params, timeout)
+
+    client._request_raw = _counting  # type: ignore[method-assign]
+    try:
+        first = await client.list_tools()
+        await client.list_tools()
+        assert [t.name for t in first] == ["echo"]
+        assert sent.count("tools/list") == 1
+
+        await client._handle_server_message({"jsonrpc": "2.0", "method": TOOLS_LIST_CHANGED})
+        await asyncio.wait_for(fired.wait(), timeout=1)
+        await client.list_tools()
+        assert sent.count("tools/list") == 2
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_sends_calls_to_the_least_busy_live_replica() -> None:
+    pool = MCPStdioPool(name="echo", command=_command(), replicas=3)
+    a, b, c = pool.replicas
+    for r, busy in ((a, 2), (b, 1), (c, 0)):
+        r._proc = type("P", (), {"returncode": None})()  # running
+        r._pending = {i: None for i in range(busy)}  # type: ignore[misc]
+    c._disabled = True
+
+    assert pool._pick() is b
+    b._pending = {i: None for i in range(5)}  # type: ignore[misc]
+    assert pool._pick() is a
+    assert pool.outstanding == 7
+
+    a._disabled = b._disabled = True
+    with pytest.raises(RuntimeError, match="MCP disabled"):
+        pool._pick()
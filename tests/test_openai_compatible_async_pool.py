@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "bench_openai_compatible.py"
+if str(REPO_ROOT / "core" / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "core" / "src"))
+
+from ora_core.execution import InMemoryRunLedger, aexecute_task  # noqa: E402
+from ora_core.providers import ProviderError, ProviderRequest, ProviderRegistry  # noqa: E402
+from ora_core.providers.openai_compatible import (  # noqa: E402
+    _ASYNC_CLIENTS,
+    _STREAM_DONE,
+    OpenAICompatibleProviderAdapter,
+    _client_closed,
+    _parse_stream_line,
+    aclose_provider_clients,
+)
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_openai_compatible", SCRIPT_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _adapter(base_url: str, max_connections: int = 64) -> OpenAICompatibleProviderAdapter:
+    return OpenAICompatibleProviderAdapter(
+        {
+            "YONERAI_OPENAI_COMPATIBLE_BASE_URL": base_url,
+            "YONERAI_OPENAI_COMPATIBLE_API_KEY": "sk-" + "T" * 24,
+            "YONERAI_OPENAI_COMPATIBLE_LIVE": "1",
+            "YONERAI_OPENAI_COMPATIBLE_MAX_CONNECTIONS": str(max_connections),
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_completions_share_keep_alive_connections_within_the_host_limit() -> None:
+    bench = _load_bench()
+    async with bench.FakeOpenAIServer(delay=0.2) as server:
+        adapter = _adapter(server.base_url, max_connections=8)
+        try:
+            started = time.perf_counter()
+            replies = await asyncio.gather(
+                *(adapter.agenerate(ProviderRequest(prompt="hi"), allow_live_call=True) for _ in range(8))
+            )
+            elapsed = time.perf_counter() - started
+            # Fresh adapter instance, same origin: the pool is shared, nothing new is dialed.
+            await asyncio.gather(
+                *(_adapter(server.base_url, max_connections=8).agenerate(ProviderRequest(prompt="hi"), allow_live_call=True) for _ in range(16))
+            )
+        finally:
+            await aclose_provider_clients()
+
+    assert {r.output_text for r in replies} == {"echo 1"}
+    assert elapsed < 0.8  # eight 200 ms generations overlap instead of queueing
+    assert server.requests == 24
+    assert server.connections == 8
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_deltas_and_cancel_hangs_up_on_the_upstream() -> None:
+    bench = _load_bench()
+    async with bench.FakeOpenAIServer(chunk_delay=0.05, chunks=20) as server:
+        adapter = _adapter(server.base_url)
+        try:
+            full = [d async for d in adapter.astream(ProviderRequest(prompt="hi"), allow_live_call=True)]
+            assert full == [f"t{i} " for i in range(20)]
+
+            received: list[str] = []
+
+            async def consume() -> None:
+                async for delta in adapter.astream(ProviderRequest(prompt="hi"), allow_live_call=True):
+                    received.append(delta)
+
+            task = asyncio.create_task(consume())
+            while len(received) < 2:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            for _ in range(50):
+                if server.aborted_streams:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await aclose_provider_clients()
+
+    assert server.completed_streams == 1
+    assert server.aborted_streams == 1
+
+
+@pytest.mark.asyncio
+async def test_async_execution_spine_uses_the_loop_pool_and_shutdown_closes_it() -> None:
+    bench = _load_bench()
+    loop = asyncio.get_running_loop()
+    async with bench.FakeOpenAIServer(delay=0.05) as server:
+        registry = ProviderRegistry([_adapter(server.base_url, max_connections=4)])
+        try:
+            results = await asyncio.gather(
+                *(
+                    aexecute_task(
+                        "summarize public docs",
+                        provider="openai-compatible",
+                        live=True,
+                        registry=registry,
+                        ledger=InMemoryRunLedger(),
+                    )
+                    for _ in range(4)
+                )
+            )
+            pools = dict(_ASYNC_CLIENTS.get(loop, {}))
+        finally:
+            await aclose_provider_clients()
+
+    assert all(result.ok and result.live_call_performed for result in results)
+    assert len(pools) == 1 and server.connections <= 4
+    assert all(_client_closed(client) for client in pools.values())
+    assert loop not in _ASYNC_CLIENTS
+
+
+@pytest.mark.asyncio
+async def test_async_errors_surface_as_provider_errors() -> None:
+    adapter = _adapter("http://127.0.0.1:9/v1")  # discard port: nothing listens
+    try:
+        with pytest.raises(ProviderError) as excinfo:
+            await adapter.agenerate(ProviderRequest(prompt="hi"), allow_live_call=True)
+        assert excinfo.value.code == "provider_connection_error"
+        with pytest.raises(ProviderError) as excinfo:
+            await adapter.agenerate(ProviderRequest(prompt="hi"), allow_live_call=False)
+        assert excinfo.value.code == "live_provider_call_disabled"
+    finally:
+        await aclose_provider_clients()
+
+
+_LIFESPAN_CHECK = """
+from fastapi.testclient import TestClient
+
+import ora_core.main as main_mod
+from ora_core.providers.openai_compatible import OpenAICompatibleProviderAdapter, _client_closed
+
+adapter = OpenAICompatibleProviderAdapter(
+    {"YONERAI_OPENAI_COMPATIBLE_BASE_URL": "http://127.0.0.1:9/v1", "YONERAI_OPENAI_COMPATIBLE_API_KEY": "k"}
+)
+
+
+async def _open_async_pool():
+    return adapter._async_client()
+
+
+with TestClient(main_mod.create_app()) as client:
+    sync_pool = adapter._sync_client()
+    async_pool = client.portal.call(_open_async_pool)
+    assert not sync_pool.is_closed and not _client_closed(async_pool)
+print(sync_pool.is_closed, _client_closed(async_pool))
+"""
+
+
+def test_core_app_shutdown_closes_the_provider_pools() -> None:
+    # Fresh interpreter: other suites stub Core modules in sys.modules.
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(REPO_ROOT / "core" / "src"), str(REPO_ROOT)])}
+    proc = subprocess.run(
+        [sys.executable, "-c", _LIFESPAN_CHECK], cwd=str(REPO_ROOT), env=env, capture_output=True, text=True, timeout=120
+    )
+
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    assert proc.stdout.strip().splitlines()[-1] == "True True"
+
+
+def test_stream_line_parser_handles_keepalives_and_done() -> None:
+    assert _parse_stream_line(": keep-alive") is None
+    assert _parse_stream_line("") is None
+    assert _parse_stream_line('data: {"choices":[{"delta":{"content":"ab"}}]}') == "ab"
+    assert _parse_stream_line('data: {"choices":[{"delta":{"role":"assistant"}}]}') is None
+    assert _parse_stream_line("data: [DONE]") is _STREAM_DONE
@@ -63,3 +63,24 @@ def test_untrusted_boundary_wrapper_masks_query_in_source() -> None:
     assert "Policy: untrusted_web_content" in out
     assert "<untrusted_web_content>" in out
     assert "?q=" not in out
+
+
+def test_fetch_uses_its_own_uncached_non_keepalive_connector(monkeypatch) -> None:
+    seen: list[dict] = []
+
+    class _Stop(Exception):
+        pass
+
+    def _connector(**kwargs):
+        seen.append(kwargs)
+        raise _Stop
+
+    async def _safe(url: str):
+        return url, {"93.184.216.34"}
+
+    monkeypatch.setattr(read_page_tool, "_assert_safe_target", _safe)
+    monkeypatch.setattr(read_page_tool.aiohttp, "TCPConnector", _connector)
+    out = asyncio.run(read_page_tool.execute({"url": "https://example.com/"}))
+
+    assert out == "Access Error: Failed to read page."
+    assert seen == [{"use_dns_cache": False, "force_close": True}]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import importlib.util
+import random
+from pathlib import Path
+
+import pytest
+
+from src.utils import redaction, sanitizer
+from src.utils.redaction import RedactionEngine, RedactionRule, _literal_prefix, _scan_form
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_redaction", ROOT / "scripts" / "bench_redaction.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+bench = _load_bench()
+
+
+def test_output_matches_rule_by_rule_redaction_on_a_corpus() -> None:
+    rng = random.Random(21)
+    outputs = [bench.tool_output(rng, 48 * 1024, secret_rate=0.05) for _ in range(4)]
+    glued = bench.adversarial(rng, 3000)
+    san = sanitizer.Sanitizer()
+
+    for text in outputs + glued:
+        assert redaction.redact_text(text) == bench.legacy_redact_text(text)
+        packet = san.sanitize(text)
+        assert (packet.text, packet.redaction_count) == bench.legacy_sanitize(text)
+    for event in bench.trace_events(rng, 300):
+        assert redaction.redact_json(event) == bench.legacy_redact_json(event)
+
+
+def test_realistic_text_takes_the_single_pass_and_glued_secrets_fall_back() -> None:
+    engine = RedactionEngine(redaction._SECRET_RULES)
+    rng = random.Random(4)
+    for text in [bench.tool_output(rng, 32 * 1024, secret_rate=0.05) for _ in range(3)]:
+        engine.sub(text)
+    assert engine.stats()["fallbacks"] == 0 and engine.stats()["scanned"] == 3
+
+    # A bot-token-shaped run that swallows an OpenAI key: rule order decides, so redo rule by rule.
+    glued = "a" * 24 + ".bbbbbb.sk-" + "c" * 30
+    assert engine.sub(glued) == ("a" * 24 + ".bbbbbb.[REDACTED]", 1)
+    assert engine.stats()["fallbacks"] == 1
+
+
+def test_fast_negative_check_skips_texts_without_any_trigger() -> None:
+    engine = RedactionEngine(redaction._SECRET_RULES)
+    assert engine._anchors is not None and set(engine._anchors) >= {"sk-", "AIzaSy", "http", "-----BEGIN ", "."}
+    clean = "ツールの出力です。エラーはありません" * 200
+    assert not engine.may_match(clean)
+    out, count = engine.sub(clean)
+    assert out is clean and count == 0 and engine.stats()["skipped"] == 1
+    assert engine.may_match("key sk-" + "x" * 30)
+
+
+@pytest.mark.parametrize("rules", [redaction._SECRET_RULES, sanitizer._SENSITIVE_RULES], ids=["secrets", "sanitizer"])
+def test_every_alternative_starts_with_a_literal(rules) -> None:
+    scans = [_scan_form(rule) for rule in rules]
+    assert all(_literal_prefix(scan)[0] for scan in scans), scans
+    assert _scan_form(RedactionRule("k", r"\bsk-[a-z]{3}\b", "x")) == r"sk-(?<=\bsk-)[a-z]{3}\b"
+    assert _literal_prefix(r"https?://x") == ("http", 4)
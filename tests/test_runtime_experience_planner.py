@@ -13,20 +13,6 @@ def _prepare_core_path() -> None:
         sys.path.insert(0, str(core_src))
 
 
-class _FakeHTTPResponse:
-    def __init__(self, payload: dict[str, object]) -> None:
-        self.payload = payload
-
-    def __enter__(self) -> "_FakeHTTPResponse":
-        return self
-
-    def __exit__(self, exc_type: object, exc: object, traceback: object) -> None:
-        return None
-
-    def read(self) -> bytes:
-        return json.dumps(self.payload).encode("utf-8")
-
-
 def test_mock_provider_success_and_registry_list(monkeypatch) -> None:
     _prepare_core_path()
     monkeypatch.delenv("YONERAI_OPENAI_COMPATIBLE_API_KEY", raising=False)
@@ -197,14 +183,20 @@ def test_openai_compatible_live_request_shape_and_response(monkeypatch: pytest.M
 
     seen: dict[str, object] = {}
 
-    def fake_urlopen(request: object, timeout: float) -> object:
-        seen["timeout"] = timeout
-        seen["url"] = request.full_url
-        seen["headers"] = dict(request.header_items())
-        seen["payload"] = json.loads(request.data.decode("utf-8"))
-        return _FakeHTTPResponse({"choices": [{"message": {"content": "openai compatible reply"}}]})
+    import httpx
+
+    def fake_upstream(request: httpx.Request) -> httpx.Response:
+        seen["timeout"] = request.extensions.get("timeout")
+        seen["url"] = str(request.url)
+        seen["headers"] = dict(request.headers)
+        seen["payload"] = json.loads(request.content.decode("utf-8"))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "openai compatible reply"}}]})
 
-    monkeypatch.setattr("urllib.request.urlopen", fake_urlopen)
+    monkeypatch.setattr(
+        OpenAICompatibleProviderAdapter,
+        "_sync_client",
+        lambda self: httpx.Client(transport=httpx.MockTransport(fake_upstream)),
+    )
     adapter = OpenAICompatibleProviderAdapter(
         {
             "YONERAI_OPENAI_COMPATIBLE_BASE_URL": "https://api.example.invalid/v1",
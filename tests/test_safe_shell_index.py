@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.utils import safe_shell
+from src.utils.code_index import required_literals
+from src.utils.safe_shell import SafeShell
+
+
+def _tree(root: Path) -> None:
+    files = {
+        "app/main.py": "import os\ndef select_tools(prompt):\n    return Router(prompt)\n",
+        "app/util.py": "def helper():\n    return 'SELECT_TOOLS lives elsewhere'\n",
+        "app/.env": "select_tools=secret\n",
+        "docs/readme.md": "Call select_tools() from the router.\n保存して共有\n",
+        ".git/config": "select_tools in git metadata\n",
+        "/".join(f"d{i}" for i in range(10)) + "/deep.py": "def select_tools(): pass\n",
+    }
+    for rel, text in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, (1_600_000_000, 1_600_000_000))
+
+
+@pytest.mark.parametrize(
+    "cmd",
+    [
+        "grep -n -m 50 select_tools .",
+        "grep -n -i -m 50 select_tools .",
+        "rg -n -m 50 def\\s+select_tools app",
+        "grep -m 10 保存 docs",
+        "grep -n -m 50 (Router|helper) .",
+        "find -m 50 \\.py$ .",
+        "find -m 50 main app",
+    ],
+)
+def test_indexed_results_match_directory_walk(tmp_path: Path, cmd: str) -> None:
+    _tree(tmp_path)
+    legacy = SafeShell(tmp_path, use_index=False)._run_builtin_sync(cmd)
+    indexed = SafeShell(tmp_path, use_index=True)._run_builtin_sync(cmd)
+    assert indexed == legacy
+    assert ".env" not in indexed["stdout"] and ".git" not in indexed["stdout"]
+    assert "deep.py" not in indexed["stdout"]  # beyond MAX_DEPTH from the search base
+
+
+def test_index_only_opens_candidates_so_scan_limits_stop_tripping(tmp_path: Path, monkeypatch) -> None:
+    for n in range(40):
+        (tmp_path / f"f{n}.py").write_text(f"value_{n} = {n}\n", encoding="utf-8")
+    (tmp_path / "needle.py").write_text("rare_needle = 1\n", encoding="utf-8")
+    monkeypatch.setattr(safe_shell, "MAX_FILES_SCANNED", 10)
+
+    legacy = SafeShell(tmp_path, use_index=False)._run_builtin_sync("grep -m 5 rare_needle .")
+    indexed = SafeShell(tmp_path, use_index=True)._run_builtin_sync("grep -m 5 rare_needle .")
+    assert legacy["stderr"] == "file_limit"
+    assert indexed == {"stdout": "needle.py: rare_needle = 1", "stderr": "", "exit_code": 0}
+
+
+def test_refresh_reindexes_only_changed_files(tmp_path: Path) -> None:
+    _tree(tmp_path)
+    shell = SafeShell(tmp_path, use_index=True)
+    index = shell.index
+    index.refresh(force=True)
+    baseline = index.files_reindexed
+
+    target = tmp_path / "app" / "util.py"
+    target.write_text("def helper():\n    return 'brand_new_symbol'\n", encoding="utf-8")
+    os.utime(target, ns=(target.stat().st_atime_ns, target.stat().st_mtime_ns + 10_000_000))
+    (tmp_path / "docs" / "readme.md").unlink()
+    index.refresh(force=True)
+
+    assert index.files_reindexed == baseline + 1
+    assert shell._run_builtin_sync("grep -m 5 brand_new_symbol .")["stdout"] == "app/util.py: return 'brand_new_symbol'"
+    assert shell._run_builtin_sync("grep -m 5 保存 .")["stdout"] == ""
+
+
+def test_files_written_after_a_query_are_found_immediately(tmp_path: Path) -> None:
+    _tree(tmp_path)
+    shell = SafeShell(tmp_path)  # index on by default
+    assert shell._run_builtin_sync("grep -m 5 needle_xyz .")["stdout"] == ""
+
+    (tmp_path / "app" / "b").write_text("needle_xyz = 1\n", encoding="utf-8")
+    assert shell._run_builtin_sync("grep -m 5 needle_xyz .")["stdout"] == "app/b: needle_xyz = 1"
+    assert shell._run_builtin_sync("find -m 5 /b$ .")["stdout"] == "app/b"
+
+    # Same size, same mtime tick: a freshly written file is re-read rather than trusted.
+    target = tmp_path / "app" / "b"
+    mtime_ns = target.stat().st_mtime_ns
+    target.write_text("needle_abc = 1\n", encoding="utf-8")
+    os.utime(target, ns=(mtime_ns, mtime_ns))
+    assert shell._run_builtin_sync("grep -m 5 needle_abc .")["stdout"] == "app/b: needle_abc = 1"
+
+
+def test_required_literals_only_keeps_mandatory_runs() -> None:
+    assert required_literals("def select_tools") == ["def select_tools"]
+    assert required_literals("(foo)bar+baz") == ["fooba", "baz"]
+    assert required_literals("a|bcd") == []
+    assert required_literals("ab(cd)?ef") == []
+    # Under IGNORECASE "s"/"i" also match ſ / ı / İ, so they end a run.
+    assert required_literals("def select_tools", ignore_case=True) == ["def ", "elect_tool"]
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from src.cogs.scheduler import SchedulerCog
+from src.cogs.tools.scheduler_tools import schedule_task
+
+T0 = 1_800_000_000.0
+
+
+class _FakeClock:
+    """Virtual wall clock; `sleep()` resolves only when the test advances time past its deadline."""
+
+    def __init__(self, now: float) -> None:
+        self.now = now
+        self._sleepers: list[tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self.now + max(0.0, delay), next(self._seq), fut))
+        await fut
+
+    async def advance_to(self, until: float) -> None:
+        await _settle()
+        while self._sleepers and self._sleepers[0][0] <= until:
+            deadline, _seq, fut = heapq.heappop(self._sleepers)
+            if fut.done():
+                continue
+            self.now = max(self.now, deadline)
+            fut.set_result(None)
+            await _settle()
+        self.now = until
+        await _settle()
+
+
+async def _settle() -> None:
+    for _ in range(30):
+        await asyncio.sleep(0)
+
+
+class _FakeStore:
+    def __init__(self) -> None:
+        self.tasks: dict[int, dict] = {}
+        self.queries: list[str] = []
+        self._ids = itertools.count(1)
+
+    def add(self, next_run_at: float, interval_sec: int = 60, enabled: bool = True) -> int:
+        task_id = next(self._ids)
+        self.tasks[task_id] = {
+            "id": task_id,
+            "owner_id": 1,
+            "guild_id": None,
+            "channel_id": 10,
+            "prompt": f"task {task_id}",
+            "interval_sec": interval_sec,
+            "model_pref": None,
+            "next_run_at": int(next_run_at),
+            "enabled": enabled,
+        }
+        return task_id
+
+    def _public(self, row: dict) -> dict:
+        return {k: v for k, v in row.items() if k != "enabled"}
+
+    async def list_enabled_scheduled_tasks(self) -> list[dict]:
+        self.queries.append("list")
+        return [self._public(r) for r in sorted(self.tasks.values(), key=lambda r: r["next_run_at"]) if r["enabled"]]
+
+    async def get_scheduled_task(self, *, task_id: int):
+        self.queries.append("get")
+        row = self.tasks.get(task_id)
+        return self._public(row) if row and row["enabled"] else None
+
+    async def get_due_scheduled_tasks(self, *, now_ts: int, limit: int = 5) -> list[dict]:
+        self.queries.append("due")
+        return []
+
+    async def claim_scheduled_task(self, *, task_id: int, now_ts: int) -> bool:
+        self.queries.append("claim")
+        row = self.tasks.get(task_id)
+        if not row or not row["enabled"] or row["next_run_at"] > now_ts:
+            return False
+        row["next_run_at"] = now_ts + max(30, row["interval_sec"])
+        return True
+
+    async def create_scheduled_task(self, *, owner_id, guild_id, channel_id, prompt, interval_sec, model_pref=None, enabled=True) -> int:
+        self.queries.append("create")
+        return self.add(T0 + interval_sec, interval_sec=interval_sec, enabled=enabled)
+
+
+def _cog(store: _FakeStore, clock: _FakeClock, monkeypatch: pytest.MonkeyPatch, concurrency: int = 4):
+    monkeypatch.setenv("ORA_SCHEDULER_MAX_CONCURRENCY", str(concurrency))
+    bot = SimpleNamespace(store=store)
+    cog = SchedulerCog(bot, clock=clock, sleep=clock.sleep)
+    bot.get_cog = lambda name: cog if name == "SchedulerCog" else None
+    fired: list[tuple[int, float]] = []
+
+    async def _execute(task: dict) -> None:
+        fired.append((int(task["id"]), clock()))
+
+    cog._execute_task = _execute  # type: ignore[method-assign]
+    return bot, cog, fired
+
+
+@pytest.mark.asyncio
+async def test_tasks_fire_on_their_due_time_and_idle_makes_no_queries(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _FakeClock(T0)
+    store = _FakeStore()
+    task_id = store.add(T0 + 100, interval_sec=60)
+    _bot, cog, fired = _cog(store, clock, monkeypatch)
+    loop_task = asyncio.create_task(cog._run_loop())
+    try:
+        await clock.advance_to(T0 + 99.9)
+        assert fired == [] and store.queries == ["list"]
+
+        await clock.advance_to(T0 + 400)
+        expected = [T0 + 100 + 60 * k for k in range(6)]
+        assert [t for _id, t in fired] == expected
+        lateness_ms = [(t - due) * 1000 for (_id, t), due in zip(fired, expected)]
+        assert max(lateness_ms) < 1.0  # the old 15 s tick fired up to 15000 ms late
+        assert store.queries == ["list"] + ["claim"] * 6
+
+        # Disabled out from under us: one re-read on notification, then silence for ten hours.
+        store.tasks[task_id]["enabled"] = False
+        cog.notify_task_changed(task_id)
+        await _settle()
+        queries_after_disable = list(store.queries)
+        await clock.advance_to(T0 + 10 * 3600)
+        assert store.queries == queries_after_disable and queries_after_disable[-1] == "get"
+        assert len(fired) == 6 and cog.next_due_at() is None
+        assert "due" not in store.queries
+    finally:
+        loop_task.cancel()
+        await asyncio.gather(loop_task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_overdue_backlog_is_claimed_at_once_and_runs_with_bounded_concurrency(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _FakeClock(T0)
+    store = _FakeStore()
+    for i in range(12):
+        store.add(T0 - 3600 + i)
+    _bot, cog, _fired = _cog(store, clock, monkeypatch, concurrency=3)
+
+    gate = asyncio.Event()
+    running = 0
+    peak = 0
+    done: list[int] = []
+
+    async def _slow(task: dict) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await gate.wait()
+        running -= 1
+        done.append(int(task["id"]))
+
+    cog._execute_task = _slow  # type: ignore[method-assign]
+    loop_task = asyncio.create_task(cog._run_loop())
+    try:
+        await _settle()
+        assert store.queries.count("claim") == 12  # not five per tick
+        assert running == 3
+        gate.set()
+        await _settle()
+        assert sorted(done) == list(range(1, 13)) and peak == 3
+        assert cog.next_due_at() == int(T0) + 60
+    finally:
+        loop_task.cancel()
+        await asyncio.gather(loop_task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_schedule_tool_wakes_an_idle_scheduler(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _FakeClock(T0)
+    store = _FakeStore()
+    bot, cog, fired = _cog(store, clock, monkeypatch)
+    loop_task = asyncio.create_task(cog._run_loop())
+    try:
+        await clock.advance_to(T0 + 1)
+        assert cog.next_due_at() is None
+
+        message = SimpleNamespace(author=SimpleNamespace(id=1), guild=None, channel=SimpleNamespace(id=10))
+        reply = await schedule_task({"prompt": "morning summary", "interval_sec": 45}, message, None, bot=bot)
+        assert reply.startswith("✅ Scheduled task created: #1")
+        await _settle()
+        assert cog.next_due_at() == T0 + 45
+
+        await clock.advance_to(T0 + 45)
+        assert fired == [(1, T0 + 45)]
+    finally:
+        loop_task.cancel()
+        await asyncio.gather(loop_task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_store_lists_enabled_tasks_for_the_heap(tmp_path) -> None:
+    from src.storage import Store
+
+    store = Store(str(tmp_path / "ora.db"))
+    await store.init()
+    first = await store.create_scheduled_task(owner_id=1, guild_id=None, channel_id=10, prompt="a", interval_sec=120)
+    second = await store.create_scheduled_task(owner_id=1, guild_id=5, channel_id=11, prompt="b", interval_sec=60)
+    assert await store.set_scheduled_task_enabled(owner_id=1, task_id=first, enabled=False)
+
+    listed = await store.list_enabled_scheduled_tasks()
+    assert [row["id"] for row in listed] == [second]
+    assert listed[0]["channel_id"] == 11 and listed[0]["interval_sec"] == 60
+    assert await store.get_scheduled_task(task_id=second) == listed[0]
+    assert await store.get_scheduled_task(task_id=first) is None
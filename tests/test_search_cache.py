@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.utils.search_cache import SearchCache, search_cache_key
+from src.utils.search_client import SearchClient
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_PATH = REPO_ROOT / "scripts" / "bench_search_cache.py"
+if str(REPO_ROOT / "core" / "src") not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT / "core" / "src"))
+
+
+def _load_bench():
+    spec = importlib.util.spec_from_file_location("bench_search_cache", SCRIPT_PATH)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_key_normalizes_query_but_keeps_provider_locale_and_limit_apart() -> None:
+    base = search_cache_key("Tokyo  Weather", provider="google", locale="jp-ja", limit=5)
+    assert search_cache_key("  ｔｏｋｙｏ weather ", provider="Google", locale="JP-ja", limit=5) == base
+    assert search_cache_key("tokyo weather", provider="ddg", locale="jp-ja", limit=5) != base
+    assert search_cache_key("tokyo weather", provider="google", locale="us-en", limit=5) != base
+    assert search_cache_key("tokyo weather", provider="google", locale="jp-ja", limit=10) != base
+
+
+@pytest.mark.asyncio
+async def test_identical_burst_makes_one_upstream_call() -> None:
+    upstream = _load_bench().FakeSearchProvider(latency_sec=0.05)
+    cache = SearchCache(max_entries=8, db_path="")
+    key = search_cache_key("q", provider="fake")
+
+    replies = await asyncio.gather(*(cache.get_or_fetch(key, lambda: upstream.search("q")) for _ in range(50)))
+
+    assert upstream.calls == 1
+    assert sorted({status for _value, status in replies}) == ["coalesced", "miss"]
+    assert all(value is replies[0][0] for value, _status in replies)
+    assert cache.stats["coalesced"] == 49
+    assert (await cache.get_or_fetch(key, lambda: upstream.search("q")))[1] == "hit"
+    assert cache.hit_rate == pytest.approx(50 / 51)
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_one_refresh_runs() -> None:
+    clock = _Clock()
+    cache = SearchCache(ttl_sec=60, stale_sec=600, empty_ttl_sec=5, db_path="", clock=clock)
+    calls: list[str] = []
+
+    async def fetch(tag: str) -> list[dict]:
+        calls.append(tag)
+        await asyncio.sleep(0.01)
+        return [{"title": tag}]
+
+    await cache.get_or_fetch("k", lambda: fetch("v1"))
+    clock.now += 61
+    first = await cache.get_or_fetch("k", lambda: fetch("v2"))
+    second = await cache.get_or_fetch("k", lambda: fetch("v3"))
+    assert first == second == ([{"title": "v1"}], "stale")
+    await asyncio.sleep(0.05)
+    assert calls == ["v1", "v2"]  # one background refresh, not one per stale read
+    assert await cache.get_or_fetch("k", lambda: fetch("v4")) == ([{"title": "v2"}], "hit")
+
+    # Past the stale window the caller waits for a fresh value.
+    clock.now += 61 + 600
+    assert await cache.get_or_fetch("k", lambda: fetch("v5")) == ([{"title": "v5"}], "miss")
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached_and_empty_results_expire_quickly() -> None:
+    clock = _Clock()
+    cache = SearchCache(ttl_sec=300, stale_sec=600, empty_ttl_sec=5, db_path="", clock=clock)
+
+    async def boom() -> list[dict]:
+        raise RuntimeError("upstream down")
+
+    async def empty() -> list[dict]:
+        return []
+
+    async def found() -> list[dict]:
+        return [{"title": "ok"}]
+
+    with pytest.raises(RuntimeError):
+        await asyncio.gather(*(cache.get_or_fetch("k", boom) for _ in range(3)))
+    assert cache.stats["errors"] == 1 and len(cache) == 0
+
+    assert await cache.get_or_fetch("k", empty) == ([], "miss")
+    assert await cache.get_or_fetch("k", found) == ([], "hit")
+    clock.now += 6  # empty results are never served stale
+    assert await cache.get_or_fetch("k", found) == ([{"title": "ok"}], "miss")
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_sqlite_warm_restart(tmp_path: Path) -> None:
+    db_path = str(tmp_path / "cache" / "search.db")
+    cache = SearchCache(max_entries=2, db_path=db_path)
+    for q in ("a", "b", "c"):
+        await cache.get_or_fetch(q, lambda q=q: asyncio.sleep(0, result=[{"title": q}]))
+    assert len(cache) == 2 and cache.stats["evictions"] == 1
+    cache.close()
+
+    restarted = SearchCache(max_entries=2, db_path=db_path)
+
+    async def unexpected() -> list[dict]:
+        raise AssertionError("should have been served from SQLite")
+
+    assert await restarted.get_or_fetch("c", unexpected) == ([{"title": "c"}], "hit")
+    assert restarted.stats["persisted_loads"] == 1 and restarted.stats["upstream_calls"] == 0
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_search_client_coalesces_duplicate_queries(monkeypatch: pytest.MonkeyPatch) -> None:
+    upstream = _load_bench().FakeSearchProvider(latency_sec=0.05)
+    client = SearchClient(None, "google", cache=SearchCache(db_path=""))
+
+    async def fake_upstream(query, *, limit, engine, gl, hl):
+        return await upstream.search(query.strip(), limit)
+
+    monkeypatch.setattr(client, "_search_upstream", fake_upstream)
+    results = await asyncio.gather(*(client.search(q, limit=3) for q in ["Anime news", "anime  NEWS", "anime news"] * 5))
+
+    assert upstream.calls == 1
+    assert all(len(r) == 3 for r in results)
+    assert client.cache.stats["coalesced"] == 14
+
+
+@pytest.mark.asyncio
+async def test_core_execute_search_shares_entries_across_users(monkeypatch: pytest.MonkeyPatch) -> None:
+    from ora_core.tools import search as core_search
+
+    calls: list[tuple[str, str]] = []
+
+    async def fake_fetch(provider: str, query: str) -> list[dict]:
+        calls.append((provider, query))
+        await asyncio.sleep(0.01)
+        return [{"title": "t", "url": "https://example.invalid", "snippet": "s", "rank": 1, "provider": provider}]
+
+    cache = SearchCache(db_path="")
+    monkeypatch.setattr(core_search, "get_search_cache", lambda: cache)
+    monkeypatch.setattr(core_search, "_fetch_sources", fake_fetch)
+
+    replies = await asyncio.gather(
+        *(core_search.execute_search(f"user{i}", "Latest  Python release", provider_name="ddg") for i in range(4))
+    )
+    again = await core_search.execute_search("user9", "latest python release", provider_name="ddg")
+
+    assert calls == [("ddg", "latest python release")]
+    assert [r["metrics"]["cache"] for r in replies] == ["miss", "coalesced", "coalesced", "coalesced"]
+    assert again["metrics"]["cache_hit"] is True
+    assert again["structuredContent"]["sources"][0]["title"] == "t"
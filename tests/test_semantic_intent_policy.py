@@ -25,7 +25,12 @@ from ora_core.api.schemas.messages import HistoryMessage, MessageRequest
 from ora_core.brain.context import ContextBuilder
 from ora_core.brain.memory import memory_store
 from src.cogs.handlers.tool_selector import ToolSelector
-from src.utils.intent_semantics import classify_semantic_intent, has_explicit_export_constraint
+from src.utils.intent_semantics import (
+    PrototypeIndex,
+    classify_semantic_intent,
+    has_explicit_export_constraint,
+    semantic_similarity_batch,
+)
 
 
 class _FakeRepo:
@@ -271,3 +276,24 @@ def test_ambiguous_request_defaults_to_normal() -> None:
     assert result.focused_image_question is False
     assert result.image_followup is False
     assert result.save_export_intent is False
+
+
+def test_batch_scores_match_single_text_scores() -> None:
+    texts = ["画面全体を説明して", "CPUのところだけ説明して", "", "Export this as csv"]
+    batch = semantic_similarity_batch(texts)
+    for text, scores in zip(texts, batch):
+        single = semantic_similarity_batch([text])[0]
+        assert single == classify_semantic_intent(text).scores  # no context adjustments apply
+        assert scores.keys() == single.keys()
+        assert all(abs(scores[k] - single[k]) < 1e-9 for k in scores)
+    assert all(v == 0.0 for v in batch[2].values())
+
+
+def test_prototype_index_accepts_new_labels_after_first_use() -> None:
+    index = PrototypeIndex({"greeting": ["こんにちは", "hello"]})
+    assert index.best("hello")[0] == "greeting"
+    index.add("music", ["音楽を流して", "play some music"])
+    label, score, margin = index.best("play some music")
+    assert (label, round(score, 6)) == ("music", 1.0)
+    assert margin > 0.5
+    assert set(index.scores("x")) == {"greeting", "music"}
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from src.utils.stt_service import STT_SAMPLE_RATE, STTService, pcm_to_whisper_audio
+
+
+def _pcm(seconds: float, amplitude: int = 8000) -> bytes:
+    n = int(48000 * seconds)
+    mono = (amplitude * np.sin(2 * np.pi * 220 * np.arange(n) / 48000)).astype(np.int16)
+    return np.repeat(mono[:, None], 2, axis=1).tobytes()
+
+
+class FakeWhisper:
+    """Emits one segment per non-silent stretch, labelled with its duration."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.loaded: list[str] = []
+        self.calls: list[tuple[str, float]] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def load(self, name: str):
+        self.loaded.append(name)
+
+        def decode(audio: np.ndarray):
+            with self._lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            try:
+                time.sleep(self.delay)
+                self.calls.append((name, audio.size / STT_SAMPLE_RATE))
+                blocks = np.abs(audio[: audio.size // 160 * 160]).reshape(-1, 160).max(axis=1)
+                segments, start = [], None
+                for i, v in enumerate(np.append(blocks > 1e-3, False)):
+                    t = i * 160 / STT_SAMPLE_RATE
+                    if v and start is None:
+                        start = t
+                    elif not v and start is not None:
+                        if t - start > 0.05:
+                            segments.append((start, t, f"{name}:{t - start:.1f}s"))
+                        start = None
+                return segments
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        return decode
+
+
+def test_pcm_conversion_is_mono_16k_and_unpadded() -> None:
+    audio = pcm_to_whisper_audio(_pcm(1.5))
+    assert audio.dtype == np.float32
+    assert audio.size == int(1.5 * STT_SAMPLE_RATE)
+
+
+async def test_short_clips_from_several_speakers_share_one_decode() -> None:
+    fake = FakeWhisper()
+    service = STTService(ladder=["small"], workers=1, batch_max=4, batch_wait_ms=50, loader=fake.load)
+    try:
+        texts = await asyncio.gather(*(service.transcribe(_pcm(d)) for d in (1.0, 2.0, 1.5)))
+        assert texts == ["small:1.0s", "small:2.0s", "small:1.5s"]
+        # 4.5 s of speech plus two 1 s separators, decoded once.
+        assert len(fake.calls) == 1
+        assert abs(fake.calls[0][1] - 6.5) < 0.01
+
+        stats = service.stats()
+        assert stats["jobs"] == 3 and stats["batches"] == 1
+        assert stats["avg_batch_size"] == 3.0
+        assert stats["queue_wait_ms_p95"] >= 0.0
+        assert stats["rtf_avg"] >= 0.0
+    finally:
+        await service.close()
+
+
+async def test_pool_bounds_concurrency_and_skips_silence() -> None:
+    fake = FakeWhisper(delay=0.02)
+    service = STTService(ladder=["small"], workers=2, batch_max=1, loader=fake.load)
+    try:
+        assert await service.transcribe(bytes(48000 * 4)) == ""
+        texts = await asyncio.gather(*(service.transcribe(_pcm(0.5)) for _ in range(8)))
+        assert texts == ["small:0.5s"] * 8
+        assert fake.max_active <= 2
+        assert fake.loaded == ["small"]
+    finally:
+        await service.close()
+
+
+async def test_ladder_steps_down_under_backlog_and_recovers() -> None:
+    fake = FakeWhisper(delay=0.01)
+    service = STTService(
+        ladder=["small", "tiny"], workers=1, batch_max=1, downshift_queue=3, upshift_idle_sec=0.0, loader=fake.load
+    )
+    try:
+        await asyncio.gather(*(service.transcribe(_pcm(0.5)) for _ in range(6)))
+        assert "tiny" in [name for name, _ in fake.calls]
+        assert service.stats()["downshifts"] == 1
+
+        assert await service.transcribe(_pcm(0.5)) in {"small:0.5s", "tiny:0.5s"}
+        assert service.current_model == "small"
+        assert service.stats()["upshifts"] == 1
+    finally:
+        await service.close()
+
+
+def test_stt_model_heads_the_ladder_and_language_reaches_the_loader(monkeypatch) -> None:
+    from src.utils import stt_service
+    from src.utils.stt_client import WhisperClient
+
+    languages: list[str | None] = []
+    monkeypatch.setattr(stt_service, "default_loader", lambda language=None, beam_size=5: languages.append(language) or FakeWhisper().load)
+    monkeypatch.setattr(stt_service, "_service", None)
+    monkeypatch.delenv("ORA_STT_MODEL_LADDER", raising=False)
+
+    client = WhisperClient(model="base", language="en")
+    assert client._service is stt_service.get_stt_service()
+    assert client._service.ladder == ["base", "tiny"] and languages == ["en"]
+
+    assert STTService(model="medium", loader=FakeWhisper().load).ladder == ["medium", "small", "base", "tiny"]
+    assert STTService(model="distil-large-v3", loader=FakeWhisper().load).ladder == ["distil-large-v3"]
+    assert STTService(loader=FakeWhisper().load).ladder == ["small", "base", "tiny"]
+    assert STTService(model="small", loader=FakeWhisper().load).ladder == ["small", "base", "tiny"]
+    monkeypatch.setenv("ORA_STT_MODEL_LADDER", "large-v3, small")
+    assert STTService(model="tiny", loader=FakeWhisper().load).ladder == ["large-v3", "small"]
+
+
+async def test_close_resolves_jobs_that_are_mid_decode() -> None:
+    fake = FakeWhisper(delay=0.3)
+    service = STTService(ladder=["small"], workers=1, batch_max=4, batch_wait_ms=0, loader=fake.load)
+    pending = [asyncio.create_task(service.transcribe(_pcm(0.5))) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    await service.close()
+    assert await asyncio.wait_for(asyncio.gather(*pending), timeout=1.0) == ["", ""]
+
+
+def test_workers_on_a_previous_loop_are_stopped() -> None:
+    fake = FakeWhisper()
+    service = STTService(ladder=["small"], workers=2, loader=fake.load)
+    old_loop = asyncio.new_event_loop()
+    try:
+        assert old_loop.run_until_complete(service.transcribe(_pcm(0.5))) == "small:0.5s"
+        old_tasks = list(service._tasks)
+
+        async def _on_new_loop() -> str:
+            try:
+                return await service.transcribe(_pcm(0.5))
+            finally:
+                await service.close()
+
+        assert asyncio.run(_on_new_loop()) == "small:0.5s"
+        old_loop.run_until_complete(asyncio.sleep(0))
+        assert old_tasks and all(task.cancelled() for task in old_tasks)
+    finally:
+        old_loop.close()
@@ -2067,7 +2067,9 @@ def test_cli_reports_non_json_success_response(monkeypatch, capsys):
         def read(self):
             return b"not json"
 
-    monkeypatch.setattr(cli.urllib.request, "urlopen", lambda request, timeout: NonJsonResponse())
+    from yonerai_cli.services import http_pool_service
+
+    monkeypatch.setattr(http_pool_service, "urlopen", lambda request, timeout: NonJsonResponse())
 
     exit_code = cli.main(["health"])
 
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.cogs.handlers.tool_selector import ToolSelector
+
+
+class _CountingLLM:
+    def __init__(self, response: str):
+        self._resp = response
+        self.calls = 0
+
+    async def chat(self, *_args, **_kwargs):
+        self.calls += 1
+        return self._resp, None, {}
+
+
+_TOOLS = [
+    {"name": "read_web_page", "tags": ["web", "read"]},
+    {"name": "web_download", "tags": ["browser", "download"]},
+    {"name": "join_voice_channel", "tags": ["vc"]},
+    {"name": "music_play", "tags": ["vc"]},
+    {"name": "system_info", "tags": ["system"]},
+]
+
+
+def _selector(response: str) -> tuple[ToolSelector, _CountingLLM]:
+    bot = SimpleNamespace(config=SimpleNamespace(standard_model="gpt-5-mini", openai_api_key="dummy"))
+    sel = ToolSelector(bot)
+    llm = _CountingLLM(response)
+    sel.llm_client = llm
+    return sel, llm
+
+
+@pytest.mark.asyncio
+async def test_repeated_prompt_is_served_from_decision_cache() -> None:
+    sel, llm = _selector('{"categories":["WEB_READ"],"intents":{"download":false,"screenshot":false,"browser_control":false}}')
+
+    first = await sel.select_tools("この記事を要約して https://example.com/a", available_tools=list(_TOOLS))
+    # Same prompt modulo case/whitespace, fresh copies of the same tool bundle.
+    second = await sel.select_tools("この記事を要約して   HTTPS://example.com/a ", available_tools=[dict(t) for t in _TOOLS])
+
+    assert llm.calls == 1
+    assert [t["name"] for t in first] == [t["name"] for t in second] == ["read_web_page"]
+    stats = sel.router_cache_stats()
+    assert stats["decision_cache_hit_rate"] == 0.5
+    assert stats["bundle_cache_hit_rate"] >= 0.5
+
+    # The RAG context is part of what the LLM sees, so it is part of the key.
+    await sel.select_tools("この記事を要約して https://example.com/a", available_tools=list(_TOOLS), rag_context="ctx")
+    assert llm.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_prerouter_answers_obvious_prompts_without_llm() -> None:
+    sel, llm = _selector('{"categories":["SYSTEM_UTIL"]}')
+
+    out = await sel.select_tools("音楽を流して", available_tools=list(_TOOLS))
+    assert llm.calls == 0
+    assert {t["name"] for t in out} == {"join_voice_channel", "music_play"}
+    assert sel.router_cache_stats()["preroute_hit_rate"] == 1.0
+
+    # Ambiguous prompts, download requests and image attachments still go to the LLM.
+    await sel.select_tools("このコードのバグを直して", available_tools=list(_TOOLS))
+    await sel.select_tools("動画を保存して", available_tools=list(_TOOLS))
+    await sel.select_tools("音楽を流して", available_tools=list(_TOOLS), has_vision_attachment=True)
+    assert llm.calls == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("prompt", ["what's the weather today and search news", "画像を生成してVCで流して"])
+async def test_prerouter_defers_prompts_that_ask_for_two_things(prompt: str) -> None:
+    sel, llm = _selector('{"categories":["SYSTEM_UTIL","WEB_READ","VOICE_AUDIO"]}')
+    tools = [*_TOOLS, {"name": "generate_image", "tags": ["media"]}]
+    categories = {c: {"tools": [{}]} for c in ("SYSTEM_UTIL", "WEB_READ", "VOICE_AUDIO", "MEDIA_CREATE")}
+
+    assert sel._preroute(prompt, categories) is None
+    await sel.select_tools(prompt, available_tools=tools)
+    assert llm.calls == 1 and sel.router_cache_stats()["preroute_hit_rate"] == 0.0
+
+
+def test_prerouter_still_answers_its_own_prototypes() -> None:
+    from src.cogs.handlers import tool_selector
+
+    sel, _llm = _selector("{}")
+    categories = {c: {"tools": [{}]} for c in tool_selector._PREROUTE_PROTOTYPES}
+    for label, phrases in tool_selector._PREROUTE_PROTOTYPES.items():
+        for phrase in phrases:
+            assert sel._preroute(phrase, categories) == ([label], {"screenshot": False, "browser_control": False, "download": False}), phrase
+
+
+@pytest.mark.asyncio
+async def test_prerouter_defers_when_bundle_lacks_the_category(monkeypatch) -> None:
+    monkeypatch.setenv("ORA_ROUTER_PREROUTE", "1")
+    sel, llm = _selector('{"categories":["SYSTEM_UTIL"]}')
+    out = await sel.select_tools("音楽を流して", available_tools=[{"name": "system_info", "tags": ["system"]}])
+    assert llm.calls == 1
+    assert [t["name"] for t in out] == ["system_info"]
+
+
+@pytest.mark.asyncio
+async def test_failed_router_decisions_are_not_cached() -> None:
+    sel, llm = _selector("not json")
+    for _ in range(2):
+        out = await sel.select_tools("このコードのバグを直して", available_tools=list(_TOOLS))
+        assert [t["name"] for t in out] == ["system_info"]
+    assert llm.calls == 6  # 3 attempts per call, nothing remembered
+    assert sel.router_cache_stats()["fallbacks"] == 2
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import importlib
+import json
+import random
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.utils.trace_rollup import LatencyHistogram, TraceRollupStore, flush_rollup_writes
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_histogram_quantiles_within_relative_error() -> None:
+    rng = random.Random(7)
+    values = [rng.lognormvariate(7.0, 0.8) for _ in range(5000)]
+    hist = LatencyHistogram()
+    for v in values:
+        hist.add(v)
+
+    exact = sorted(values)
+    for q in (0.5, 0.95, 0.99):
+        truth = exact[int(q * (len(exact) - 1))]
+        assert abs(hist.quantile(q) - truth) / truth < 0.03
+
+    restored = LatencyHistogram.from_json(hist.to_json())
+    assert restored.count == hist.count
+    assert restored.quantile(0.95) == hist.quantile(0.95)
+
+
+def test_rollup_store_groups_and_window(tmp_path) -> None:
+    store = TraceRollupStore(str(tmp_path / "rollup.db"))
+    now = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+    store.record_many(
+        [
+            (now - timedelta(hours=1), {"route_band": "task", "provider": "openai", "model": "m1", "total_ms": 100}),
+            (now - timedelta(hours=2), {"route_band": "task", "provider": "openai", "model": "m1", "total_ms": 300, "budget_stop": True}),
+            (now - timedelta(hours=3), {"route_band": "agent", "provider": "local", "model": "m2", "total_ms": 2000, "status": "failed"}),
+            (now - timedelta(days=10), {"route_band": "task", "provider": "openai", "model": "m1", "total_ms": 99999}),
+        ]
+    )
+
+    out = store.rolling_kpis(days=7, group_by=["route_band"], now=now)
+    assert out["sample_count"] == 3
+    assert out["budget_stop_rate"] == round(1 / 3, 4)
+    assert out["failure_rate"] == round(1 / 3, 4)
+    assert out["p99_total_ms"] < 2100
+
+    groups = {g["route_band"]: g for g in out["groups"]}
+    assert groups["task"]["sample_count"] == 2
+    assert groups["agent"]["sample_count"] == 1
+    assert abs(groups["agent"]["p50_total_ms"] - 2000) / 2000 < 0.02
+    store.close()
+
+
+def test_trace_event_feeds_rollup_store(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv("ORA_TRACE_ENABLED", "1")
+    monkeypatch.setenv("ORA_TRACE_LOG", str(tmp_path / "agent_trace.jsonl"))
+    monkeypatch.setenv("ORA_TRACE_ROLLUP_DB", str(tmp_path / "rollup.db"))
+    import src.utils.agent_trace as agent_trace
+
+    agent_trace = importlib.reload(agent_trace)
+    agent_trace.trace_event("core.run.metrics", route_band="instant", provider="openai", model="m", total_ms=42)
+    agent_trace.trace_event("other.event", total_ms=1)
+    assert flush_rollup_writes()
+
+    store = TraceRollupStore(str(tmp_path / "rollup.db"))
+    out = store.rolling_kpis(days=1, group_by=["provider"])
+    assert out["sample_count"] == 1
+    assert out["groups"][0]["provider"] == "openai"
+    store.close()
+
+
+def test_trace_event_writes_the_store_off_the_calling_thread(monkeypatch, tmp_path) -> None:
+    import threading
+
+    import src.utils.trace_rollup as trace_rollup
+
+    monkeypatch.setenv("ORA_TRACE_ROLLUP_DB", str(tmp_path / "rollup.db"))
+    writers: list[str] = []
+    real_record_many = TraceRollupStore.record_many
+
+    def _record_many(self, items):
+        writers.append(threading.current_thread().name)
+        return real_record_many(self, items)
+
+    monkeypatch.setattr(TraceRollupStore, "record_many", _record_many)
+    trace_rollup.record_trace_event("core.run.metrics", {"total_ms": 5})
+    assert flush_rollup_writes()
+
+    assert writers and threading.current_thread().name not in writers
+    assert TraceRollupStore(str(tmp_path / "rollup.db")).rolling_kpis(days=1)["sample_count"] == 1
+
+
+def test_concurrent_processes_do_not_lose_histogram_counts(tmp_path) -> None:
+    db = tmp_path / "rollup.db"
+    TraceRollupStore(str(db)).close()  # create the schema before the writers race
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {str(ROOT)!r})\n"
+        "from datetime import datetime, timezone\n"
+        "from src.utils.trace_rollup import TraceRollupStore\n"
+        "store = TraceRollupStore(sys.argv[1])\n"
+        "ts = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)\n"
+        "for i in range(150):\n"
+        "    store.record({'route_band': 'task', 'total_ms': 10 + i}, ts=ts)\n"
+    )
+    procs = [subprocess.Popen([sys.executable, "-c", code, str(db)]) for _ in range(4)]
+    assert [p.wait(timeout=120) for p in procs] == [0, 0, 0, 0]
+
+    store = TraceRollupStore(str(db))
+    (samples, raw_hist), = store._connect().execute("SELECT samples, hist FROM kpi_rollup").fetchall()
+    assert samples == 600
+    assert LatencyHistogram.from_json(raw_hist).count == 600
+    store.close()
+
+
+def test_kpi_script_rebuilds_store_from_log(tmp_path) -> None:
+    log = tmp_path / "agent_trace.jsonl"
+    ts = datetime.now(timezone.utc).isoformat()
+    lines = [
+        {"ts": ts, "event": "core.run.metrics", "payload": {"route_band": "task", "total_ms": 120, "budget_stop": True}},
+        {"ts": ts, "event": "core.run.metrics", "payload": {"route_band": "task", "total_ms": 80}},
+        {"ts": ts, "event": "router.decision", "payload": {}},
+    ]
+    log.write_text("\n".join(json.dumps(x) for x in lines) + "\n", encoding="utf-8")
+    store = tmp_path / "rollup.db"
+
+    proc = subprocess.run(
+        [sys.executable, str(ROOT / "scripts" / "kpi_rolling_7d.py"), "--log", str(log), "--store", str(store), "--rebuild"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    out = json.loads(proc.stdout.strip().splitlines()[-1])
+    assert out["sample_count"] == 2
+    assert out["budget_stop_rate"] == 0.5
+    assert out["p95_total_ms"] > 0
+
+
+def test_kpi_script_auto_ignores_a_store_that_was_never_backfilled(tmp_path) -> None:
+    log = tmp_path / "agent_trace.jsonl"
+    old = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+    lines = [{"ts": old, "event": "core.run.metrics", "payload": {"total_ms": 100 + i}} for i in range(3)]
+    log.write_text("\n".join(json.dumps(x) for x in lines) + "\n", encoding="utf-8")
+    # What trace_event leaves behind: a store holding only the runs since it was created.
+    store = TraceRollupStore(str(tmp_path / "rollup.db"))
+    store.record({"total_ms": 50})
+    store.close()
+
+    def _run(*extra: str) -> subprocess.CompletedProcess:
+        cmd = [sys.executable, str(ROOT / "scripts" / "kpi_rolling_7d.py"), "--log", str(log), "--store", store.path]
+        return subprocess.run([*cmd, *extra], capture_output=True, text=True, check=True)
+
+    proc = _run()
+    assert json.loads(proc.stdout.strip().splitlines()[-1])["sample_count"] == 3
+    assert "never backfilled" in proc.stderr
+
+    proc = _run("--rebuild")
+    assert json.loads(proc.stdout.strip().splitlines()[-1])["sample_count"] == 3
+    assert "never backfilled" not in proc.stderr
+    assert store.backfilled_at() is not None
+    store.close()
+
+    proc = _run("--source", "store")
+    assert "p99_total_ms" in json.loads(proc.stdout)
+    assert proc.stderr == ""
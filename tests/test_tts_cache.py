@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from src.utils.tts_cache import TTSAudioCache, prewarm_phrases_from_env, tts_cache_key
+
+
+def test_cache_key_covers_voice_parameters() -> None:
+    base = tts_cache_key("こんにちは", speaker_id=1, speed_scale=1.0, engine_version="0.14.0")
+    assert base == tts_cache_key(" こんにちは ", speaker_id=1, speed_scale=1.0, engine_version="0.14.0")
+    assert base != tts_cache_key("こんにちは", speaker_id=2, speed_scale=1.0, engine_version="0.14.0")
+    assert base != tts_cache_key("こんにちは", speaker_id=1, speed_scale=1.2, engine_version="0.14.0")
+    assert base != tts_cache_key("こんにちは", speaker_id=1, speed_scale=1.0, engine_version="0.15.0")
+
+
+def test_memory_then_disk_hits_and_ttl(tmp_path) -> None:
+    cache = TTSAudioCache(tmp_path, max_memory_bytes=1024, max_disk_bytes=1 << 20, ttl_sec=3600)
+    key = tts_cache_key("hello", speaker_id=1, speed_scale=1.0)
+    assert cache.get(key) is None
+    cache.put(key, b"RIFF" * 10)
+    assert cache.get(key) == b"RIFF" * 10
+
+    # A fresh instance (bot restart) only has the disk tier.
+    reopened = TTSAudioCache(tmp_path, max_memory_bytes=1024, max_disk_bytes=1 << 20, ttl_sec=3600)
+    assert reopened.get(key) == b"RIFF" * 10
+    assert reopened.get(key) == b"RIFF" * 10
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+    path = next(tmp_path.glob("*/*.audio"))
+    old = time.time() - 7200
+    os.utime(path, (old, old))
+    expired = TTSAudioCache(tmp_path, max_memory_bytes=1024, max_disk_bytes=1 << 20, ttl_sec=3600)
+    assert expired.get(key) is None
+    assert expired.stats()["expired"] == 1
+    assert not path.exists()
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path) -> None:
+    cache = TTSAudioCache(tmp_path, max_memory_bytes=0, max_disk_bytes=250, ttl_sec=0)
+    keys = [tts_cache_key(f"phrase {i}", speaker_id=1, speed_scale=1.0) for i in range(3)]
+    now = time.time()
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, bytes(100))
+        path = next(tmp_path.glob(f"*/{key}.audio"))
+        os.utime(path, (now - 100 + i, now - 100 + i))
+    assert cache.get(keys[0]) == bytes(100)  # bump keys[0] so keys[1] is the LRU entry
+    cache.put(keys[2], bytes(100))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == bytes(100)
+    assert cache.get(keys[2]) == bytes(100)
+    assert cache.stats()["evictions"] == 1
+
+
+async def test_voice_manager_synthesizes_once_per_phrase(tmp_path) -> None:
+    pytest.importorskip("torch")  # voice_manager pulls in the T5 TTS client
+    from src.utils.voice_manager import VoiceManager
+
+    class FakeVoiceVox:
+        speaker_id = 3
+
+        def __init__(self) -> None:
+            self.calls: list[tuple[str, int, float]] = []
+
+        async def get_version(self) -> str:
+            return "0.14.0"
+
+        async def synthesize(self, text: str, speaker_id: int | None = None, speed_scale: float = 1.0) -> bytes:
+            self.calls.append((text, speaker_id, speed_scale))
+            return f"wav:{text}".encode()
+
+    manager = VoiceManager.__new__(VoiceManager)
+    manager._tts = FakeVoiceVox()
+    manager.tts_cache = TTSAudioCache(tmp_path, max_memory_bytes=1 << 20, max_disk_bytes=1 << 20, ttl_sec=0)
+
+    assert await manager.prewarm_tts(["おはよう", "おはよう", "またね"]) == 2
+    assert await manager._synthesize_voicevox("おはよう", None, 1.0) == "wav:おはよう".encode()
+    assert await manager._synthesize_voicevox("おはよう", 3, 1.0) == "wav:おはよう".encode()
+    assert manager._tts.calls == [("おはよう", 3, 1.0), ("またね", 3, 1.0)]
+    assert manager.tts_cache.stats()["hit_rate"] > 0.5
+
+
+def test_prewarm_phrases_from_env(monkeypatch) -> None:
+    monkeypatch.setenv("ORA_TTS_PREWARM_PHRASES", "おはよう| こんにちは |\nおはよう")
+    assert prewarm_phrases_from_env() == ["おはよう", "こんにちは"]
+
+
+async def test_failed_version_lookup_is_not_retried_on_every_synthesis(monkeypatch) -> None:
+    from src.utils import tts_client
+
+    calls: list[str] = []
+
+    class DownSession:
+        def get(self, url, **kwargs):
+            calls.append(url)
+            raise OSError("connection refused")
+
+    class Borrow:
+        async def __aenter__(self):
+            return DownSession()
+
+        async def __aexit__(self, *exc):
+            return False
+
+    clock = [1000.0]
+    monkeypatch.setattr(tts_client, "borrow_session", lambda: Borrow())
+    monkeypatch.setattr(tts_client.time, "monotonic", lambda: clock[0])
+
+    client = tts_client.VoiceVoxClient("http://voicevox.invalid", speaker_id=1)
+    assert await client.get_version() == ""
+    assert await client.get_version() == ""
+    assert len(calls) == 1
+
+    clock[0] += client.VERSION_RETRY_SEC + 1
+    assert await client.get_version() == ""
+    assert len(calls) == 2
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+
+from src.utils.tts_pipeline import ChunkedPCMSource, SentencePipeline, split_sentences
+
+
+def test_split_sentences_japanese_and_latin() -> None:
+    assert split_sentences("はい。今日はいい天気ですね！散歩に行きましょうか？") == [
+        "はい。今日はいい天気ですね！",
+        "散歩に行きましょうか？",
+    ]
+    assert split_sentences("The answer is 3.14 exactly. Next question?\nDone") == [
+        "The answer is 3.14 exactly.",
+        "Next question?",
+        "Done",
+    ]
+    assert split_sentences("「はい」と言った。") == ["「はい」と言った。"]
+    assert split_sentences("   ") == []
+
+
+def test_split_sentences_breaks_overlong_sentence_at_commas() -> None:
+    long = "、".join(["とても長い文章の一部分です"] * 12) + "。"
+    chunks = split_sentences(long, max_chars=60)
+    assert len(chunks) > 1
+    assert all(len(c) <= 60 for c in chunks)
+    assert all(c.endswith("、") for c in chunks[:-1])
+    assert "".join(chunks) == long
+
+
+class _Synth:
+    def __init__(self, fail: set[str] | None = None) -> None:
+        self.fail = fail or set()
+        self.started: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self.cancelled = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, text: str) -> bytes:
+        self.started.append(text)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.release.wait()
+            if text in self.fail:
+                raise RuntimeError("engine down")
+            return text.encode()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active -= 1
+
+
+async def test_pipeline_prefetches_in_order_with_bounded_window() -> None:
+    synth = _Synth(fail={"b"})
+    pipeline = SentencePipeline(["a", "b", "c", "d", "e"], synth, prefetch=2)
+    first = asyncio.create_task(pipeline.next())
+    await asyncio.sleep(0.01)
+    # "a" is awaited and "b" already synthesizing, but never more than the window.
+    assert synth.started == ["a", "b"]
+    synth.release.set()
+    assert await first == b"a"
+    assert [await pipeline.next() for _ in range(4)] == [b"c", b"d", b"e", None]
+    assert synth.max_active <= 2
+    assert pipeline.failed == 1
+
+
+async def test_cancel_stops_every_in_flight_synthesis() -> None:
+    synth = _Synth()
+    pipeline = SentencePipeline(["a", "b", "c", "d"], synth, prefetch=3)
+    waiter = asyncio.create_task(pipeline.next())
+    await asyncio.sleep(0.01)
+    assert synth.active == 3
+
+    pipeline.cancel()
+    assert await waiter is None
+    await asyncio.sleep(0)
+    assert synth.cancelled == 3
+    assert "d" not in synth.started
+    assert await pipeline.next() is None
+
+
+class _Chunk:
+    def __init__(self, tag: int, frames: int) -> None:
+        self.frames = [bytes([tag]) * 3840 for _ in range(frames)]
+        self.cleaned = False
+
+    def read(self) -> bytes:
+        return self.frames.pop(0) if self.frames else b""
+
+    def cleanup(self) -> None:
+        self.cleaned = True
+
+
+async def test_chunked_source_stitches_chunks_without_gaps() -> None:
+    stream = ChunkedPCMSource(asyncio.get_running_loop())
+    first, second = _Chunk(1, 2), _Chunk(2, 1)
+    stream.feed(first)
+    stream.feed(second)
+    assert stream.pending == 1
+
+    reads = [stream.read()[0] for _ in range(3)]
+    assert reads == [1, 1, 2]
+    assert first.cleaned and stream.chunks_played == 1
+    await asyncio.wait_for(stream.wait_for_room(0), timeout=1)
+
+    # Next sentence not ready yet: silence keeps the player alive instead of ending it.
+    assert stream.read() == bytes(3840)
+    assert stream.underrun_frames == 1
+    stream.feed(_Chunk(3, 1))
+    stream.close()
+    assert stream.read()[0] == 3
+    assert stream.read() == b""
+
+
+async def test_chunked_source_cancel_ends_playback_and_cleans_up() -> None:
+    stream = ChunkedPCMSource(asyncio.get_running_loop())
+    queued = [_Chunk(1, 5), _Chunk(2, 5)]
+    for chunk in queued:
+        stream.feed(chunk)
+    stream.cancel()
+    assert stream.read() == b""
+    assert all(chunk.cleaned for chunk in queued)
+
+    late = _Chunk(3, 1)
+    stream.feed(late)
+    assert late.cleaned and stream.read() == b""
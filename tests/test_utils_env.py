@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from src.utils.env import env_float, env_int
+
+
+def test_env_knobs_fall_back_and_clamp(monkeypatch) -> None:
+    monkeypatch.delenv("ORA_TEST_KNOB", raising=False)
+    assert env_int("ORA_TEST_KNOB", 5, 1, 10) == 5
+
+    for raw, expected in (("7", 7), (" 7 ", 7), ("", 5), ("seven", 5), ("0", 1), ("99", 10)):
+        monkeypatch.setenv("ORA_TEST_KNOB", raw)
+        assert env_int("ORA_TEST_KNOB", 5, 1, 10) == expected, raw
+
+    monkeypatch.setenv("ORA_TEST_KNOB", "2.5")
+    assert env_float("ORA_TEST_KNOB", 1.0, 0.0, 2.0) == 2.0
+    monkeypatch.setenv("ORA_TEST_KNOB", "nan?")
+    assert env_float("ORA_TEST_KNOB", 1.0, 0.0, 2.0) == 1.0
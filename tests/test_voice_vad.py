@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.utils.voice_vad import FRAME_BYTES, FRAME_MS, EnergyVAD, PCMRingBuffer, SpeechSegmenter, VADConfig
+
+
+def _frames(ms: int, amplitude: float, *, seed: int = 0) -> bytes:
+    n = 48000 * ms // 1000
+    t = np.arange(n) / 48000.0
+    rng = np.random.default_rng(seed)
+    mono = amplitude * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 30, n)
+    stereo = np.repeat(np.clip(mono, -32768, 32767).astype(np.int16)[:, None], 2, axis=1)
+    return stereo.tobytes()
+
+
+def _feed(seg: SpeechSegmenter, pcm: bytes, start: float = 0.0):
+    events = []
+    now = start
+    for i in range(0, len(pcm), FRAME_BYTES):
+        events.extend(seg.push(pcm[i : i + FRAME_BYTES], now))
+        now += FRAME_MS / 1000.0
+    return events, now
+
+
+def _segmenter(**overrides) -> SpeechSegmenter:
+    config = VADConfig(**{"backend": "energy", "partial_ms": 500, **overrides})
+    return SpeechSegmenter(config, EnergyVAD(min_dbfs=config.min_dbfs, noise_margin_db=config.noise_margin_db))
+
+
+def test_ring_buffer_wraps_and_returns_newest_bytes() -> None:
+    ring = PCMRingBuffer(8)
+    ring.append(b"abcde")
+    ring.append(b"fghij")
+    assert len(ring) == 8
+    assert ring.read_last(8) == b"cdefghij"
+    assert ring.read_last(3) == b"hij"
+    ring.append(b"0123456789AB")
+    assert ring.read_last(8) == b"456789AB"
+
+
+def test_utterance_emits_start_partials_and_trimmed_end() -> None:
+    seg = _segmenter(end_ms=300)
+    pcm = _frames(500, 0) + _frames(1200, 8000) + _frames(600, 0)
+    events, _ = _feed(seg, pcm)
+
+    kinds = [e.kind for e in events]
+    assert kinds[0] == "start"
+    assert kinds.count("partial") == 2
+    assert kinds[-1] == "end"
+    end = events[-1]
+    # Speech plus ~200 ms pre-roll and a little trailing silence, not the whole stream.
+    assert 1200 <= end.duration_ms <= 1700
+    assert not seg.speaking
+
+
+def test_short_noise_burst_does_not_trigger_speech() -> None:
+    seg = _segmenter()
+    events, _ = _feed(seg, _frames(400, 0) + _frames(60, 12000) + _frames(400, 0))
+    assert events == []
+
+
+def test_packet_gap_closes_the_utterance() -> None:
+    seg = _segmenter(partial_ms=0)
+    events, now = _feed(seg, _frames(800, 8000))
+    assert [e.kind for e in events] == ["start"]
+    assert seg.flush_if_idle(now + 0.1) == []
+
+    ended = seg.flush_if_idle(now + 0.5)
+    assert [e.kind for e in ended] == ["end"]
+    assert ended[0].duration_ms >= 700
+
+
+def test_long_speech_is_split_at_max_segment() -> None:
+    seg = _segmenter(partial_ms=0, max_segment_ms=2000)
+    events, _ = _feed(seg, _frames(4500, 8000))
+    ends = [e for e in events if e.kind == "end"]
+    assert len(ends) == 2
+    assert all(e.duration_ms <= 2000 for e in ends)
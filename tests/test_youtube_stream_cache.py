@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import src.utils.youtube as yt
+from src.utils.youtube_stream_cache import ResolvedStream, YouTubeStreamCache, stream_cache_key, stream_url_expiry
+
+
+class _FakeExtractor:
+    """Stands in for yt-dlp: slow, counts calls, returns googlevideo-style URLs."""
+
+    def __init__(self, delay: float = 0.05, expire_in: float = 6 * 3600) -> None:
+        self.delay = delay
+        self.expire_in = expire_in
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str) -> ResolvedStream | None:
+        with self._lock:
+            self.calls.append(query)
+        time.sleep(self.delay)
+        if "missing" in query:
+            return None
+        vid = "dQw4w9WgXcQ"
+        expire = int(time.time() + self.expire_in)
+        return ResolvedStream(url=f"https://rr1.googlevideo.com/videoplayback?expire={expire}&n={len(self.calls)}", title="Song", duration=212, video_id=vid)
+
+
+def test_url_spellings_share_a_key_and_expiry_is_parsed() -> None:
+    keys = {
+        stream_cache_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10"),
+        stream_cache_key("https://youtu.be/dQw4w9WgXcQ"),
+        stream_cache_key("https://music.youtube.com/watch?v=dQw4w9WgXcQ"),
+        stream_cache_key("https://www.youtube.com/shorts/dQw4w9WgXcQ"),
+    }
+    assert keys == {"id:dQw4w9WgXcQ"}
+    assert stream_cache_key("  Never  Gonna ") == stream_cache_key("ytsearch1:never gonna")
+    assert stream_url_expiry("https://rr1.googlevideo.com/videoplayback?expire=1700000000&x=1") == 1700000000.0
+    assert stream_url_expiry("https://rr1.googlevideo.com/videoplayback/expire/1700000000/id/x") == 1700000000.0
+    assert stream_url_expiry("/tmp/song.mp3") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_extraction_and_search_aliases_the_video_id() -> None:
+    extractor = _FakeExtractor()
+    cache = YouTubeStreamCache(extractor, ttl_sec=600, expiry_margin_sec=60)
+
+    results = await asyncio.gather(*(cache.resolve("never gonna give you up") for _ in range(5)))
+    assert len(extractor.calls) == 1 and len({r.url for r in results}) == 1
+
+    by_url = await cache.resolve("https://youtu.be/dQw4w9WgXcQ")
+    assert by_url == results[0] and len(extractor.calls) == 1
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["joined"] == 4 and stats["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_first_caller_does_not_fail_the_ones_waiting_on_it() -> None:
+    extractor = _FakeExtractor(delay=0.2)
+    cache = YouTubeStreamCache(extractor, ttl_sec=600, expiry_margin_sec=60)
+
+    leader = asyncio.create_task(cache.resolve("never gonna give you up"))
+    await asyncio.sleep(0.02)
+    waiters = [asyncio.create_task(cache.resolve("never gonna give you up")) for _ in range(3)]
+    await asyncio.sleep(0.02)
+    leader.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+    results = await asyncio.gather(*waiters)
+    assert all(r is not None and r.url for r in results) and len({r.url for r in results}) == 1
+    assert len(extractor.calls) == 1
+    assert cache.peek("never gonna give you up") == results[0]
+
+
+@pytest.mark.asyncio
+async def test_entries_go_stale_before_the_stream_url_expires() -> None:
+    now = [time.time()]
+    extractor = _FakeExtractor(delay=0, expire_in=1200)
+    cache = YouTubeStreamCache(extractor, ttl_sec=3600, expiry_margin_sec=900, clock=lambda: now[0])
+
+    first = await cache.resolve("song a")
+    assert cache.peek("song a") == first
+    now[0] += 301  # 1200s URL lifetime minus 900s margin
+    assert cache.peek("song a") is None
+    second = await cache.resolve("song a")
+    assert second.url != first.url and len(extractor.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_prefetch_warms_upcoming_items_and_failures_are_not_cached() -> None:
+    extractor = _FakeExtractor()
+    cache = YouTubeStreamCache(extractor, ttl_sec=600, expiry_margin_sec=60, prefetch_concurrency=2)
+
+    assert cache.prefetch(["next song", "missing song", "", "next song"]) == 2
+    await cache.drain()
+    assert cache.peek("next song") is not None and cache.peek("missing song") is None
+    assert cache.prefetch(["next song"]) == 0
+
+    started = time.perf_counter()
+    await cache.resolve("next song")
+    assert time.perf_counter() - started < extractor.delay
+    await cache.resolve("missing song")
+    assert extractor.calls.count("missing song") == 2
+    assert cache.stats()["prefetched"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_youtube_audio_stream_url_goes_through_the_cache(monkeypatch) -> None:
+    extractor = _FakeExtractor(delay=0)
+    monkeypatch.setattr(yt, "_stream_cache", YouTubeStreamCache(extractor, ttl_sec=600, expiry_margin_sec=60))
+
+    first = await yt.get_youtube_audio_stream_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    again = await yt.get_youtube_audio_stream_url("https://youtu.be/dQw4w9WgXcQ")
+    assert first == again and first[1:] == ("Song", 212)
+    assert len(extractor.calls) == 1